@@ -0,0 +1,261 @@
+# backend_selector.py
+# Bir ONNX modeli için en hızlı çıkarım arka ucunu seçer. Makinede kullanılabilen adaylar (yerel TensorRT motoru,
+# ONNX Runtime TensorRT/CUDA sağlayıcıları ve farklı iş parçacığı sayılarıyla CPU sağlayıcısı) kısa bir ısıtma
+# ve zamanlama turuyla ölçülür; kazanan makine + model özeti + aday kümesi anahtarıyla diske yazılır. Sonraki
+# açılışlarda karar ölçüm yapılmadan kullanılır. Aday kümesi değişirse (örn. TensorRT motoru derlenip hazır
+# olduğunda) seçim yeniden yapılır.
+#
+# Elle seçim: YOLO_BACKEND=ort-cpu:4 (ortam değişkeni). Kararı sıfırlama: python backend_selector.py best.onnx --forget
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import threading
+import time
+import traceback
+
+import numpy as np
+import onnxruntime as ort
+
+import engine_cache  # ONNX içerik özeti, GPU adı ve önbellek dizini
+from ort_backend import available_cpu_count, ort_trt_cache_warm
+
+# Seçim kararlarının saklandığı dosya
+BACKEND_SELECTION_FILE = os.path.join(engine_cache.ENGINE_CACHE_DIR, "backend_selection.json")
+
+# Verilirse ölçüm yapılmadan bu aday kullanılır (örn. "ort-cuda", "ort-cpu:2")
+BACKEND_OVERRIDE_ENV = "YOLO_BACKEND"
+
+# Aday başına ölçüm
+BENCHMARK_WARMUP_RUNS = 5
+BENCHMARK_TIMED_RUNS = 20
+
+# Aday adları
+CANDIDATE_TENSORRT = "tensorrt"  # Yerel TensorRT motoru (engine_cache)
+CANDIDATE_ORT_TENSORRT = "ort-tensorrt"
+CANDIDATE_ORT_CUDA = "ort-cuda"
+CANDIDATE_ORT_CPU = "ort-cpu"  # "ort-cpu:<iş parçacığı>"
+
+_decisions_lock = threading.Lock()
+# Aynı anda tek ölçüm: iki model (veya iki iş parçacığı) birlikte ölçülürse GPU/CPU paylaşılır, süreler bozulur
+_benchmark_lock = threading.Lock()
+_machine_fingerprint = None
+
+
+def cpu_thread_options(available):
+    """CPU sağlayıcısı için denenecek iş parçacığı sayıları."""
+    return sorted({1, max(1, available // 2), max(1, available - 1), available})
+
+
+def list_candidates(engine_path=None, available_cpus=None, onnx_path=None):
+    """
+    Bu makinede denenebilecek arka uçları döndürür.
+    :param engine_path: Model için derlenmiş yerel TensorRT motoru (yoksa None).
+    :param onnx_path: Verilirse ONNX Runtime TensorRT adayı yalnızca bu modelin motor önbelleği doluysa eklenir;
+        soğuk önbellekte oturum açılışı motoru derler (dakikalar sürebilir) ve açılıştaki ölçümü bekletir.
+    """
+    providers = ort.get_available_providers()
+    candidates = []
+    if engine_path is not None:
+        candidates.append(CANDIDATE_TENSORRT)
+    if "TensorrtExecutionProvider" in providers:
+        if onnx_path is None or ort_trt_cache_warm(onnx_path):
+            candidates.append(CANDIDATE_ORT_TENSORRT)
+        else:
+            print(f"HATA AYIKLAMA (backend_selector): {CANDIDATE_ORT_TENSORRT} motor önbelleği boş, ölçüme alınmadı "
+                  f"({BACKEND_OVERRIDE_ENV}={CANDIDATE_ORT_TENSORRT} ile bir kez açılınca önbellek dolar).")
+    if "CUDAExecutionProvider" in providers:
+        candidates.append(CANDIDATE_ORT_CUDA)
+    if available_cpus is None:
+        available_cpus = available_cpu_count()
+    candidates.extend(f"{CANDIDATE_ORT_CPU}:{threads}" for threads in cpu_thread_options(available_cpus))
+    return candidates
+
+
+def parse_candidate(candidate):
+    """'ort-cpu:4' -> ('ort-cpu', 4); diğer adaylar -> (ad, None)."""
+    name, _, threads = candidate.partition(":")
+    return name, int(threads) if threads else None
+
+
+def machine_fingerprint():
+    """Kararın geçerli olduğu makineyi tanımlayan alanlar (donanım ve çalışma zamanı sürümleri)."""
+    global _machine_fingerprint
+    if _machine_fingerprint is None:
+        has_gpu = any(name in ort.get_available_providers()
+                      for name in ("CUDAExecutionProvider", "TensorrtExecutionProvider"))
+        _machine_fingerprint = {
+            "host": platform.node(),
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "cpus": os.cpu_count(),
+            "gpu": engine_cache.get_gpu_name() if has_gpu or engine_cache.get_trt_version() != "no-tensorrt"
+            else "no-gpu",
+            "onnxruntime": ort.__version__,
+            "tensorrt": engine_cache.get_trt_version(),
+        }
+    return _machine_fingerprint
+
+
+def compute_decision_key(onnx_path, candidates):
+    key_fields = {
+        "onnx_sha256": engine_cache.onnx_content_hash(onnx_path),
+        "machine": machine_fingerprint(),
+        "candidates": sorted(candidates),
+    }
+    return hashlib.sha256(json.dumps(key_fields, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _load_decisions():
+    try:
+        with open(BACKEND_SELECTION_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"UYARI (backend_selector): Seçim dosyası okunamadı, yok sayılıyor: {e}")
+        return {}
+
+
+def _write_decisions(decisions):
+    """Kararları geçici dosyaya yazıp yerine taşır (yarıda kalan yazım dosyayı bozmaz). _decisions_lock altında."""
+    os.makedirs(os.path.dirname(BACKEND_SELECTION_FILE), exist_ok=True)
+    tmp_path = BACKEND_SELECTION_FILE + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(decisions, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, BACKEND_SELECTION_FILE)
+
+
+def _store_decision(key, entry):
+    with _decisions_lock:
+        decisions = _load_decisions()
+        decisions[key] = entry
+        _write_decisions(decisions)
+
+
+def forget(onnx_path):
+    """Bu modelin tüm kayıtlı kararlarını siler; sonraki yüklemede ölçüm yeniden yapılır."""
+    digest = engine_cache.onnx_content_hash(onnx_path)
+    with _decisions_lock:
+        decisions = _load_decisions()
+        kept = {key: entry for key, entry in decisions.items() if entry.get("onnx_sha256") != digest}
+        if len(kept) != len(decisions):
+            _write_decisions(kept)
+    return len(decisions) - len(kept)
+
+
+def benchmark_model(model, warmup_runs=BENCHMARK_WARMUP_RUNS, timed_runs=BENCHMARK_TIMED_RUNS):
+    """Modelin geçerli giriş boyutunda ortanca çıkarım süresini (ms) ölçer."""
+    dummy_input = np.zeros((1, 3, model.input_height, model.input_width), dtype=np.float32)
+    for _ in range(warmup_runs):
+        model.infer(dummy_input)
+    timings = []
+    for _ in range(timed_runs):
+        start = time.perf_counter()
+        model.infer(dummy_input)
+        timings.append((time.perf_counter() - start) * 1000.0)
+    return float(np.median(timings))
+
+
+def select_backend(onnx_path, candidates, load_candidate):
+    """
+    Model için arka ucu seçer ve o arka uçla yüklenmiş modeli döndürür.
+    :param candidates: list_candidates() çıktısı.
+    :param load_candidate: aday adı -> YoloModel (veya None) döndüren yükleyici.
+    :return: (aday adı, YoloModel); hiçbir aday yüklenemezse (None, None).
+    """
+    override = os.environ.get(BACKEND_OVERRIDE_ENV)
+    if override:
+        print(f"HATA AYIKLAMA (backend_selector): {BACKEND_OVERRIDE_ENV}={override} ile arka uç elle seçildi.")
+        return override, _try_load(load_candidate, override)
+
+    key = compute_decision_key(onnx_path, candidates)
+    cached = _load_decisions().get(key)
+    selected = _use_cached(cached, candidates, load_candidate)
+    if selected is not None:
+        return selected
+
+    with _benchmark_lock:
+        # Kilit beklenirken başka bir iş parçacığı aynı model için ölçüp kaydetmiş olabilir
+        latest = _load_decisions().get(key)
+        if latest != cached:
+            selected = _use_cached(latest, candidates, load_candidate)
+            if selected is not None:
+                return selected
+        return _benchmark_candidates(onnx_path, key, candidates, load_candidate)
+
+
+def _use_cached(cached, candidates, load_candidate):
+    """Kayıtlı kararın arka ucunu yükler: (aday adı, YoloModel); kayıt yoksa veya yüklenemezse None."""
+    if cached is None or cached.get("backend") not in candidates:
+        return None
+    model = _try_load(load_candidate, cached["backend"])
+    if model is None:
+        print(f"UYARI (backend_selector): Kayıtlı arka uç ({cached['backend']}) yüklenemedi, yeniden ölçülüyor.")
+        return None
+    print(f"HATA AYIKLAMA (backend_selector): Kayıtlı seçim kullanılıyor: {cached['backend']}")
+    return cached["backend"], model
+
+
+def _benchmark_candidates(onnx_path, key, candidates, load_candidate):
+    """Adayları sırayla ölçer, kazananı kaydeder. _benchmark_lock altında çağrılır."""
+    print(f"HATA AYIKLAMA (backend_selector): {os.path.basename(onnx_path)} için arka uçlar ölçülüyor: {candidates}")
+    timings = {}
+    best_candidate, best_model = None, None
+    for candidate in candidates:
+        model = _try_load(load_candidate, candidate)
+        if model is None:
+            continue
+        try:
+            timings[candidate] = benchmark_model(model)
+        except Exception as e:
+            print(f"UYARI (backend_selector): {candidate} ölçülemedi: {e}")
+            continue
+        print(f"HATA AYIKLAMA (backend_selector): {candidate:<14} {timings[candidate]:8.2f} ms")
+        if best_candidate is None or timings[candidate] < timings[best_candidate]:
+            best_candidate, best_model = candidate, model
+        del model  # Kaybeden adayın oturumu/motoru bırakılır
+
+    if best_candidate is None:
+        return None, None
+    print(f"HATA AYIKLAMA (backend_selector): Seçilen arka uç: {best_candidate} ({timings[best_candidate]:.2f} ms)")
+    try:
+        _store_decision(key, {
+            "backend": best_candidate,
+            "timings_ms": timings,
+            "onnx_path": os.path.abspath(onnx_path),
+            "onnx_sha256": engine_cache.onnx_content_hash(onnx_path),
+            "selected_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        })
+    except OSError as e:
+        print(f"UYARI (backend_selector): Seçim kaydedilemedi: {e}")
+    return best_candidate, best_model
+
+
+def _try_load(load_candidate, candidate):
+    try:
+        return load_candidate(candidate)
+    except Exception as e:
+        print(f"UYARI (backend_selector): {candidate} yüklenemedi: {e}")
+        traceback.print_exc()
+        return None
+
+
+def _main():
+    parser = argparse.ArgumentParser(description="ONNX modeli için arka uç seçimi (ölçüm ve kayıtlı karar)")
+    parser.add_argument("model", help=".onnx model yolu")
+    parser.add_argument("--forget", action="store_true", help="Kayıtlı kararı silip yeniden ölç")
+    args = parser.parse_args()
+
+    if args.forget:
+        print(f"{forget(args.model)} kayıtlı karar silindi.")
+    from yolo_models import load_yolo_model
+    model = load_yolo_model(args.model)
+    if model is not None:
+        print(f"Kullanılan arka uç: {model.backend_choice}")
+
+
+if __name__ == "__main__":
+    _main()
@@ -0,0 +1,182 @@
+# camera_backend.py
+# Platforma uygun kamera arka ucunu (Linux: V4L2, Windows: DirectShow) seçer, piksel biçimini (FOURCC),
+# çözünürlüğü ve FPS'i açıkça pazarlık eder ve anlaşılan modu raporlar. Linux'ta biçim seçilmezse USB
+# kameralar yavaş ham YUYV'ye düşer (720p'de genellikle 10 fps); MJPG ile 720p 60 fps'e çıkılabilir.
+# Aygıt dizinleri paralel olarak denenir; seçilen aygıt önbelleğe yazılır ve sonraki açılışta önce o denenir.
+#
+# Kullanılabilir modları listelemek için: python camera_backend.py
+
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import platform
+import sys
+import traceback
+
+import cv2
+
+import engine_cache  # Makineye özel önbellek dizini
+
+# Denenecek aygıt dizinleri ve istenen mod
+CAMERA_INDICES = (0, 1, 2, 3, 4)
+CAMERA_WIDTH = 1280
+CAMERA_HEIGHT = 720
+CAMERA_FPS = 60
+# Tercih sırasıyla piksel biçimleri (MJPG: sıkıştırılmış, USB bant genişliğinde yüksek FPS; YUYV: ham)
+CAMERA_FOURCC_PREFERENCE = ("MJPG", "YUYV")
+# > 0 ise MJPEG kareleri sürücüde değil, bu kadar iş parçacığında çözülür (yalnızca V4L2 + MJPG).
+# Tek çekirdekte çözme 720p 60 fps'e yetmediğinde açılır; bkz. frame_capture.CaptureThread.
+CAMERA_MJPEG_DECODE_THREADS = 0
+
+# Son başarılı aygıt seçimi
+CAMERA_CHOICE_FILE = os.path.join(engine_cache.ENGINE_CACHE_DIR, "camera_choice.json")
+
+# Anlaşılan kamera modu. raw_mjpeg: kareler çözülmemiş JPEG olarak gelir (uygulama çözer).
+CameraMode = namedtuple('CameraMode', ['index', 'backend', 'fourcc', 'width', 'height', 'fps', 'raw_mjpeg'])
+
+
+def default_api_preference():
+    """Platform için OpenCV yakalama arka ucu: (API sabiti, ad)."""
+    if sys.platform.startswith("linux"):
+        return cv2.CAP_V4L2, "V4L2"
+    if sys.platform.startswith("win"):
+        return cv2.CAP_DSHOW, "DSHOW"
+    return cv2.CAP_ANY, "ANY"
+
+
+def fourcc_to_str(value):
+    code = int(value)
+    return "".join(chr((code >> (8 * i)) & 0xFF) for i in range(4)).strip("\x00")
+
+
+def describe_mode(mode):
+    decode = ", uygulama içi MJPEG çözme" if mode.raw_mjpeg else ""
+    return (f"Kamera {mode.index}: {mode.backend} {mode.fourcc or '?'} {mode.width}x{mode.height} "
+            f"@ {mode.fps:.1f} fps{decode}")
+
+
+def _negotiate(capture, fourcc, width, height, fps):
+    """Biçimi, boyutu ve FPS'i bu sırayla ister (V4L2 FPS'i biçim/boyuta göre sınırlar); anlaşılanı döndürür."""
+    if fourcc:
+        capture.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+    capture.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    capture.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    capture.set(cv2.CAP_PROP_FPS, fps)
+    return (fourcc_to_str(capture.get(cv2.CAP_PROP_FOURCC)), int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT)), float(capture.get(cv2.CAP_PROP_FPS)))
+
+
+def _mode_score(mode, width, height, fps):
+    """Daha iyi mod daha büyük puan alır: önce istenen boyut, sonra FPS (istenene kadar), sonra MJPG."""
+    size_match = (mode.width, mode.height) == (width, height)
+    return size_match, min(mode.fps, fps), mode.fourcc == "MJPG", -mode.index
+
+
+def open_camera(index, width=CAMERA_WIDTH, height=CAMERA_HEIGHT, fps=CAMERA_FPS,
+                fourcc_preference=CAMERA_FOURCC_PREFERENCE, mjpeg_decode_threads=CAMERA_MJPEG_DECODE_THREADS):
+    """
+    Aygıtı açar ve tercih edilen biçimlerden en iyi modu seçer.
+    :return: (cv2.VideoCapture, CameraMode) veya açılamazsa (None, None).
+    """
+    api, backend_name = default_api_preference()
+    capture = cv2.VideoCapture(index, api)
+    if not capture.isOpened():
+        capture.release()
+        return None, None
+
+    best, best_request, mode = None, None, None
+    # DirectShow/diğer arka uçlarda biçim isteği çoğunlukla yok sayılır; yine de denemek zararsızdır
+    for fourcc in fourcc_preference:
+        mode = CameraMode(index, backend_name, *_negotiate(capture, fourcc, width, height, fps), False)
+        if best is None or _mode_score(mode, width, height, fps) > _mode_score(best, width, height, fps):
+            best, best_request = mode, fourcc
+        if mode.fourcc == fourcc and (mode.width, mode.height) == (width, height) and mode.fps >= fps:
+            break  # Tam istenen mod; daha düşük tercihli biçimleri deneme
+    if mode is not best:
+        # Son denenen biçim en iyisi değildi; en iyi moda geri dön
+        best = CameraMode(index, backend_name, *_negotiate(capture, best_request, width, height, fps), False)
+
+    if mjpeg_decode_threads > 0 and backend_name == "V4L2" and best.fourcc == "MJPG":
+        # Sürücü içi RGB dönüşümü kapatılınca V4L2 ham JPEG tamponunu verir; çözme iş parçacıklarında yapılır
+        if capture.set(cv2.CAP_PROP_CONVERT_RGB, 0):
+            best = best._replace(raw_mjpeg=True)
+    return capture, best
+
+
+def _load_cached_index():
+    try:
+        with open(CAMERA_CHOICE_FILE, "r", encoding="utf-8") as f:
+            choice = json.load(f)
+        if choice.get("host") == platform.node():
+            return choice.get("index")
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        print(f"UYARI (camera_backend): Kamera seçimi okunamadı: {e}")
+    return None
+
+
+def _store_cached_mode(mode):
+    try:
+        os.makedirs(os.path.dirname(CAMERA_CHOICE_FILE), exist_ok=True)
+        with open(CAMERA_CHOICE_FILE, "w", encoding="utf-8") as f:
+            json.dump({"host": platform.node(), **mode._asdict()}, f, indent=2)
+    except OSError as e:
+        print(f"UYARI (camera_backend): Kamera seçimi kaydedilemedi: {e}")
+
+
+def probe_cameras(indices=CAMERA_INDICES, **open_kwargs):
+    """
+    Tüm aygıtları paralel olarak açar ve modlarını pazarlık eder.
+    :return: [(cv2.VideoCapture, CameraMode), ...] (açılabilenler, dizin sırasıyla)
+    """
+    def try_open(index):
+        try:
+            return open_camera(index, **open_kwargs)
+        except Exception as e:
+            print(f"UYARI (camera_backend): Kamera {index} açılırken hata: {e}")
+            return None, None
+
+    with ThreadPoolExecutor(max_workers=len(indices)) as pool:
+        results = list(pool.map(try_open, indices))
+    return [(capture, mode) for capture, mode in results if capture is not None]
+
+
+def open_best_camera(indices=CAMERA_INDICES, **open_kwargs):
+    """
+    Önbellekteki aygıtı dener; açılamazsa tüm aygıtları paralel yoklayıp en iyi modu seçer.
+    :return: (cv2.VideoCapture, CameraMode) veya hiçbiri açılamazsa (None, None).
+    """
+    cached_index = _load_cached_index()
+    if cached_index is not None:
+        capture, mode = open_camera(cached_index, **open_kwargs)
+        if capture is not None:
+            print(f"HATA AYIKLAMA (camera_backend): Önbellekteki kamera kullanılıyor. {describe_mode(mode)}")
+            return capture, mode
+        print(f"UYARI (camera_backend): Önbellekteki kamera {cached_index} açılamadı, tüm aygıtlar yoklanıyor.")
+
+    opened = probe_cameras(indices, **open_kwargs)
+    if not opened:
+        return None, None
+    for _, mode in opened:
+        print(f"HATA AYIKLAMA (camera_backend): {describe_mode(mode)}")
+    width = open_kwargs.get("width", CAMERA_WIDTH)
+    height = open_kwargs.get("height", CAMERA_HEIGHT)
+    fps = open_kwargs.get("fps", CAMERA_FPS)
+    capture, mode = max(opened, key=lambda item: _mode_score(item[1], width, height, fps))
+    for other_capture, _ in opened:
+        if other_capture is not capture:
+            other_capture.release()
+    _store_cached_mode(mode)
+    return capture, mode
+
+
+if __name__ == "__main__":
+    try:
+        for probed_capture, probed_mode in probe_cameras():
+            print(describe_mode(probed_mode))
+            probed_capture.release()
+    except Exception as e:
+        print(f"HATA (camera_backend): {e}")
+        traceback.print_exc()
@@ -1,35 +1,227 @@
 # convert_to_engine.py
 import tensorrt as trt
 import onnx
+import numpy as np
+import argparse
+import json
 import sys
 import os
+import time
+
+import cv2
+
+from gpu_preprocess import letterbox_cpu
 
 # TensorRT logger
 TRT_LOGGER = trt.Logger(trt.Logger.WARNING)
 
-def build_engine(onnx_file_path, engine_file_path, input_shape=(1, 3, 640, 640)):
+# Desteklenen hassasiyet modları
+PRECISIONS = ("fp32", "fp16", "int8")
+
+# Kalibrasyon/rapor için okunacak kare dosyası uzantıları
+FRAME_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+# Birleşik NMS çıkışlarının adları (EfficientNMS_TRT eklentisinin çıkış sırasıyla)
+FUSED_NMS_OUTPUT_NAMES = ("num_dets", "det_boxes", "det_scores", "det_classes")
+
+# Ağa eklenen sabitlerin ağırlıkları derleme bitene kadar bellekte kalmalı (TensorRT kopyalamaz)
+_network_weights = []
+
+def append_efficient_nms(network, top_k=100, score_threshold=0.25, iou_threshold=0.45):
+    """
+    Ham YOLO başlığının (B, 4+C, N) sonuna kutu çözme, güven filtresi ve sınıf bazlı NMS ekler (EfficientNMS_TRT).
+    Ağın çıkışı sabit boyutlu top-K tensörleri olur: num_dets (1,1), det_boxes (1,K,4; x1y1x2y2),
+    det_scores (1,K), det_classes (1,K). Böylece GPU'dan yalnızca son kutular kopyalanır.
+    Dinamik toplu/giriş boyutlu ağlarda dilim boyutları çalışma zamanında şekil tensöründen hesaplanır.
+    :return: Eklenti eklendiyse True; ağ zaten NMS içeriyorsa veya başlık beklenen biçimde değilse False.
+    """
+    if network.num_outputs != 1:
+        print("UYARI: Ağın birden fazla çıkışı var (NMS zaten ekli olabilir), EfficientNMS eklenmedi.")
+        return False
+    raw_output = network.get_output(0)
+    output_shape = tuple(raw_output.shape)
+    if (len(output_shape) != 3 or output_shape[1] < 0
+            or (output_shape[2] >= 0 and output_shape[2] <= output_shape[1])):
+        print(f"UYARI: Çıkış ham YOLO başlığı gibi görünmüyor ({output_shape}), EfficientNMS eklenmedi.")
+        return False
+    batch, num_channels, num_anchors = output_shape
+
+    # (B, 4+C, N) -> (B, N, 4+C) ve kutu/skor dilimleri
+    transpose = network.add_shuffle(raw_output)
+    transpose.first_transpose = (0, 2, 1)
+    transposed = transpose.get_output(0)
+    if batch >= 0 and num_anchors >= 0:
+        boxes = network.add_slice(transposed, (0, 0, 0), (batch, num_anchors, 4), (1, 1, 1)).get_output(0)
+        scores = network.add_slice(transposed, (0, 0, 4), (batch, num_anchors, num_channels - 4),
+                                   (1, 1, 1)).get_output(0)
+    else:
+        # Dinamik şekil: dilim boyutu = [B, N] + [4] veya [C]
+        dims = network.add_shape(transposed).get_output(0)
+        dims_dtype = trt.nptype(dims.dtype)
+        leading = network.add_slice(dims, (0,), (2,), (1,)).get_output(0)
+        slices = []
+        for start, width in ((0, 4), (4, num_channels - 4)):
+            _network_weights.append(np.array([width], dtype=dims_dtype))
+            width_tensor = network.add_constant((1,), _network_weights[-1]).get_output(0)
+            size = network.add_concatenation([leading, width_tensor])
+            size.axis = 0
+            slice_layer = network.add_slice(transposed, (0, 0, start), (1, 1, 1), (1, 1, 1))
+            slice_layer.set_input(2, size.get_output(0))
+            slices.append(slice_layer.get_output(0))
+        boxes, scores = slices
+
+    trt.init_libnvinfer_plugins(TRT_LOGGER, "")
+    creator = trt.get_plugin_registry().get_plugin_creator("EfficientNMS_TRT", "1", "")
+    if creator is None:
+        print("UYARI: EfficientNMS_TRT eklentisi bulunamadı, EfficientNMS eklenmedi.")
+        return False
+    fields = trt.PluginFieldCollection([
+        trt.PluginField("score_threshold", np.array([score_threshold], dtype=np.float32), trt.PluginFieldType.FLOAT32),
+        trt.PluginField("iou_threshold", np.array([iou_threshold], dtype=np.float32), trt.PluginFieldType.FLOAT32),
+        trt.PluginField("max_output_boxes", np.array([top_k], dtype=np.int32), trt.PluginFieldType.INT32),
+        trt.PluginField("background_class", np.array([-1], dtype=np.int32), trt.PluginFieldType.INT32),
+        trt.PluginField("score_activation", np.array([0], dtype=np.int32), trt.PluginFieldType.INT32),
+        trt.PluginField("class_agnostic", np.array([0], dtype=np.int32), trt.PluginFieldType.INT32),
+        trt.PluginField("box_coding", np.array([1], dtype=np.int32), trt.PluginFieldType.INT32),  # cx, cy, w, h
+    ])
+    nms_layer = network.add_plugin_v2([boxes, scores], creator.create_plugin("efficient_nms", fields))
+    nms_layer.name = "efficient_nms"
+
+    network.unmark_output(raw_output)
+    for i, name in enumerate(FUSED_NMS_OUTPUT_NAMES):
+        output = nms_layer.get_output(i)
+        output.name = name
+        network.mark_output(output)
+    print(f"EfficientNMS eklendi (top-K={top_k}, skor>={score_threshold}, IoU={iou_threshold}).")
+    return True
+
+def list_frame_files(frames_dir, max_frames=None):
+    """Bir dizindeki kayıtlı kare dosyalarını sıralı olarak döndürür."""
+    files = sorted(os.path.join(frames_dir, name) for name in os.listdir(frames_dir)
+                   if name.lower().endswith(FRAME_EXTENSIONS))
+    return files[:max_frames] if max_frames else files
+
+class FrameDirectoryCalibrator(trt.IInt8EntropyCalibrator2):
+    """
+    INT8 entropi kalibratörü. Kayıtlı kareleri uygulamadaki letterbox ön işlemesiyle hazırlar ve
+    hesaplanan kalibrasyon tablosunu dosyaya kaydeder; tablo varsa kareler hiç okunmaz.
+    """
+
+    def __init__(self, frames_dir, cache_path, input_shape=(1, 3, 640, 640), max_frames=500):
+        trt.IInt8EntropyCalibrator2.__init__(self)
+        import pycuda.driver as cuda
+        import pycuda.autoinit  # Kalibrasyon için CUDA bağlamı
+
+        self.cuda = cuda
+        self.batch_size, _, self.input_height, self.input_width = input_shape
+        self.cache_path = cache_path
+        self.files = list_frame_files(frames_dir, max_frames) if frames_dir else []
+        self.index = 0
+        self.device_input = cuda.mem_alloc(int(trt.volume(input_shape)) * np.dtype(np.float32).itemsize)
+        print(f"INT8 kalibrasyonu: {len(self.files)} kare, önbellek: {cache_path}")
+
+    def get_batch_size(self):
+        return self.batch_size
+
+    def get_batch(self, names):
+        batch = []
+        while len(batch) < self.batch_size and self.index < len(self.files):
+            frame = cv2.imread(self.files[self.index])
+            self.index += 1
+            if frame is not None:
+                batch.append(letterbox_cpu(frame, self.input_width, self.input_height)[0])
+        if len(batch) < self.batch_size:
+            return None  # Kalibrasyon bitti
+        self.cuda.memcpy_htod(self.device_input, np.ascontiguousarray(np.concatenate(batch)))
+        return [int(self.device_input)]
+
+    def read_calibration_cache(self):
+        if self.cache_path and os.path.exists(self.cache_path):
+            print(f"Kalibrasyon önbelleği yüklendi: {self.cache_path}")
+            with open(self.cache_path, "rb") as f:
+                return f.read()
+        return None
+
+    def write_calibration_cache(self, cache):
+        if self.cache_path:
+            with open(self.cache_path, "wb") as f:
+                f.write(cache)
+            print(f"Kalibrasyon önbelleği kaydedildi: {self.cache_path}")
+
+def build_engine(onnx_file_path, engine_file_path, input_shape=(1, 3, 640, 640), precision=None,
+                 timing_cache_path=None, deserialize=True, fused_nms=False, nms_top_k=100,
+                 nms_score_threshold=0.25, nms_iou_threshold=0.45, strongly_typed=False,
+                 calibration_dir=None, calibration_cache_path=None, profile_sizes=None, max_batch=1,
+                 profile_sets=1):
     """
     ONNX modelini TensorRT motoruna dönüştürür ve kaydeder.
     :param onnx_file_path: Giriş ONNX modelinin yolu.
     :param engine_file_path: Çıkış TensorRT motor dosyasının kaydedileceği yol.
     :param input_shape: Modelin beklediği giriş boyutu (batch, channels, height, width).
                         YOLOv11 için genellikle (1, 3, 640, 640) veya (1, 3, 1280, 1280) gibi.
+    :param precision: "fp32", "fp16" veya "int8". None ise GPU hızlı FP16 destekliyorsa "fp16", değilse "fp32".
+                      INT8'de INT8 olarak çalıştırılamayan katmanlar için FP16 da açılır.
+    :param timing_cache_path: Builder zamanlama önbelleği dosyası. Varsa yüklenir, derlemeden sonra güncellenir.
+    :param deserialize: False ise motor deserialize edilmez, seri hale getirilmiş motor döndürülür.
+    :param fused_nms: True ise kutu çözme + NMS motora eklenir (bkz. append_efficient_nms).
+    :param strongly_typed: True ise ağ kesin tipli derlenir: katman hassasiyetleri ONNX'teki tiplerden gelir
+                           (örn. FP16 dışa aktarılmış veya QDQ INT8 model) ve builder hassasiyet bayrakları kullanılmaz.
+    :param calibration_dir: INT8 kalibrasyonu için kayıtlı karelerin bulunduğu dizin.
+    :param calibration_cache_path: INT8 kalibrasyon önbelleği. Varsa kareler yerine bu kullanılır.
+    :param profile_sizes: Dinamik girişli (dynamic=True dışa aktarılmış) ONNX için optimizasyon profili başına kare
+                          giriş boyutları, örn. (320, 480, 640, 960). None ise yalnızca input_shape boyutu.
+                          Statik girişli modellerde yok sayılır.
+    :param max_batch: Her profilin desteklediği en büyük toplu boyutu (en küçüğü 1).
+    :param profile_sets: Profil grubunun kaç kez tekrarlanacağı. Aynı anda çalışan her yürütme bağlamı ayrı
+                         bir profil kullanmak zorunda olduğundan, her bağlam (senkron + asenkron slotlar) kendi
+                         grubunu alır. Profil indeksi = grup * len(profile_sizes) + boyut indeksi.
     """
     print(f"ONNX modelinden TensorRT motoru oluşturuluyor: {onnx_file_path}")
     print(f"Motor şu adrese kaydedilecek: {engine_file_path}")
 
     builder = trt.Builder(TRT_LOGGER)
-    network = builder.create_network(1 << (int)(trt.NetworkDefinitionCreationFlag.EXPLICIT_BATCH))
+    network_flags = 1 << (int)(trt.NetworkDefinitionCreationFlag.EXPLICIT_BATCH)
+    if strongly_typed:
+        network_flags |= 1 << (int)(trt.NetworkDefinitionCreationFlag.STRONGLY_TYPED)
+    network = builder.create_network(network_flags)
     parser = trt.OnnxParser(network, TRT_LOGGER)
 
     config = builder.create_builder_config()
     config.set_memory_pool_limit(trt.MemoryPoolType.WORKSPACE, 1 << 32) # 4GB (Bellek ihtiyacına göre artırılabilir)
 
-    if builder.platform_has_fast_fp16:
-        config.set_flag(trt.BuilderFlag.FP16)
-        print("FP16 etkinleştirildi.")
+    if precision is None:
+        precision = "fp16" if builder.platform_has_fast_fp16 else "fp32"
+    if precision not in PRECISIONS:
+        print(f"HATA: Bilinmeyen hassasiyet: {precision} (seçenekler: {', '.join(PRECISIONS)})")
+        return None
+    if strongly_typed:
+        print("Kesin tipli ağ: hassasiyet ONNX modelindeki tiplerden alınacak.")
+    elif precision == "fp32":
+        print("FP16/INT8 devre dışı, FP32 kullanılacak.")
     else:
-        print("FP16 desteklenmiyor, FP32 kullanılacak.")
+        if precision == "int8":
+            if not builder.platform_has_fast_int8:
+                print("UYARI: GPU hızlı INT8 desteklemiyor; motor yine de INT8 olarak derlenecek.")
+            if not calibration_dir and not (calibration_cache_path and os.path.exists(calibration_cache_path)):
+                print("HATA: INT8 için kalibrasyon kareleri dizini veya kalibrasyon önbelleği gerekli.")
+                return None
+            config.set_flag(trt.BuilderFlag.INT8)
+            config.int8_calibrator = FrameDirectoryCalibrator(calibration_dir, calibration_cache_path, input_shape)
+            print("INT8 etkinleştirildi.")
+        if precision == "fp16" or builder.platform_has_fast_fp16:
+            config.set_flag(trt.BuilderFlag.FP16)
+            print("FP16 etkinleştirildi.")
+
+    # Zamanlama önbelleği: katman taktiklerinin yeniden ölçülmesini önleyerek derlemeyi hızlandırır
+    timing_cache = None
+    if timing_cache_path:
+        timing_cache_data = b""
+        if os.path.exists(timing_cache_path):
+            with open(timing_cache_path, "rb") as f:
+                timing_cache_data = f.read()
+            print(f"Zamanlama önbelleği yüklendi: {timing_cache_path}")
+        timing_cache = config.create_timing_cache(timing_cache_data)
+        config.set_timing_cache(timing_cache, ignore_mismatch=False)
 
     if not os.path.exists(onnx_file_path):
         print(f"HATA: ONNX dosyası bulunamadı: {onnx_file_path}")
@@ -43,6 +235,27 @@ def build_engine(onnx_file_path, engine_file_path, input_shape=(1, 3, 640, 640))
             return None
     print("ONNX modeli başarıyla ayrıştırıldı.")
 
+    if fused_nms:
+        append_efficient_nms(network, nms_top_k, nms_score_threshold, nms_iou_threshold)
+
+    network_input = network.get_input(0)
+    if any(dim < 0 for dim in network_input.shape):
+        profile_sizes = tuple(profile_sizes or (input_shape[2],))
+        channels = input_shape[1]
+        calibration_profile = None
+        for _ in range(profile_sets):
+            for size in profile_sizes:
+                profile = builder.create_optimization_profile()
+                profile.set_shape(network_input.name, (1, channels, size, size), (1, channels, size, size),
+                                  (max_batch, channels, size, size))
+                config.add_optimization_profile(profile)
+                if calibration_profile is None and size == input_shape[2]:
+                    calibration_profile = profile
+        if precision == "int8" and not strongly_typed:
+            config.set_calibration_profile(calibration_profile or profile)
+        print(f"Dinamik giriş: {profile_sets} x {len(profile_sizes)} optimizasyon profili "
+              f"(boyutlar: {profile_sizes}, en büyük toplu: {max_batch}).")
+
     print("TensorRT motoru oluşturuluyor...")
     # YENİ: build_engine yerine build_serialized_network kullanıldı
     serialized_engine = builder.build_serialized_network(network, config)
@@ -51,35 +264,185 @@ def build_engine(onnx_file_path, engine_file_path, input_shape=(1, 3, 640, 640))
         return None
     print("TensorRT motoru başarıyla oluşturuldu (seri hale getirilmiş).")
 
+    if timing_cache is not None:
+        with open(timing_cache_path, "wb") as f:
+            f.write(memoryview(config.get_timing_cache().serialize()))
+        print(f"Zamanlama önbelleği kaydedildi: {timing_cache_path}")
+
     # Seri hale getirilmiş motoru dosyaya kaydet
     print(f"Motor {engine_file_path} adresine kaydediliyor...")
     with open(engine_file_path, "wb") as f:
         f.write(serialized_engine) # Doğrudan seri hale getirilmiş veriyi yaz
     print("Motor başarıyla kaydedildi.")
 
+    if not deserialize:
+        return serialized_engine
+
     # İsteğe bağlı: Oluşturulan motoru deserialize edip döndürmek isterseniz
     runtime = trt.Runtime(TRT_LOGGER)
     engine = runtime.deserialize_cuda_engine(serialized_engine)
     return engine
 
+def _match_detections(reference, candidate, iou_threshold=0.5):
+    """
+    Aynı sınıftaki kutuları skora göre açgözlü eşleştirir.
+    :return: Eşleşme F1 skoru (iki taraf da boşsa 1.0).
+    """
+    if len(reference) == 0 and len(candidate) == 0:
+        return 1.0
+    if len(reference) == 0 or len(candidate) == 0:
+        return 0.0
+    matched = 0
+    used = np.zeros(len(reference), dtype=bool)
+    for det in candidate[np.argsort(-candidate[:, 4])]:
+        x1 = np.maximum(reference[:, 0], det[0])
+        y1 = np.maximum(reference[:, 1], det[1])
+        x2 = np.minimum(reference[:, 2], det[2])
+        y2 = np.minimum(reference[:, 3], det[3])
+        inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+        union = ((reference[:, 2] - reference[:, 0]) * (reference[:, 3] - reference[:, 1])
+                 + (det[2] - det[0]) * (det[3] - det[1]) - inter)
+        iou = np.where(used | (reference[:, 5] != det[5]), 0.0, inter / np.maximum(union, 1e-9))
+        best = int(np.argmax(iou))
+        if iou[best] >= iou_threshold:
+            used[best] = True
+            matched += 1
+    return 2.0 * matched / (len(reference) + len(candidate))
+
+def _evaluate_model(model, frames, postprocessor, reference_detections=None, warmup_frames=5):
+    """Bir modeli karelerde çalıştırır; gecikme istatistiklerini, tespitleri ve referansla uyumu döndürür."""
+    for frame in frames[:warmup_frames]:
+        model.infer_frame(frame)
+    latencies, detections = [], []
+    for frame in frames:
+        start = time.perf_counter()
+        outputs, letterbox = model.infer_frame(frame)
+        latencies.append((time.perf_counter() - start) * 1000.0)
+        detections.append(postprocessor.process(outputs, model.output_layout, letterbox).copy())
+    result = {
+        "latency_ms_median": float(np.median(latencies)),
+        "latency_ms_p95": float(np.percentile(latencies, 95)),
+        "detections_per_frame": float(np.mean([len(d) for d in detections])),
+    }
+    if reference_detections is not None:
+        result["agreement"] = float(np.mean([_match_detections(ref, det)
+                                             for ref, det in zip(reference_detections, detections)]))
+    return result, detections
+
+def compare_precisions(onnx_file_path, frames_dir, precisions=PRECISIONS, input_shape=(1, 3, 640, 640),
+                       accuracy_budget=0.02, calibration_cache_path=None, fused_nms=False,
+                       conf_threshold=0.25, max_frames=200, report_path=None):
+    """
+    Her hassasiyet için motor derler ve FP32 ONNX modeline (ONNX Runtime) göre gecikme ve tespit uyumunu raporlar.
+    Uyum, kare başına aynı sınıf + IoU>=0.5 eşleşmesinin F1 skorunun ortalamasıdır.
+    Önerilen motor, uyumu 1 - accuracy_budget'ın üstünde kalan en hızlı motordur.
+    :return: Rapor sözlüğü.
+    """
+    from yolo_models import load_yolo_model
+    from yolo_postprocess import YoloPostprocessor
+
+    frames = [frame for frame in (cv2.imread(path) for path in list_frame_files(frames_dir, max_frames))
+              if frame is not None]
+    if not frames:
+        print(f"HATA: {frames_dir} içinde kare bulunamadı.")
+        return None
+    postprocessor = YoloPostprocessor(conf_threshold, 0.45)
+
+    reference_model = load_yolo_model(onnx_file_path, use_engine_cache=False)
+    if reference_model is None:
+        return None
+    reference, reference_detections = _evaluate_model(reference_model, frames, postprocessor)
+    report = {"onnx": onnx_file_path, "frames": len(frames), "accuracy_budget": accuracy_budget,
+              "reference_fp32_onnx": reference, "engines": {}}
+    print(f"FP32 ONNX referansı: {reference['latency_ms_median']:.2f} ms (medyan)")
+
+    if calibration_cache_path is None:
+        calibration_cache_path = os.path.splitext(onnx_file_path)[0] + "_int8.calib"
+    for precision in precisions:
+        engine_file_path = os.path.splitext(onnx_file_path)[0] + f"_{precision}.engine"
+        built = build_engine(onnx_file_path, engine_file_path, input_shape, precision=precision,
+                             deserialize=False, fused_nms=fused_nms, calibration_dir=frames_dir,
+                             calibration_cache_path=calibration_cache_path)
+        if built is None:
+            report["engines"][precision] = {"error": "derleme başarısız"}
+            continue
+        model = load_yolo_model(engine_file_path)
+        if model is None or not model.is_tensorrt:
+            report["engines"][precision] = {"error": "motor yüklenemedi"}
+            continue
+        result, _ = _evaluate_model(model, frames, postprocessor, reference_detections)
+        result["engine"] = engine_file_path
+        report["engines"][precision] = result
+
+    print(f"{'hassasiyet':<10} {'medyan ms':>10} {'p95 ms':>8} {'uyum':>7}")
+    candidates = []
+    for precision, result in report["engines"].items():
+        if "error" in result:
+            print(f"{precision:<10} {result['error']}")
+            continue
+        print(f"{precision:<10} {result['latency_ms_median']:>10.2f} {result['latency_ms_p95']:>8.2f} "
+              f"{result['agreement']:>7.3f}")
+        if result["agreement"] >= 1.0 - accuracy_budget:
+            candidates.append((result["latency_ms_median"], precision))
+    report["recommended"] = min(candidates)[1] if candidates else None
+    print(f"Önerilen hassasiyet (uyum >= {1.0 - accuracy_budget:.3f}): {report['recommended']}")
+
+    if report_path:
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Rapor kaydedildi: {report_path}")
+    return report
+
 if __name__ == "__main__":
-    # DİKKAT: Bu yolu PC'deki best.onnx dosyanızın gerçek yoluyla güncelleyin!
-    ONNX_MODEL_PATH = "C:/Users/user/yolo11/runs/detect/train2/weights/best.onnx"
-    # Çıkış .engine dosyasının yolu. ONNX dosyasıyla aynı dizinde olması tavsiye edilir.
-    ENGINE_MODEL_PATH = ONNX_MODEL_PATH.replace(".onnx", ".engine")
+    # DİKKAT: Varsayılan yolu PC'deki best.onnx dosyanızın gerçek yoluyla güncelleyin veya argüman olarak verin!
+    parser = argparse.ArgumentParser(description="ONNX modelini TensorRT motoruna dönüştürür.")
+    parser.add_argument("onnx", nargs="?", default="C:/Users/user/yolo11/runs/detect/train2/weights/best.onnx")
+    # Çıkış .engine dosyasının yolu. Verilmezse ONNX dosyasıyla aynı dizine yazılır.
+    parser.add_argument("--engine", default=None)
+    # Eğer modeliniz 1280x1280 ise --imgsz 1280 verin.
+    parser.add_argument("--imgsz", type=int, default=640)
+    # Dinamik dışa aktarılmış ONNX için (convert_to_onnx.pt_to_onnx(..., dynamic=True))
+    parser.add_argument("--profile-sizes", type=int, nargs="+", default=None,
+                        help="Optimizasyon profili giriş boyutları, örn. 320 480 640 960")
+    parser.add_argument("--max-batch", type=int, default=1)
+    parser.add_argument("--profile-sets", type=int, default=1,
+                        help="Eşzamanlı bağlam sayısı kadar profil grubu (senkron + asenkron slotlar)")
+    parser.add_argument("--precision", choices=PRECISIONS, default=None,
+                        help="Varsayılan: GPU hızlı FP16 destekliyorsa fp16, değilse fp32")
+    parser.add_argument("--strongly-typed", action="store_true")
+    parser.add_argument("--calib-dir", default=None, help="INT8 kalibrasyonu için kayıtlı kareler dizini")
+    parser.add_argument("--calib-cache", default=None, help="INT8 kalibrasyon önbelleği dosyası")
+    # NMS motorun içine eklenir; GPU'dan yalnızca son kutular (top-K) kopyalanır.
+    parser.add_argument("--no-fused-nms", dest="fused_nms", action="store_false")
+    parser.add_argument("--report", metavar="FRAMES_DIR", default=None,
+                        help="Tüm hassasiyetleri bu karelerde FP32 ONNX'e göre karşılaştır ve raporla")
+    parser.add_argument("--accuracy-budget", type=float, default=0.02)
+    args = parser.parse_args()
 
-    # YOLOv11 modelinizin giriş boyutunu doğru ayarlayın.
-    # Eğer modeliniz 1280x1280 ise (1, 3, 1280, 1280) olarak değiştirin.
-    YOLO_INPUT_SHAPE = (1, 3, 640, 640)
+    ONNX_MODEL_PATH = args.onnx
+    YOLO_INPUT_SHAPE = (1, 3, args.imgsz, args.imgsz)
 
     if not os.path.exists(ONNX_MODEL_PATH):
         print(f"HATA: ONNX dosyası bulunamadı: {ONNX_MODEL_PATH}")
-        print("Lütfen ONNX_MODEL_PATH değişkenini doğru dosya yolunuzla güncelleyin.")
+        print("Lütfen ONNX model yolunu doğru dosya yolunuzla verin.")
         sys.exit(1)
 
+    if args.report:
+        compare_precisions(ONNX_MODEL_PATH, args.report, input_shape=YOLO_INPUT_SHAPE,
+                           accuracy_budget=args.accuracy_budget, calibration_cache_path=args.calib_cache,
+                           fused_nms=args.fused_nms,
+                           report_path=os.path.splitext(ONNX_MODEL_PATH)[0] + "_precision_report.json")
+        sys.exit(0)
+
+    ENGINE_MODEL_PATH = args.engine or ONNX_MODEL_PATH.replace(".onnx", ".engine")
+    calib_cache = args.calib_cache or os.path.splitext(ONNX_MODEL_PATH)[0] + "_int8.calib"
+
     print(f"ONNX model yolu: {ONNX_MODEL_PATH}")
     print(f"Engine model yolu: {ENGINE_MODEL_PATH}")
     print(f"Giriş boyutu: {YOLO_INPUT_SHAPE}")
 
-    build_engine(ONNX_MODEL_PATH, ENGINE_MODEL_PATH, YOLO_INPUT_SHAPE)
-    print("Dönüştürme işlemi tamamlandı.")
+    build_engine(ONNX_MODEL_PATH, ENGINE_MODEL_PATH, YOLO_INPUT_SHAPE, precision=args.precision,
+                 fused_nms=args.fused_nms, strongly_typed=args.strongly_typed,
+                 calibration_dir=args.calib_dir, calibration_cache_path=calib_cache,
+                 profile_sizes=args.profile_sizes, max_batch=args.max_batch, profile_sets=args.profile_sets)
+    print("Dönüştürme işlemi tamamlandı.")
\ No newline at end of file
@@ -3,16 +3,25 @@ import sys
 from ultralytics import YOLO
 import tensorrt as trt
 
+from convert_to_engine import append_efficient_nms
+
 TRT_LOGGER = trt.Logger(trt.Logger.WARNING)
 
-def pt_to_onnx(pt_path, onnx_path, img_size=640):
+def pt_to_onnx(pt_path, onnx_path, img_size=640, nms=False, max_det=100, dynamic=False):
+    # nms=True: kutu çözme + NMS (ONNX NonMaxSuppression) grafa eklenir, çıkış (1, max_det, 6) olur:
+    # x1, y1, x2, y2, skor, sınıf. NonMaxSuppression için opset 12 yetmediğinden 13 kullanılır.
+    # dynamic=True: toplu boyutu ve giriş çözünürlüğü dinamik olur; motor birden fazla optimizasyon
+    # profiliyle derlenip çalışma zamanında giriş boyutu değiştirilebilir.
     model = YOLO(pt_path)
-    model.export(format="onnx", opset=12, imgsz=img_size, dynamic=False)
+    if nms:
+        model.export(format="onnx", opset=13, imgsz=img_size, dynamic=dynamic, nms=True, max_det=max_det)
+    else:
+        model.export(format="onnx", opset=12, imgsz=img_size, dynamic=dynamic)
     if not os.path.exists(onnx_path):
         raise FileNotFoundError(f"ONNX oluşturulamadı: {onnx_path}")
     print("✅ ONNX export tamamlandı:", onnx_path)
 
-def onnx_to_engine(onnx_file_path, engine_file_path, input_shape=(1, 3, 640, 640)):
+def onnx_to_engine(onnx_file_path, engine_file_path, input_shape=(1, 3, 640, 640), fused_nms=False):
     builder = trt.Builder(TRT_LOGGER)
     network = builder.create_network(1 << int(trt.NetworkDefinitionCreationFlag.EXPLICIT_BATCH))
     parser = trt.OnnxParser(network, TRT_LOGGER)
@@ -28,6 +37,10 @@ def onnx_to_engine(onnx_file_path, engine_file_path, input_shape=(1, 3, 640, 640
                 print(parser.get_error(i))
             return None
 
+    # Ham başlıklı ONNX için NMS'i motorun içine ekle (EfficientNMS_TRT)
+    if fused_nms:
+        append_efficient_nms(network)
+
     serialized_engine = builder.build_serialized_network(network, config)
     with open(engine_file_path, "wb") as f:
         f.write(serialized_engine)
@@ -38,5 +51,8 @@ if __name__ == "__main__":
     onnx_path = pt_path.replace(".pt", ".onnx")
     engine_path = pt_path.replace(".pt", ".engine")
 
+    # True: NMS motora eklenir ve yalnızca son kutular GPU'dan çıkar
+    FUSED_NMS = True
+
     pt_to_onnx(pt_path, onnx_path, img_size=640)
-    onnx_to_engine(onnx_path, engine_path)
+    onnx_to_engine(onnx_path, engine_path, fused_nms=FUSED_NMS)
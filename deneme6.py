@@ -2,7 +2,7 @@ import sys
 import cv2
 from PyQt5.QtWidgets import QApplication, QWidget, QLabel, QPushButton, QVBoxLayout, QHBoxLayout, QSizePolicy, \
     QSpacerItem, QGroupBox, QLineEdit, QMessageBox, QRadioButton
-from PyQt5.QtGui import QPixmap, QImage, QPainter, QPen, QFont
+from PyQt5.QtGui import QPainter, QPen, QFont
 from PyQt5.QtCore import QTimer, Qt, QCoreApplication, QThread, pyqtSignal
 
 import time
@@ -13,32 +13,31 @@ import json
 import os
 import traceback
 import queue  # İş parçacığı güvenli iletişim için
-
-# TensorRT içe aktarmaları
-try:
-    import tensorrt as trt
-    import pycuda.driver as cuda
-    import pycuda.autoinit  # CUDA bağlamını otomatik olarak başlatır
-
-    TRT_AVAILABLE = True
-    print("HATA AYIKLAMA: TensorRT ve PyCUDA başarıyla içe aktarıldı.")
-except ImportError:
-    TRT_AVAILABLE = False
-    print("UYARI: TensorRT veya PyCUDA bulunamadı. Yalnızca ONNX Runtime (CPU/GPU) kullanılabilir olacak.")
-    print(
-        "TensorRT kullanmak için 'pip install tensorrt pycuda' komutunu çalıştırdığınızdan ve CUDA/cuDNN kurduğunuzdan emin olun.")
-except Exception as e:
-    TRT_AVAILABLE = False
-    print(f"UYARI: TensorRT/PyCUDA içe aktarma sırasında hata: {e}")
-    print("TensorRT veya PyCUDA yanlış kurulmuş olabilir. Yalnızca ONNX Runtime (CPU/GPU) kullanılabilir olacak.")
-    traceback.print_exc()
+import argparse
+
+from yolo_models import ModelRegistry  # Bellekte kalan, anında değiştirilebilir YOLO modelleri
+from yolo_postprocess import YoloPostprocessor
+from detections import Detections  # Önceden ayrılmış yapılandırılmış dizide kare başına tespitler
+from roi_detection import RoiScheduler  # Kilitli hedef etrafında doğal çözünürlüklü ROI tespiti
+from ego_motion import EgoMotionEstimator  # Taret hareketinden kaynaklanan görüntü kayması
+from scene_activity import ActivityGate, GATE_FULL, GATE_ROI, GATE_SKIP  # Sahne etkinliği kapısı
+from multi_object_tracker import MultiObjectTracker  # Kalman durumlu iz tablosu, Macar eşleştirme
+from kcf_tracker import TargetTracker, DetectionScheduler, bbox_iou  # Dedektör çalışmaları arası görsel izleyici
+from tiled_inference import TiledDetector  # Arama aşamasında yüksek çözünürlüklü döşemeli tespit
+from detector_service import DetectorService  # Ayrı işlemde çalışan dedektör (paylaşımlı bellek halkası)
+from frame_capture import CaptureThread  # En yeni kareyi tutan yakalama iş parçacığı
+from video_view import VideoView, Overlays  # Dönüşümsüz (BGR888) görüntüleme ve vektör kaplamalar
+from gl_video_view import GLVideoView, GL_VIDEO_VIEW_AVAILABLE  # İsteğe bağlı OpenGL görüntüleme
+from ui_state import UiState, UiRefresher  # Etiketlerin sınırlı hızda, yalnızca değişince güncellenmesi
+import frame_source  # Canlı kamera, video dosyası/görüntü klasörü ve kayıt tekrarı kaynakları
 
 # --- YOLOv11 Model Yapılandırması ---
 # DİKKAT: Bu yolu PC'deki best.engine veya best.onnx dosyanızın gerçek yoluyla güncelleyin!
 # Her iki formatı da desteklemek için uzantıyı kontrol edeceğiz.
-YOLO_MODEL_PATH = "C:/Users/user/yolo11/runs/detect/train2/weights/best.engine"  # Veya .onnx
+# .onnx verildiğinde TensorRT motoru engine_cache üzerinden otomatik olarak bulunur veya arka planda derlenir.
+YOLO_MODEL_PATH = "C:/Users/user/yolo11/runs/detect/train2/weights/best.onnx"  # Veya .engine
 # YENİ: Aşama 3 için yeni model yolu
-YOLO_MODEL_PATH_TASK3 = "C:/Users/user/yolo11/runs/detect/train2/weights/best1.engine"
+YOLO_MODEL_PATH_TASK3 = "C:/Users/user/yolo11/runs/detect/train2/weights/best1.onnx"
 
 CONF_THRESHOLD = 0.4  # Daha iyi tespit için güven eşiği düşürüldü
 NMS_THRESHOLD = 0.4
@@ -48,208 +47,55 @@ CLASSES = ['blue_balloon', 'red_balloon']  # data.yaml'dan güncellenmiş sını
 # YENİ: Aşama 3 için özel sınıflar
 CLASSES_TASK3 = ['kir_Dai', 'kir_Kar', 'kir_Uc', 'mav_Dai', 'mav_Kar', 'mav_Uc', 'yes_Dai', 'yes_Kar', 'yes_Uc']
 
-# IMG_HEIGHT ve IMG_WIDTH'i varsayılan değerlerle global olarak başlat
-IMG_HEIGHT, IMG_WIDTH = 640, 640  # YOLOv11 için varsayılan
-
-# TensorRT bağlamı ve motor değişkenleri
-trt_runtime = None
-trt_engine = None
-trt_context = None
-trt_buffers = None
-trt_inputs = None
-trt_outputs = None
-trt_bindings = None
-trt_stream = None
-
-# YENİ: TensorRT için giriş/çıkış bağlama indekslerini saklamak için global değişkenler
-trt_input_binding_idx = None
-trt_output_binding_idx = None
-# YENİ: Farklı modeller için ayrı değişkenler
-yolo_model_task12 = None
-yolo_model_task3 = None
-
-
-# YOLO modelini yükleme fonksiyonu
-def load_yolo_model(model_path):
-    global trt_runtime, trt_engine, trt_context, trt_buffers, trt_inputs, trt_outputs, trt_bindings, trt_stream
-    global IMG_HEIGHT, IMG_WIDTH, trt_input_binding_idx, trt_output_binding_idx
-
-    print(f"YOLO modeli yükleniyor: {model_path}")
-    session = None
-    providers = []
-
-    if model_path.endswith(".engine") and TRT_AVAILABLE:
-        try:
-            # TensorRT motorunu yükle
-            TRT_LOGGER = trt.Logger(trt.Logger.WARNING)
-            trt_runtime = trt.Runtime(TRT_LOGGER)
-            with open(model_path, "rb") as f:
-                trt_engine = trt_runtime.deserialize_cuda_engine(f.read())
-            if not trt_engine:
-                raise RuntimeError("TensorRT motoru yüklenemedi.")
-
-            print("TensorRT motoru başarıyla yüklendi.")
-
-            # Giriş ve çıkış boyutlarını al
-            trt_context = trt_engine.create_execution_context()
-
-            input_name = None
-            output_name = None
-            input_shape = None
-            output_shape = None
-
-            # num_io_tensors üzerinden döngü yap ve indeksleri kullan
-            # YENİ: trt_engine.num_io_tensors kullanılıyor
-            for i in range(trt_engine.num_io_tensors):
-                binding_name = trt_engine.get_tensor_name(i)  # İndeksten ad al
-                binding_shape = trt_engine.get_tensor_shape(binding_name)  # Addan şekil al
-                binding_is_input = trt_engine.get_tensor_mode(
-                    binding_name) == trt.TensorIOMode.INPUT  # Giriş olup olmadığını kontrol et
-
-                if binding_is_input:
-                    input_name = binding_name
-                    input_shape = binding_shape
-                    trt_input_binding_idx = i  # Giriş indeksini sakla
-                else:
-                    output_name = binding_name
-                    output_shape = binding_shape
-                    trt_output_binding_idx = i  # Çıkış indeksini sakla
-
-            if input_name is None or output_name is None:
-                raise RuntimeError("TensorRT motorundan giriş veya çıkış bağlama adları belirlenemedi.")
-
-            # Dinamik toplu boyut için optimizasyon profilleri burada ayarlanabilir
-            # if trt_engine.has_implicit_batch_dimension:
-            #     pass
-
-            # Giriş/çıkış boyutlarını güncelle
-            if len(input_shape) == 4:
-                IMG_HEIGHT = input_shape[2]
-                IMG_WIDTH = input_shape[3]
-                print(f"TensorRT motoru giriş boyutu algılandı: {IMG_WIDTH}x{IMG_HEIGHT}")
-            else:
-                print(
-                    f"TensorRT motoru giriş boyutu beklenmedik formatta ({input_shape}). Varsayılan {IMG_WIDTH}x{IMG_HEIGHT} kullanılacak.")
-
-            # Giriş/çıkış belleği ayır
-            trt_inputs = []
-            trt_outputs = []
-            trt_bindings = [None] * trt_engine.num_io_tensors  # Tüm bağlamalar için None ile başlat
-            trt_stream = cuda.Stream()
-
-            for i in range(trt_engine.num_io_tensors):
-                binding_name = trt_engine.get_tensor_name(i)
-                binding_shape = trt_engine.get_tensor_shape(binding_name)
-                binding_dtype = trt_engine.get_tensor_dtype(binding_name)
-
-                size = trt.volume(binding_shape) * binding_dtype.itemsize
-                # Düzeltme: pagelocked_empty eleman sayısını bekler, byte sayısını değil
-                host_mem = cuda.pagelocked_empty(trt.volume(binding_shape), dtype=trt.nptype(binding_dtype))
-                device_mem = cuda.mem_alloc(size)
-                trt_bindings[i] = int(device_mem)  # trt_bindings'de doğru indekse ata
-
-                if trt_engine.get_tensor_mode(binding_name) == trt.TensorIOMode.INPUT:
-                    trt_inputs.append({'host': host_mem, 'device': device_mem})
-                else:
-                    trt_outputs.append({'host': host_mem, 'device': device_mem})
-
-            # Bu durumda, oturum nesnesi None kalacak, doğrudan TensorRT motorunu kullanacağız.
-            return "tensorrt"  # Modelin TensorRT olduğunu belirtmek için bir dize döndür
-
-        except Exception as e:
-            print(f"HATA: TensorRT motoru yüklenirken veya yapılandırılırken hata: {e}")
-            traceback.print_exc()
-            trt_engine = None
-            trt_context = None
-            trt_buffers = None
-            trt_inputs = None
-            trt_outputs = None
-            trt_bindings = None
-            trt_stream = None
-            trt_input_binding_idx = None
-            trt_output_binding_idx = None
-            print("TensorRT yüklenemedi, ONNX Runtime'a geri dönülüyor.")
-            # TensorRT başarısız olursa, ONNX Runtime'a geri dön
-            return load_yolo_model(model_path.replace(".engine", ".onnx"))  # ONNX versiyonunu dene
-
-    elif model_path.endswith(".onnx"):
-        # ONNX Runtime ile yükle
-        # --- BAŞLANGIÇ: GPU/CPU SEÇİMİ İÇİN DEĞİŞTİR ---
-        # Bu bayrağı True yaparak CPU kullanımını zorla, False yaparak GPU'yu dene.
-        # Çökme yaşıyorsanız, bunu True yapmayı deneyin.
-        FORCE_CPU_FOR_YOLO = False  # <--- ÇÖKME TESTİ İÇİN BUNU TRUE YAP
-
-        if not FORCE_CPU_FOR_YOLO and 'CUDAExecutionProvider' in ort.get_available_providers():
-            providers.append('CUDAExecutionProvider')
-            print("CUDAExecutionProvider mevcut. GPU kullanılacak.")
-            cuda_provider_options = {
-                "device_id": 0,  # Kullanılacak GPU kimliği (genellikle 0)
-                "arena_extend_strategy": "kNextPowerOfTwo",
-                "cudnn_conv_algo_search": "EXHAUSTIVE",
-                "do_copy_in_default_stream": True,
-                "enable_cuda_graph": False
-            }
-            # Sağlayıcı seçeneklerini oturum seçeneklerine ekle
-            sess_options = ort.SessionOptions()  # sess_options burada tanımlanmalı
-            sess_options.add_session_config_entry("session.provider.options",
-                                                  json.dumps({"CUDAExecutionProvider": cuda_provider_options}))
-        else:
-            print("CUDAExecutionProvider mevcut değil veya CPU kullanımı zorlandı. CPU kullanılacak.")
-            sess_options = ort.SessionOptions()  # sess_options burada da tanımlanmalı
-        providers.append('CPUExecutionProvider')  # Her zaman CPU'yu yedek olarak ekle
-        # --- SON: GPU/CPU SEÇİMİ İÇİN DEĞİŞTİR ---
-
-        try:
-            # ONNX modelini oturum seçenekleri ve sağlayıcılarla yükle
-            session = ort.InferenceSession(model_path, sess_options=sess_options, providers=providers)
-            print("ONNX modeli başarıyla yüklendi.")
-
-            # Eğer yolo_model yüklendiyse, modelden IMG_HEIGHT ve IMG_WIDTH'i al, aksi takdirde varsayılanları kullan
-            input_name = session.get_inputs()[0].name
-            output_name = session.get_outputs()[0].name
-            input_shape = session.get_inputs()[0].shape
-
-            # ONNX model giriş şekli (toplu, kanallar, yükseklik, genişlik) formatında olmalı
-            if len(input_shape) == 4:
-                IMG_HEIGHT = input_shape[2]
-                IMG_WIDTH = input_shape[3]
-                print(f"ONNX model giriş boyutu algılandı: {IMG_WIDTH}x{IMG_HEIGHT}")
-            else:
-                # Eğer input_shape 4 elemanlı değilse veya beklenmedik bir formattaysa
-                # Varsayılan değerler zaten global olarak tanımlanmıştır, sadece bir uyarı ver.
-                print(
-                    f"ONNX model giriş boyutu beklenmedik formatta ({input_shape}). Varsayılan {IMG_WIDTH}x{IMG_HEIGHT} kullanılacak.")
-            return session
-        except Exception as e:
-            print(f"YOLO modeli yüklenirken hata: {e}")
-            print(
-                "Lütfen YOLO_MODEL_PATH'in doğru olduğundan, gerekli kütüphanelerin (onnxruntime-gpu) kurulu olduğundan ve GPU sürücülerinizin güncel olduğundan emin olun.")
-            return None
-    else:
-        print("Desteklenmeyen model formatı. Yalnızca .onnx veya .engine desteklenir.")
-        return None
-
-
-# --- DÜZELTME 1: Model değişkenlerini daha temiz bir şekilde başlat ---
-# Model yükleme sürecini güncelledik. Artık 'yolo_model' doğrudan bir InferenceSession nesnesi veya "tensorrt" dizesi olabilir.
-yolo_model_task12 = load_yolo_model(YOLO_MODEL_PATH)
-# Aşama 3 modeli sadece gerektiğinde yüklenecek şekilde None olarak bırakıldı.
-yolo_model_task3 = None
-
-input_name = None
-output_name = None
-
-# Eğer model TensorRT ise, giriş/çıkış adlarını TensorRT motorundan al
-if yolo_model_task12 == "tensorrt":
-    if trt_engine:
-        # Bu değişkenler load_yolo_model içinde zaten ayarlandı.
-        # Burada ek bir işlem yapmaya gerek yok.
-        pass
-else:  # Eğer ONNX Runtime ise
-    if yolo_model_task12:
-        # ONNX oturumundan giriş/çıkış adlarını al
-        input_name = yolo_model_task12.get_inputs()[0].name
-        output_name = yolo_model_task12.get_outputs()[0].name
+# YENİ: Dinamik girişli modellerde kare başına giriş çözünürlüğü seçimi (statik modellerde etkisiz).
+# Uzun süre hedef yoksa (açık gökyüzü taraması) küçük giriş, küçük hedefler varken büyük giriş kullanılır.
+YOLO_INPUT_SIZE_DEFAULT = 640
+YOLO_INPUT_SIZE_SEARCH = 480
+YOLO_INPUT_SIZE_SMALL_TARGET = 960
+YOLO_SEARCH_AFTER_EMPTY_FRAMES = 15  # Bu kadar boş kareden sonra tarama çözünürlüğüne geç
+YOLO_SMALL_TARGET_MAX_SIDE = 24  # Orijinal karede kısa kenarı bu pikselden küçük hedefler "küçük" sayılır
+
+# YENİ: Her model kendi motorunu, bağlamını, akışını ve tamponlarını tutar. Görev değişimi yalnızca
+# etkin model işaretçisini değiştirir; modeller arka planda yüklenip ısıtılır.
+model_registry = ModelRegistry()
+model_registry.register('task12', YOLO_MODEL_PATH, CLASSES)
+model_registry.register('task3', YOLO_MODEL_PATH_TASK3, CLASSES_TASK3)
+
+# YENİ: True ise modeller arayüz işleminde değil ayrı bir dedektör işleminde yüklenir ve çalışır. Kareler paylaşımlı
+# bellek halkasıyla gönderilir, arayüz yalnızca en son sonucu okur; yavaş çıkarım arayüzü dondurmaz.
+USE_DETECTOR_PROCESS = True
+
+# YENİ: Kamera sürücüsü tampon boyutu (kare). Kareler ayrı bir iş parçacığında okunur ve yalnızca en yenisi tutulur.
+CAMERA_BUFFER_SIZE = 1
+
+# YENİ: Görüntüleme, denetimden (update_frame, kamera hızında) bağımsız olarak en fazla bu hızda boyanır.
+# None: monitör yenileme hızı. BGR kare dönüştürülmeden gösterilir, kaplamalar QPainter ile çizilir (video_view).
+DISPLAY_FPS = None
+# YENİ: True ise görüntü OpenGL ile çizilir (gl_video_view: kalıcı doku, PBO ile yükleme, GPU'da ölçekleme).
+# PyOpenGL yoksa veya OpenGL başlatılamazsa QPainter tabanlı VideoView kullanılır.
+USE_GL_VIDEO_VIEW = False
+
+# YENİ: Kilitli hedef dedektör çalışmaları arasında bu arka uçla izlenir (kcf, mosse, csrt: opencv-contrib gerekir;
+# lk: seyrek optik akış). Dedektör aralığı izleyicinin dedektörle uyumuna ve dedektör yüküne göre 1..N kare arasında
+# uyarlanır.
+VISUAL_TRACKER_BACKEND = "lk"
+DETECTION_MAX_INTERVAL_FRAMES = 6
+# YENİ: Taret açı akışı ve gönderilen komutlardan kare başına görüntü kayması hesaplanır; izleyici tahminleri
+# eşleştirmeden önce bu kayma kadar düzeltilir. Taret hareketi hedef hareketi sanılmadığından yeniden edinme
+# mesafesi ve ROI payı küçük, tam kare taraması seyrek tutulabilir.
+EGO_MOTION_COMPENSATION = True
+# YENİ: Kayma küçültülmüş karede faz korelasyonuyla iyileştirilir (kare başına ~1 ms ek maliyet)
+EGO_MOTION_PHASE_CORRELATION = False
+REACQUISITION_DISTANCE_COMPENSATED = 150
+ROI_BBOX_MARGIN_COMPENSATED = 2.0
+FULL_FRAME_REFRESH_INTERVAL_COMPENSATED = 20
+# YENİ: Bir tespitin kilitlenebilir (onaylı) iz sayılması için gereken ardışık eşleşme sayısı
+TRACKER_MIN_HITS = 2
+# YENİ: Hedef kilitli değilken (arama, görev 3 QR bekleme) dedektör küçük bir gri küçük resimdeki hareket skoruna
+# göre tam karede, yalnızca değişen bölgede (ROI) çalışır veya hiç çalışmaz. Durgun sahnede en fazla
+# ACTIVITY_GATE_MAX_SKIP_FRAMES kare art arda atlanır; iz tablosunda iz varken kapı çıkarımı atlamaz.
+SCENE_ACTIVITY_GATE = True
+ACTIVITY_GATE_MAX_SKIP_FRAMES = 10
 
 
 class RPiCommunicator(QThread):
@@ -430,16 +276,27 @@ class RPiCommunicator(QThread):
 
 
 class HavaSavunmaArayuz(QWidget):
-    def __init__(self):
+    def __init__(self, source=None, replay=frame_source.REPLAY_REALTIME, replay_speed=1.0, loop=False):
+        """
+        :param source: Kare kaynağı (frame_source.open_source): None/"camera" canlı kamera, aksi halde
+                       video dosyası veya görüntü klasörü.
+        """
         print("HATA AYIKLAMA: HavaSavunmaArayuz başlatıldı.")
         super().__init__()
         self.setWindowTitle('Hava Savunma Sistemi Arayüzü')
         self.setGeometry(100, 100, 1920, 1080)
         self.setStyleSheet("background-color: black;")
 
+        # YENİ: Etiketlere gidecek değerler önce bu modele yazılır; ui_refresher değişenleri 10 Hz'te aktarır
+        self.ui_state = UiState(status="Durum: Hazır", target_info="Hedef Bilgisi: Yok", error_px=None,
+                                info_message="BUKREK Hava Savunma Sistemi", yaw=0.0, pitch=0.0)
+
         # --- UI Elemanları Oluşturma ---
         print("HATA AYIKLAMA: UI elemanları oluşturuluyor.")
-        self.camera_label = QLabel(self)
+        if USE_GL_VIDEO_VIEW and GL_VIDEO_VIEW_AVAILABLE:
+            self.camera_label = GLVideoView(self, max_fps=DISPLAY_FPS)
+        else:
+            self.camera_label = VideoView(self, max_fps=DISPLAY_FPS)
         self.camera_label.setFixedSize(1280, 720)
         self.camera_label.setStyleSheet("background-color: black;")
 
@@ -454,17 +311,17 @@ class HavaSavunmaArayuz(QWidget):
         self.info_label = QLabel(self)
         self.info_label.move(1530, 5)
         self.info_label.setFixedSize(350, 30)
-        self.update_info_panel("BUKREK Hava Savunma Sistemi")
-        print("HATA AYIKLAMA: UI elemanları oluşturuldu.")
 
-        # KCF ile ilgili değişkenler artık kullanılmıyor veya rolleri değişti
-        self.kcf_bbox = None
-        self.kcf_active = False  # KCF artık ana takipçi değil
-        self.last_kcf_restart_time = 0
-        self.kcf_restart_cooldown = 0.5  # Bu değer artık kullanılmıyor, ancak hataları önlemek için tutuldu
+        self.ui_refresher = UiRefresher(self.ui_state, parent=self)
+        self.ui_refresher.bind(("status",), str, self.status_label.setText)
+        self.ui_refresher.bind(("target_info", "error_px"), self._render_target_info, self.target_info_label.setText)
+        self.ui_refresher.bind(("info_message", "yaw", "pitch"), self._render_info_panel, self.info_label.setText)
+        self.ui_refresher.start()
+        print("HATA AYIKLAMA: UI elemanları oluşturuldu.")
 
-        # Bu eşik artık kullanılmıyor
-        self.yolo_kcf_match_threshold_pixel = 75
+        # YENİ: Kilitli hedefin görsel izleyicisi (küçültülmüş gri kırpıntı) ve tam dedektörün uyarlanır aralığı
+        self.target_tracker = TargetTracker(VISUAL_TRACKER_BACKEND)
+        self.detection_scheduler = DetectionScheduler(max_interval=DETECTION_MAX_INTERVAL_FRAMES)
 
         # Ateş kısıtlı bölge tanımları (şimdi varsayılan değerler, kullanıcı tarafından değiştirilebilir)
         self.no_fire_yaw_start = 0.0  # Varsayılan değer
@@ -507,7 +364,12 @@ class HavaSavunmaArayuz(QWidget):
         # YENİ: Hedefin kaç ardışık karede algılanamadığını takip etmek için
         self.missing_frames = 0
         self.MAX_MISSING_FRAMES = 15
-        self.MAX_REACQUISITION_DISTANCE_PIXELS = 250
+        self.MAX_REACQUISITION_DISTANCE_PIXELS = REACQUISITION_DISTANCE_COMPENSATED if EGO_MOTION_COMPENSATION else 250
+        # YENİ: Tüm tespitlerin iz tablosu (sabit hızlı Kalman). Kilitli hedef sınıf ve en yakın merkez yerine
+        # iz kimliğiyle takip edilir; hız EMA yerine izin Kalman durumundan okunur.
+        self.tracker = MultiObjectTracker(min_hits=TRACKER_MIN_HITS, max_age=self.MAX_MISSING_FRAMES,
+                                          max_distance=self.MAX_REACQUISITION_DISTANCE_PIXELS)
+        self.current_tracked_target_id = None
 
         # --- PID Kontrol Değişkenleri ---
         # AYARLANDI: Daha hızlı ve daha agresif yanıt için PID kazançları artırıldı.
@@ -519,7 +381,7 @@ class HavaSavunmaArayuz(QWidget):
         self.KI_PITCH = 0.005  # 0.0001'den 0.0002'ye yükseltildi
         self.KD_PITCH = 0.02
 
-        self.pid_update_time = time.time()
+        self.pid_update_time = time.monotonic()  # Kare zaman damgalarıyla aynı saat (frame_capture)
         self.integral_yaw = 0.0
         self.last_error_yaw = 0.0
         self.integral_pitch = 0.0
@@ -539,9 +401,6 @@ class HavaSavunmaArayuz(QWidget):
         self.feedforward_yaw_gain = 0.1
         self.feedforward_pitch_gain = 0.1
 
-        # YENİ EKLEDİM HAREKETLİ SİSTEMDE YUMUŞATMA ANİ DÖNÜŞLER İÇİN
-        self.velocity_smoothing_factor = 0.6
-
         # YENİ: PID'ye giren hata sinyalindeki gürültüyü azaltmak için yumuşatma faktörü.
         # Bu, hem D teriminin hem de ileri beslemenin neden olduğu salınımları engellemek için en önemli adımdır.
         self.error_smoothing_factor = 0.6
@@ -559,6 +418,9 @@ class HavaSavunmaArayuz(QWidget):
         # DERECE_BAŞINA_PİKSEL_YAW ve DERECE_BAŞINA_PİKSEL_PITCH işaretleri kontrol edildi.
         self.DEGREES_PER_PIXEL_YAW = 0.02
         self.DEGREES_PER_PIXEL_PITCH = -0.02
+        # YENİ: Açı akışı ve komutlardan görüntü kayması (EGO_MOTION_COMPENSATION kapalıysa None)
+        self.ego_motion = EgoMotionEstimator(self.DEGREES_PER_PIXEL_YAW, self.DEGREES_PER_PIXEL_PITCH,
+                                             EGO_MOTION_PHASE_CORRELATION) if EGO_MOTION_COMPENSATION else None
 
         # AYARLANDI: PID çıkışı için ölü bant (hata bunun altındaysa, PID çıkışı 0 olur)
         self.pid_output_deadband_degree = 0.03
@@ -579,11 +441,6 @@ class HavaSavunmaArayuz(QWidget):
         self.last_fire_time = 0.0
         self.fire_cooldown_interval = 0.3
 
-        # Tekrarlayan hata mesajlarını önlemek için
-        self.last_status_message = ""
-        self.last_status_time = 0
-        self.status_message_cooldown_interval = 0.5  # Saniye
-
         print("HATA AYIKLAMA: RPiCommunicator başlatılıyor.")
         self.rpi_thread = RPiCommunicator(self.rpi_ip, self.rpi_port)
         self.rpi_thread.status_update_signal.connect(self._update_status_label)
@@ -793,15 +650,48 @@ class HavaSavunmaArayuz(QWidget):
         print("HATA AYIKLAMA: Düzen ayarlandı.")
 
         # Kamera ve Zamanlayıcı Ayarları
-        self.capture = None
+        self.capture = None  # frame_source kaynağı (cv2.VideoCapture arayüzlü)
+        self.capture_thread = None  # Kareleri okuyan iş parçacığı (start_camera içinde başlar)
+        self.source_spec = source
+        self.source_options = {"replay": replay, "speed": replay_speed, "loop": loop}
+        # Uçtan uca işlenen kare hızı (stop_camera'da raporlanır)
+        self.processed_frame_count = 0
+        self.processing_start_time = None
         self.timer = QTimer(self)
         self.timer.timeout.connect(self.update_frame)
         # Zamanlayıcı 'start_camera' içinde kamera başarıyla başlatıldıktan sonra başlayacaktır.
 
         self.frame_counter = 0
-        # --- DÜZELTME 2: Başlangıç model durumunu doğru değişkenle ayarla ---
-        self.yolo_ready = (yolo_model_task12 is not None)
-        self.model_is_tensorrt = (yolo_model_task12 == "tensorrt")
+        # YENİ: Her iki görev modelini de arka planda yükle ve ısıt; arayüz beklemeden açılır.
+        # Dedektör işlemi kullanılıyorsa modeller yalnızca o işlemde yüklenir.
+        self.detector_service = None
+        if USE_DETECTOR_PROCESS:
+            self.detector_service = DetectorService(
+                [('task12', YOLO_MODEL_PATH, CLASSES), ('task3', YOLO_MODEL_PATH_TASK3, CLASSES_TASK3)],
+                CONF_THRESHOLD, NMS_THRESHOLD)
+            self.detector_service.start()
+        else:
+            model_registry.load_in_background()
+        # YENİ: Vektörleştirilmiş, sınıf bazlı NMS yapan son işlemci (çalışma alanı kareler arasında yeniden kullanılır)
+        self.yolo_postprocessor = YoloPostprocessor(CONF_THRESHOLD, NMS_THRESHOLD)
+        # YENİ: Tespitler her karede aynı yapılandırılmış dizi tamponuna yazılır (sözlük listesi kurulmaz)
+        self.detections = Detections()
+        # YENİ: Giriş çözünürlüğü seçimi için son tespitlerin özeti
+        self.yolo_empty_frames = 0
+        self.yolo_smallest_target_side = None
+        # YENİ: Hedef kilitliyken tespiti hedef etrafındaki kırpıntıda (ROI) çalıştırır, periyodik tam kare taraması
+        if EGO_MOTION_COMPENSATION:
+            self.roi_scheduler = RoiScheduler(refresh_interval=FULL_FRAME_REFRESH_INTERVAL_COMPENSATED,
+                                              bbox_margin=ROI_BBOX_MARGIN_COMPENSATED)
+        else:
+            self.roi_scheduler = RoiScheduler()
+        self.show_detection_roi = True  # ROI'yi ekranda ince bir çerçeveyle göster
+        # YENİ: Kilit yokken sahne etkinliğine göre tam kare / ROI / atla kararı (SCENE_ACTIVITY_GATE kapalıysa None)
+        self.activity_gate = ActivityGate(max_skip=ACTIVITY_GATE_MAX_SKIP_FRAMES) if SCENE_ACTIVITY_GATE else None
+        # YENİ: Hedef kilitli değilken (görev 1/2 arama aşaması) kare örtüşen doğal çözünürlüklü döşemelerle,
+        # tek toplu çağrıda taranır; uzaktaki küçük balonlar küçültmede kaybolmaz
+        self.tiled_detector = TiledDetector(self.yolo_postprocessor)
+        self.tiled_search_enabled = True
 
         self.crosshair_movable = False
         self.crosshair_fixed_center = True
@@ -812,6 +702,15 @@ class HavaSavunmaArayuz(QWidget):
         self.camera_label.setMouseTracking(True)
         self.camera_label.mouseMoveEvent = self.mouse_move_event
         self.camera_label.mousePressEvent = self.mouse_press_event
+
+        # YENİ: Arka planda derlenen TensorRT motorlarını periyodik olarak kontrol et ve hazır olunca geçiş yap.
+        # Dedektör işleminde bunu işçi yapar; arayüz yalnızca işçinin yaşadığını denetler, gerekirse yeniden başlatır.
+        self.engine_promotion_timer = QTimer(self)
+        if self.detector_service is not None:
+            self.engine_promotion_timer.timeout.connect(self.detector_service.ensure_running)
+        else:
+            self.engine_promotion_timer.timeout.connect(model_registry.promote_built_engines)
+        self.engine_promotion_timer.start(1000)
         print("HATA AYIKLAMA: Kamera ve Zamanlayıcı ayarları yapılandırıldı.")
 
         # Sinyal Bağlantıları
@@ -887,13 +786,27 @@ class HavaSavunmaArayuz(QWidget):
         button.clicked.connect(button.clearFocus)
 
     def _update_status_label(self, message):
-        """Tekrarlayan hata mesajlarını önlemek için bekleme süreli yuva."""
-        current_time = time.time()
-        if message != self.last_status_message or (
-                current_time - self.last_status_time > self.status_message_cooldown_interval):
-            self.status_label.setText(message)
-            self.last_status_message = message
-            self.last_status_time = current_time
+        """Durum mesajını modele yazar; etiket ui_refresher tarafından yalnızca değiştiğinde güncellenir."""
+        self.ui_state.set(status=message)
+
+    def _update_target_info(self, text, error_px=None):
+        """
+        Hedef bilgisini modele yazar.
+        :param error_px: (yaw, pitch) piksel hatası; verilirse metnin sonuna eklenir.
+        """
+        self.ui_state.set(target_info=text, error_px=error_px)
+
+    @staticmethod
+    def _render_target_info(text, error_px):
+        if error_px is None:
+            return text
+        return f"{text} Hata: Yaw {error_px[0]}px, Pitch {error_px[1]}px"
+
+    @staticmethod
+    def _render_info_panel(info_message, yaw, pitch):
+        if info_message is None:
+            info_message = f"Mevcut Yaw: {yaw:.1f}°, Pitch: {pitch:.1f}°"
+        return f"<h2 style='color: white; text-align: center;'>{info_message}</h2>"
 
     def connect_rpi_threaded(self):
         """RPi'ye bağlantıyı ayrı bir iş parçacığında başlatır."""
@@ -918,7 +831,9 @@ class HavaSavunmaArayuz(QWidget):
         """RPiCommunicator'dan alınan mevcut açıları güncelleyen yuva."""
         self.current_yaw_angle = yaw
         self.current_pitch_angle = pitch
-        self.update_info_panel(f"Mevcut Yaw: {self.current_yaw_angle:.1f}°, Pitch: {self.current_pitch_angle:.1f}°")
+        self.ui_state.set(yaw=yaw, pitch=pitch, info_message=None)
+        if self.ego_motion is not None:
+            self.ego_motion.on_angles(yaw, pitch, time.monotonic())
 
     def _process_rpi_response(self, response_data):
         """RPiCommunicator'dan gelen genel yanıtları işler."""
@@ -930,7 +845,7 @@ class HavaSavunmaArayuz(QWidget):
                     self.target_destroyed = True
                     self.waiting_for_new_engagement_command = True
                     self._update_status_label("Durum: Hedef yok edildi. Yeni angajman bekleniyor...")
-                    self.target_info_label.setText("Hedef Bilgisi: Yok Edildi.")
+                    self._update_target_info("Hedef Bilgisi: Yok Edildi.")
                     self.reset_pid_state()  # PID durumunu sıfırla
                     print("HATA AYIKLAMA: Ateşlemeden sonra PID ve hedef bilgisi sıfırlandı.")
             elif response_data.get("action") == "reset_angles":
@@ -938,6 +853,8 @@ class HavaSavunmaArayuz(QWidget):
                 self.update_info_panel("Taret açıları sıfırlandı: Yaw 0.0°, Pitch 0.0°")
                 print("Taret açıları Raspberry Pi'de (0,0) olarak sıfırlandı.")
                 self.reset_pid_state()  # PID durumunu sıfırla
+                if self.ego_motion is not None:
+                    self.ego_motion.reset()  # Açı referansı değişti; sıçrama kayma sayılmamalı
                 print("HATA AYIKLAMA: Açı sıfırlamadan sonra PID bilgisi sıfırlandı.")
             elif response_data.get("action") in ["set_angles", "move_by_direction", "set_proportional_angles_delta", "manual_move_continuous"]:
                 pass  # Açılar zaten angles_update_signal aracılığıyla güncellendi
@@ -973,26 +890,18 @@ class HavaSavunmaArayuz(QWidget):
 
         command = {"action": "set_proportional_angles_delta", "delta_yaw": delta_yaw, "delta_pitch": delta_pitch}
         self.last_angle_command_send_time = current_time
-        return self.send_command_to_rpi(command)
+        sent = self.send_command_to_rpi(command)
+        if sent and self.ego_motion is not None:
+            self.ego_motion.on_command(delta_yaw, delta_pitch, time.monotonic())
+        return sent
 
     def start_camera(self):
         try:
             print("Kamera başlatılıyor...")
-            camera_indices = [0, 1, 2, 3, 4]
-            self.capture = None
-
-            for index in camera_indices:
-                print(f"cv2.CAP_DSHOW arka ucu ile kamera {index} deneniyor...")
-                try:
-                    temp_capture = cv2.VideoCapture(index, cv2.CAP_DSHOW)
-                    if temp_capture.isOpened():
-                        self.capture = temp_capture
-                        print(f"Kamera {index} (cv2.CAP_DSHOW) başarıyla açıldı.")
-                        break
-                    else:
-                        print(f"Kamera {index} (cv2.CAP_DSHOW) açılamadı.")
-                except Exception as e:
-                    print(f"Kamera {index} (cv2.CAP_DSHOW) açılırken hata: {e}")
+            # Canlı kamerada önce önbellekteki aygıt denenir; yoksa 0-4 dizinleri paralel yoklanır ve MJPG/YUYV
+            # ile 1280x720 @ 60 fps pazarlık edilir (Linux'ta V4L2, Windows'ta DirectShow).
+            # --source ile video dosyası veya görüntü klasörü verildiyse o oynatılır.
+            self.capture = frame_source.open_source(self.source_spec, **self.source_options)
 
             if not self.capture or not self.capture.isOpened():
                 print("HATA: Hiçbir kamera açılamadı! Lütfen kamera bağlantısını veya numarasını kontrol edin.")
@@ -1000,14 +909,17 @@ class HavaSavunmaArayuz(QWidget):
                 self.capture = None
                 return
 
-            self.capture.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-            self.capture.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
-
-            actual_width = int(self.capture.get(cv2.CAP_PROP_FRAME_WIDTH))
-            actual_height = int(self.capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            print(f"Kamera başarıyla başlatıldı. Çözünürlük Ayarlandı: {actual_width}x{actual_height}")
-
-            self._update_status_label("Durum: Kamera Başlatıldı.")
+            source_text = self.capture.describe()
+            print(f"Kamera başarıyla başlatıldı. {source_text}")
+            # Kareler bu iş parçacığında okunur; update_frame beklemeden en yeni kareyi alır.
+            # Dosya kaynaklarında sürücü tamponu yoktur.
+            is_camera = isinstance(self.capture, frame_source.CameraSource)
+            self.capture_thread = CaptureThread(self.capture, CAMERA_BUFFER_SIZE if is_camera else None,
+                                                decode_threads=self.capture.decode_threads).start()
+            self.processed_frame_count = 0
+            self.processing_start_time = time.monotonic()
+
+            self._update_status_label(f"Durum: Kamera Başlatıldı. {source_text}")
             self.timer.start(int(self.angle_command_minimum_interval * 1000))
 
             if hasattr(self, 'start_button'):
@@ -1028,13 +940,29 @@ class HavaSavunmaArayuz(QWidget):
 
     def stop_camera(self):
         if self.capture and self.capture.isOpened():
+            if self.capture_thread is not None:
+                self.capture_thread.stop()
+                print(f"HATA AYIKLAMA: Yakalama durdu: {self.capture_thread.frames_captured} kare, "
+                      f"{self.capture_thread.frames_dropped} düşürülen.")
+                self.capture_thread = None
+            if self.processing_start_time is not None:
+                elapsed = time.monotonic() - self.processing_start_time
+                if elapsed > 0:
+                    print(f"HATA AYIKLAMA: Uçtan uca işlenen: {self.processed_frame_count} kare, "
+                          f"{self.processed_frame_count / elapsed:.1f} fps ({elapsed:.1f} s)")
+                self.processing_start_time = None
             self.capture.release()
             self.capture = None
             self.timer.stop()
             self._update_status_label("Durum: Kamera Durduruldu.")
-            self.target_info_label.setText("Hedef Bilgisi: Yok")
-            self.kcf_active = False
-            self.kcf_bbox = None
+            self._update_target_info("Hedef Bilgisi: Yok")
+            self.target_tracker.reset()
+            self.detection_scheduler.reset()
+            if self.activity_gate is not None:
+                counts = self.activity_gate.counts
+                print(f"HATA AYIKLAMA: Etkinlik kapısı: {counts[GATE_FULL]} tam, {counts[GATE_ROI]} ROI, "
+                      f"{counts[GATE_SKIP]} atlanan kare.")
+                self.activity_gate.reset()
             self.active_task = None
             self.camera_label.clear()
             self._stop_all_manual_movement()
@@ -1046,6 +974,10 @@ class HavaSavunmaArayuz(QWidget):
             self.target_lost_time = 0.0
             self.current_tracked_target_class = None
             self.current_tracked_target_bbox = None
+            self.current_tracked_target_id = None
+            self.tracker.reset()
+            if self.ego_motion is not None:
+                self.ego_motion.reset()
             self.missing_frames = 0  # Sıfırla
             print("HATA AYIKLAMA: Kamera durduruldu, tüm PID ve hedef bilgisi sıfırlandı.")
         else:
@@ -1053,13 +985,18 @@ class HavaSavunmaArayuz(QWidget):
 
     def cancel_task(self):
         self.active_task = None
-        self.kcf_bbox = None
-        self.kcf_active = False
+        self._deactivate_model()
+        self.target_tracker.reset()
+        self.detection_scheduler.reset()
+        if self.activity_gate is not None:
+            self.activity_gate.reset()
         self.target_destroyed = False
         self.waiting_for_new_engagement_command = False
         self.target_lost_time = 0.0
         self.current_tracked_target_class = None
         self.current_tracked_target_bbox = None
+        self.current_tracked_target_id = None
+        self.tracker.reset()
         self.missing_frames = 0  # Sıfırla
         # YENİ: Aşama 3 ile ilgili durumları sıfırla
         self.is_ready_to_engage_from_qr = False
@@ -1068,7 +1005,7 @@ class HavaSavunmaArayuz(QWidget):
         self.task3_settings_group_box.setVisible(False)
 
         self._update_status_label("Durum: Görev durduruldu.")
-        self.target_info_label.setText("Hedef Bilgisi: Yok")
+        self._update_target_info("Hedef Bilgisi: Yok")
         self._stop_all_manual_movement()
         self.movement_restricted_yaw_start = 0
         self.movement_restricted_yaw_end = 0
@@ -1103,14 +1040,15 @@ class HavaSavunmaArayuz(QWidget):
         self.crosshair_fixed_center = True
         self.task3_settings_group_box.setVisible(False)
         self._update_status_label("Durum: Aşama 1 başlatıldı (Tüm Balonları Takip Et, Manuel Ateş).")
-        self.target_info_label.setText("Hedef Bilgisi: Tüm Balonlar.")
-        self.kcf_active = False
-        self.kcf_bbox = None
+        self._update_target_info("Hedef Bilgisi: Tüm Balonlar.")
+        self.target_tracker.reset()
+        self.detection_scheduler.reset()
         self.target_destroyed = False
         self.waiting_for_new_engagement_command = True
         self.target_lost_time = 0.0
         self.current_tracked_target_class = None
         self.current_tracked_target_bbox = None
+        self.current_tracked_target_id = None
         self.missing_frames = 0  # Sıfırla
         self.movement_restricted_yaw_start = 0
         self.movement_restricted_yaw_end = 0
@@ -1118,8 +1056,8 @@ class HavaSavunmaArayuz(QWidget):
         self.direct_manual_control_group_box.setVisible(False)
         self.is_target_active = True
         self.is_aimed_at_target = False
-        # --- DÜZELTME 3: Görev değiştiğinde model türü bayrağını güncelle ---
-        self.model_is_tensorrt = (yolo_model_task12 == "tensorrt")
+        # Görev değiştiğinde yalnızca etkin model işaretçisi değişir (yeniden yükleme yok)
+        self._activate_model('task12')
         print("HATA AYIKLAMA: Aşama 1 başlatıldı, PID ve hedef bilgisi sıfırlandı.")
 
     def task2(self):
@@ -1129,14 +1067,15 @@ class HavaSavunmaArayuz(QWidget):
         self.crosshair_fixed_center = True
         self.task3_settings_group_box.setVisible(False)
         self._update_status_label("Durum: Aşama 2 başlatıldı (Kırmızı Balonu Takip Et, Otomatik Ateş).")
-        self.target_info_label.setText("Hedef Bilgisi: Kırmızı Balon.")
-        self.kcf_active = False
-        self.kcf_bbox = None
+        self._update_target_info("Hedef Bilgisi: Kırmızı Balon.")
+        self.target_tracker.reset()
+        self.detection_scheduler.reset()
         self.target_destroyed = False
         self.waiting_for_new_engagement_command = True
         self.target_lost_time = 0.0
         self.current_tracked_target_class = None
         self.current_tracked_target_bbox = None
+        self.current_tracked_target_id = None
         self.missing_frames = 0  # Sıfırla
         self.movement_restricted_yaw_start = 0
         self.movement_restricted_yaw_end = 0
@@ -1144,8 +1083,8 @@ class HavaSavunmaArayuz(QWidget):
         self.direct_manual_control_group_box.setVisible(False)
         self.is_target_active = True
         self.is_aimed_at_target = False
-        # --- DÜZELTME 3: Görev değiştiğinde model türü bayrağını güncelle ---
-        self.model_is_tensorrt = (yolo_model_task12 == "tensorrt")
+        # Görev değiştiğinde yalnızca etkin model işaretçisi değişir (yeniden yükleme yok)
+        self._activate_model('task12')
         print("HATA AYIKLAMA: Aşama 2 başlatıldı, PID ve hedef bilgisi sıfırlandı.")
 
     # YENİ: Aşama 3 ayar panelini gösteren fonksiyon
@@ -1156,7 +1095,7 @@ class HavaSavunmaArayuz(QWidget):
         self.fire_control_group_box.setVisible(True)
         self.direct_manual_control_group_box.setVisible(False)
         self._update_status_label("Durum: Aşama 3 - Angajman ayarları bekleniyor.")
-        self.target_info_label.setText("Hedef Bilgisi: Yok (Ayar Bekleniyor).")
+        self._update_target_info("Hedef Bilgisi: Yok (Ayar Bekleniyor).")
         self.is_target_active = False  # Henüz hedef takibi aktif değil
 
     # YENİ: "Angajmanı Al" butonuna basıldığında çalışan fonksiyon
@@ -1169,14 +1108,10 @@ class HavaSavunmaArayuz(QWidget):
         self.direct_manual_control_group_box.setVisible(False)
         self.is_ready_to_engage_from_qr = False
 
-        # --- DÜZELTME 4: Aşama 3 modelini doğru şekilde yükle ve ata ---
-        global yolo_model_task3
-        if yolo_model_task3 is None:
-            # Bu, global trt_... değişkenlerini Aşama 3 modeline göre güncelleyecektir.
-            yolo_model_task3 = load_yolo_model(YOLO_MODEL_PATH_TASK3)
-
-        # Tespit fonksiyonunun doğru çalışması için model türü bayrağını güncelle
-        self.model_is_tensorrt = (yolo_model_task3 == "tensorrt")
+        # Aşama 3 modeli arka planda zaten yüklendi; yalnızca etkin model işaretçisini değiştir.
+        # Henüz hazır değilse yükleme bitene kadar tespit atlanır, arayüz donmaz.
+        if self._activate_model('task3') is None:
+            print("HATA AYIKLAMA: Aşama 3 modeli henüz hazır değil, arka planda yükleniyor.")
 
         # Girilen dereceleri al ve kaydet
         try:
@@ -1184,7 +1119,7 @@ class HavaSavunmaArayuz(QWidget):
             b_degree = float(self.b_input.text())
             self.qr_degrees = {'A': a_degree, 'B': b_degree}
             self._update_status_label("Durum: Aşama 3 Ayarları kaydedildi. QR kodu bekleniyor...")
-            self.target_info_label.setText("Hedef Bilgisi: QR Kod.")
+            self._update_target_info("Hedef Bilgisi: QR Kod.")
             self.is_target_active = True  # Kare işleme döngüsünü başlat
             self.waiting_for_new_engagement_command = True
             self.reset_pid_state()
@@ -1199,7 +1134,7 @@ class HavaSavunmaArayuz(QWidget):
         self.active_task = 'full_manual'
         self.task3_settings_group_box.setVisible(False)
         self._update_status_label("Durum: Tam Manuel Kontrol Modu Aktif.")
-        self.target_info_label.setText("Hedef Bilgisi: Yok (Manuel).")
+        self._update_target_info("Hedef Bilgisi: Yok (Manuel).")
         self.crosshair_movable = True
         self.crosshair_fixed_center = False
         self.fire_control_group_box.setVisible(True)
@@ -1299,125 +1234,160 @@ class HavaSavunmaArayuz(QWidget):
             self.send_command_to_rpi(
                 {"action": "manual_move_continuous", "yaw_direction": 0, "pitch_direction": 0})
 
-    def _preprocess_frame_for_yolo(self, frame):
-        """Çerçeveyi YOLO modeli için ön işler."""
-        if frame is None:
-            print("HATA (_preprocess_frame_for_yolo): Giriş çerçevesi boş.")
-            return None
-        img = cv2.resize(frame, (IMG_WIDTH, IMG_HEIGHT))
-        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        img = img.transpose((2, 0, 1)).astype(np.float32) / 255.0
-        img = np.expand_dims(img, axis=0)
-        return img
-
-    def _process_yolo_output(self, output, img_width, img_height, classes_list):
-        """YOLO çıktısını işler ve sınırlayıcı kutuları döndürür."""
-        boxes = []
-        confidences = []
-        class_ids = []
-
-        predictions = np.squeeze(output).T
-
-        scores = np.max(predictions[:, 4:], axis=1)
-        valid_predictions = predictions[scores > CONF_THRESHOLD]
-        valid_scores = scores[scores > CONF_THRESHOLD]
-
-        for i in range(len(valid_predictions)):
-            row = valid_predictions[i]
-            score = valid_scores[i]
-            class_id = np.argmax(row[4:])
-
-            if score < CONF_THRESHOLD:
-                continue
+    def _activate_model(self, name):
+        """Etkin modeli seçer (dedektör işleminde veya bu işlemdeki kayıtta). Hazır değilse None döner."""
+        if self.detector_service is not None:
+            return self.detector_service.activate(name)
+        return model_registry.activate(name)
 
-            center_x, center_y, w, h = row[:4]
-            x = int((center_x - w / 2) * img_width / IMG_WIDTH)
-            y = int((center_y - h / 2) * img_height / IMG_HEIGHT)
-            width = int(w * img_width / IMG_WIDTH)
-            height = int(h * img_height / IMG_HEIGHT)  # Düzeltildi: Bunun IMG_HEIGHT kullandığından emin ol
-
-            boxes.append([x, y, width, height])
-            confidences.append(float(score))
-            class_ids.append(class_id)
-
-        indices = cv2.dnn.NMSBoxes(boxes, confidences, CONF_THRESHOLD, NMS_THRESHOLD)
-        if len(indices) > 0:
-            indices = indices.flatten()
-            filtered_boxes = [boxes[i] for i in indices]
-            filtered_confidences = [confidences[i] for i in indices]
-            filtered_class_ids = [class_ids[i] for i in indices]
-            return filtered_boxes, filtered_confidences, filtered_class_ids
-        return [], [], []
-
-    def process_yolo_detection(self, frame, model, classes_list):
-        """YOLOv11 modelini kullanarak nesne tespiti yapar."""
-        global trt_context, trt_inputs, trt_outputs, trt_bindings, trt_stream, trt_output_binding_idx
+    def _deactivate_model(self):
+        if self.detector_service is not None:
+            self.detector_service.deactivate()
+        else:
+            model_registry.deactivate()
+
+    def _active_model(self):
+        """Etkin model: YoloModel veya dedektör işlemindeki modelin özellikleri (RemoteModelInfo)."""
+        if self.detector_service is not None:
+            return self.detector_service.active_model
+        return model_registry.active_model
+
+    def _choose_yolo_input_size(self, model):
+        """Son tespitlere göre bu kare için model giriş çözünürlüğünü seçer."""
+        if not model.dynamic_input:
+            return model.input_height
+        if self.yolo_smallest_target_side is not None and self.yolo_smallest_target_side < YOLO_SMALL_TARGET_MAX_SIDE:
+            size = YOLO_INPUT_SIZE_SMALL_TARGET
+        elif self.yolo_empty_frames >= YOLO_SEARCH_AFTER_EMPTY_FRAMES:
+            size = YOLO_INPUT_SIZE_SEARCH
+        else:
+            size = YOLO_INPUT_SIZE_DEFAULT
+        return model.nearest_input_size(size)
+
+    def _confirmed_detections(self, detections):
+        """Onaylı (min_hits kez eşleşmiş) izlere ait tespitler."""
+        return detections.with_tracks(track.track_id for track in self.tracker.confirmed_tracks())
 
+    def _nearest_track_id(self, class_id, reference_bbox, default_center):
+        """
+        Verilen sınıf kimliğindeki, referans kutunun (yoksa default_center'ın) merkezine en yakın izin kimliği.
+        MAX_REACQUISITION_DISTANCE_PIXELS içinde iz yoksa None.
+        """
+        if reference_bbox is not None:
+            ref_x = reference_bbox[0] + reference_bbox[2] / 2
+            ref_y = reference_bbox[1] + reference_bbox[3] / 2
+        else:
+            ref_x, ref_y = default_center
+        best_id, best_distance = None, self.MAX_REACQUISITION_DISTANCE_PIXELS
+        for track in self.tracker.tracks:
+            if track.class_id != class_id or not track.updated:
+                continue
+            track_x, track_y = track.center
+            distance = np.hypot(track_x - ref_x, track_y - ref_y)
+            if distance < best_distance:
+                best_id, best_distance = track.track_id, distance
+        return best_id
+
+    def process_yolo_detection(self, frame, model, classes_list, roi=None, input_size=None, tiled=False,
+                               capture_time=None):
+        """
+        YOLOv11 modelini (YoloModel) kullanarak nesne tespiti yapar.
+        :param roi: (x0, y0, x1, y1) verilirse yalnızca bu kırpıntıda tespit yapılır; kutular tam kare koordinatlarındadır.
+        :param input_size: Giriş boyutu (None ise son tespitlere göre seçilir).
+        :param tiled: True ise kare döşemelerle (tek toplu çağrıda) taranır; kare döşemeye veya model toplu çağrıya
+            uygun değilse normal yol.
+        :param capture_time: Karenin yakalama zamanı (time.monotonic); sonuçla birlikte (timestamp) geri verilir.
+        :return: Detections (timestamp/roi: sonucun hesaplandığı karenin zamanı ve kırpıntısı) veya yeni sonuç yoksa
+            None (asenkron yolda henüz tamamlanmış çıkarım yok ya da hata). None "hiçbir şey görülmedi" demek
+            değildir; çağıran bu karede izleri yalnızca kestirmelidir.
+        """
+        if capture_time is None:
+            capture_time = time.monotonic()
         if model is None:
             # print("HATA AYIKLAMA (process_yolo_detection): YOLO modeli hazır değil.")
-            return []
+            return None
 
         if frame is None or frame.size == 0:
             print("HATA (process_yolo_detection): Giriş çerçevesi boş veya geçersiz.")
-            return []
+            return None
 
         try:
-            input_image = self._preprocess_frame_for_yolo(frame)
-            if input_image is None:
-                print("HATA (process_yolo_detection): Ön işlenmiş görüntü boş.")
-                return []
-
-            outputs = []
-            if self.model_is_tensorrt and isinstance(model, str) and model == "tensorrt":
-                # TensorRT ile çıkarım yap
-                if trt_context is None:
-                    print("HATA (process_yolo_detection): TensorRT bağlamı başlatılmadı.")
-                    return []
-                if trt_input_binding_idx is None or trt_output_binding_idx is None:
-                    print("HATA (process_yolo_detection): TensorRT giriş/çıkış bağlama indeksleri ayarlanmadı.")
-                    return []
-
-                # Giriş verilerini ana bilgisayardan cihaza kopyala
-                np.copyto(trt_inputs[0]['host'], input_image.flatten())
-                cuda.memcpy_htod_async(trt_inputs[0]['device'], trt_inputs[0]['host'], trt_stream)
-
-                # execute_v2 (senkron) kullanarak çıkarım yap
-                # Bu, execute_async / execute_async_v2 mevcut değilse bir yedektir
-                trt_context.execute_v2(trt_bindings)
-
-                # Çıkış verilerini cihazdan ana bilgisayara kopyala
-                cuda.memcpy_dtoh_async(trt_outputs[0]['host'], trt_outputs[0]['device'], trt_stream)
-                trt_stream.synchronize()
-
-                # Saklanan çıkış bağlama indeksini kullanarak çıkış şekline eriş
-                outputs = [trt_outputs[0]['host'].reshape(
-                    trt_engine.get_tensor_shape(trt_engine.get_tensor_name(trt_output_binding_idx)))]
+            if self.detector_service is not None:
+                return self._process_remote_detection(frame, model, classes_list, roi, input_size, tiled,
+                                                      capture_time)
+
+            if tiled:
+                dets = self.tiled_detector.detect(model, frame)
+                if dets is not None:
+                    return self.detections.fill(dets, classes_list, capture_time)
+
+            # Ön işleme (letterbox, BGR->RGB, CHW, 0-1 ölçekleme) model tarafından yapılır:
+            # TensorRT varsa GPU'da tek çekirdekte, yoksa CPU'da OpenCV ile.
+            if input_size is None:
+                input_size = self._choose_yolo_input_size(model)
+            if model.async_executor is not None:
+                # YENİ: Asenkron TensorRT yolu. Bu kare GPU'ya kuyruğa alınır ve beklemeden, tamamlanmış en yeni
+                # karenin (genellikle bir önceki karenin) sonucu alınır. CPU bir sonraki kareyi hazırlarken GPU çalışır.
+                # Sonuç, gönderildiği karenin zamanı ve ROI'siyle döner; izler o karenin ölçümüyle güncellenir.
+                if model.dynamic_input:
+                    model.async_executor.submit_frame(frame, input_size, input_size, roi, capture_time)
+                else:
+                    model.async_executor.submit_frame(frame, model.input_width, model.input_height, roi,
+                                                      capture_time)
+                result = model.async_executor.poll()
+                if result is None:
+                    return None  # Henüz tamamlanmış bir sonuç yok
+                outputs, letterbox, result_time, result_roi = result
             else:
-                # ONNX Runtime ile çıkarım yap
-                outputs = model.run([output_name], {input_name: input_image})
-
-            img_height, img_width, _ = frame.shape
-            outputs_np = outputs[0]  # _process_yolo_output için bir numpy dizisi olduğundan emin ol
-            boxes, confidences, class_ids = self._process_yolo_output(outputs_np, img_width, img_height, classes_list)
-
-            detections = []
-            for i in range(len(boxes)):
-                x, y, w, h = boxes[i]
-                class_name = classes_list[class_ids[i]] if class_ids[i] < len(classes_list) else "Bilinmeyen"
-                detections.append({
-                    'bbox': (x, y, w, h),
-                    'score': confidences[i],
-                    'class_name': class_name
-                })
+                # Modelin kendi motoru/oturumu ve tamponlarıyla çıkarım yap (TensorRT veya ONNX Runtime)
+                outputs, letterbox = model.infer_frame(frame, input_size, roi)
+                result_time, result_roi = capture_time, roi
+
+            # Ham başlıkta çözme + sınıf bazlı NMS vektörel olarak yapılır; NMS modelin içindeyse
+            # yalnızca top-K satıra eşik ve letterbox geri eşlemesi uygulanır
+            dets = self.yolo_postprocessor.process(outputs, model.output_layout, letterbox)
+            detections = self.detections.fill(dets, classes_list, result_time, result_roi)
+
+            if (letterbox.src_width, letterbox.src_height) == (frame.shape[1], frame.shape[0]):
+                # Çözünürlük seçimi yalnızca tam kare sonuçlarına göre güncellenir (asenkron yolda sonuç
+                # önceki bir gönderime ait olabileceğinden ROI olup olmadığı sonucun kendisinden anlaşılır)
+                self._update_yolo_size_stats(detections)
             return detections
         except Exception as e:
             print(f"HATA (process_yolo_detection): Model işleme hatası: {e}")
             traceback.print_exc()
             self._update_status_label(f"Hata: Model tespit hatası: {str(e)[:50]}...")
-            return []
+            return None
+
+    def _process_remote_detection(self, frame, model, classes_list, roi, input_size, tiled, capture_time):
+        """
+        Kareyi dedektör işlemine gönderir ve beklemeden en son sonucu okur. Sonuç genellikle önceki bir kareye
+        aittir ve o karenin zamanı ve ROI'siyle döner. Yeni sonuç yoksa (önceki kareden beri işçi bitirmediyse),
+        sonuç çok eskiyse veya başka bir modele aitse None döner.
+        """
+        if input_size is None:
+            input_size = self._choose_yolo_input_size(model)
+        self.detector_service.submit(frame, capture_time, roi, input_size, tiled)
+        result = self.detector_service.latest_result()
+        if result is None:
+            return None
+        detections = self.detections.fill(result.dets, classes_list, result.timestamp, result.roi)
+        if result.full_frame:
+            self._update_yolo_size_stats(detections)
+        return detections
+
+    def _update_yolo_size_stats(self, detections):
+        """Giriş çözünürlüğü seçimi için tam kare tespit özetini günceller."""
+        if len(detections):
+            self.yolo_empty_frames = 0
+            self.yolo_smallest_target_side = int(detections.sizes().min())
+        else:
+            self.yolo_empty_frames += 1
+            self.yolo_smallest_target_side = None
 
     def update_info_panel(self, text):
-        self.info_label.setText(f"<h2 style='color: white; text-align: center;'>{text}</h2>")
+        """Bilgi panelinde açılar yerine bu mesajı gösterir (sonraki açı güncellemesine kadar)."""
+        self.ui_state.set(info_message=text)
 
     def apply_no_fire_zone_settings(self):
         """Girişlerden ateşsiz bölge değerlerini okur ve uygular."""
@@ -1456,7 +1426,11 @@ class HavaSavunmaArayuz(QWidget):
 
         command = {"action": "set_angles", "yaw": yaw, "pitch": pitch}
         self.last_angle_command_send_time = current_time
-        return self.send_command_to_rpi(command)
+        sent = self.send_command_to_rpi(command)
+        if sent and self.ego_motion is not None:
+            self.ego_motion.on_command(yaw - self.current_yaw_angle, pitch - self.current_pitch_angle,
+                                       time.monotonic())
+        return sent
 
     def fire_weapon(self):
         if not self.rpi_thread.is_connected:
@@ -1505,7 +1479,7 @@ class HavaSavunmaArayuz(QWidget):
         print("Açıları sıfırlama komutu gönderiliyor...")
         self.send_command_to_rpi({"action": "reset_angles"})
 
-    def close_event(self, event):
+    def close_event(self, event=None):
         """Uygulama kapatıldığında bağlantıyı keser."""
         print("HATA AYIKLAMA: Uygulama kapanıyor (close_event tetiklendi)...")
         self.stop_camera()
@@ -1514,10 +1488,13 @@ class HavaSavunmaArayuz(QWidget):
             self.rpi_thread.wait(2000)
             if self.rpi_thread.isRunning():
                 print("UYARI: RPiCommunicator iş parçacığı zamanında kapanmadı.")
-        event.accept()
+        if self.detector_service is not None:
+            self.detector_service.shutdown()
+            self.detector_service = None
+        if event is not None:  # aboutToQuit sinyali olay nesnesi göndermez
+            event.accept()
 
     def update_frame(self):
-        display_frame = None
         try:
             # print("HATA AYIKLAMA (update_frame): Kare güncelleme döngüsü başlatıldı.")
             if self.capture is None or not self.capture.isOpened():
@@ -1526,37 +1503,49 @@ class HavaSavunmaArayuz(QWidget):
                 self.timer.stop()
                 return
 
-            ret, frame = self.capture.read()
-            if not ret or frame is None or frame.size == 0:
-                print("HATA (update_frame): Kare okunamadı, boş veya geçersiz boyut. Kamera durduruluyor.")
+            if self.capture_thread is not None and self.capture_thread.ended:
+                print("HATA AYIKLAMA (update_frame): Kare kaynağı sona erdi. Kamera durduruluyor.")
+                self.stop_camera()
+                self._update_status_label("Durum: Kaynak sona erdi.")
+                return
+            if self.capture_thread is None or self.capture_thread.failed:
+                print("HATA (update_frame): Kameradan kare okunamıyor. Kamera durduruluyor.")
                 self._update_status_label("Hata: Kameradan kare okunamadı.")
                 self.stop_camera()
                 return
+            captured = self.capture_thread.latest()
+            if captured is None:
+                return  # Son işlenen kareden bu yana yeni kare yok
+            frame = captured.image
+            self.processed_frame_count += 1
 
-            display_frame = frame.copy()
+            # Kare kopyalanmaz; çizimler vektör kaplama olarak görüntünün üzerine boyanır
+            overlays = Overlays()
 
-            current_frame_time = time.time()
+            # Hız tahmini ve PID, karenin gerçek yakalama zamanını (monotonik) kullanır
+            current_frame_time = captured.timestamp
             original_h, original_w = frame.shape[:2]
             center_x_frame, center_y_frame = original_w // 2, original_h // 2
 
-            h, w, ch = display_frame.shape
-            bytes_per_line = ch * w
-            center_x_display, center_y_display = w // 2, h // 2
-
             # Artı işaretini çiz
             crosshair_color = (0, 255, 0)
             crosshair_size = 10
-            cv2.line(display_frame, (center_x_display - crosshair_size, center_y_display),
-                     (center_x_display + crosshair_size, center_y_display),
-                     crosshair_color, 2)
-            cv2.line(display_frame, (center_x_display, center_y_display - crosshair_size),
-                     (center_x_display, center_y_display + crosshair_size),
-                     crosshair_color, 2)
-
-            self.update_info_panel(
-                f"Mevcut Yaw: {self.current_yaw_angle:.1f}°, Pitch: {self.current_pitch_angle:.1f}°")
-
-            detections = []
+            overlays.crosshair(center_x_frame, center_y_frame, crosshair_size, crosshair_color, 2)
+
+            # YENİ: Taret hareketinin bu karedeki görüntü kayması; izler ve kilitli hedef kutusu eşleştirmeden ve
+            # ROI planından önce bu kadar ötelenir
+            ego_shift = None
+            if self.ego_motion is not None:
+                ego_shift = self.ego_motion.frame_shift(frame, current_frame_time)
+                self.tracker.apply_shift(*ego_shift)
+                if self.current_tracked_target_bbox is not None:
+                    x, y, w, h = self.current_tracked_target_bbox
+                    self.current_tracked_target_bbox = (int(round(x + ego_shift[0])), int(round(y + ego_shift[1])),
+                                                        w, h)
+
+            self.ui_state.set(yaw=self.current_yaw_angle, pitch=self.current_pitch_angle, info_message=None)
+
+            detections = self.detections.clear()
             current_target_bbox_for_pid = None
             detected_class_status = None
 
@@ -1565,38 +1554,106 @@ class HavaSavunmaArayuz(QWidget):
             # --- DÜZELTME 5: Aktif göreve göre doğru model tanıtıcısını ve sınıf listesini seç ---
             current_yolo_model = None
             current_classes = None
-            if self.active_task == 'task3':
-                current_yolo_model = yolo_model_task3
-                current_classes = CLASSES_TASK3
-            elif self.active_task in ['task1', 'task2']:
-                current_yolo_model = yolo_model_task12
-                current_classes = CLASSES
+            if self.active_task in ['task1', 'task2', 'task3']:
+                # Etkin model görev başlatılırken seçildi (_activate_model)
+                current_yolo_model = self._active_model()
+                if current_yolo_model is not None:
+                    current_classes = current_yolo_model.classes
+            detections.class_names = current_classes or []
 
             if self.is_target_active and current_yolo_model is not None:
-                detections = self.process_yolo_detection(display_frame, current_yolo_model, current_classes)
+                # YENİ: Kilitli hedef varken önce görsel izleyici güncellenir; izleyici hedefi tutuyorsa ve
+                # zamanlayıcının aralığı dolmadıysa tam dedektör bu karede çalışmaz
+                locked_track = self.tracker.get(self.current_tracked_target_id)
+                self.detection_scheduler.tick(current_frame_time)
+                tracker_ok, tracker_bbox, tracker_confidence = False, None, 0.0
+                if locked_track is not None and self.target_tracker.active:
+                    tracker_ok, tracker_bbox, tracker_confidence = self.target_tracker.update(frame, ego_shift)
+                run_detector = (locked_track is None or not locked_track.updated or not tracker_ok
+                                or self.detection_scheduler.due())
+                # YENİ: Kilit yokken sahne etkinliği kapısı: durgun sahnede çıkarım atlanır, hareket küçük bir
+                # bölgedeyse yalnızca orada yapılır. Aday izler varken onaylanmaları gecikmesin diye tam kare.
+                gate_decision, gate_roi, gate_input_size = None, None, None
+                detection_fresh = False  # Bu karede yeni bir dedektör sonucu alındı mı?
+                if (run_detector and self.activity_gate is not None
+                        and self.current_tracked_target_class is None):
+                    if self.tracker.tracks:
+                        self.activity_gate.request_full()
+                    gate_decision, gate_roi, gate_input_size = self.activity_gate.decide(
+                        frame, ego_shift, current_yolo_model.input_sizes)
+                    run_detector = gate_decision != GATE_SKIP
+                if run_detector:
+                    detection_start_time = time.monotonic()
+                    # YENİ: Hedef kilitliyse tahmini konum etrafındaki doğal çözünürlüklü kırpıntıda tespit yap
+                    detection_roi, roi_input_size = None, None
+                    if (self.current_tracked_target_class is not None and self.current_tracked_target_bbox is not None
+                            and not self.target_destroyed):
+                        lookahead = current_frame_time - self.last_frame_time if self.last_frame_time else 0.0
+                        detection_roi, roi_input_size = self.roi_scheduler.plan(
+                            original_w, original_h, self.current_tracked_target_bbox,
+                            (self.last_target_velocity_x, self.last_target_velocity_y), lookahead,
+                            self.missing_frames, current_yolo_model.input_sizes)
+                    else:
+                        self.roi_scheduler.reset()
+                        if gate_decision == GATE_ROI:
+                            detection_roi, roi_input_size = gate_roi, gate_input_size
+                    # Kilitli hedef yokken görev 1/2 arama aşamasında döşemeli tarama
+                    use_tiles = (self.tiled_search_enabled and self.active_task in ['task1', 'task2']
+                                 and self.current_tracked_target_class is None and detection_roi is None)
+                    # Tespit, üzerine artı işareti çizilmemiş orijinal karede yapılır
+                    new_detections = self.process_yolo_detection(frame, current_yolo_model, current_classes,
+                                                                 detection_roi, roi_input_size, use_tiles,
+                                                                 current_frame_time)
+                    if detection_roi is not None and self.show_detection_roi:
+                        overlays.rect(*detection_roi, (255, 255, 0), 1)
+                    if new_detections is not None:
+                        detections = new_detections
+                        detection_fresh = True
+                        # Tespitler izlerle, hesaplandıkları karenin zamanı ve ROI'siyle eşleştirilir (asenkron
+                        # dedektörde bu kare değil, daha önce gönderilen bir kare); her tespite 'track_id' yazılır.
+                        # ROI dışındaki izler kaçırılmış sayılmaz. İzler bu karenin taret pozundadır (apply_shift);
+                        # daha eski karenin tespitleri ve ROI'si o kareden bu yana biriken kayma kadar ötelenir.
+                        if self.ego_motion is not None and detections.timestamp < current_frame_time:
+                            detections.translate(*self.ego_motion.shift_since(detections.timestamp))
+                        self.tracker.update(detections, detections.timestamp, region=detections.roi)
+                        result_is_older = detections.timestamp < current_frame_time
+                        if result_is_older:
+                            self.tracker.predict(current_frame_time)  # Geç sonuçla açılan izler de bu kareye
+                        # İzleyici dedektör kutusuyla yeniden başlatılır; uyumu (IoU) dedektör aralığını belirler.
+                        # Sonuç daha eski bir kareye aitse izin bu kareye kestirilmiş kutusu kullanılır.
+                        locked_track = self.tracker.get(self.current_tracked_target_id)
+                        agreement = None
+                        if locked_track is not None and locked_track.updated:
+                            locked_bbox = locked_track.bbox if result_is_older else locked_track.last_bbox
+                            if tracker_ok:
+                                agreement = min(tracker_confidence, bbox_iou(tracker_bbox, locked_bbox))
+                            self.target_tracker.init(frame, locked_bbox)
+                        self.detection_scheduler.record_detection(time.monotonic() - detection_start_time,
+                                                                  agreement)
+                if not detection_fresh:
+                    # Dedektör çalışmadı veya yeni sonuç yok: izler Kalman ile kestirilir, kilitli iz görsel
+                    # izleyicinin kutusuyla düzeltilir (etkinlik kapısının atladığı karelerde kilitli iz yoktur)
+                    self.tracker.predict(current_frame_time)
+                    if locked_track is not None and tracker_ok:
+                        self.tracker.correct(locked_track.track_id, tracker_bbox, current_frame_time,
+                                             tracker_confidence)
                 # print(f"HATA AYIKLAMA (update_frame): YOLO {len(detections)} tespit buldu.")
 
                 # GÜNCELLENDİ: Aşama 3 Mantığı
                 if self.active_task == 'task3' and self.waiting_for_new_engagement_command and not self.is_ready_to_engage_from_qr:
                     # Aşama 3: QR kodunu oku ve açıya dön
                     # self.process_tracking_to_home_position() # Önce başlangıç konumuna dön
-                    data, bbox_qr, _ = self.qr_detector.detectAndDecode(display_frame)
+                    data, bbox_qr, _ = self.qr_detector.detectAndDecode(frame)
                     if data and data in self.qr_degrees:
-                        # QR koduna en yakın hedefi bul
-                        closest_target_to_qr = None
-                        min_dist_to_qr = float('inf')
+                        # QR koduna yatayda en yakın hedefi bul
                         qr_center_x = bbox_qr[0][0][0] + (bbox_qr[0][2][0] - bbox_qr[0][0][0]) / 2
 
-                        for det in detections:
-                            det_center_x = det['bbox'][0] + det['bbox'][2] / 2
-                            dist = abs(det_center_x - qr_center_x)
-                            if dist < min_dist_to_qr:
-                                min_dist_to_qr = dist
-                                closest_target_to_qr = det
-
-                        if closest_target_to_qr:
+                        if len(detections):
+                            closest_to_qr = int(np.argmin(np.abs(detections.centers()[:, 0] - qr_center_x)))
                             self.current_qr_char = data
-                            self.current_tracked_target_class = closest_target_to_qr['class_name']
+                            self.current_tracked_target_class = detections.class_name(closest_to_qr)
+                            self.current_tracked_target_id = detections.track_id(closest_to_qr)
+                            self.target_tracker.init(frame, detections.bbox(closest_to_qr))
                             target_yaw_from_qr = self.qr_degrees[self.current_qr_char]
 
                             self.send_angle_command(target_yaw_from_qr, self.current_pitch_angle)
@@ -1605,8 +1662,13 @@ class HavaSavunmaArayuz(QWidget):
 
                             self._update_status_label(
                                 f"Durum: QR Kodu '{data}' okundu. Hedef '{self.current_tracked_target_class}' kilitlendi. Açıya dönülüyor: {target_yaw_from_qr}°")
-                            self.target_info_label.setText(
+                            self._update_target_info(
                                 f"Hedef: {self.current_tracked_target_class}. Açıya dönülüyor.")
+                        elif not detection_fresh:
+                            # Bu karede yeni sonuç yok (kapı çıkarımı atladı veya sonuç bekleniyor): kapı atladıysa
+                            # sonraki karede tam kare taranır
+                            if gate_decision == GATE_SKIP:
+                                self.activity_gate.request_full()
                         else:
                             self._update_status_label(f"Uyarı: QR Kodu okundu ancak yanında hedef bulunamadı.")
 
@@ -1615,223 +1677,176 @@ class HavaSavunmaArayuz(QWidget):
 
                 elif self.current_tracked_target_class is not None and not self.target_destroyed:
                     # print(f"HATA AYIKLAMA: Kilitli hedef '{self.current_tracked_target_class}' takip ediliyor.")
-                    closest_locked_detection = None
-                    min_locked_distance = float('inf')
-
-                    # Son bilinen veya tahmin edilen hedef merkezini al
-                    last_tracked_center_x = self.current_tracked_target_bbox[0] + self.current_tracked_target_bbox[
-                        2] // 2 if self.current_tracked_target_bbox else center_x_frame
-                    last_tracked_center_y = self.current_tracked_target_bbox[1] + self.current_tracked_target_bbox[
-                        3] // 2 if self.current_tracked_target_bbox else center_y_frame
-
-                    # Eğer kayıp kareler varsa, yeniden edinme için tahmini merkezi kullan
-                    if self.missing_frames > 0 and self.last_target_x is not None and self.last_target_y is not None:
-                        time_since_last_known = current_frame_time - self.last_frame_time
-                        predicted_x_for_reacq = self.last_target_x + self.last_target_velocity_x * time_since_last_known
-                        predicted_y_for_reacq = self.last_target_y + self.last_target_velocity_y * time_since_last_known
-                        last_tracked_center_x = int(predicted_x_for_reacq)
-                        last_tracked_center_y = int(predicted_y_for_reacq)
-                        # print(
-                        #     f"HATA AYIKLAMA: Yeniden edinme için tahmini merkez kullanılıyor: ({last_tracked_center_x}, {last_tracked_center_y})")
-
-                    for det in detections:
-                        # Sadece mevcut kilitli hedef sınıfıyla eşleşenleri kontrol et
-                        if det['class_name'] == self.current_tracked_target_class:
-                            x, y, det_w, det_h = det['bbox']
-                            det_center_x = x + det_w // 2
-                            det_center_y = y + det_h // 2
-                            distance = np.sqrt(
-                                (det_center_x - last_tracked_center_x) ** 2 + (
-                                        det_center_y - last_tracked_center_y) ** 2)
-
-                            # Yalnızca son bilinen/tahmin edilen konumdan belirli bir mesafe içindeki tespitleri dikkate al
-                            if distance < min_locked_distance and distance < self.MAX_REACQUISITION_DISTANCE_PIXELS:
-                                min_locked_distance = distance
-                                closest_locked_detection = det
-
-                    if closest_locked_detection:
-                        current_target_bbox_for_pid = closest_locked_detection['bbox']
-                        detected_class_status = closest_locked_detection['class_name']
-                        self.target_info_label.setText(
-                            f"Hedef: YOLO Takip Ediyor ({detected_class_status}).")
+                    if self.current_tracked_target_id is None:
+                        # Kimliksiz kilit (örn. QR yanında hedef seçildiği karede iz yoktu): son kutuya veya kare
+                        # merkezine en yakın, aynı sınıftaki iz seçilir
+                        self.current_tracked_target_id = self._nearest_track_id(
+                            detections.class_id_of(self.current_tracked_target_class),
+                            self.current_tracked_target_bbox,
+                            (center_x_frame, center_y_frame))
+                    locked_track = self.tracker.get(self.current_tracked_target_id)
+
+                    if locked_track is not None and locked_track.updated:
+                        # Kutu ve hız izin Kalman durumundan (dedektör bu karede çalışmadıysa tahmin)
+                        current_target_bbox_for_pid = locked_track.bbox
+                        detected_class_status = detections.name_of(locked_track.class_id)
+                        self._update_target_info(
+                            f"Hedef: YOLO Takip Ediyor ({detected_class_status}, iz #{locked_track.track_id}).")
                         self.target_lost_time = 0.0
                         self.missing_frames = 0  # Hedef bulunduğunda sayacı sıfırla
-                        # current_tracked_target_bbox'u yeni bulunan tespitle güncelle
                         self.current_tracked_target_bbox = current_target_bbox_for_pid
-
-                        # Hedef hızını yeni tespitten güncelle (Yumuşatma ile)
-                        if self.last_target_x is not None and self.last_frame_time is not None:
-                            delta_time_for_velocity = current_frame_time - self.last_frame_time
-                            if delta_time_for_velocity > 0:
-                                # 1. Anlık (gürültülü) hızı hesapla
-                                current_raw_velocity_x = (current_target_bbox_for_pid[0] +
-                                                          current_target_bbox_for_pid[
-                                                              2] // 2 - self.last_target_x) / delta_time_for_velocity
-                                current_raw_velocity_y = (current_target_bbox_for_pid[1] +
-                                                          current_target_bbox_for_pid[
-                                                              3] // 2 - self.last_target_y) / delta_time_for_velocity
-
-                                # 2. Üstel Hareketli Ortalama (EMA) ile hızı yumuşat
-                                alpha = self.velocity_smoothing_factor
-                                self.last_target_velocity_x = (alpha * current_raw_velocity_x) + (
-                                        1 - alpha) * self.last_target_velocity_x
-                                self.last_target_velocity_y = (alpha * current_raw_velocity_y) + (
-                                        1 - alpha) * self.last_target_velocity_y
-                        # Hız hesaplamasından SONRA last_target_x, last_target_y, last_frame_time'ı güncelle
+                        self.last_target_velocity_x, self.last_target_velocity_y = locked_track.velocity
                         self.last_target_x = current_target_bbox_for_pid[0] + current_target_bbox_for_pid[2] // 2
                         self.last_target_y = current_target_bbox_for_pid[1] + current_target_bbox_for_pid[3] // 2
                         self.last_frame_time = current_frame_time
-                        # print(f"HATA AYIKLAMA: Kilitli hedef yeniden edinildi. Missing frames sıfırlandı.")
 
-                    else:  # closest_locked_detection is None
-                        # print(
-                        #     f"HATA AYIKLAMA: Kilitli hedef sınıfı için YOLO tespiti bulunamadı ({self.current_tracked_target_class}) veya çok uzakta.")
-                        self.missing_frames += 1  # Hedef bulunamadığında sayacı artır
+                    elif locked_track is not None:
+                        # İz kaçırıldı ama henüz silinmedi (max_age = MAX_MISSING_FRAMES): Kalman tahminiyle devam
+                        self.missing_frames = locked_track.misses
+                        self._update_status_label(
+                            f"Durum: Hedef kaybedildi, tahminle takip etmeye çalışılıyor ({self.MAX_MISSING_FRAMES - self.missing_frames} kare kaldı).")
+                        self._update_target_info("Hedef: Takip Kayboldu. Tahminle hareket ediyor.")
+                        current_target_bbox_for_pid = locked_track.bbox
+                        self.last_target_velocity_x, self.last_target_velocity_y = locked_track.velocity
+
+                    elif self.current_tracked_target_id is None and self.missing_frames < self.MAX_MISSING_FRAMES:
+                        # Sınıfı kilitli hedef için henüz iz yok
+                        self.missing_frames += 1
+                        current_target_bbox_for_pid = None
 
-                        if self.missing_frames <= self.MAX_MISSING_FRAMES:
-                            self._update_status_label(
-                                f"Durum: Hedef kaybedildi, tahminle takip etmeye çalışılıyor ({self.MAX_MISSING_FRAMES - self.missing_frames} kare kaldı).")
-                            self.target_info_label.setText("Hedef: Takip Kayboldu. Tahminle hareket ediyor.")
-
-                            if self.last_target_x is not None and self.last_frame_time is not None and self.current_tracked_target_bbox is not None:
-                                # Sadece geçerli bir son bilinen konum ve bbox boyutu varsa tahmin et
-                                time_since_last_detection = current_frame_time - self.last_frame_time
-                                predicted_x = self.last_target_x + self.last_target_velocity_x * time_since_last_detection
-                                predicted_y = self.last_target_y + self.last_target_velocity_y * time_since_last_detection
-
-                                _, _, w_last, h_last = self.current_tracked_target_bbox  # Son takip edilen bbox'un boyutlarını kullan
-                                current_target_bbox_for_pid = (
-                                    int(predicted_x - w_last / 2), int(predicted_y - h_last / 2), w_last, h_last)
-                                # print(f"HATA AYIKLAMA: Hedef tahmin edildi: X={predicted_x:.1f}, Y={predicted_y:.1f}")
-                            else:
-                                current_target_bbox_for_pid = None  # Tahmin için yeterli veri yok
-                                # print("HATA AYIKLAMA: Tahmin için yeterli veri yok, PID hedefi yok.")
-                        else:
-                            # Hedef gerçekten kayboldu
-                            print(
-                                f"HATA AYIKLAMA: Hedef takibi {self.MAX_MISSING_FRAMES} kare boyunca kaybedildi. Hedef kalıcı olarak kaybedildi.")
-                            current_target_bbox_for_pid = None
-                            self.current_tracked_target_class = None
-                            self.current_tracked_target_bbox = None  # Gerçekten kaybolduğunda bbox'u temizle
-                            self.target_destroyed = True
-                            self.waiting_for_new_engagement_command = True
-                            self.target_info_label.setText("Hedef: Takip Kayboldu. Yeni hedef aranıyor.")
-                            self.reset_pid_state()
-                            print(
-                                "HATA AYIKLAMA: Hedef kaybedildi ve zaman aşımı doldu, PID ve hedef bilgisi sıfırlandı.")
+                    else:
+                        # İz silindi: hedef gerçekten kayboldu
+                        print(
+                            f"HATA AYIKLAMA: Hedef takibi {self.MAX_MISSING_FRAMES} kare boyunca kaybedildi. Hedef kalıcı olarak kaybedildi.")
+                        current_target_bbox_for_pid = None
+                        self.current_tracked_target_class = None
+                        self.current_tracked_target_bbox = None  # Gerçekten kaybolduğunda bbox'u temizle
+                        self.current_tracked_target_id = None
+                        self.target_tracker.reset()
+                        self.detection_scheduler.reset()
+                        self.target_destroyed = True
+                        self.waiting_for_new_engagement_command = True
+                        self._update_target_info("Hedef: Takip Kayboldu. Yeni hedef aranıyor.")
+                        self.reset_pid_state()
+                        print(
+                            "HATA AYIKLAMA: Hedef kaybedildi ve zaman aşımı doldu, PID ve hedef bilgisi sıfırlandı.")
                 elif self.waiting_for_new_engagement_command or self.current_tracked_target_class is None:
                     # print("HATA AYIKLAMA: Yeni hedef edinme/yeniden edinme süreci başlatıldı.")
                     candidate_target = None
-                    minimum_distance = float('inf')
+
+                    # Yalnızca onaylı izlere ait tespitler kilitlenir (tek karelik yanlış tespitler elenir)
+                    lockable_detections = self._confirmed_detections(detections)
+                    frame_center = (center_x_frame, center_y_frame)
 
                     if self.active_task == 'task1':
-                        for det in detections:
-                            x, y, det_w, det_h = det['bbox']
-                            det_center_x = x + det_w // 2
-                            det_center_y = y + det_h // 2
-                            distance = np.sqrt(
-                                (det_center_x - center_x_frame) ** 2 + (det_center_y - center_y_frame) ** 2)
-                            if distance < minimum_distance:
-                                minimum_distance = distance
-                                candidate_target = det
-                        if candidate_target:
-                            self.target_info_label.setText(
-                                f"Hedef Bilgisi: {candidate_target['class_name']} algılandı.")
-                            detected_class_status = candidate_target['class_name']
+                        # Kare merkezine en yakın tespit (vektörel uzaklık)
+                        nearest = lockable_detections.nearest(frame_center)
+                        if nearest is not None:
+                            candidate_target = lockable_detections[nearest]
+                            self._update_target_info(
+                                f"Hedef Bilgisi: {candidate_target.class_name()} algılandı.")
+                            detected_class_status = candidate_target.class_name()
                             self._update_status_label("Durum: Aşama 1 - Hedef kilitlendi.")
                         else:
-                            self.target_info_label.setText("Hedef Bilgisi: Balon algılanmadı.")
+                            self._update_target_info("Hedef Bilgisi: Balon algılanmadı.")
                             self._update_status_label("Durum: Yeni hedef bekleniyor...")
 
                     elif self.active_task == 'task2':
-                        red_balloons = [d for d in detections if d['class_name'] == 'red_balloon']
-                        for det in red_balloons:
-                            x, y, det_w, det_h = det['bbox']
-                            det_center_x = x + det_w // 2
-                            det_center_y = y + det_h // 2
-                            distance = np.sqrt(
-                                (det_center_x - center_x_frame) ** 2 + (det_center_y - center_y_frame) ** 2)
-                            if distance < minimum_distance:
-                                minimum_distance = distance
-                                candidate_target = det
-                        if candidate_target:
-                            self.target_info_label.setText(f"Hedef Bilgisi: Kırmızı Balon algılandı.")
+                        red_balloons = lockable_detections.by_class('red_balloon')
+                        nearest = red_balloons.nearest(frame_center)
+                        if nearest is not None:
+                            candidate_target = red_balloons[nearest]
+                            self._update_target_info(f"Hedef Bilgisi: Kırmızı Balon algılandı.")
                             detected_class_status = "red_balloon"
                             self._update_status_label("Durum: Aşama 2 - Düşman hedef kilitlendi.")
                         else:
-                            self.target_info_label.setText(f"Hedef Bilgisi: Kırmızı Balon Yok.")
+                            self._update_target_info(f"Hedef Bilgisi: Kırmızı Balon Yok.")
                             self._update_status_label("Durum: Yeni hedef bekleniyor...")
 
                     # GÜNCELLENDİ: Bu blok artık kullanılmıyor, Aşama 3 mantığı yukarıda ele alındı
                     # elif self.active_task == 'task3' and self.is_ready_to_engage_from_qr:
                     #     pass
 
-                    if candidate_target:
-                        self.current_tracked_target_class = candidate_target['class_name']
-                        self.current_tracked_target_bbox = candidate_target[
-                            'bbox']  # Yeni hedef kilitlendiğinde bbox'u ayarla
+                    if candidate_target is not None:
+                        self.current_tracked_target_class = candidate_target.class_name()
+                        # Yeni hedef kilitlendiğinde bbox'u ayarla
+                        self.current_tracked_target_bbox = candidate_target.bbox()
+                        self.current_tracked_target_id = candidate_target.track_id()
+                        self.target_tracker.init(frame, self.current_tracked_target_bbox)
                         self.target_destroyed = False
                         self.waiting_for_new_engagement_command = False
                         self.target_lost_time = 0.0
                         self.missing_frames = 0  # Yeni hedef kilitlendiğinde sayacı sıfırla
-                        current_target_bbox_for_pid = candidate_target['bbox']
+                        current_target_bbox_for_pid = self.current_tracked_target_bbox
                         self.reset_pid_state()  # Yeni hedef için PID durumunu sıfırla
                         # Yeni hedef için last_target_x, last_target_y, last_frame_time'ı başlat
                         self.last_target_x = current_target_bbox_for_pid[0] + current_target_bbox_for_pid[2] // 2
                         self.last_target_y = current_target_bbox_for_pid[1] + current_target_bbox_for_pid[3] // 2
                         self.last_frame_time = current_frame_time
-                        self.last_target_velocity_x = 0.0  # Yeni hedef için hızı sıfırla
-                        self.last_target_velocity_y = 0.0  # Yeni hedef için hızı sıfırla
+                        # Onaylı izin Kalman hızı kilit anından itibaren kullanılabilir
+                        locked_track = self.tracker.get(self.current_tracked_target_id)
+                        self.last_target_velocity_x, self.last_target_velocity_y = locked_track.velocity
 
                         print(
-                            f"HATA AYIKLAMA: Yeni hedef kilitlendi: {self.current_tracked_target_class}. PID sıfırlandı.")
+                            f"HATA AYIKLAMA: Yeni hedef kilitlendi: {self.current_tracked_target_class} (iz #{self.current_tracked_target_id}). PID sıfırlandı.")
                     else:
                         current_target_bbox_for_pid = None
                         self.current_tracked_target_class = None
                         self.current_tracked_target_bbox = None
+                        self.current_tracked_target_id = None
                         if self.target_destroyed and self.waiting_for_new_engagement_command:
                             # print("HATA AYIKLAMA: PID sıfırlandı (Hedef Yok Edildi/Bekleniyor).")
-                            self.target_info_label.setText("Hedef Bilgisi: Yok Edildi. Yeni angajman bekleniyor.")
+                            self._update_target_info("Hedef Bilgisi: Yok Edildi. Yeni angajman bekleniyor.")
                         self.target_lost_time = 0.0
 
             # print("HATA AYIKLAMA (update_frame): YOLO tespitleri çiziliyor.")
-            for det in detections:
-                x, y, w_det, h_det = [int(v) for v in det['bbox']]
-                yolo_draw_color = (0, 255, 0)
-
-                if self.current_tracked_target_class and det[
-                    'class_name'] == self.current_tracked_target_class:
-                    if current_target_bbox_for_pid and det['bbox'] == current_target_bbox_for_pid:
-                        yolo_draw_color = (0, 0, 255)  # Kilitli hedef kırmızı
-                    else:
-                        yolo_draw_color = (0, 255, 255)  # Diğer aynı sınıftan hedefler sarı
+            # Renkler sınıf ve iz kimliği sütunlarından vektörel seçilir: kilitli hedef kırmızı, aynı sınıftan
+            # diğer hedefler sarı, diğerleri yeşil
+            locked_class_id = detections.class_id_of(self.current_tracked_target_class) \
+                if self.current_tracked_target_class else None
+            same_class = detections.class_ids == (locked_class_id if locked_class_id is not None else -1)
+            locked_track_id = self.current_tracked_target_id if self.current_tracked_target_id is not None else -2
+            is_locked = same_class & (detections.track_ids == locked_track_id)
+            locked_detection_drawn = bool(is_locked.any())
+            boxes = detections.xyxy.astype(np.int32)
+            for i in range(len(detections)):
+                if is_locked[i]:
+                    yolo_draw_color = (0, 0, 255)  # Kilitli hedef kırmızı
+                elif same_class[i]:
+                    yolo_draw_color = (0, 255, 255)  # Diğer aynı sınıftan hedefler sarı
                 else:
                     yolo_draw_color = (0, 255, 0)  # Diğer hedefler yeşil
-
-                # Çerçeve kalınlığı 1'den 2'ye çıkarıldı
-                cv2.rectangle(display_frame, (x, y), (x + w_det, y + h_det), yolo_draw_color,
-                              2)  # Kalınlık 2 olarak ayarlandı
-                cv2.putText(display_frame, f"YOLO: {det['class_name']} ({det['score']:.2f})", (x, y - 25),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.4, yolo_draw_color, 1)
+                x1, y1, x2, y2 = boxes[i].tolist()
+                overlays.rect(x1, y1, x2, y2, yolo_draw_color, 2)  # Kalınlık 2 olarak ayarlandı
+                track_id = detections.track_id(i)
+                track_label = f" #{track_id}" if track_id is not None else ""
+                overlays.text(x1, y1 - 25,
+                              f"YOLO{track_label}: {detections.class_name(i)} ({detections.score(i):.2f})",
+                              yolo_draw_color)
+            # Kilitli hedefin bu karede tespiti yoksa Kalman tahmini ince kırmızı çerçeveyle gösterilir
+            if current_target_bbox_for_pid and not locked_detection_drawn:
+                x, y, w_det, h_det = [int(v) for v in current_target_bbox_for_pid]
+                overlays.rect(x, y, x + w_det, y + h_det, (0, 0, 255), 1)
 
             # print("HATA AYIKLAMA (update_frame): PID kontrolü başlatılıyor.")
             if current_target_bbox_for_pid and not self.target_destroyed:
                 x_pid, y_pid, w_pid, h_pid = [int(v) for v in current_target_bbox_for_pid]
                 target_center_x = x_pid + w_pid // 2
                 target_center_y = y_pid + h_pid // 2
-                self.process_tracking(target_center_x, target_center_y, display_frame, 0, current_frame_time)
+                self.process_tracking(target_center_x, target_center_y, frame, 0, current_frame_time)
             else:
                 self.reset_pid_state()
                 self.is_aimed_at_target = False
                 if self.active_task not in ['full_manual']:
                     if not self.target_destroyed and not self.waiting_for_new_engagement_command:
-                        self.target_info_label.setText("Hedef Bilgisi: Yok.")
+                        self._update_target_info("Hedef Bilgisi: Yok.")
                 # GÜNCELLENDİ: Aşama 3'te hedef yok edildiğinde veya kaybolduğunda ana konuma dön
                 if self.active_task == 'task3' and self.target_destroyed and self.waiting_for_new_engagement_command:
                     self.process_tracking_to_home_position()
                     self.is_ready_to_engage_from_qr = False  # Yeni QR için hazırla
                     self.current_qr_char = None
                     self.current_tracked_target_class = None
+                    self.current_tracked_target_id = None
 
             # print("HATA AYIKLAMA (update_frame): Göreve özel durum güncellemeleri.")
             if self.active_task == 'task1':
@@ -1892,13 +1907,13 @@ class HavaSavunmaArayuz(QWidget):
                 else:
                     self._update_status_label(
                         f"Durum: Tam Manuel Kontrol Modu - Yaw: {self.current_yaw_angle:.1f}°, Pitch: {self.current_pitch_angle:.1f}°")
-                self.target_info_label.setText("Hedef Bilgisi: Kullanıcı Kontrollü.")
+                self._update_target_info("Hedef Bilgisi: Kullanıcı Kontrollü.")
             elif self.active_task != 'task3_setup':
                 self._update_status_label("Durum: Hazır.")
-                self.target_info_label.setText("Hedef Bilgisi: Yok.")
+                self._update_target_info("Hedef Bilgisi: Yok.")
 
             # print("HATA AYIKLAMA (update_frame): Ekran üzerinde çerçeve gösteriliyor.")
-            self._display_frame(display_frame)
+            self._display_frame(frame, overlays)
 
             self.frame_counter += 1
             # print("HATA AYIKLAMA (update_frame): Kare güncelleme döngüsü tamamlandı.")
@@ -1954,32 +1969,20 @@ class HavaSavunmaArayuz(QWidget):
                 is_within_zone = True
         return is_within_zone
 
-    def _display_frame(self, frame):
-        """Çerçeveyi QLabel'de gösterir."""
+    def _display_frame(self, frame, overlays=()):
+        """
+        Kareyi ve kaplamaları VideoView'a verir. Kare kopyalanmaz ve dönüştürülmez; ekran en fazla DISPLAY_FPS
+        hızında boyanır, arada gelen kareler atlanır.
+        """
+        if frame is None or frame.size == 0:
+            print("HATA (_display_frame): Görüntülenecek çerçeve boş veya geçersiz.")
+            return
         try:
-            if frame is None or frame.size == 0:
-                print("HATA (_display_frame): Görüntülenecek çerçeve boş veya geçersiz.")
-                return
-
-            try:
-                rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                h, w, ch = rgb_image.shape
-                bytes_per_line = ch * w
-                if not rgb_image.flags['C_CONTIGUOUS']:
-                    rgb_image = np.ascontiguousarray(rgb_image)
-                qt_image = QImage(rgb_image.data, w, h, bytes_per_line, QImage.Format_RGB888)
-                pixmap_obj = qt_image.scaled(self.camera_label.width(), self.camera_label.height(),
-                                             Qt.KeepAspectRatio)
-                self.camera_label.setPixmap(QPixmap.fromImage(pixmap_obj))
-            except Exception as e:
-                print(f"HATA (_display_frame - Görüntü Dönüşümü): Çerçeve görüntülenirken hata: {e}")
-                traceback.print_exc()
-                self._update_status_label(f"Hata: Görüntü Dönüşüm Hatası: {str(e)[:50]}...")
-
+            self.camera_label.set_frame(frame, overlays)
         except Exception as e:
-            print(f"HATA (_display_frame - Genel): Çerçeve görüntülenirken genel hata: {e}")
+            print(f"HATA (_display_frame - Görüntü Dönüşümü): Çerçeve görüntülenirken hata: {e}")
             traceback.print_exc()
-            self._update_status_label(f"Hata: Görüntüleme Hatası: {str(e)[:50]}...")
+            self._update_status_label(f"Hata: Görüntü Dönüşüm Hatası: {str(e)[:50]}...")
 
     def process_tracking(self, target_x, target_y, frame, target_area_unused, current_frame_time):
         """
@@ -2092,15 +2095,13 @@ class HavaSavunmaArayuz(QWidget):
         else:
             # print(
             #     f"HATA AYIKLAMA (process_tracking): Hedef ölü bant içinde veya minimum eşiğin altında. Hata Yaw: {error_yaw_pixel}px ({error_yaw_degree:.2f}°), Pitch: {error_pitch_pixel}px ({error_pitch_degree:.2f}°). Hareket komutu gönderilmedi.")
-            self.target_info_label.setText(
-                f"Hedef: Nişan Alındı. Hata: Yaw {error_yaw_pixel}px, Pitch {error_pitch_pixel}px")
+            self._update_target_info("Hedef: Nişan Alındı.", (error_yaw_pixel, error_pitch_pixel))
 
         self.last_target_x = target_x
         self.last_target_y = target_y
         self.last_frame_time = current_frame_time
 
-        self.target_info_label.setText(
-            f"Hedef: Takip Ediliyor. Hata: Yaw {error_yaw_pixel}px, Pitch {error_pitch_pixel}px")
+        self._update_target_info("Hedef: Takip Ediliyor.", (error_yaw_pixel, error_pitch_pixel))
 
     def process_tracking_to_home_position(self):
         """
@@ -2127,7 +2128,7 @@ class HavaSavunmaArayuz(QWidget):
             self._update_status_label(f"Durum: Ana konuma ulaşıldı. Yeni QR bekleniyor.")
             return
 
-        current_time = time.time()
+        current_time = time.monotonic()
         delta_time = current_time - self.pid_update_time
         self.pid_update_time = current_time
 
@@ -2182,7 +2183,7 @@ class HavaSavunmaArayuz(QWidget):
             # print("Ana konum ulaşıldı.")
             return
 
-        self.target_info_label.setText(
+        self._update_target_info(
             f"Hedef: Ana Konuma Dönülüyor. Hata: Yaw {error_yaw_degree:.1f}°, Pitch {error_pitch_degree:.1f}°")
 
     def mouse_move_event(self, event):
@@ -2199,6 +2200,12 @@ class HavaSavunmaArayuz(QWidget):
 
             center_x = self.camera_label.width() // 2
             center_y = self.camera_label.height() // 2
+            frame_point = self.camera_label.widget_to_frame(target_x, target_y)
+            if frame_point is not None:
+                # Görüntü widget içinde ölçeklenmiş/ortalanmış olabilir; hata kare pikseliyle hesaplanır
+                frame_w, frame_h = self.camera_label.image_size()
+                target_x, target_y = frame_point
+                center_x, center_y = frame_w / 2.0, frame_h / 2.0
 
             error_yaw_pixel = target_x - center_x
             error_pitch_pixel = target_y - center_y
@@ -2219,9 +2226,14 @@ if __name__ == '__main__':
     print("HATA AYIKLAMA: __main__ bloğuna girildi.")
     print("HATA AYIKLAMA: YOLO modeli ve global görüntü boyutları ayarlandı.")
     print("HATA AYIKLAMA: QApplication örneği oluşturulmaya çalışılıyor.")
-    app = QApplication(sys.argv)
+    parser = argparse.ArgumentParser(description="BUKREK Hava Savunma Sistemi Arayüzü")
+    frame_source.add_source_arguments(parser)
+    # Tanınmayan (Qt'ye ait) argümanlar QApplication'a bırakılır
+    args, qt_args = parser.parse_known_args()
+    app = QApplication([sys.argv[0]] + qt_args)
     print("HATA AYIKLAMA: QApplication örneği oluşturuldu.")
-    window = HavaSavunmaArayuz()
+    window = HavaSavunmaArayuz(source=args.source, replay=args.replay, replay_speed=args.replay_speed,
+                               loop=args.loop)
     print("HATA AYIKLAMA: HavaSavunmaArayuz örneği oluşturuldu.")
     window.showMaximized()
     print("HATA AYIKLAMA: window.showMaximized() çağrıldı. QApplication olay döngüsü başlatılıyor.")
@@ -2231,4 +2243,3 @@ if __name__ == '__main__':
         print(f"Uygulama beklenmedik bir hata ile kapandı: {e}")
         traceback.print_exc()
     print("HATA AYIKLAMA: QApplication olay döngüsünden çıkıldı.")
-}
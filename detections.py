@@ -0,0 +1,220 @@
+# detections.py
+# Kare başına tespitlerin önceden ayrılmış NumPy yapılandırılmış dizisi üzerinde tutulması. Her satır:
+# xyxy (float32 x4), skor, sınıf kimliği ve iz kimliği (izsiz: NO_TRACK). Tespit listesi her karede sözlük
+# listesi olarak yeniden kurulmaz; aynı tampon doldurulur ve görev mantığı, izleyici, PID girişi ve çizim
+# vektörel sorgularla (sınıfa, merkeze uzaklığa, ROI'ye göre süzme, en yakın komşu) bu diziyi kullanır.
+#
+# Dilimleme (det[a:b]) kopyasızdır; maske veya dizin dizisiyle süzme (by_class, within_roi ...) NumPy gereği
+# küçük bir kopya üretir. Tampon bir sonraki karede yeniden yazıldığından kare sonrasına saklanacak değerler
+# bbox(i), score(i) gibi Python değerlerine çevrilmelidir. timestamp ve roi, tespitlerin hesaplandığı karenin
+# yakalama zamanı ve kırpıntısıdır (asenkron dedektörde sonuç, o an işlenen kareden daha eski bir kareye aittir).
+
+import numpy as np
+
+# Satır biçimi
+DETECTION_DTYPE = np.dtype([
+    ('xyxy', np.float32, (4,)),
+    ('score', np.float32),
+    ('class_id', np.int32),
+    ('track_id', np.int32),
+])
+# İzle eşleşmemiş tespitin iz kimliği
+NO_TRACK = -1
+# Varsayılan tampon kapasitesi (satır); yetmezse tampon büyütülür
+DETECTIONS_CAPACITY = 256
+
+
+class Detections:
+    """
+    Tespit kümesi. Arkasındaki yapılandırılmış dizinin ilk len() satırını gösterir.
+    :param class_names: Sınıf kimliği -> ad listesi (görüntüleme ve ada göre süzme için).
+    """
+
+    def __init__(self, capacity=DETECTIONS_CAPACITY, class_names=None, _data=None):
+        if _data is not None:
+            self._buffer = None  # Başka bir kümenin görünümü; yeniden doldurulmaz
+            self._data = _data
+        else:
+            self._buffer = np.zeros(capacity, dtype=DETECTION_DTYPE)
+            self._data = self._buffer[:0]
+        self.class_names = class_names or []
+        self.timestamp = None
+        self.roi = None
+
+    @classmethod
+    def empty(cls, class_names=None):
+        return cls(0, class_names)
+
+    def _view(self, data):
+        view = Detections(class_names=self.class_names, _data=data)
+        view.timestamp, view.roi = self.timestamp, self.roi
+        return view
+
+    def fill(self, dets, class_names=None, timestamp=None, roi=None, det_columns=(0, 1, 2, 3, 4, 5)):
+        """
+        (K, 6) float dizisinden (x1, y1, x2, y2, skor, sınıf; yolo_postprocess.DET_*) tamponu doldurur.
+        İz kimlikleri NO_TRACK olur.
+        :param timestamp: Tespitlerin ait olduğu karenin yakalama zamanı.
+        :param roi: Dedektörün çalıştığı kırpıntı (x0, y0, x1, y1); tam kare için None.
+        :return: self
+        """
+        if self._buffer is None:
+            raise ValueError("Görünüm olan bir Detections doldurulamaz")
+        if class_names is not None:
+            self.class_names = class_names
+        count = 0 if dets is None else len(dets)
+        if count > len(self._buffer):
+            self._buffer = np.zeros(max(count, 2 * len(self._buffer)), dtype=DETECTION_DTYPE)
+        data = self._buffer[:count]
+        if count:
+            x1, y1, x2, y2, score, class_id = det_columns
+            data['xyxy'] = dets[:, [x1, y1, x2, y2]]
+            data['score'] = dets[:, score]
+            data['class_id'] = dets[:, class_id]
+        data['track_id'] = NO_TRACK
+        self._data = data
+        self.timestamp = timestamp
+        self.roi = roi
+        return self
+
+    def translate(self, dx, dy):
+        """Kutuları (ve roi'yi) yerinde öteler (örn. taret hareketi kaymasıyla güncel kareye taşıma). :return: self"""
+        if dx or dy:
+            self._data['xyxy'] += np.array([dx, dy, dx, dy], dtype=np.float32)
+            if self.roi is not None:
+                x0, y0, x1, y1 = self.roi
+                ox, oy = int(round(dx)), int(round(dy))
+                self.roi = (x0 + ox, y0 + oy, x1 + ox, y1 + oy)
+        return self
+
+    def clear(self):
+        self._data = self._data[:0]
+        self.timestamp = None
+        self.roi = None
+        return self
+
+    # --- Dizi görünümleri (kopyasız) ---
+
+    @property
+    def data(self):
+        return self._data
+
+    @property
+    def xyxy(self):
+        return self._data['xyxy']
+
+    @property
+    def scores(self):
+        return self._data['score']
+
+    @property
+    def class_ids(self):
+        return self._data['class_id']
+
+    @property
+    def track_ids(self):
+        return self._data['track_id']
+
+    def __len__(self):
+        return len(self._data)
+
+    def __bool__(self):
+        return len(self._data) > 0
+
+    def __getitem__(self, index):
+        """Dilim: kopyasız görünüm. Tamsayı: tek satırlık görünüm. Maske/dizin dizisi: süzülmüş küme."""
+        if isinstance(index, (int, np.integer)):
+            index = int(index)
+            if index < 0:
+                index += len(self._data)
+            return self._view(self._data[index:index + 1])
+        return self._view(self._data[index])
+
+    # --- Türetilmiş değerler ---
+
+    def centers(self):
+        """(K, 2) kutu merkezleri."""
+        xyxy = self.xyxy
+        return (xyxy[:, :2] + xyxy[:, 2:]) * 0.5
+
+    def sizes(self):
+        """(K, 2) kutu genişlik ve yükseklikleri."""
+        xyxy = self.xyxy
+        return xyxy[:, 2:] - xyxy[:, :2]
+
+    def xywh(self):
+        """(K, 4) float32 (x, y, w, h) kutular."""
+        xyxy = self.xyxy
+        return np.hstack([xyxy[:, :2], xyxy[:, 2:] - xyxy[:, :2]])
+
+    def bbox(self, i=0):
+        """i. tespitin (x, y, w, h) tamsayı kutusu (Python demeti; kare sonrasına saklanabilir)."""
+        x1, y1, x2, y2 = self.xyxy[i]
+        x, y = int(x1), int(y1)
+        return x, y, int(x2) - x, int(y2) - y
+
+    def score(self, i=0):
+        return float(self.scores[i])
+
+    def class_id(self, i=0):
+        return int(self.class_ids[i])
+
+    def track_id(self, i=0):
+        """i. tespitin iz kimliği; izsizse None."""
+        track_id = int(self.track_ids[i])
+        return None if track_id == NO_TRACK else track_id
+
+    def class_name(self, i=0):
+        return self.name_of(self.class_id(i))
+
+    def name_of(self, class_id):
+        return self.class_names[class_id] if 0 <= class_id < len(self.class_names) else "Bilinmeyen"
+
+    def class_id_of(self, class_name):
+        """Sınıf adının kimliği; listede yoksa None."""
+        try:
+            return self.class_names.index(class_name)
+        except ValueError:
+            return None
+
+    # --- Vektörel süzgeçler ---
+
+    def by_class(self, class_id):
+        """Verilen sınıf kimliğine (veya adına) ait tespitler."""
+        if isinstance(class_id, str):
+            class_id = self.class_id_of(class_id)
+            if class_id is None:
+                return self[:0]
+        return self[self.class_ids == class_id]
+
+    def by_track(self, track_id):
+        """Verilen iz kimliğine ait tespitler (en fazla bir satır)."""
+        if track_id is None:
+            return self[:0]
+        return self[self.track_ids == track_id]
+
+    def with_tracks(self, track_ids):
+        """İz kimliği verilen kümede olan tespitler."""
+        return self[np.isin(self.track_ids, np.fromiter(track_ids, dtype=np.int32))]
+
+    def within_roi(self, roi):
+        """Merkezi (x0, y0, x1, y1) bölgesinde olan tespitler."""
+        x0, y0, x1, y1 = roi
+        centers = self.centers()
+        mask = (centers[:, 0] >= x0) & (centers[:, 0] < x1) & (centers[:, 1] >= y0) & (centers[:, 1] < y1)
+        return self[mask]
+
+    def distances_to(self, point):
+        """(K,) kutu merkezlerinin noktaya uzaklığı."""
+        return np.hypot(*(self.centers() - np.asarray(point, dtype=np.float32)).T)
+
+    def within_distance(self, point, radius):
+        return self[self.distances_to(point) < radius]
+
+    def nearest(self, point, max_distance=np.inf):
+        """Merkezi noktaya en yakın tespitin dizini; max_distance içinde yoksa None."""
+        if not len(self._data):
+            return None
+        distances = self.distances_to(point)
+        index = int(np.argmin(distances))
+        return index if distances[index] < max_distance else None
@@ -0,0 +1,422 @@
+# detector_service.py
+# YOLO dedektörünü arayüzden ayrı bir işlemde çalıştırır. Kareler, önceden ayrılmış slotlardan oluşan bir
+# multiprocessing.shared_memory halkasıyla (sıra numaralı) işçiye aktarılır; tespitler küçük bir paylaşımlı sonuç
+# tamponuyla geri döner. Arayüz yalnızca en son sonucu okur: yavaş bir çıkarım arayüzü dondurmaz, arayüz
+# yeniden çizimi de çıkarımı geciktirmez. İşçi arayüz takılmalarından etkilenmez; yanıt vermezse kamera
+# kapatılmadan yeniden başlatılabilir (paylaşımlı bellek arayüz işlemine aittir ve yeniden başlatmada korunur).
+
+import multiprocessing as mp
+import queue
+import time
+import traceback
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from yolo_postprocess import YoloPostprocessor
+
+# Halka kapasitesi: en büyük kare boyutu ve slot sayısı (arayüz en fazla bu kadar kare önde olabilir)
+DETECTOR_RING_SLOTS = 4
+DETECTOR_MAX_FRAME_WIDTH = 1920
+DETECTOR_MAX_FRAME_HEIGHT = 1080
+# Sonuç tamponundaki en fazla tespit
+DETECTOR_MAX_RESULTS = 300
+# İşçinin kalp atışı bu süreden eskiyse (saniye) işçi yanıt vermiyor sayılır
+DETECTOR_HEARTBEAT_TIMEOUT = 5.0
+# İşçi başladıktan sonra bu süre (saniye) boyunca yalnızca işlemin yaşayıp yaşamadığına bakılır (içe aktarmalar,
+# CUDA bağlamı ve ilk model yüklemesi kalp atışını geciktirebilir)
+DETECTOR_STARTUP_GRACE = 30.0
+# Bu süreden (saniye) eski sonuçlar arayüze verilmez
+DETECTOR_RESULT_MAX_AGE = 0.5
+# İşçinin yeni kare için halkayı yoklama aralığı (saniye). Sinyalleşme için kilitli nesneler (Event) kullanılmaz:
+# işlem kilidi tutarken öldürülürse arayüz tarafı kilitlenirdi.
+DETECTOR_POLL_INTERVAL = 0.001
+
+# Halka slot başlığı alanları (float64)
+_SLOT_SEQ, _SLOT_WIDTH, _SLOT_HEIGHT, _SLOT_TIMESTAMP, _SLOT_MODEL = 0, 1, 2, 3, 4
+_SLOT_ROI_X0, _SLOT_ROI_Y0, _SLOT_ROI_X1, _SLOT_ROI_Y1, _SLOT_INPUT_SIZE, _SLOT_TILED = 5, 6, 7, 8, 9, 10
+_SLOT_FIELDS = 11
+
+# Sonuç başlığı alanları (float64)
+_RES_VERSION, _RES_FRAME_SEQ, _RES_COUNT, _RES_FULL_FRAME, _RES_MODEL = 0, 1, 2, 3, 4
+_RES_TIMESTAMP, _RES_INFER_MS, _RES_HEARTBEAT = 5, 6, 7
+_RES_ROI_X0, _RES_ROI_Y0, _RES_ROI_X1, _RES_ROI_Y1 = 8, 9, 10, 11
+_RES_FIELDS = 12
+
+
+class FrameRing:
+    """
+    Paylaşımlı bellekte sabit sayıda kare slotu. Tek yazar (arayüz) sıradaki slota yazar ve slotun sıra
+    numarasını en son günceller; okuyucu kareyi kopyaladıktan sonra sıra numarasını yeniden kontrol eder.
+    """
+
+    def __init__(self, name=None, slots=DETECTOR_RING_SLOTS, max_width=DETECTOR_MAX_FRAME_WIDTH,
+                 max_height=DETECTOR_MAX_FRAME_HEIGHT):
+        self.slots = slots
+        self.max_width = max_width
+        self.max_height = max_height
+        header_bytes = (1 + slots * _SLOT_FIELDS) * 8
+        frame_bytes = slots * max_height * max_width * 3
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=header_bytes + frame_bytes)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = self.shm.name
+        self.latest = np.ndarray((1,), dtype=np.float64, buffer=self.shm.buf)
+        self.meta = np.ndarray((slots, _SLOT_FIELDS), dtype=np.float64, buffer=self.shm.buf, offset=8)
+        self.frames = np.ndarray((slots, max_height, max_width, 3), dtype=np.uint8, buffer=self.shm.buf,
+                                 offset=header_bytes)
+        if name is None:
+            self.latest[0] = 0
+            self.meta[:, _SLOT_SEQ] = -1
+
+    def write(self, frame, timestamp, model_index, roi=None, input_size=None, tiled=False):
+        """Kareyi sıradaki slota yazar. :return: karenin sıra numarası; kare sığmazsa None."""
+        height, width = frame.shape[:2]
+        if width > self.max_width or height > self.max_height:
+            return None
+        seq = int(self.latest[0]) + 1
+        slot = seq % self.slots
+        meta = self.meta[slot]
+        meta[_SLOT_SEQ] = -1  # Yazım sırasında geçersiz
+        self.frames[slot, :height, :width] = frame
+        meta[_SLOT_WIDTH], meta[_SLOT_HEIGHT], meta[_SLOT_TIMESTAMP] = width, height, timestamp
+        meta[_SLOT_MODEL] = model_index
+        meta[_SLOT_ROI_X0:_SLOT_ROI_Y1 + 1] = roi if roi is not None else (-1, -1, -1, -1)
+        meta[_SLOT_INPUT_SIZE] = input_size if input_size is not None else -1
+        meta[_SLOT_TILED] = 1 if tiled else 0
+        meta[_SLOT_SEQ] = seq
+        self.latest[0] = seq
+        return seq
+
+    def read_latest(self, out):
+        """
+        En son kareyi out tamponuna kopyalar.
+        :return: (sıra, slot başlığı kopyası, kare görünümü) veya kopya sırasında üzerine yazıldıysa/kare yoksa None.
+        """
+        seq = int(self.latest[0])
+        if seq <= 0:
+            return None
+        slot = seq % self.slots
+        meta = self.meta[slot].copy()
+        if int(meta[_SLOT_SEQ]) != seq:
+            return None
+        width, height = int(meta[_SLOT_WIDTH]), int(meta[_SLOT_HEIGHT])
+        frame = out[:height, :width]
+        np.copyto(frame, self.frames[slot, :height, :width])
+        if int(self.meta[slot, _SLOT_SEQ]) != seq:
+            return None  # Kopya sırasında yazar bu slota döndü
+        return seq, meta, frame
+
+    def close(self, unlink=False):
+        del self.latest, self.meta, self.frames
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+class ResultBuffer:
+    """Paylaşımlı sonuç tamponu. Yazar sürüm numarasını yazım sırasında tek, sonra çift yapar (seqlock)."""
+
+    def __init__(self, name=None, max_results=DETECTOR_MAX_RESULTS):
+        self.max_results = max_results
+        header_bytes = _RES_FIELDS * 8
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=header_bytes + max_results * 6 * 4)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = self.shm.name
+        self.header = np.ndarray((_RES_FIELDS,), dtype=np.float64, buffer=self.shm.buf)
+        self.dets = np.ndarray((max_results, 6), dtype=np.float32, buffer=self.shm.buf, offset=header_bytes)
+        if name is None:
+            self.header[:] = 0
+            self.header[_RES_FRAME_SEQ] = -1
+
+    def write(self, frame_seq, dets, full_frame, model_index, timestamp, infer_ms, roi=None):
+        count = min(len(dets), self.max_results)
+        self.header[_RES_VERSION] += 1
+        self.dets[:count] = dets[:count]
+        self.header[_RES_FRAME_SEQ] = frame_seq
+        self.header[_RES_COUNT] = count
+        self.header[_RES_FULL_FRAME] = 1 if full_frame else 0
+        self.header[_RES_MODEL] = model_index
+        self.header[_RES_TIMESTAMP] = timestamp
+        self.header[_RES_INFER_MS] = infer_ms
+        self.header[_RES_ROI_X0:_RES_ROI_Y1 + 1] = roi if roi is not None else (-1, -1, -1, -1)
+        self.header[_RES_VERSION] += 1
+
+    def beat(self):
+        self.header[_RES_HEARTBEAT] = time.time()
+
+    @property
+    def heartbeat(self):
+        return float(self.header[_RES_HEARTBEAT])
+
+    def read(self, retries=3):
+        """:return: (başlık kopyası, (K, 6) tespit kopyası) veya tutarlı bir okuma yapılamazsa None."""
+        for _ in range(retries):
+            version = self.header[_RES_VERSION]
+            if version % 2:
+                continue  # Yazım sürüyor
+            header = self.header.copy()
+            dets = self.dets[:int(header[_RES_COUNT])].copy()
+            if self.header[_RES_VERSION] == version:
+                return header, dets
+        return None
+
+    def close(self, unlink=False):
+        del self.header, self.dets
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+class DetectorResult:
+    """Arayüze verilen en son sonuç."""
+
+    def __init__(self, header, dets):
+        self.frame_seq = int(header[_RES_FRAME_SEQ])
+        self.model_index = int(header[_RES_MODEL])
+        self.full_frame = bool(header[_RES_FULL_FRAME])
+        self.timestamp = float(header[_RES_TIMESTAMP])  # Karenin yakalama zamanı (time.monotonic)
+        self.infer_ms = float(header[_RES_INFER_MS])
+        # Dedektörün çalıştığı kırpıntı (x0, y0, x1, y1); tam kare veya döşemeli taramada None
+        self.roi = tuple(int(v) for v in header[_RES_ROI_X0:_RES_ROI_Y1 + 1]) if header[_RES_ROI_X0] >= 0 else None
+        self.dets = dets  # (K, 6): x1, y1, x2, y2, skor, sınıf (kare koordinatları)
+
+
+class RemoteModelInfo:
+    """İşçideki bir modelin arayüzün kullandığı özellikleri (boyut seçimi ve ROI planlaması için)."""
+
+    def __init__(self, name, classes, info):
+        self.name = name
+        self.classes = classes
+        self.backend = info["backend"]
+        self.dynamic_input = info["dynamic_input"]
+        self.input_sizes = list(info["input_sizes"])
+        self.input_width = info["input_width"]
+        self.input_height = info["input_height"]
+
+    def nearest_input_size(self, size):
+        return min(self.input_sizes, key=lambda available: abs(available - size))
+
+
+def run_detection(model, postprocessor, tiled_detector, frame, roi=None, input_size=None, tiled=False):
+    """
+    Tek bir kareyi eşzamanlı olarak tespit eder (işçi işleminde kullanılır).
+    :return: ((K, 6) tespit dizisi, sonuç tam kareye mi ait)
+    """
+    if tiled:
+        dets = tiled_detector.detect(model, frame)
+        if dets is not None:
+            return dets, False
+    outputs, letterbox = model.infer_frame(frame, input_size, roi)
+    # Son işlemci sonucu kendi çalışma alanında tutar; sonuç tamponuna yazılana kadar geçerlidir
+    return postprocessor.process(outputs, model.output_layout, letterbox), roi is None
+
+
+def _worker_main(ring_name, result_name, model_specs, conf_threshold, nms_threshold, stop_flag, status_queue):
+    """İşçi işleminin ana döngüsü: en son kareyi alır, tespit eder ve sonucu yazar."""
+    # Ağır içe aktarmalar yalnızca işçide (TensorRT/PyCUDA bağlamı bu işleme aittir)
+    from tiled_inference import TiledDetector
+    from yolo_models import ModelRegistry
+
+    ring = FrameRing(ring_name)
+    results = ResultBuffer(result_name)
+    # İşçi her kareyi senkron çalıştırır (run_detection -> infer_frame): arayüzle örtüşme işlem ayrımından gelir,
+    # işçi bir kareyi bitirince halkadaki en yeni kareyi alır. Asenkron slotlar (bağlamlar, sabitlenmiş tamponlar)
+    # burada kullanılmayacağı için ayrılmaz.
+    registry = ModelRegistry(async_slots=0)
+    names = [name for name, _, _ in model_specs]
+    for name, model_path, classes in model_specs:
+        registry.register(name, model_path, classes)
+    registry.load_in_background()
+    postprocessor = YoloPostprocessor(conf_threshold, nms_threshold)
+    tiled_detector = TiledDetector(postprocessor)
+    frame_buffer = np.empty((ring.max_height, ring.max_width, 3), dtype=np.uint8)
+    announced = {}  # ad -> duyurulan model nesnesi
+    last_seq = 0
+    last_promotion_check = 0.0
+    parent = mp.parent_process()
+
+    try:
+        while not stop_flag.value:
+            results.beat()
+            now = time.time()
+            if now - last_promotion_check >= 1.0:
+                last_promotion_check = now
+                registry.promote_built_engines()
+                for name in names:
+                    model = registry.get(name)
+                    if model is not None and announced.get(name) is not model:
+                        announced[name] = model
+                        status_queue.put(("model_ready", name, {
+                            "backend": model.backend_choice or model.backend,
+                            "dynamic_input": model.dynamic_input,
+                            "input_sizes": list(model.input_sizes),
+                            "input_width": model.input_width,
+                            "input_height": model.input_height,
+                        }))
+                if parent is not None and not parent.is_alive():
+                    break
+
+            if int(ring.latest[0]) == last_seq:
+                time.sleep(DETECTOR_POLL_INTERVAL)
+                continue
+            latest = ring.read_latest(frame_buffer)
+            if latest is None or latest[0] == last_seq:
+                continue
+            seq, meta, frame = latest
+            last_seq = seq
+            model_index = int(meta[_SLOT_MODEL])
+            model = registry.get(names[model_index]) if 0 <= model_index < len(names) else None
+            if model is None:
+                continue  # Model henüz yükleniyor
+            roi = tuple(int(v) for v in meta[_SLOT_ROI_X0:_SLOT_ROI_Y1 + 1]) if meta[_SLOT_ROI_X0] >= 0 else None
+            input_size = int(meta[_SLOT_INPUT_SIZE]) if meta[_SLOT_INPUT_SIZE] > 0 else None
+            try:
+                start = time.perf_counter()
+                dets, full_frame = run_detection(model, postprocessor, tiled_detector, frame, roi, input_size,
+                                                 meta[_SLOT_TILED] > 0)
+                results.write(seq, dets, full_frame, model_index, meta[_SLOT_TIMESTAMP],
+                              (time.perf_counter() - start) * 1000.0, roi)
+            except Exception as e:
+                print(f"HATA (detector_service): Tespit hatası: {e}")
+                traceback.print_exc()
+    finally:
+        ring.close()
+        results.close()
+
+
+class DetectorService:
+    """
+    Arayüz tarafı: paylaşımlı belleği sahiplenir, işçi işlemini başlatır/yeniden başlatır, kareleri halkaya yazar
+    ve en son sonucu okur.
+    :param model_specs: [(ad, model_yolu, sınıflar), ...]
+    """
+
+    def __init__(self, model_specs, conf_threshold, nms_threshold):
+        self.model_specs = list(model_specs)
+        self.model_names = [name for name, _, _ in self.model_specs]
+        self.conf_threshold = conf_threshold
+        self.nms_threshold = nms_threshold
+        # CUDA bağlamı çatallanan (fork) işlemde kullanılamaz; işçi her platformda temiz başlatılır
+        self._ctx = mp.get_context("spawn")
+        self.ring = FrameRing()
+        self.results = ResultBuffer()
+        self.stop_flag = None
+        self.status_queue = None
+        self.process = None
+        self.models = {}  # ad -> RemoteModelInfo (işçide hazır olanlar)
+        self.active_name = None
+        self.restart_count = 0
+        self._started_at = 0.0
+        self._oversize_warned = False
+        self._last_result_seq = -1  # Arayüze son verilen sonucun kare sıra numarası
+
+    def start(self):
+        self.stop_flag = self._ctx.RawValue('b', 0)
+        self.status_queue = self._ctx.Queue()
+        self.models = {}
+        self.process = self._ctx.Process(
+            target=_worker_main, name="yolo-detector",
+            args=(self.ring.name, self.results.name, self.model_specs, self.conf_threshold, self.nms_threshold,
+                  self.stop_flag, self.status_queue),
+            daemon=True)
+        self._started_at = time.time()
+        self.process.start()
+        print(f"HATA AYIKLAMA (detector_service): Dedektör işlemi başlatıldı (pid {self.process.pid}).")
+
+    def stop(self, timeout=2.0):
+        if self.process is None:
+            return
+        self.stop_flag.value = 1
+        self.process.join(timeout)
+        if self.process.is_alive():
+            print("UYARI (detector_service): Dedektör işlemi zamanında kapanmadı, sonlandırılıyor.")
+            self.process.terminate()
+            self.process.join(timeout)
+        self.process = None
+
+    def restart(self):
+        """İşçiyi yeniden başlatır. Paylaşımlı bellek ve kamera etkilenmez."""
+        print("UYARI (detector_service): Dedektör işlemi yeniden başlatılıyor.")
+        self.stop(timeout=1.0)
+        self.restart_count += 1
+        self.start()
+
+    def shutdown(self):
+        """İşçiyi durdurur ve paylaşımlı belleği serbest bırakır (uygulama kapanırken)."""
+        self.stop()
+        self.ring.close(unlink=True)
+        self.results.close(unlink=True)
+
+    def is_healthy(self):
+        if self.process is None or not self.process.is_alive():
+            return False
+        now = time.time()
+        return (now - self._started_at < DETECTOR_STARTUP_GRACE
+                or now - self.results.heartbeat < DETECTOR_HEARTBEAT_TIMEOUT)
+
+    def ensure_running(self):
+        """İşçi çökmüş veya yanıt vermiyorsa yeniden başlatır (arayüz zamanlayıcısından çağrılır)."""
+        if not self.is_healthy():
+            self.restart()
+
+    def activate(self, name):
+        """Etkin modeli seçer. :return: model işçide hazırsa RemoteModelInfo, değilse None."""
+        self.active_name = name
+        return self.active_model
+
+    def deactivate(self):
+        self.active_name = None
+
+    @property
+    def active_model(self):
+        self._poll_status()
+        return self.models.get(self.active_name)
+
+    def submit(self, frame, timestamp, roi=None, input_size=None, tiled=False):
+        """Kareyi etkin model için halkaya yazar. :return: sıra numarası veya None."""
+        if self.active_name is None:
+            return None
+        seq = self.ring.write(frame, timestamp, self.model_names.index(self.active_name), roi, input_size, tiled)
+        if seq is None:
+            if not self._oversize_warned:
+                print(f"UYARI (detector_service): Kare ({frame.shape[1]}x{frame.shape[0]}) halka kapasitesinden "
+                      f"({self.ring.max_width}x{self.ring.max_height}) büyük, tespit atlanıyor.")
+                self._oversize_warned = True
+            return None
+        return seq
+
+    def latest_result(self):
+        """
+        :return: Etkin modelin daha önce verilmemiş, en son ve yeterince taze sonucu (DetectorResult) veya None.
+            Her sonuç bir kez verilir: aynı sonucun sonraki karelerde yeniden verilmesi izleyicide tek bir
+            tespiti birden çok ölçüm gibi sayar (yanlış onay, hız kestirimi hatası).
+        """
+        read = self.results.read()
+        if read is None:
+            return None
+        result = DetectorResult(*read)
+        if result.frame_seq < 0 or self.active_name is None or result.frame_seq == self._last_result_seq:
+            return None
+        if result.model_index != self.model_names.index(self.active_name):
+            return None  # Görev değişiminden önceki modelin sonucu
+        if time.monotonic() - result.timestamp > DETECTOR_RESULT_MAX_AGE:
+            return None
+        self._last_result_seq = result.frame_seq
+        return result
+
+    def _poll_status(self):
+        if self.status_queue is None:
+            return
+        while True:
+            try:
+                kind, name, info = self.status_queue.get_nowait()
+            except queue.Empty:
+                return
+            if kind == "model_ready":
+                classes = next(spec[2] for spec in self.model_specs if spec[0] == name)
+                self.models[name] = RemoteModelInfo(name, classes, info)
+                print(f"HATA AYIKLAMA (detector_service): '{name}' modeli işçide hazır ({info['backend']}).")
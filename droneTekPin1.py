@@ -5,8 +5,16 @@ import numpy as np
 import time
 from pymavlink import mavutil
 import os
+import argparse
 from gpiozero import DigitalInputDevice
 
+import frame_source  # Video file / image directory / recording replay instead of the live camera
+
+# --source lets the whole loop run against recorded footage (see frame_source.py)
+parser = argparse.ArgumentParser(description="Color detection and MAVLink status reporter")
+frame_source.add_source_arguments(parser)
+args = parser.parse_args()
+
 # --- GPIO and Telemetry Settings ---
 # Set the Raspberry Pi GPIO pin number for the button.
 # For example, use 17 for GPIO 17.
@@ -29,7 +37,8 @@ except Exception as e:
 
 # --- Camera and Image Settings ---
 # Note: Used only for color detection, the image is not displayed.
-cap = cv2.VideoCapture(0)
+# Without --source the live camera is opened exactly as before. Property settings are ignored by file sources.
+cap = cv2.VideoCapture(0) if args.source is None else frame_source.open_source_from_args(args)
 cap.set(cv2.CAP_PROP_AUTO_WB, 1)
 cap.set(cv2.CAP_PROP_AUTO_EXPOSURE, 0.75)
 cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
@@ -140,6 +149,9 @@ print(" Live Color Detection and Status Screen ")
 print("-------------------------------------")
 print(f"RC Trigger Pin: GPIO {TRIGGER_PIN}")
 
+processed_frames = 0
+loop_start_time = time.monotonic()
+
 try:
     while True:
         # Check for state changes with a timer
@@ -164,8 +176,12 @@ try:
         # Continuously process camera image
         ok, frame = cap.read()
         if not ok:
-            print("\nCamera could not be read. Terminating program.")
+            if getattr(cap, "ended", False):
+                print("\nEnd of source reached. Terminating program.")
+            else:
+                print("\nCamera could not be read. Terminating program.")
             break
+        processed_frames += 1
             
         small_frame = cv2.resize(frame, (320, 240))
         h, w = small_frame.shape[:2]
@@ -209,4 +225,7 @@ try:
 except KeyboardInterrupt:
     print("\nProgram terminated by user.")
 finally:
+    elapsed = time.monotonic() - loop_start_time
+    if elapsed > 0:
+        print(f"Processed {processed_frames} frames in {elapsed:.1f} s ({processed_frames / elapsed:.1f} fps)")
     cap.release()
@@ -0,0 +1,152 @@
+# ego_motion.py
+# Taret hareketinden kaynaklanan görüntü kaymasının kestirimi (ego-hareket telafisi). Taret yaw/pitch ekseninde
+# d derece döndüğünde sahnedeki her şey görüntüde yaklaşık -d / DEGREES_PER_PIXEL piksel kayar. İzleyici
+# tahminleri bu kayma kadar düzeltilmezse taret hareketi hedef hareketi sanılır; yeniden edinme mesafesi ve
+# ROI'ler gereğinden büyük tutulmak zorunda kalır.
+#
+# Kaynaklar:
+#   - RPiCommunicator.angles_update_signal ile gelen ölçülmüş açılar (on_angles)
+#   - send_proportional_move_command / send_angle_command ile gönderilen komutlar (on_command). Yanıtı henüz
+#     gelmemiş komutların etkisi, gönderildikten sonra COMMAND_SETTLE_TIME içinde doğrusal olarak eklenir.
+#   - İsteğe bağlı: küçültülmüş gri karede faz korelasyonu (cv2.phaseCorrelate). Yanıt güçlüyse ve açılardan
+#     beklenen kaymayla çelişmiyorsa ölçülen kayma kullanılır (motor gecikmesi, boşluk ve ölçek hataları düzelir).
+#
+# frame_shift() her kare için bir kez çağrılır ve önceki kareden bu yana beklenen (dx, dy) kaymayı döndürür.
+# Kare başına kaymalar zamanlarıyla saklanır; shift_since() daha eski bir karede (asenkron dedektör sonucu)
+# hesaplanmış kutuları bu karenin taret pozuna taşımak için o kareden bu yana biriken kaymayı verir.
+
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+# Gönderilen bir komutun tamamlanması için varsayılan süre (saniye)
+COMMAND_SETTLE_TIME = 0.1
+# Bundan büyük kaymalar (piksel) açı referansı sıçraması sayılır ve yok sayılır (örn. açı sıfırlama)
+EGO_MAX_SHIFT_PIXELS = 400.0
+# Faz korelasyonu: küçültülmüş kare genişliği, kabul için en düşük tepe yanıtı ve açılardan beklenen kaymadan
+# izin verilen sapma (tam kare pikseli)
+PHASE_CORRELATION_WIDTH = 160
+PHASE_CORRELATION_MIN_RESPONSE = 0.15
+PHASE_CORRELATION_MAX_DEVIATION = 30.0
+# Saklanan kare kayması sayısı (shift_since için; dedektör gecikmesinden uzun olmalı)
+SHIFT_HISTORY_LENGTH = 64
+
+
+class EgoMotionEstimator:
+    """
+    Taret açı akışını ve komutlarını kare başına görüntü kaymasına çevirir.
+    :param degrees_per_pixel_yaw: Yatay piksel başına derece (deneme6.DEGREES_PER_PIXEL_YAW ile aynı işaret).
+    :param degrees_per_pixel_pitch: Dikey piksel başına derece.
+    :param phase_correlation: True ise kayma, küçültülmüş karede faz korelasyonuyla iyileştirilir.
+    """
+
+    def __init__(self, degrees_per_pixel_yaw, degrees_per_pixel_pitch, phase_correlation=False,
+                 settle_time=COMMAND_SETTLE_TIME):
+        self.degrees_per_pixel_yaw = degrees_per_pixel_yaw
+        self.degrees_per_pixel_pitch = degrees_per_pixel_pitch
+        self.phase_correlation = phase_correlation
+        self.settle_time = settle_time
+        self.last_shift = (0.0, 0.0)
+        self.phase_used = 0  # Faz korelasyonunun kabul edildiği kare sayısı
+        self.rejected_jumps = 0
+        self._base_pose = None  # Son ölçülen (yaw, pitch)
+        self._pending = []  # Yanıtı gelmemiş komutlar: (gönderim zamanı, dyaw, dpitch)
+        self._last_pose = None  # Önceki karedeki kestirilmiş açı
+        self._last_gray = None
+        self._window = None
+        self._phase_scale = 1.0
+        self._history = deque(maxlen=SHIFT_HISTORY_LENGTH)  # (kare zamanı, dx, dy)
+
+    def reset(self):
+        """Açı referansı değiştiğinde (sıfırlama, yeniden bağlanma) veya kaynak yeniden başlatıldığında."""
+        self._base_pose = None
+        self._pending = []
+        self._last_pose = None
+        self._last_gray = None
+        self.last_shift = (0.0, 0.0)
+        self._history.clear()
+
+    def on_angles(self, yaw, pitch, timestamp=None):
+        """Ölçülen açılar (angles_update_signal yuvası). Yanıtı gelen komutların etkisi bu ölçümde yer alır."""
+        if self._base_pose is None:
+            # İlk ölçüm: açı referansı yeni kuruldu, önceki kareye göre fark tanımsız
+            self._last_pose = None
+        self._base_pose = (float(yaw), float(pitch))
+        self._pending = []
+
+    def on_command(self, delta_yaw, delta_pitch, timestamp=None):
+        """Tarete gönderilen göreli hareket komutu (derece)."""
+        if timestamp is None:
+            timestamp = time.monotonic()
+        self._pending.append((timestamp, float(delta_yaw), float(delta_pitch)))
+
+    def pose(self, timestamp):
+        """Verilen andaki kestirilmiş taret açısı (yaw, pitch); ölçüm yoksa komutların toplamı."""
+        yaw, pitch = self._base_pose if self._base_pose is not None else (0.0, 0.0)
+        for sent_time, delta_yaw, delta_pitch in self._pending:
+            progress = 1.0 if self.settle_time <= 0 else min(max((timestamp - sent_time) / self.settle_time, 0.0), 1.0)
+            yaw += delta_yaw * progress
+            pitch += delta_pitch * progress
+        return yaw, pitch
+
+    def frame_shift(self, frame, timestamp):
+        """
+        Önceki kareden bu kareye sahnenin görüntüdeki beklenen kayması.
+        :param frame: BGR kare (yalnızca faz korelasyonu açıksa kullanılır).
+        :param timestamp: Karenin yakalama zamanı (time.monotonic).
+        :return: (dx, dy) piksel.
+        """
+        pose = self.pose(timestamp)
+        if self._last_pose is None:
+            dx = dy = 0.0
+        else:
+            dx = -(pose[0] - self._last_pose[0]) / self.degrees_per_pixel_yaw
+            dy = -(pose[1] - self._last_pose[1]) / self.degrees_per_pixel_pitch
+        self._last_pose = pose
+
+        if self.phase_correlation and frame is not None:
+            measured = self._phase_shift(frame)
+            if measured is not None and np.hypot(measured[0] - dx, measured[1] - dy) <= max(
+                    PHASE_CORRELATION_MAX_DEVIATION, 0.5 * np.hypot(dx, dy)):
+                dx, dy = measured
+                self.phase_used += 1
+
+        if np.hypot(dx, dy) > EGO_MAX_SHIFT_PIXELS:
+            self.rejected_jumps += 1
+            dx = dy = 0.0
+        self.last_shift = (float(dx), float(dy))
+        self._history.append((timestamp, self.last_shift[0], self.last_shift[1]))
+        return self.last_shift
+
+    def shift_since(self, timestamp):
+        """
+        Verilen zamanda yakalanan kareden son frame_shift() karesine kadar biriken kayma (dx, dy). O karede
+        hesaplanan kutulara eklenince kutular son karenin taret pozuna taşınır.
+        """
+        dx = dy = 0.0
+        for frame_time, shift_x, shift_y in reversed(self._history):
+            if frame_time <= timestamp:
+                break
+            dx += shift_x
+            dy += shift_y
+        return dx, dy
+
+    def _phase_shift(self, frame):
+        """Küçültülmüş gri karede önceki kareye göre faz korelasyonu kayması (tam kare pikseli); zayıfsa None."""
+        h, w = frame.shape[:2]
+        scale = min(1.0, PHASE_CORRELATION_WIDTH / float(w))
+        size = (max(int(w * scale), 1), max(int(h * scale), 1))
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        gray = cv2.resize(gray, size, interpolation=cv2.INTER_AREA).astype(np.float32)
+        previous = self._last_gray
+        self._last_gray = gray
+        if previous is None or previous.shape != gray.shape:
+            self._window = cv2.createHanningWindow(size, cv2.CV_32F)
+            self._phase_scale = scale
+            return None
+        (dx, dy), response = cv2.phaseCorrelate(previous, gray, self._window)
+        if response < PHASE_CORRELATION_MIN_RESPONSE:
+            return None
+        return dx / self._phase_scale, dy / self._phase_scale
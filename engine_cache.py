@@ -0,0 +1,239 @@
+# engine_cache.py
+# ONNX modellerinden TensorRT motorlarını otomatik olarak oluşturan ve yerel bir önbellekte saklayan yardımcı modül.
+# Önbellek anahtarı; ONNX dosyasının içerik özeti, GPU adı, TensorRT sürümü ve hassasiyet bayraklarından oluşur.
+# Böylece sürücü/TensorRT güncellemesinden sonra motor elle yeniden oluşturulmak zorunda kalmaz.
+
+import hashlib
+import json
+import os
+import threading
+import traceback
+
+# Motorların ve builder zamanlama önbelleğinin saklanacağı dizin
+ENGINE_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "engine_cache")
+
+# Motorlar kutu çözme + NMS (EfficientNMS_TRT) eklenmiş olarak derlenir; GPU'dan yalnızca top-K kutu çıkar.
+# Güven eşiği uygulamadakinden düşük tutulur, son filtre ana bilgisayarda K satır üzerinde yapılır.
+BUILD_FUSED_NMS = True
+FUSED_NMS_TOP_K = 100
+FUSED_NMS_SCORE_THRESHOLD = 0.25
+FUSED_NMS_IOU_THRESHOLD = 0.4
+
+# Hassasiyet bayraklarında "int8" varsa kalibrasyon için kullanılacak kayıtlı kareler dizini.
+# Kalibrasyon tablosu önbellekte saklanır; tablo varsa dizin gerekmez.
+CALIBRATION_FRAMES_DIR = None
+
+# Dinamik girişli ONNX modelleri için optimizasyon profilleri (statik modellerde etkisizdir).
+# Her profil grubu bir yürütme bağlamına aittir: senkron bağlam + yolo_models.ASYNC_EXECUTION_SLOTS kadar slot.
+DYNAMIC_PROFILE_SIZES = (320, 480, 640, 960)
+DYNAMIC_MAX_BATCH = 8  # 1920x1080 kare 640 döşemelerle 8 döşeme
+DYNAMIC_PROFILE_SETS = 4
+
+# Arka planda devam eden ve tamamlanan derlemeler (iş parçacığı güvenli erişim için kilitli)
+_build_lock = threading.Lock()
+_pending_builds = {}  # önbellek anahtarı -> threading.Thread
+_finished_builds = []  # (onnx_yolu, motor_yolu) listesi
+
+# Aynı dosyanın özetini her seferinde yeniden hesaplamamak için (yol, boyut, mtime) -> özet. Arayüz, derleme ve
+# model yükleme iş parçacıklarından erişildiği için kilitli; özet kilit dışında hesaplanır
+_hash_memo = {}
+_hash_memo_lock = threading.Lock()
+_default_precision_flags = None
+
+
+def onnx_content_hash(onnx_path):
+    """
+    ONNX dosyasının içeriğinin SHA-256 özetini döndürür.
+    :param onnx_path: ONNX modelinin yolu.
+    """
+    stat = os.stat(onnx_path)
+    memo_key = (os.path.abspath(onnx_path), stat.st_size, stat.st_mtime)
+    with _hash_memo_lock:
+        if memo_key in _hash_memo:
+            return _hash_memo[memo_key]
+
+    sha = hashlib.sha256()
+    with open(onnx_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha.update(chunk)
+    digest = sha.hexdigest()
+    with _hash_memo_lock:
+        _hash_memo[memo_key] = digest
+    return digest
+
+
+def get_gpu_name():
+    """Kullanılan GPU'nun adını döndürür. GPU bulunamazsa 'unknown-gpu' döner."""
+    try:
+        import pycuda.driver as cuda
+        cuda.init()
+        return cuda.Device(0).name()
+    except Exception as e:
+        print(f"UYARI (engine_cache): GPU adı alınamadı: {e}")
+        return "unknown-gpu"
+
+
+def get_trt_version():
+    """Kurulu TensorRT sürümünü döndürür."""
+    try:
+        import tensorrt as trt
+        return trt.__version__
+    except Exception:
+        return "no-tensorrt"
+
+
+def default_precision_flags():
+    """
+    build_engine'in varsayılan olarak kullanacağı hassasiyet bayraklarını döndürür.
+    GPU hızlı FP16 destekliyorsa ("fp16",), aksi takdirde ("fp32",).
+    Diğer geçerli bayraklar: ("int8",) ve kesin tipli derleme için "strongly_typed".
+    """
+    global _default_precision_flags
+    if _default_precision_flags is None:
+        try:
+            import tensorrt as trt
+            builder = trt.Builder(trt.Logger(trt.Logger.WARNING))
+            _default_precision_flags = ("fp16",) if builder.platform_has_fast_fp16 else ("fp32",)
+        except Exception as e:
+            print(f"UYARI (engine_cache): Hassasiyet bayrakları belirlenemedi: {e}")
+            _default_precision_flags = ("fp32",)
+    return _default_precision_flags
+
+
+def compute_cache_key(onnx_path, precision_flags=None):
+    """
+    Motor önbelleği anahtarını hesaplar.
+    :param onnx_path: ONNX modelinin yolu.
+    :param precision_flags: Hassasiyet bayrakları (örn: ("fp16",)). None ise varsayılanlar kullanılır.
+    """
+    if precision_flags is None:
+        precision_flags = default_precision_flags()
+    key_fields = {
+        "onnx_sha256": onnx_content_hash(onnx_path),
+        "gpu": get_gpu_name(),
+        "tensorrt": get_trt_version(),
+        "precision": sorted(precision_flags),
+        "fused_nms": [FUSED_NMS_TOP_K, FUSED_NMS_SCORE_THRESHOLD, FUSED_NMS_IOU_THRESHOLD] if BUILD_FUSED_NMS else None,
+        "profiles": [list(DYNAMIC_PROFILE_SIZES), DYNAMIC_MAX_BATCH, DYNAMIC_PROFILE_SETS],
+    }
+    return hashlib.sha256(json.dumps(key_fields, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def get_engine_path(onnx_path, precision_flags=None):
+    """Verilen ONNX modeli için önbellekteki motor dosyasının yolunu döndürür (dosya var olmayabilir)."""
+    model_name = os.path.splitext(os.path.basename(onnx_path))[0]
+    cache_key = compute_cache_key(onnx_path, precision_flags)
+    return os.path.join(ENGINE_CACHE_DIR, f"{model_name}_{cache_key[:16]}.engine")
+
+
+def get_timing_cache_path():
+    """
+    Builder zamanlama önbelleğinin yolunu döndürür.
+    Zamanlama önbelleği modelden bağımsızdır; yalnızca GPU ve TensorRT sürümüne bağlıdır,
+    bu yüzden model güncellemelerinde de yeniden kullanılır.
+    """
+    device_key = hashlib.sha256(f"{get_gpu_name()}|{get_trt_version()}".encode("utf-8")).hexdigest()
+    return os.path.join(ENGINE_CACHE_DIR, f"timing_{device_key[:16]}.cache")
+
+
+def lookup_engine(onnx_path, precision_flags=None):
+    """
+    Önbellekte bu ONNX modeli için geçerli bir motor varsa yolunu, yoksa None döndürür.
+    """
+    if not os.path.exists(onnx_path):
+        print(f"HATA (engine_cache): ONNX dosyası bulunamadı: {onnx_path}")
+        return None
+    engine_path = get_engine_path(onnx_path, precision_flags)
+    if os.path.exists(engine_path):
+        print(f"HATA AYIKLAMA (engine_cache): Önbellekte motor bulundu: {engine_path}")
+        return engine_path
+    print(f"HATA AYIKLAMA (engine_cache): Önbellekte motor yok: {engine_path}")
+    return None
+
+
+def invalidate(engine_path):
+    """Yüklenemeyen (bozuk veya uyumsuz) bir önbellek motorunu siler."""
+    if os.path.dirname(os.path.abspath(engine_path)) != os.path.abspath(ENGINE_CACHE_DIR):
+        return  # Yalnızca önbellek dizinindeki dosyalara dokun
+    try:
+        os.remove(engine_path)
+        print(f"HATA AYIKLAMA (engine_cache): Geçersiz motor önbellekten silindi: {engine_path}")
+    except OSError:
+        pass
+
+
+def get_calibration_cache_path(onnx_path):
+    """INT8 kalibrasyon tablosunun yolunu döndürür (ONNX içeriğine bağlıdır, GPU'dan bağımsızdır)."""
+    model_name = os.path.splitext(os.path.basename(onnx_path))[0]
+    return os.path.join(ENGINE_CACHE_DIR, f"{model_name}_{onnx_content_hash(onnx_path)[:16]}.calib")
+
+
+def _build_worker(onnx_path, engine_path, cache_key, precision_flags):
+    try:
+        from convert_to_engine import build_engine
+
+        os.makedirs(ENGINE_CACHE_DIR, exist_ok=True)
+        tmp_engine_path = engine_path + ".tmp"
+        precision = next((p for p in ("int8", "fp16", "fp32") if p in precision_flags), "fp32")
+        engine = build_engine(onnx_path, tmp_engine_path, precision=precision,
+                              strongly_typed="strongly_typed" in precision_flags,
+                              calibration_dir=CALIBRATION_FRAMES_DIR,
+                              calibration_cache_path=get_calibration_cache_path(onnx_path),
+                              timing_cache_path=get_timing_cache_path(), deserialize=False,
+                              fused_nms=BUILD_FUSED_NMS, nms_top_k=FUSED_NMS_TOP_K,
+                              nms_score_threshold=FUSED_NMS_SCORE_THRESHOLD,
+                              nms_iou_threshold=FUSED_NMS_IOU_THRESHOLD,
+                              profile_sizes=DYNAMIC_PROFILE_SIZES, max_batch=DYNAMIC_MAX_BATCH,
+                              profile_sets=DYNAMIC_PROFILE_SETS)
+        if engine is None or not os.path.exists(tmp_engine_path):
+            print(f"HATA (engine_cache): Arka plan motor derlemesi başarısız: {onnx_path}")
+            return
+        # Yarım yazılmış bir motorun önbellekte görünmemesi için atomik olarak yerine koy
+        os.replace(tmp_engine_path, engine_path)
+        print(f"HATA AYIKLAMA (engine_cache): Arka plan motor derlemesi tamamlandı: {engine_path}")
+        with _build_lock:
+            _finished_builds.append((onnx_path, engine_path))
+    except Exception as e:
+        print(f"HATA (engine_cache): Arka plan motor derlemesi sırasında hata: {e}")
+        traceback.print_exc()
+    finally:
+        with _build_lock:
+            _pending_builds.pop(cache_key, None)
+
+
+def start_background_build(onnx_path, precision_flags=None):
+    """
+    Önbellekte olmayan bir motoru arka planda derlemeye başlar.
+    Aynı model için zaten bir derleme sürüyorsa yeni bir derleme başlatılmaz.
+    :return: Derlemenin yazılacağı motor yolu.
+    """
+    if precision_flags is None:
+        precision_flags = default_precision_flags()
+    cache_key = compute_cache_key(onnx_path, precision_flags)
+    engine_path = get_engine_path(onnx_path, precision_flags)
+
+    with _build_lock:
+        if cache_key in _pending_builds:
+            print(f"HATA AYIKLAMA (engine_cache): {onnx_path} için derleme zaten sürüyor.")
+            return engine_path
+        thread = threading.Thread(target=_build_worker,
+                                  args=(onnx_path, engine_path, cache_key, tuple(precision_flags)),
+                                  name=f"engine-build-{cache_key[:8]}", daemon=True)
+        _pending_builds[cache_key] = thread
+    print(f"HATA AYIKLAMA (engine_cache): {onnx_path} için arka planda TensorRT motoru derleniyor...")
+    thread.start()
+    return engine_path
+
+
+def pop_finished_builds():
+    """Son çağrıdan bu yana tamamlanan derlemeleri (onnx_yolu, motor_yolu) listesi olarak döndürür."""
+    with _build_lock:
+        finished = list(_finished_builds)
+        _finished_builds.clear()
+    return finished
+
+
+def is_build_pending():
+    """Arka planda devam eden bir derleme olup olmadığını döndürür."""
+    with _build_lock:
+        return bool(_pending_builds)
@@ -0,0 +1,165 @@
+# frame_capture.py
+# Kameradan kareleri ayrı bir iş parçacığında okur ve yalnızca en yeni kareyi tutar ("en yeni kare kazanır").
+# İşleme geride kalsa bile tüketici bayat bir kare almaz; sürücünün iç tamponunda biriken kareler yerine her
+# zaman son yakalanan kare işlenir. Her kare, grab() döndüğü andaki monotonik zaman damgası ve artan bir sıra
+# numarasıyla gelir; hız tahmini ve PID gerçek yakalama zamanlarını kullanır. Hiç tüketilmeden üzerine yazılan
+# kareler "düşürülen" olarak sayılır.
+#
+# Kamera ham MJPEG veriyorsa (camera_backend, CAMERA_MJPEG_DECODE_THREADS > 0) JPEG çözme birden çok iş
+# parçacığına dağıtılır: okuma döngüsü yalnızca grab/retrieve yapar, cv2.imdecode GIL'i bıraktığı için kareler
+# paralel çözülür. Sırası geçmiş bir karenin çözümü daha yeni bir kareden sonra biterse yayınlanmaz.
+
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+import cv2
+
+# Sürücü tampon boyutu (kare). Küçük tampon gecikmeyi azaltır; her arka uç desteklemez.
+CAPTURE_BUFFER_SIZE = 1
+# Art arda bu kadar okuma başarısız olursa yakalama durmuş sayılır
+CAPTURE_MAX_CONSECUTIVE_FAILURES = 30
+
+# image: BGR kare, timestamp: time.monotonic() (saniye), seq: 1'den başlayan sıra numarası
+CapturedFrame = namedtuple('CapturedFrame', ['image', 'timestamp', 'seq'])
+
+
+class CaptureThread:
+    """Bir cv2.VideoCapture nesnesini arka planda okuyan ve en yeni kareyi tutan yakalayıcı."""
+
+    def __init__(self, capture, buffer_size=CAPTURE_BUFFER_SIZE, name="camera-capture", decode_threads=0):
+        """
+        :param decode_threads: > 0 ise kamera ham MJPEG verir (CAP_PROP_CONVERT_RGB=0) ve kareler bu kadar iş
+                               parçacığında çözülür.
+        """
+        self.capture = capture
+        self.buffer_size = buffer_size
+        if buffer_size is not None and not capture.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size):
+            print(f"UYARI (frame_capture): Kamera arka ucu tampon boyutu ayarını ({buffer_size}) desteklemiyor.")
+        self._lock = threading.Lock()
+        self._new_frame = threading.Condition(self._lock)
+        self._latest = None
+        self._latest_consumed = True
+        self._running = False
+        self._thread = None
+        self._name = name
+        self._decode_threads = decode_threads
+        self._decode_pool = None
+        self._decodes_pending = 0
+        self._latest_seq = 0
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        self.failed = False  # Kamera art arda okunamadıysa True
+        self.ended = False  # Dosya kaynağı sona erdiyse True (frame_source)
+
+    def start(self):
+        self._running = True
+        if self._decode_threads > 0:
+            self._decode_pool = ThreadPoolExecutor(max_workers=self._decode_threads,
+                                                   thread_name_prefix=f"{self._name}-decode")
+        self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        """Okuma döngüsünü durdurur (kamerayı serbest bırakmaz)."""
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                print("UYARI (frame_capture): Yakalama iş parçacığı zamanında durmadı.")
+            self._thread = None
+        if self._decode_pool is not None:
+            self._decode_pool.shutdown(wait=True)
+            self._decode_pool = None
+
+    def latest(self):
+        """
+        Beklemeden en yeni kareyi döndürür. Son çağrıdan bu yana yeni kare yoksa None döner
+        (aynı kare iki kez işlenmez).
+        """
+        with self._lock:
+            if self._latest_consumed:
+                return None
+            self._latest_consumed = True
+            return self._latest
+
+    def wait_for_frame(self, timeout=None):
+        """Yeni bir kare gelene kadar (en fazla timeout saniye) bekler ve döndürür; zaman aşımında None."""
+        with self._new_frame:
+            if self._latest_consumed and not self._new_frame.wait_for(lambda: not self._latest_consumed, timeout):
+                return None
+            self._latest_consumed = True
+            return self._latest
+
+    def _run(self):
+        failures = 0
+        seq = 0
+        while self._running:
+            try:
+                # grab() kare hazır olduğunda döner; zaman damgası çözme (retrieve) süresinden bağımsız alınır
+                grabbed = self.capture.grab()
+                timestamp = time.monotonic()
+                ok, image = self.capture.retrieve() if grabbed else (False, None)
+            except cv2.error as e:
+                print(f"HATA (frame_capture): Kare okunamadı: {e}")
+                ok, image = False, None
+            if not ok or image is None or image.size == 0:
+                if getattr(self.capture, "ended", False):
+                    print("HATA AYIKLAMA (frame_capture): Kaynak sona erdi, yakalama durduruluyor.")
+                    self.ended = True
+                    self._running = False
+                    with self._new_frame:
+                        self._new_frame.notify_all()
+                    return
+                failures += 1
+                if failures >= CAPTURE_MAX_CONSECUTIVE_FAILURES:
+                    print("HATA (frame_capture): Kameradan art arda kare okunamadı, yakalama durduruluyor.")
+                    self.failed = True
+                    self._running = False
+                    with self._new_frame:
+                        self._new_frame.notify_all()
+                    return
+                time.sleep(0.005)
+                continue
+            failures = 0
+            seq += 1
+            if self._decode_pool is None:
+                self._publish(CapturedFrame(image, timestamp, seq))
+                continue
+            with self._lock:
+                # Çözücüler geride kaldıysa ham kare kuyruğa alınmaz; en yeni kare zaten sırada
+                backlog = self._decodes_pending >= 2 * self._decode_threads
+                if backlog:
+                    self.frames_dropped += 1
+                else:
+                    self._decodes_pending += 1
+            if not backlog:
+                self._decode_pool.submit(self._decode_and_publish, image, timestamp, seq)
+
+    def _decode_and_publish(self, buffer, timestamp, seq):
+        try:
+            image = cv2.imdecode(buffer.reshape(-1), cv2.IMREAD_COLOR)
+        except cv2.error as e:
+            print(f"HATA (frame_capture): MJPEG karesi çözülemedi: {e}")
+            image = None
+        with self._lock:
+            self._decodes_pending -= 1
+        if image is None:
+            return
+        self._publish(CapturedFrame(image, timestamp, seq))
+
+    def _publish(self, frame):
+        with self._new_frame:
+            if frame.seq < self._latest_seq:
+                self.frames_dropped += 1  # Daha yeni bir kare önce çözüldü
+                return
+            if not self._latest_consumed:
+                self.frames_dropped += 1
+            self._latest = frame
+            self._latest_seq = frame.seq
+            self._latest_consumed = False
+            self.frames_captured += 1
+            self._new_frame.notify_all()
+
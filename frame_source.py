@@ -0,0 +1,277 @@
+# frame_source.py
+# Takılabilir kare kaynakları. Tüm kaynaklar cv2.VideoCapture ile aynı arayüzü sunar (grab, retrieve, read,
+# set, get, isOpened, release); böylece CaptureThread, arayüz ve betikler canlı kamera yerine video dosyası,
+# görüntü klasörü veya kayıt tekrarı ile değişiklik yapılmadan çalışır. Kamera takılı olmayan, yalnızca CPU'lu
+# bir makinede dedektör, izleyici ve denetleyici uçtan uca ölçülebilir.
+#
+#   CameraSource      : camera_backend ile açılan canlı kamera
+#   FileSource        : video dosyası veya görüntü klasörü (kare başına ortam zamanıyla)
+#   ReplaySource      : FileSource'u orijinal zaman damgalarına göre (veya hız çarpanıyla) ya da
+#                       olabildiğince hızlı oynatır
+#
+# Görüntü klasöründe "timestamps.csv" (dosya_adı,saniye) varsa kare zamanları oradan okunur; yoksa
+# FILE_SOURCE_DEFAULT_FPS kullanılır.
+#
+# Komut satırı: --source 0 | camera | camera:1 | video.mp4 | kayit_klasoru/  [--replay realtime|fast]
+#               [--replay-speed 2.0] [--loop]
+
+import csv
+import os
+import time
+
+import cv2
+
+import camera_backend  # Canlı kamera açma ve mod pazarlığı
+
+# Zaman damgası bulunmayan görüntü klasörleri ve FPS bilgisi okunamayan videolar için kare hızı
+FILE_SOURCE_DEFAULT_FPS = 30.0
+# Görüntü klasöründe aranan zaman damgası dosyası
+TIMESTAMPS_FILE_NAME = "timestamps.csv"
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff")
+
+REPLAY_REALTIME = "realtime"  # Orijinal kare aralıklarına uyar
+REPLAY_FAST = "fast"  # Beklemeden, okunabildiği kadar hızlı
+
+
+class CameraSource:
+    """camera_backend ile açılan canlı kamera. İşlemleri alttaki cv2.VideoCapture'a aktarır."""
+
+    def __init__(self, index=None):
+        """:param index: Aygıt dizini; None ise önbellekteki/en iyi aygıt seçilir."""
+        if index is None:
+            self.capture, self.mode = camera_backend.open_best_camera()
+        else:
+            self.capture, self.mode = camera_backend.open_camera(index)
+        self.ended = False  # Canlı kaynak kendiliğinden bitmez
+
+    @property
+    def decode_threads(self):
+        return camera_backend.CAMERA_MJPEG_DECODE_THREADS if self.mode is not None and self.mode.raw_mjpeg else 0
+
+    def describe(self):
+        return camera_backend.describe_mode(self.mode) if self.mode is not None else "Kamera açılamadı"
+
+    def isOpened(self):
+        return self.capture is not None and self.capture.isOpened()
+
+    def grab(self):
+        return self.capture.grab()
+
+    def retrieve(self):
+        return self.capture.retrieve()
+
+    def read(self):
+        return self.capture.read()
+
+    def set(self, prop, value):
+        return self.capture.set(prop, value) if self.capture is not None else False
+
+    def get(self, prop):
+        return self.capture.get(prop) if self.capture is not None else 0.0
+
+    def release(self):
+        if self.capture is not None:
+            self.capture.release()
+            self.capture = None
+
+
+class FileSource:
+    """
+    Video dosyası veya görüntü klasörü. Kareler beklemeden okunur; her karenin ortam zamanı (saniye,
+    ilk kareye göre) frame_time özelliğindedir. Kaynak sona erince ended True olur.
+    """
+
+    def __init__(self, path, loop=False):
+        self.path = path
+        self.loop = loop
+        self.ended = False
+        self.frame_time = None
+        self.decode_threads = 0
+        self._frame_index = -1
+        self._loop_offset = 0.0
+        self._capture = None
+        self._images = None
+        self._times = None
+        self._pending = None
+        if os.path.isdir(path):
+            self._images, self._times = _list_image_directory(path)
+            span = self._times[-1] if self._times else 0.0
+            self.fps = (len(self._times) - 1) / span if span > 0 else FILE_SOURCE_DEFAULT_FPS
+        else:
+            self._capture = cv2.VideoCapture(path)
+            fps = self._capture.get(cv2.CAP_PROP_FPS) if self._capture.isOpened() else 0.0
+            self.fps = fps if fps and fps > 0 else FILE_SOURCE_DEFAULT_FPS
+
+    def describe(self):
+        kind = "Görüntü klasörü" if self._images is not None else "Video dosyası"
+        count = len(self._images) if self._images is not None else int(self.get(cv2.CAP_PROP_FRAME_COUNT))
+        return f"{kind}: {self.path} ({count} kare, {self.fps:.1f} fps)"
+
+    def isOpened(self):
+        if self._images is not None:
+            return len(self._images) > 0
+        return self._capture is not None and self._capture.isOpened()
+
+    def _rewind(self):
+        self._loop_offset = (self.frame_time or 0.0) + 1.0 / self.fps
+        self._frame_index = -1
+        if self._capture is not None:
+            self._capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+    def grab(self):
+        if not self.isOpened() or self.ended:
+            return False
+        if not self._grab_next():
+            if not self.loop:
+                self.ended = True
+                return False
+            self._rewind()
+            if not self._grab_next():
+                self.ended = True
+                return False
+        return True
+
+    def _grab_next(self):
+        index = self._frame_index + 1
+        if self._images is not None:
+            if index >= len(self._images):
+                return False
+            self._pending = self._images[index]
+            media_time = self._times[index]
+        else:
+            if not self._capture.grab():
+                return False
+            position_ms = self._capture.get(cv2.CAP_PROP_POS_MSEC)
+            media_time = position_ms / 1000.0 if position_ms > 0 or index == 0 else index / self.fps
+        self._frame_index = index
+        self.frame_time = self._loop_offset + media_time
+        return True
+
+    def retrieve(self):
+        if self._images is not None:
+            if self._pending is None:
+                return False, None
+            image = cv2.imread(self._pending, cv2.IMREAD_COLOR)
+            return image is not None, image
+        return self._capture.retrieve()
+
+    def read(self):
+        if not self.grab():
+            return False, None
+        return self.retrieve()
+
+    def set(self, prop, value):
+        # Dosya kaynaklarında tampon, pozlama, beyaz dengesi vb. anlamsızdır
+        return False
+
+    def get(self, prop):
+        if self._images is not None:
+            if prop == cv2.CAP_PROP_FRAME_COUNT:
+                return float(len(self._images))
+            if prop == cv2.CAP_PROP_FPS:
+                return self.fps
+            if prop == cv2.CAP_PROP_POS_FRAMES:
+                return float(self._frame_index + 1)
+            if prop in (cv2.CAP_PROP_FRAME_WIDTH, cv2.CAP_PROP_FRAME_HEIGHT) and self._images:
+                image = cv2.imread(self._images[0], cv2.IMREAD_COLOR)
+                if image is not None:
+                    return float(image.shape[1] if prop == cv2.CAP_PROP_FRAME_WIDTH else image.shape[0])
+            return 0.0
+        return self._capture.get(prop) if self._capture is not None else 0.0
+
+    def release(self):
+        if self._capture is not None:
+            self._capture.release()
+            self._capture = None
+        self._images = [] if self._images is not None else None
+
+
+class ReplaySource(FileSource):
+    """
+    FileSource'u zamanlamalı oynatır. realtime: her kare, ilk kareye göre orijinal zamanına (speed ile ölçeklenmiş)
+    gelene kadar grab() içinde beklenir; böylece yakalama zaman damgaları kayıttaki aralıkları izler. İşleme
+    geride kalırsa beklenmez (late_frames sayılır). fast: hiç beklenmez, uçtan uca azami FPS ölçülür.
+    """
+
+    def __init__(self, path, mode=REPLAY_REALTIME, speed=1.0, loop=False):
+        super().__init__(path, loop=loop)
+        if mode not in (REPLAY_REALTIME, REPLAY_FAST):
+            raise ValueError(f"Geçersiz tekrar kipi: {mode}")
+        self.mode = mode
+        self.speed = speed
+        self.late_frames = 0
+        self._start_wall = None
+        self._start_media = None
+
+    def describe(self):
+        timing = "orijinal zamanlama" if self.mode == REPLAY_REALTIME else "olabildiğince hızlı"
+        if self.mode == REPLAY_REALTIME and self.speed != 1.0:
+            timing += f", {self.speed:g}x"
+        return f"{super().describe()} - tekrar: {timing}"
+
+    def grab(self):
+        if not super().grab():
+            return False
+        if self.mode == REPLAY_FAST:
+            return True
+        now = time.monotonic()
+        if self._start_wall is None:
+            self._start_wall, self._start_media = now, self.frame_time
+            return True
+        due = self._start_wall + (self.frame_time - self._start_media) / self.speed
+        if due > now:
+            time.sleep(due - now)
+        elif now - due > 1.0 / self.fps:
+            self.late_frames += 1
+        return True
+
+
+def open_source(spec=None, replay=REPLAY_REALTIME, speed=1.0, loop=False):
+    """
+    --source değerinden kaynak oluşturur.
+    :param spec: None/"camera" (en iyi kamera), "camera:<n>" veya "<n>" (belirli aygıt), dosya ya da klasör yolu.
+    :return: CameraSource veya ReplaySource; açılamadıysa isOpened() False döner.
+    """
+    if spec is None or spec == "camera":
+        return CameraSource()
+    if spec.startswith("camera:"):
+        return CameraSource(int(spec.split(":", 1)[1]))
+    if spec.isdigit() and not os.path.exists(spec):
+        return CameraSource(int(spec))
+    if not os.path.exists(spec):
+        print(f"HATA (frame_source): Kaynak bulunamadı: {spec}")
+    return ReplaySource(spec, mode=replay, speed=speed, loop=loop)
+
+
+def add_source_arguments(parser):
+    """--source, --replay, --replay-speed ve --loop seçeneklerini bir argparse ayrıştırıcısına ekler."""
+    parser.add_argument("--source", default=None,
+                        help="Kare kaynağı: camera, camera:<n>, <n>, video dosyası veya görüntü klasörü")
+    parser.add_argument("--replay", choices=(REPLAY_REALTIME, REPLAY_FAST), default=REPLAY_REALTIME,
+                        help="Dosya kaynağında zamanlama (realtime: orijinal aralıklar, fast: beklemesiz)")
+    parser.add_argument("--replay-speed", type=float, default=1.0, help="realtime tekrarında hız çarpanı")
+    parser.add_argument("--loop", action="store_true", help="Dosya kaynağı bitince baştan başla")
+
+
+def open_source_from_args(args):
+    return open_source(args.source, replay=args.replay, speed=args.replay_speed, loop=args.loop)
+
+
+def _list_image_directory(path):
+    """Klasördeki görüntüleri ad sırasıyla ve kare zamanlarını (saniye, ilk kareye göre) döndürür."""
+    names = sorted(name for name in os.listdir(path) if name.lower().endswith(IMAGE_EXTENSIONS))
+    times = None
+    timestamps_path = os.path.join(path, TIMESTAMPS_FILE_NAME)
+    if os.path.isfile(timestamps_path):
+        try:
+            with open(timestamps_path, "r", encoding="utf-8", newline="") as f:
+                recorded = {row[0]: float(row[1]) for row in csv.reader(f) if len(row) >= 2 and row[0] in names}
+            names = sorted(recorded, key=lambda name: (recorded[name], name))
+            times = [recorded[name] - recorded[names[0]] for name in names] if names else []
+        except (OSError, ValueError, IndexError) as e:
+            print(f"UYARI (frame_source): {timestamps_path} okunamadı, sabit kare hızı kullanılıyor: {e}")
+            names = sorted(name for name in os.listdir(path) if name.lower().endswith(IMAGE_EXTENSIONS))
+            times = None
+    if times is None:
+        times = [index / FILE_SOURCE_DEFAULT_FPS for index in range(len(names))]
+    return [os.path.join(path, name) for name in names], times
@@ -0,0 +1,286 @@
+# gl_video_view.py
+# İsteğe bağlı OpenGL video görüntüleme widget'ı (QOpenGLWidget + PyOpenGL). Her kare kalıcı bir dokuya
+# glTexSubImage2D ile yüklenir (doku yalnızca kare boyutu değişince yeniden ayrılır); piksel arabellek nesnesi
+# (PBO) varsa yükleme iki PBO üzerinden dönüşümlü yapılır, sürücü kopyayı eşzamansız yürütür. Ölçekleme GPU'da
+# dokulu dörtgenle, kaplama çizgileri/kutuları küçük bir köşe arabelleğinden GL_LINES ile çizilir; yalnızca
+# yazılar QPainter ile eklenir. BGR kare GL_BGR biçimiyle yüklendiğinden renk dönüşümü yapılmaz.
+#
+# VideoView ile aynı arayüzü sunar (set_frame, clear, set_max_fps, widget_to_frame); camera_label
+# olarak doğrudan kullanılabilir. PyOpenGL yoksa GL_VIDEO_VIEW_AVAILABLE False olur ve VideoView kullanılmalıdır.
+
+import ctypes
+import traceback
+
+import cv2
+import numpy as np
+from PyQt5.QtGui import QPainter
+
+from video_view import ThrottledViewMixin, OverlayLine, OverlayRect, OverlayText, draw_overlays
+
+try:
+    from PyQt5.QtWidgets import QOpenGLWidget
+    from OpenGL import GL
+
+    GL_VIDEO_VIEW_AVAILABLE = True
+except ImportError:
+    QOpenGLWidget = None
+    GL = None
+    GL_VIDEO_VIEW_AVAILABLE = False
+    print("UYARI (gl_video_view): PyOpenGL veya QOpenGLWidget bulunamadı. OpenGL görüntüleme kullanılamayacak.")
+
+# Dönüşümlü kullanılan PBO sayısı (biri GPU'ya kopyalanırken diğeri doldurulur)
+PBO_COUNT = 2
+
+# Kare pikseli -> NDC dönüşümü: gl_Position.xy = position * transform.xy + transform.zw
+_IMAGE_VERTEX_SHADER = """
+#version 120
+attribute vec2 position;
+attribute vec2 texcoord;
+uniform vec4 transform;
+varying vec2 v_texcoord;
+void main() {
+    gl_Position = vec4(position * transform.xy + transform.zw, 0.0, 1.0);
+    v_texcoord = texcoord;
+}
+"""
+_IMAGE_FRAGMENT_SHADER = """
+#version 120
+uniform sampler2D image;
+varying vec2 v_texcoord;
+void main() {
+    gl_FragColor = vec4(texture2D(image, v_texcoord).rgb, 1.0);
+}
+"""
+_OVERLAY_VERTEX_SHADER = """
+#version 120
+attribute vec2 position;
+attribute vec3 color;
+uniform vec4 transform;
+varying vec3 v_color;
+void main() {
+    gl_Position = vec4(position * transform.xy + transform.zw, 0.0, 1.0);
+    v_color = color;
+}
+"""
+_OVERLAY_FRAGMENT_SHADER = """
+#version 120
+varying vec3 v_color;
+void main() {
+    gl_FragColor = vec4(v_color, 1.0);
+}
+"""
+
+
+def _compile_program(vertex_source, fragment_source):
+    program = GL.glCreateProgram()
+    shaders = []
+    for shader_type, source in ((GL.GL_VERTEX_SHADER, vertex_source), (GL.GL_FRAGMENT_SHADER, fragment_source)):
+        shader = GL.glCreateShader(shader_type)
+        GL.glShaderSource(shader, source)
+        GL.glCompileShader(shader)
+        if not GL.glGetShaderiv(shader, GL.GL_COMPILE_STATUS):
+            raise RuntimeError(f"Gölgelendirici derlenemedi: {GL.glGetShaderInfoLog(shader)}")
+        GL.glAttachShader(program, shader)
+        shaders.append(shader)
+    GL.glLinkProgram(program)
+    if not GL.glGetProgramiv(program, GL.GL_LINK_STATUS):
+        raise RuntimeError(f"Gölgelendirici programı bağlanamadı: {GL.glGetProgramInfoLog(program)}")
+    for shader in shaders:
+        GL.glDeleteShader(shader)
+    return program
+
+
+def overlay_line_vertices(overlays):
+    """
+    Çizgi/kutu kaplamalarını kalınlığa göre gruplanmış GL_LINES köşelerine çevirir.
+    :return: {kalınlık: (N, 5) float32 [x, y, r, g, b]}
+    """
+    groups = {}
+    for item in overlays:
+        if isinstance(item, OverlayText):
+            continue
+        color = (item.color[2] / 255.0, item.color[1] / 255.0, item.color[0] / 255.0)
+        if isinstance(item, OverlayRect):
+            x0, y0, x1, y1 = item.x0, item.y0, item.x1, item.y1
+            points = ((x0, y0), (x1, y0), (x1, y0), (x1, y1), (x1, y1), (x0, y1), (x0, y1), (x0, y0))
+        elif isinstance(item, OverlayLine):
+            points = ((item.x1, item.y1), (item.x2, item.y2))
+        else:
+            continue
+        groups.setdefault(item.width, []).extend((x, y) + color for x, y in points)
+    return {width: np.asarray(vertices, dtype=np.float32) for width, vertices in groups.items()}
+
+
+class GLVideoView(ThrottledViewMixin, QOpenGLWidget if GL_VIDEO_VIEW_AVAILABLE else object):
+    """
+    OpenGL ile çizen video widget'ı. VideoView ile aynı kullanım: set_frame(kare, kaplamalar).
+    :param max_fps: Azami boyama hızı; None ise monitör yenileme hızı.
+    """
+
+    def __init__(self, parent=None, max_fps=None):
+        if not GL_VIDEO_VIEW_AVAILABLE:
+            raise RuntimeError("OpenGL görüntüleme için PyOpenGL ve QOpenGLWidget gerekli.")
+        super().__init__(parent)
+        self._pending_frame = None  # Henüz dokuya yüklenmemiş kare
+        self._frame_shape = None  # Dokudaki karenin (yükseklik, genişlik)
+        self._texture = None
+        self._texture_size = None
+        self._pbos = []
+        self._pbo_index = 0
+        self._image_program = None
+        self._overlay_program = None
+        self._quad_buffer = None
+        self._overlay_buffer = None
+        self._gl_failed = False
+        self.uses_pbo = False
+        self._init_view(max_fps)
+
+    def _frame_size(self):
+        return None if self._frame_shape is None else (self._frame_shape[1], self._frame_shape[0])
+
+    def set_frame(self, frame, overlays=()):
+        """Kareyi saklar; doku yüklemesi bir sonraki boyamada yapılır. Kare değiştirilmemelidir."""
+        if frame.ndim == 2:
+            frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+        self._pending_frame = np.ascontiguousarray(frame)
+        self._frame_shape = frame.shape[:2]
+        self._mark_dirty(overlays)
+
+    def clear(self):
+        self._pending_frame, self._frame_shape, self._overlays = None, None, ()
+        self._dirty = False
+        self.update()
+
+    # --- OpenGL ---
+
+    def initializeGL(self):
+        try:
+            self._image_program = _compile_program(_IMAGE_VERTEX_SHADER, _IMAGE_FRAGMENT_SHADER)
+            self._overlay_program = _compile_program(_OVERLAY_VERTEX_SHADER, _OVERLAY_FRAGMENT_SHADER)
+            self._texture = GL.glGenTextures(1)
+            self._quad_buffer, self._overlay_buffer = GL.glGenBuffers(2)
+            context = self.context()
+            major, minor = context.format().version()
+            self.uses_pbo = (major, minor) >= (2, 1) or context.hasExtension(b"GL_ARB_pixel_buffer_object")
+            if self.uses_pbo:
+                self._pbos = list(np.atleast_1d(GL.glGenBuffers(PBO_COUNT)))
+            print(f"HATA AYIKLAMA (gl_video_view): OpenGL {major}.{minor}, PBO: {'var' if self.uses_pbo else 'yok'}")
+        except Exception as e:
+            self._gl_failed = True
+            print(f"HATA (gl_video_view): OpenGL başlatılamadı: {e}")
+            traceback.print_exc()
+
+    def _allocate_texture(self, width, height):
+        GL.glBindTexture(GL.GL_TEXTURE_2D, self._texture)
+        GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_MIN_FILTER, GL.GL_LINEAR)
+        GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_MAG_FILTER, GL.GL_LINEAR)
+        GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_WRAP_S, GL.GL_CLAMP_TO_EDGE)
+        GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_WRAP_T, GL.GL_CLAMP_TO_EDGE)
+        GL.glTexImage2D(GL.GL_TEXTURE_2D, 0, GL.GL_RGB8, width, height, 0, GL.GL_BGR, GL.GL_UNSIGNED_BYTE, None)
+        nbytes = width * height * 3
+        for pbo in self._pbos:
+            GL.glBindBuffer(GL.GL_PIXEL_UNPACK_BUFFER, pbo)
+            GL.glBufferData(GL.GL_PIXEL_UNPACK_BUFFER, nbytes, None, GL.GL_STREAM_DRAW)
+        if self._pbos:
+            GL.glBindBuffer(GL.GL_PIXEL_UNPACK_BUFFER, 0)
+        # Tam ekran dörtgen (kare pikselleri + doku koordinatları); doku satır 0 karenin üst satırıdır
+        quad = np.array([[0, 0, 0, 0], [width, 0, 1, 0], [0, height, 0, 1], [width, height, 1, 1]],
+                        dtype=np.float32)
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, self._quad_buffer)
+        GL.glBufferData(GL.GL_ARRAY_BUFFER, quad.nbytes, quad, GL.GL_STATIC_DRAW)
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, 0)
+        self._texture_size = (width, height)
+
+    def _upload_frame(self, frame):
+        height, width = frame.shape[:2]
+        if self._texture_size != (width, height):
+            self._allocate_texture(width, height)
+        GL.glBindTexture(GL.GL_TEXTURE_2D, self._texture)
+        GL.glPixelStorei(GL.GL_UNPACK_ALIGNMENT, 1)  # 3 baytlık pikseller; satırlar 4'e hizalı olmayabilir
+        if self._pbos:
+            # Arabellek yeniden ayrılarak (orphan) GPU'nun önceki kopyası beklenmez
+            pbo = self._pbos[self._pbo_index]
+            self._pbo_index = (self._pbo_index + 1) % len(self._pbos)
+            GL.glBindBuffer(GL.GL_PIXEL_UNPACK_BUFFER, pbo)
+            GL.glBufferData(GL.GL_PIXEL_UNPACK_BUFFER, frame.nbytes, None, GL.GL_STREAM_DRAW)
+            GL.glBufferSubData(GL.GL_PIXEL_UNPACK_BUFFER, 0, frame.nbytes, frame)
+            GL.glTexSubImage2D(GL.GL_TEXTURE_2D, 0, 0, 0, width, height, GL.GL_BGR, GL.GL_UNSIGNED_BYTE,
+                               ctypes.c_void_p(0))
+            GL.glBindBuffer(GL.GL_PIXEL_UNPACK_BUFFER, 0)
+        else:
+            GL.glTexSubImage2D(GL.GL_TEXTURE_2D, 0, 0, 0, width, height, GL.GL_BGR, GL.GL_UNSIGNED_BYTE, frame)
+
+    def _frame_transform(self, target):
+        """Kare pikselinden NDC'ye dönüşüm (sx, sy, tx, ty); y ekseni aşağı doğru."""
+        scale = target.width() / self._texture_size[0]
+        w, h = float(self.width()), float(self.height())
+        return (2.0 * scale / w, -2.0 * scale / h, 2.0 * target.x() / w - 1.0, 1.0 - 2.0 * target.y() / h)
+
+    @staticmethod
+    def _bind_attribute(program, name, size, stride, offset):
+        location = GL.glGetAttribLocation(program, name)
+        GL.glEnableVertexAttribArray(location)
+        GL.glVertexAttribPointer(location, size, GL.GL_FLOAT, GL.GL_FALSE, stride, ctypes.c_void_p(offset))
+        return location
+
+    def _draw_image(self, transform):
+        GL.glUseProgram(self._image_program)
+        GL.glUniform4f(GL.glGetUniformLocation(self._image_program, "transform"), *transform)
+        GL.glUniform1i(GL.glGetUniformLocation(self._image_program, "image"), 0)
+        GL.glActiveTexture(GL.GL_TEXTURE0)
+        GL.glBindTexture(GL.GL_TEXTURE_2D, self._texture)
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, self._quad_buffer)
+        locations = (self._bind_attribute(self._image_program, "position", 2, 16, 0),
+                     self._bind_attribute(self._image_program, "texcoord", 2, 16, 8))
+        GL.glDrawArrays(GL.GL_TRIANGLE_STRIP, 0, 4)
+        for location in locations:
+            GL.glDisableVertexAttribArray(location)
+
+    def _draw_overlay_lines(self, transform):
+        groups = overlay_line_vertices(self._overlays)
+        if not groups:
+            return
+        GL.glUseProgram(self._overlay_program)
+        GL.glUniform4f(GL.glGetUniformLocation(self._overlay_program, "transform"), *transform)
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, self._overlay_buffer)
+        for width, vertices in groups.items():
+            GL.glBufferData(GL.GL_ARRAY_BUFFER, vertices.nbytes, vertices, GL.GL_STREAM_DRAW)
+            locations = (self._bind_attribute(self._overlay_program, "position", 2, 20, 0),
+                         self._bind_attribute(self._overlay_program, "color", 3, 20, 8))
+            GL.glLineWidth(float(width))
+            GL.glDrawArrays(GL.GL_LINES, 0, len(vertices))
+            for location in locations:
+                GL.glDisableVertexAttribArray(location)
+
+    def paintGL(self):
+        GL.glClearColor(0.0, 0.0, 0.0, 1.0)
+        GL.glClear(GL.GL_COLOR_BUFFER_BIT)
+        if self._gl_failed or self._frame_shape is None:
+            return
+        try:
+            if self._pending_frame is not None:
+                self._upload_frame(self._pending_frame)
+                self._pending_frame = None
+            target = self.image_rect()
+            transform = self._frame_transform(target)
+            self._draw_image(transform)
+            if self._overlays:
+                self._draw_overlay_lines(transform)
+            GL.glUseProgram(0)
+            GL.glBindBuffer(GL.GL_ARRAY_BUFFER, 0)
+            GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
+        except Exception as e:
+            # Sürücü uyumsuzluğunda her karede hata basmamak için GL çizimi kapatılır
+            self._gl_failed = True
+            print(f"HATA (gl_video_view): OpenGL çizimi başarısız, görüntüleme durduruldu: {e}")
+            traceback.print_exc()
+            return
+        if self._overlays and any(isinstance(item, OverlayText) for item in self._overlays):
+            # Yazılar QPainter ile (GL durumu yukarıda bırakıldı)
+            painter = QPainter(self)
+            try:
+                draw_overlays(painter, target, target.width() / self._texture_size[0], self._overlays,
+                              text_only=True)
+            finally:
+                painter.end()
+        self.frames_shown += 1
@@ -0,0 +1,190 @@
+# gpu_preprocess.py
+# YOLO girişi için letterbox (en-boy oranını koruyarak yeniden boyutlandırma + dolgu), BGR->RGB, HWC->CHW
+# ve 0-1 ölçekleme adımlarını yapar. TensorRT/PyCUDA varken tüm adımlar tek bir CUDA çekirdeğinde GPU'da
+# çalışır: CPU tarafında yalnızca ham uint8 BGR karenin sabitlenmiş (pinned) tampona kopyalanması kalır.
+# GPU yoksa aynı letterbox işlemi OpenCV ile CPU'da yapılır, böylece iki yol aynı kutu eşlemesini kullanır.
+
+from collections import namedtuple
+import traceback
+
+import cv2
+import numpy as np
+
+try:
+    import pycuda.driver as cuda
+    from pycuda.compiler import SourceModule
+
+    PYCUDA_AVAILABLE = True
+except Exception:
+    PYCUDA_AVAILABLE = False
+
+# Ultralytics ile aynı gri dolgu değeri
+LETTERBOX_PAD_VALUE = 114
+
+# Kutuları model girişinden orijinal kareye geri eşlemek için gereken bilgiler.
+# offset_x/offset_y: giriş bir kırpıntıysa (ROI) kırpıntının karedeki sol üst köşesi.
+LetterboxInfo = namedtuple('LetterboxInfo', ['scale', 'pad_x', 'pad_y', 'src_width', 'src_height',
+                                             'offset_x', 'offset_y'], defaults=(0, 0))
+
+_LETTERBOX_KERNEL_SOURCE = r"""
+extern "C" __global__ void letterbox_bgr_to_rgb_chw(
+    const unsigned char* __restrict__ src, int src_w, int src_h, int src_pitch,
+    float* __restrict__ dst, int dst_w, int dst_h,
+    int new_w, int new_h, int pad_x, int pad_y,
+    float inv_scale_x, float inv_scale_y, float pad_value)
+{
+    int x = blockIdx.x * blockDim.x + threadIdx.x;
+    int y = blockIdx.y * blockDim.y + threadIdx.y;
+    if (x >= dst_w || y >= dst_h) return;
+
+    int plane = dst_w * dst_h;
+    int idx = y * dst_w + x;
+    int ix = x - pad_x;
+    int iy = y - pad_y;
+    if (ix < 0 || iy < 0 || ix >= new_w || iy >= new_h) {
+        dst[idx] = pad_value;
+        dst[plane + idx] = pad_value;
+        dst[2 * plane + idx] = pad_value;
+        return;
+    }
+
+    // cv2.INTER_LINEAR ile aynı yarım-piksel merkez hizalaması
+    float sx = fmaxf((ix + 0.5f) * inv_scale_x - 0.5f, 0.0f);
+    float sy = fmaxf((iy + 0.5f) * inv_scale_y - 0.5f, 0.0f);
+    int x0 = min((int)sx, src_w - 1);
+    int y0 = min((int)sy, src_h - 1);
+    int x1 = min(x0 + 1, src_w - 1);
+    int y1 = min(y0 + 1, src_h - 1);
+    float fx = sx - x0;
+    float fy = sy - y0;
+
+    const unsigned char* p00 = src + y0 * src_pitch + x0 * 3;
+    const unsigned char* p01 = src + y0 * src_pitch + x1 * 3;
+    const unsigned char* p10 = src + y1 * src_pitch + x0 * 3;
+    const unsigned char* p11 = src + y1 * src_pitch + x1 * 3;
+
+    // BGR kaynak -> RGB düzlemler (c=2 kırmızı, c=0 mavi)
+    for (int c = 0; c < 3; ++c) {
+        float top = p00[c] + (p01[c] - p00[c]) * fx;
+        float bottom = p10[c] + (p11[c] - p10[c]) * fx;
+        dst[(2 - c) * plane + idx] = (top + (bottom - top) * fy) * (1.0f / 255.0f);
+    }
+}
+"""
+
+
+def compute_letterbox(src_width, src_height, dst_width, dst_height):
+    """
+    Letterbox ölçeğini ve dolgusunu hesaplar.
+    :return: (LetterboxInfo, yeni_genişlik, yeni_yükseklik)
+    """
+    scale = min(dst_width / src_width, dst_height / src_height)
+    new_width = int(round(src_width * scale))
+    new_height = int(round(src_height * scale))
+    pad_x = (dst_width - new_width) // 2
+    pad_y = (dst_height - new_height) // 2
+    return LetterboxInfo(scale, pad_x, pad_y, src_width, src_height), new_width, new_height
+
+
+def letterbox_cpu(frame, dst_width, dst_height):
+    """
+    GPU olmadığında kullanılan CPU letterbox ön işlemesi.
+    :return: ((1, 3, H, W) float32 giriş, LetterboxInfo)
+    """
+    src_height, src_width = frame.shape[:2]
+    info, new_width, new_height = compute_letterbox(src_width, src_height, dst_width, dst_height)
+    resized = cv2.resize(frame, (new_width, new_height), interpolation=cv2.INTER_LINEAR)
+    padded = cv2.copyMakeBorder(resized, info.pad_y, dst_height - new_height - info.pad_y,
+                                info.pad_x, dst_width - new_width - info.pad_x,
+                                cv2.BORDER_CONSTANT, value=(LETTERBOX_PAD_VALUE,) * 3)
+    # blobFromImage; BGR->RGB, HWC->CHW, 1/255 ölçekleme ve toplu boyutu tek geçişte yapar
+    input_image = cv2.dnn.blobFromImage(padded, scalefactor=1.0 / 255.0, swapRB=True)
+    return input_image, info
+
+
+class FrameStaging:
+    """Ham uint8 BGR kare için sabitlenmiş ana bilgisayar tamponu ve cihaz tamponu. Gerekirse büyür."""
+
+    def __init__(self):
+        self.capacity = 0
+        self.host = None
+        self.device = None
+
+    def ensure(self, nbytes):
+        if nbytes > self.capacity:
+            self.host = cuda.pagelocked_empty(nbytes, dtype=np.uint8)
+            self.device = cuda.mem_alloc(nbytes)
+            self.capacity = nbytes
+
+
+class GpuLetterbox:
+    """Letterbox ön işlemesini tek bir CUDA çekirdeğiyle, verilen CUDA akışında çalıştırır."""
+
+    BLOCK = (16, 16, 1)
+
+    def __init__(self):
+        module = SourceModule(_LETTERBOX_KERNEL_SOURCE, no_extern_c=True)
+        self.kernel = module.get_function("letterbox_bgr_to_rgb_chw")
+
+    def enqueue(self, frame, staging, device_dst, dst_width, dst_height, stream):
+        """
+        Kareyi sabitlenmiş tampona kopyalar, GPU'ya yükler ve çekirdeği kuyruğa alır.
+        Çıkış doğrudan modelin giriş tamponuna (float32, 1x3xHxW) yazılır.
+        :return: LetterboxInfo
+        """
+        src_height, src_width = frame.shape[:2]
+        nbytes = src_height * src_width * 3
+        staging.ensure(nbytes)
+        # CPU tarafındaki tek kopya: (kırpılmış/bitişik olmayan kareler dahil) doğrudan sabitlenmiş tampona
+        np.copyto(staging.host[:nbytes].reshape(src_height, src_width, 3), frame)
+        cuda.memcpy_htod_async(staging.device, staging.host[:nbytes], stream)
+
+        info, new_width, new_height = compute_letterbox(src_width, src_height, dst_width, dst_height)
+        self._launch(int(staging.device), src_width, src_height, src_width * 3, int(device_dst),
+                     dst_width, dst_height, info, new_width, new_height, stream)
+        return info
+
+    def enqueue_tiles(self, frame, staging, device_dst, tile_origins, tile_size, stream):
+        """
+        Kareyi bir kez yükler ve her döşeme (tile) için çekirdeği kareye işaretçi ofsetiyle çalıştırır.
+        Döşemeler doğal çözünürlüktedir (ölçek 1) ve toplu girişin ardışık dilimlerine yazılır.
+        :param tile_origins: Döşemelerin sol üst köşeleri [(x0, y0), ...]; döşemeler karenin içinde olmalı.
+        :return: Döşeme başına LetterboxInfo listesi (ofsetler döşeme köşeleridir).
+        """
+        src_height, src_width = frame.shape[:2]
+        nbytes = src_height * src_width * 3
+        staging.ensure(nbytes)
+        np.copyto(staging.host[:nbytes].reshape(src_height, src_width, 3), frame)
+        cuda.memcpy_htod_async(staging.device, staging.host[:nbytes], stream)
+
+        tile_bytes = 3 * tile_size * tile_size * np.dtype(np.float32).itemsize
+        infos = []
+        for i, (x0, y0) in enumerate(tile_origins):
+            info, _, _ = compute_letterbox(tile_size, tile_size, tile_size, tile_size)
+            self._launch(int(staging.device) + (y0 * src_width + x0) * 3, tile_size, tile_size, src_width * 3,
+                         int(device_dst) + i * tile_bytes, tile_size, tile_size, info, tile_size, tile_size, stream)
+            infos.append(info._replace(offset_x=x0, offset_y=y0))
+        return infos
+
+    def _launch(self, src_ptr, src_width, src_height, src_pitch, dst_ptr, dst_width, dst_height, info,
+                new_width, new_height, stream):
+        grid = ((dst_width + self.BLOCK[0] - 1) // self.BLOCK[0], (dst_height + self.BLOCK[1] - 1) // self.BLOCK[1])
+        self.kernel(np.uintp(src_ptr), np.int32(src_width), np.int32(src_height), np.int32(src_pitch),
+                    np.uintp(dst_ptr), np.int32(dst_width), np.int32(dst_height),
+                    np.int32(new_width), np.int32(new_height), np.int32(info.pad_x), np.int32(info.pad_y),
+                    np.float32(src_width / new_width), np.float32(src_height / new_height),
+                    np.float32(LETTERBOX_PAD_VALUE / 255.0),
+                    block=self.BLOCK, grid=grid, stream=stream)
+
+
+def create_gpu_letterbox():
+    """GPU ön işleme çekirdeğini derler. PyCUDA/nvcc yoksa None döner ve CPU yolu kullanılır."""
+    if not PYCUDA_AVAILABLE:
+        return None
+    try:
+        return GpuLetterbox()
+    except Exception as e:
+        print(f"UYARI (gpu_preprocess): GPU ön işleme çekirdeği derlenemedi, CPU ön işleme kullanılacak: {e}")
+        traceback.print_exc()
+        return None
+
@@ -1,60 +1,503 @@
-import cv2
+# kcf_tracker.py
+# Dedektör çalışmaları arasında kilitli hedefi izleyen hafif görsel izleyici katmanı. Her hedef için ayrı bir
+# TargetTracker örneği oluşturulur (modül düzeyinde paylaşılan izleyici yoktur). Arka uçlar:
+#
+#   kcf   : OpenCV KCF (opencv-contrib gerekir)
+#   mosse : OpenCV MOSSE (opencv-contrib, cv2.legacy gerekir)
+#   csrt  : OpenCV CSRT (opencv-contrib gerekir; en doğru, en yavaş)
+#   lk    : Seyrek Lucas-Kanade optik akışı (yalnızca OpenCV çekirdeği; ileri-geri hata ile aykırı eleme)
+#
+# Arka uçlar tam kare yerine hedef etrafındaki arama penceresinin küçültülmüş gri kırpıntısıyla güncellenir.
+# Pencere izleyici başlatılırken sabitlenir; hedef pencere kenarına yaklaşınca izleyici güncel kutuyla yeniden
+# başlatılır. Böylece kare başına maliyet kare çözünürlüğünden bağımsızdır.
+#
+# DetectionScheduler tam YOLO dedektörünün kaç karede bir çalışacağına (N) karar verir: izleyici dedektörle
+# uyuştukça N artar, uyuşmazlıkta veya izleyici hedefi kaybedince küçülür; dedektör süresi kare süresine göre
+# uzunsa N en az yük sınırına çıkarılır.
+#
+# Karşılaştırma: python kcf_tracker.py klip1.mp4 [klip2/ ...] --model best.onnx [--backends kcf lk]
+#   Her arka ucun güncelleme hızını (fps) ve dedektör kutularına göre kaymasını (merkez hatası, IoU) yazdırır.
+
+import argparse
+import math
+import time
 import traceback
 
-tracker = None
+import cv2
+import numpy as np
+
+TRACKER_BACKENDS = ("kcf", "mosse", "csrt", "lk")
+# Varsayılan arka uç (opencv-contrib olmadan da çalışır)
+DEFAULT_TRACKER_BACKEND = "lk"
+# Arama penceresi kenarı = hedefin uzun kenarı x bu katsayı (dedektör çalışmaları arasındaki hareket payı)
+TRACKER_SEARCH_MARGIN = 4.0
+TRACKER_MIN_WINDOW_SIDE = 64
+# Küçültülmüş gri kırpıntının en uzun kenarı (piksel)
+TRACKER_CROP_MAX_SIDE = 128
+# Küçültmede hedefin kısa kenarı bu pikselin altına inmez (izleyiciler çok küçük kutularda bozulur)
+TRACKER_MIN_TARGET_PIXELS = 16
+# Hedef merkezi pencere kenarına pencere kenarının bu oranından yakınsa pencere yeniden ortalanır
+TRACKER_RECENTER_BORDER = 0.2
+
+# Lucas-Kanade ayarları
+LK_MAX_POINTS = 40
+LK_MIN_POINTS = 5
+LK_FB_THRESHOLD = 1.0  # İleri-geri hata sınırı (kırpıntı pikseli)
+LK_WINDOW_SIZE = (15, 15)
+LK_PYRAMID_LEVELS = 2
+
+# Dedektör zamanlayıcısı
+DETECTION_MIN_INTERVAL = 1
+DETECTION_MAX_INTERVAL = 8
+DETECTION_CONFIDENCE_HIGH = 0.7  # İzleyici-dedektör uyumu bunun üstündeyse N artar
+DETECTION_CONFIDENCE_LOW = 0.4  # Bunun altındaysa N en küçüğe döner
+DETECTION_LOAD_BUDGET = 0.5  # Dedektörün kare süresinden alabileceği pay
+SCHEDULER_SMOOTHING = 0.2  # Süre ortalamaları için EMA katsayısı
+
+_OPENCV_FACTORIES = {
+    "kcf": "TrackerKCF_create",
+    "mosse": "TrackerMOSSE_create",
+    "csrt": "TrackerCSRT_create",
+}
+
+
+def _create_opencv_tracker(name):
+    """cv2.legacy (varsa) veya cv2 altındaki fabrikayla OpenCV izleyicisi oluşturur; yoksa None."""
+    factory_name = _OPENCV_FACTORIES[name]
+    for module in (getattr(cv2, "legacy", None), cv2):
+        if module is not None and hasattr(module, factory_name):
+            return getattr(module, factory_name)()
+    return None
+
+
+def available_backends():
+    """Bu OpenCV kurulumunda kullanılabilen arka uçlar."""
+    backends = [name for name in _OPENCV_FACTORIES if _create_opencv_tracker(name) is not None]
+    backends.append("lk")
+    return backends
+
+
+class OpenCvBackend:
+    """OpenCV izleyici sarmalayıcısı (KCF, MOSSE, CSRT). Güven, başarıda 1, kayıpta 0'dır."""
+
+    def __init__(self, name):
+        self.name = name
+        self._tracker = None
+        # MOSSE gri görüntüyle çalışır; KCF/CSRT renk özellikleri için 3 kanal bekler
+        self._needs_color = name != "mosse"
+
+    def init(self, gray, bbox):
+        self._tracker = _create_opencv_tracker(self.name)
+        if self._tracker is None:
+            return False
+        result = self._tracker.init(self._prepare(gray), tuple(int(round(v)) for v in bbox))
+        return result is None or bool(result)  # Yeni API None döndürür
+
+    def update(self, gray, shift=None):
+        # Korelasyon filtreleri arama bölgesini kendileri kurar; kayma ipucu kullanılmaz
+        if self._tracker is None:
+            return False, None, 0.0
+        ok, box = self._tracker.update(self._prepare(gray))
+        if not ok:
+            return False, None, 0.0
+        return True, tuple(float(v) for v in box), 1.0
+
+    def _prepare(self, gray):
+        return cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR) if self._needs_color else gray
 
-def init_tracker(frame, bbox):
+
+class LucasKanadeBackend:
     """
-    KCF takipçisini başlatır.
-    :param frame: Takipçinin başlatılacağı video karesi.
-    :param bbox: Takip edilecek nesnenin sınırlayıcı kutusu (x, y, w, h).
+    Kutu içindeki köşe noktalarını piramitli LK ile izler. Öteleme nokta kaymalarının medyanından, ölçek nokta
+    çifti uzaklık oranlarının medyanından bulunur. Güven, ileri-geri kontrolünü geçen noktaların oranıdır.
     """
-    global tracker
-    try:
-        print("DEBUG (kcf_tracker): init_tracker çalışıyor...")
-        if frame is None:
-            raise ValueError("init_tracker: frame None geldi!")
-        if not isinstance(bbox, (tuple, list)) or len(bbox) != 4:
-            raise ValueError(f"init_tracker: bbox formatı hatalı: {bbox}")
-
-        # OpenCV sürümüne göre KCF takipçi oluşturma
-        # cv2.legacy modülü, bazı eski veya deneysel algoritmaları içerir.
-        if hasattr(cv2, 'legacy') and hasattr(cv2.legacy, 'TrackerKCF_create'):
-            tracker = cv2.legacy.TrackerKCF_create()
-            print("DEBUG (kcf_tracker): cv2.legacy.TrackerKCF_create() kullanıldı.")
-        elif hasattr(cv2, 'TrackerKCF_create'): # Daha yeni OpenCV sürümlerinde doğrudan cv2 altında olabilir
-            tracker = cv2.TrackerKCF_create()
-            print("DEBUG (kcf_tracker): cv2.TrackerKCF_create() kullanıldı.")
+
+    name = "lk"
+
+    def __init__(self):
+        self._previous = None
+        self._points = None
+        self._bbox = None
+
+    def init(self, gray, bbox):
+        self._previous = gray
+        self._bbox = tuple(float(v) for v in bbox)
+        self._points = self._find_points(gray, self._bbox)
+        return self._points is not None
+
+    def update(self, gray, shift=None):
+        """:param shift: Beklenen kayma (dx, dy) kırpıntı pikseli (örn. taret hareketi); akışın başlangıç tahmini."""
+        if self._points is None:
+            return False, None, 0.0
+        p0 = self._points
+        if shift is not None and (shift[0] or shift[1]):
+            initial = (p0 + np.array(shift, dtype=np.float32).reshape(1, 1, 2)).astype(np.float32)
+            p1, status, _ = cv2.calcOpticalFlowPyrLK(self._previous, gray, p0, initial, winSize=LK_WINDOW_SIZE,
+                                                     maxLevel=LK_PYRAMID_LEVELS, flags=cv2.OPTFLOW_USE_INITIAL_FLOW)
         else:
-            raise AttributeError("OpenCV KCF Tracker desteklemiyor. Lütfen 'opencv-contrib-python' kurulu olduğundan emin olun.")
+            p1, status, _ = cv2.calcOpticalFlowPyrLK(self._previous, gray, p0, None, winSize=LK_WINDOW_SIZE,
+                                                     maxLevel=LK_PYRAMID_LEVELS)
+        if p1 is None:
+            return False, None, 0.0
+        p0_back, status_back, _ = cv2.calcOpticalFlowPyrLK(gray, self._previous, p1, None,
+                                                           winSize=LK_WINDOW_SIZE, maxLevel=LK_PYRAMID_LEVELS)
+        forward_backward = np.linalg.norm((p0 - p0_back).reshape(-1, 2), axis=1)
+        good = (status.ravel() == 1) & (status_back.ravel() == 1) & (forward_backward < LK_FB_THRESHOLD)
+        confidence = float(good.sum()) / len(p0)
+        if good.sum() < LK_MIN_POINTS:
+            self._points = None
+            return False, None, confidence
 
-        tracker.init(frame, bbox)
-        print("DEBUG (kcf_tracker): Tracker başarıyla başlatıldı.")
-    except Exception as e:
-        print(f"HATA (kcf_tracker): init_tracker HATASI: {e}")
-        traceback.print_exc() # Detaylı hata çıktısı
-        tracker = None
+        old = p0.reshape(-1, 2)[good]
+        new = p1.reshape(-1, 2)[good]
+        dx, dy = (float(v) for v in np.median(new - old, axis=0))
+        scale = 1.0
+        if len(old) >= 2:
+            rows, cols = np.triu_indices(len(old), k=1)
+            old_distance = np.linalg.norm(old[rows] - old[cols], axis=1)
+            new_distance = np.linalg.norm(new[rows] - new[cols], axis=1)
+            valid = old_distance > 1e-3
+            if valid.any():
+                scale = float(np.median(new_distance[valid] / old_distance[valid]))
+
+        x, y, w, h = self._bbox
+        cx, cy = x + w / 2.0 + dx, y + h / 2.0 + dy
+        w, h = w * scale, h * scale
+        self._bbox = (cx - w / 2.0, cy - h / 2.0, w, h)
+        self._previous = gray
+        self._points = new.reshape(-1, 1, 2).astype(np.float32)
+        if len(self._points) < LK_MAX_POINTS // 2:
+            # Noktalar azaldıysa güncel kutuda yeniden köşe aranır
+            refreshed = self._find_points(gray, self._bbox)
+            if refreshed is not None:
+                self._points = refreshed
+        return True, self._bbox, confidence
+
+    @staticmethod
+    def _find_points(gray, bbox):
+        x, y, w, h = bbox
+        x0, y0 = max(int(x), 0), max(int(y), 0)
+        x1, y1 = min(int(math.ceil(x + w)), gray.shape[1]), min(int(math.ceil(y + h)), gray.shape[0])
+        if x1 - x0 < 2 or y1 - y0 < 2:
+            return None
+        corners = cv2.goodFeaturesToTrack(gray[y0:y1, x0:x1], LK_MAX_POINTS, 0.01, 3)
+        if corners is None or len(corners) < LK_MIN_POINTS:
+            # Dokusuz hedef (düz renkli balon): kutu içinde düzenli ızgara
+            side = max(int(math.sqrt(LK_MAX_POINTS)), 2)
+            xs = np.linspace(x0, x1 - 1, side)
+            ys = np.linspace(y0, y1 - 1, side)
+            grid = np.array([(px, py) for py in ys for px in xs], dtype=np.float32)
+            return grid.reshape(-1, 1, 2)
+        corners[:, 0, 0] += x0
+        corners[:, 0, 1] += y0
+        return corners.astype(np.float32)
 
-def update_tracker(frame):
+
+def create_backend(name):
+    """Arka uç örneği oluşturur; arka uç bu kurulumda yoksa None."""
+    if name == "lk":
+        return LucasKanadeBackend()
+    if name in _OPENCV_FACTORIES:
+        if _create_opencv_tracker(name) is None:
+            return None
+        return OpenCvBackend(name)
+    raise ValueError(f"Bilinmeyen izleyici arka ucu: {name}")
+
+
+class TargetTracker:
     """
-    KCF takipçisini bir sonraki karede günceller.
-    :param frame: Güncel video karesi.
-    :return: (success, box) - Takip başarılı mı ve güncel sınırlayıcı kutu.
+    Tek bir hedefin görsel izleyicisi. init(kare, kutu) dedektör kutusuyla (yeniden) başlatır, update(kare)
+    kutuyu tam kare koordinatlarında döndürür. Kutular (x, y, w, h).
+    :param backend: TRACKER_BACKENDS'ten biri; kurulumda yoksa 'lk' kullanılır.
     """
-    global tracker
-    if tracker is None:
-        # print("DEBUG (kcf_tracker): Tracker başlatılmamış, güncelleme atlandı.")
-        return False, None
+
+    def __init__(self, backend=DEFAULT_TRACKER_BACKEND, crop_max_side=TRACKER_CROP_MAX_SIDE,
+                 search_margin=TRACKER_SEARCH_MARGIN):
+        self.crop_max_side = crop_max_side
+        self.search_margin = search_margin
+        self._backend = create_backend(backend)
+        if self._backend is None:
+            print(f"UYARI (kcf_tracker): '{backend}' izleyicisi bu OpenCV kurulumunda yok "
+                  f"(opencv-contrib gerekir), 'lk' kullanılıyor.")
+            self._backend = LucasKanadeBackend()
+        self.backend_name = self._backend.name
+        self.active = False
+        self.bbox = None
+        self.confidence = 0.0
+        self._window = None  # (x0, y0, x1, y1) tam kare pikseli
+        self._scale = 1.0
+
+    def reset(self):
+        self.active = False
+        self.bbox = None
+        self.confidence = 0.0
+        self._window = None
+
+    def init(self, frame, bbox):
+        """Arama penceresini kutu etrafında kurar ve arka ucu başlatır. Başarısızsa False."""
+        try:
+            if frame is None:
+                raise ValueError("init: kare None geldi")
+            self._window, self._scale = self._plan_window(frame.shape, bbox)
+            gray = self._crop(frame)
+            self.active = bool(self._backend.init(gray, self._to_crop(bbox)))
+        except Exception as e:
+            print(f"HATA (kcf_tracker): İzleyici başlatılamadı: {e}")
+            traceback.print_exc()
+            self.active = False
+        self.bbox = tuple(float(v) for v in bbox) if self.active else None
+        self.confidence = 1.0 if self.active else 0.0
+        return self.active
+
+    def update(self, frame, shift=None):
+        """
+        :param shift: Önceki kareden bu yana beklenen görüntü kayması (dx, dy) tam kare pikseli (ego_motion).
+        :return: (başarılı, kutu, güven). Başarısızlıkta izleyici pasifleşir.
+        """
+        if not self.active:
+            return False, None, 0.0
+        crop_shift = None if shift is None else (shift[0] * self._scale, shift[1] * self._scale)
+        try:
+            ok, crop_box, confidence = self._backend.update(self._crop(frame), crop_shift)
+        except Exception as e:
+            print(f"HATA (kcf_tracker): İzleyici güncellenemedi: {e}")
+            traceback.print_exc()
+            ok, crop_box, confidence = False, None, 0.0
+        box = self._from_crop(crop_box) if ok else None
+        if ok and not self._inside_window(box):
+            ok, box = False, None
+        if not ok:
+            self.reset()
+            return False, None, confidence
+        self.bbox, self.confidence = box, confidence
+        if self._near_border(box):
+            # Pencere sabit olduğundan hedef kenara yaklaşınca pencere güncel kutu etrafında yeniden kurulur
+            self.init(frame, box)
+            self.confidence = confidence
+        return True, box, confidence
+
+    def _plan_window(self, frame_shape, bbox):
+        frame_h, frame_w = frame_shape[:2]
+        x, y, w, h = bbox
+        side = max(max(w, h) * self.search_margin, TRACKER_MIN_WINDOW_SIDE)
+        window_w, window_h = min(side, frame_w), min(side, frame_h)
+        cx, cy = x + w / 2.0, y + h / 2.0
+        x0 = int(min(max(cx - window_w / 2.0, 0), frame_w - window_w))
+        y0 = int(min(max(cy - window_h / 2.0, 0), frame_h - window_h))
+        window = (x0, y0, x0 + int(window_w), y0 + int(window_h))
+        scale = min(1.0, self.crop_max_side / max(window_w, window_h))
+        if min(w, h) * scale < TRACKER_MIN_TARGET_PIXELS:
+            scale = min(1.0, TRACKER_MIN_TARGET_PIXELS / max(min(w, h), 1.0))
+        return window, scale
+
+    def _crop(self, frame):
+        x0, y0, x1, y1 = self._window
+        crop = frame[y0:y1, x0:x1]
+        gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY) if crop.ndim == 3 else crop
+        if self._scale < 1.0:
+            size = (max(int(round((x1 - x0) * self._scale)), 1), max(int(round((y1 - y0) * self._scale)), 1))
+            gray = cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+        return gray
+
+    def _to_crop(self, bbox):
+        x, y, w, h = bbox
+        x0, y0 = self._window[:2]
+        return ((x - x0) * self._scale, (y - y0) * self._scale, w * self._scale, h * self._scale)
+
+    def _from_crop(self, box):
+        x, y, w, h = box
+        x0, y0 = self._window[:2]
+        return (x / self._scale + x0, y / self._scale + y0, w / self._scale, h / self._scale)
+
+    def _inside_window(self, box):
+        x0, y0, x1, y1 = self._window
+        cx, cy = box[0] + box[2] / 2.0, box[1] + box[3] / 2.0
+        return x0 <= cx < x1 and y0 <= cy < y1 and box[2] > 0 and box[3] > 0
+
+    def _near_border(self, box):
+        x0, y0, x1, y1 = self._window
+        cx, cy = box[0] + box[2] / 2.0, box[1] + box[3] / 2.0
+        border_x, border_y = (x1 - x0) * TRACKER_RECENTER_BORDER, (y1 - y0) * TRACKER_RECENTER_BORDER
+        return cx < x0 + border_x or cx > x1 - border_x or cy < y0 + border_y or cy > y1 - border_y
+
+
+class DetectionScheduler:
+    """
+    Tam dedektörün çalışma aralığını (N kare) uyarlar. Her karede tick(), dedektör çalıştığında
+    record_detection() çağrılır; due() True ise bu karede dedektör çalıştırılmalıdır.
+    """
+
+    def __init__(self, min_interval=DETECTION_MIN_INTERVAL, max_interval=DETECTION_MAX_INTERVAL,
+                 confidence_high=DETECTION_CONFIDENCE_HIGH, confidence_low=DETECTION_CONFIDENCE_LOW,
+                 load_budget=DETECTION_LOAD_BUDGET):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.confidence_high = confidence_high
+        self.confidence_low = confidence_low
+        self.load_budget = load_budget
+        self.interval = min_interval
+        self.frames_since_detection = 0
+        self.detector_time = None  # Dedektör çalışma süresi ortalaması (saniye)
+        self.frame_period = None  # Kare aralığı ortalaması (saniye)
+        self._last_timestamp = None
+
+    def reset(self):
+        """Kilit bırakıldığında: bir sonraki kilit en küçük aralıkla başlar."""
+        self.interval = self.min_interval
+        self.frames_since_detection = 0
+
+    def tick(self, timestamp):
+        self.frames_since_detection += 1
+        if self._last_timestamp is not None and timestamp > self._last_timestamp:
+            self.frame_period = _smooth(self.frame_period, timestamp - self._last_timestamp)
+        self._last_timestamp = timestamp
+
+    def due(self):
+        return self.frames_since_detection >= self.interval
+
+    def record_detection(self, duration, confidence):
+        """
+        :param duration: Dedektör çalışmasının süresi (saniye).
+        :param confidence: İzleyicinin bu karedeki dedektör kutusuyla uyumu (0-1); izleyici yoksa None.
+        """
+        self.frames_since_detection = 0
+        self.detector_time = _smooth(self.detector_time, duration)
+        if confidence is None or confidence < self.confidence_low:
+            self.interval = self.min_interval
+        elif confidence >= self.confidence_high:
+            self.interval += 1
+        else:
+            self.interval -= 1
+        if self.detector_time and self.frame_period:
+            load_interval = math.ceil(self.detector_time / (self.frame_period * self.load_budget))
+            self.interval = max(self.interval, load_interval)
+        self.interval = min(max(self.interval, self.min_interval), self.max_interval)
+
+
+def bbox_iou(box_a, box_b):
+    """İki (x, y, w, h) kutunun IoU değeri."""
+    ax, ay, aw, ah = box_a
+    bx, by, bw, bh = box_b
+    iw = max(0.0, min(ax + aw, bx + bw) - max(ax, bx))
+    ih = max(0.0, min(ay + ah, by + bh) - max(ay, by))
+    intersection = iw * ih
+    union = aw * ah + bw * bh - intersection
+    return intersection / union if union > 0 else 0.0
+
+
+def _smooth(average, value):
+    return value if average is None else average + SCHEDULER_SMOOTHING * (value - average)
+
+
+def _reference_detections(clip, model, postprocessor):
+    """Klipteki her kare için dedektör kutuları [(x, y, w, h, skor), ...] (kayma ölçümünde referans)."""
+    import frame_source
+    from yolo_postprocess import DET_X1, DET_Y1, DET_X2, DET_Y2, DET_SCORE
+
+    references = []
+    source = frame_source.open_source(clip, replay=frame_source.REPLAY_FAST)
+    try:
+        while True:
+            ok, frame = source.read()
+            if not ok:
+                break
+            outputs, letterbox = model.infer_frame(frame)
+            dets = postprocessor.process(outputs, model.output_layout, letterbox)
+            references.append([(d[DET_X1], d[DET_Y1], d[DET_X2] - d[DET_X1], d[DET_Y2] - d[DET_Y1], d[DET_SCORE])
+                               for d in dets])
+    finally:
+        source.release()
+    return references
+
+
+def _benchmark_backend(clip, backend, references, initial_bbox, reinit_interval):
+    """Bir arka ucu klipte çalıştırır. :return: (güncelleme sayısı, toplam süre, merkez hataları, IoU'lar, kayıp)"""
+    import frame_source
+
+    tracker = TargetTracker(backend)
+    source = frame_source.open_source(clip, replay=frame_source.REPLAY_FAST)
+    updates, elapsed, lost = 0, 0.0, 0
+    center_errors, ious = [], []
+    frame_index = -1
+    try:
+        while True:
+            ok, frame = source.read()
+            if not ok:
+                break
+            frame_index += 1
+            reference = None
+            if references is not None and frame_index < len(references) and references[frame_index]:
+                reference = max(references[frame_index], key=lambda r: r[4])[:4]
+            if not tracker.active or (reinit_interval and frame_index % reinit_interval == 0):
+                start_box = reference if references is not None else (initial_bbox if frame_index == 0 else None)
+                if start_box is not None:
+                    tracker.init(frame, start_box)
+                continue
+            start = time.perf_counter()
+            ok, box, _ = tracker.update(frame)
+            elapsed += time.perf_counter() - start
+            updates += 1
+            if not ok:
+                lost += 1
+                continue
+            if reference is not None:
+                center_errors.append(math.hypot(box[0] + box[2] / 2.0 - reference[0] - reference[2] / 2.0,
+                                                box[1] + box[3] / 2.0 - reference[1] - reference[3] / 2.0))
+                ious.append(bbox_iou(box, reference))
+    finally:
+        source.release()
+    return updates, elapsed, center_errors, ious, lost
+
+
+def _run_benchmark(args):
+    references_by_clip = {}
+    if args.model:
+        from yolo_models import load_yolo_model
+        from yolo_postprocess import YoloPostprocessor
+
+        model = load_yolo_model(args.model)
+        if model is None:
+            print("HATA (kcf_tracker): Model yüklenemedi.")
+            return
+        postprocessor = YoloPostprocessor(args.conf, 0.4)
+        for clip in args.clips:
+            references_by_clip[clip] = _reference_detections(clip, model, postprocessor)
+    elif args.bbox is None:
+        print("HATA (kcf_tracker): Referans için --model veya başlangıç kutusu için --bbox gerekli.")
+        return
+
+    backends = args.backends or available_backends()
+    print(f"{'arka uç':<8} {'klip':<28} {'güncelleme':>10} {'fps':>9} {'hata px':>8} {'en çok':>8} "
+          f"{'IoU':>6} {'kayıp':>6}")
+    for backend in backends:
+        if create_backend(backend) is None:
+            print(f"{backend:<8} bu OpenCV kurulumunda yok (opencv-contrib gerekir)")
+            continue
+        for clip in args.clips:
+            updates, elapsed, errors, ious, lost = _benchmark_backend(
+                clip, backend, references_by_clip.get(clip), args.bbox, args.reinit_interval)
+            fps = updates / elapsed if elapsed > 0 else 0.0
+            mean_error = f"{np.mean(errors):.1f}" if errors else "-"
+            max_error = f"{np.max(errors):.1f}" if errors else "-"
+            mean_iou = f"{np.mean(ious):.2f}" if ious else "-"
+            print(f"{backend:<8} {clip[-28:]:<28} {updates:>10} {fps:>9.1f} {mean_error:>8} {max_error:>8} "
+                  f"{mean_iou:>6} {lost:>6}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="İzleyici arka uçlarının hızını ve kaymasını kayıtlarda karşılaştırır")
+    parser.add_argument("clips", nargs="+", help="Video dosyaları veya görüntü klasörleri")
+    parser.add_argument("--model", default=None,
+                        help="Referans kutular için .onnx/.engine model (her karede en yüksek skorlu tespit)")
+    parser.add_argument("--conf", type=float, default=0.4)
+    parser.add_argument("--bbox", type=lambda text: tuple(float(v) for v in text.split(",")), default=None,
+                        help="Model yoksa ilk karedeki hedef kutusu: x,y,w,h (yalnızca hız ve kayıp ölçülür)")
+    parser.add_argument("--backends", nargs="+", choices=TRACKER_BACKENDS, default=None,
+                        help="Karşılaştırılacak arka uçlar (varsayılan: kurulumdaki tümü)")
+    parser.add_argument("--reinit-interval", type=int, default=0,
+                        help="İzleyici her bu kadar karede referans kutuyla yeniden başlatılır (0: hiç; saf kayma)")
     try:
-        if frame is None:
-            raise ValueError("update_tracker: frame None geldi.")
-        success, box = tracker.update(frame)
-        # if success:
-        #     print(f"DEBUG (kcf_tracker): Tracker güncellendi, başarı: {success}, kutu: {box}")
-        # else:
-        #     print("DEBUG (kcf_tracker): Tracker güncelleme başarısız.")
-        return success, box
+        _run_benchmark(parser.parse_args())
     except Exception as e:
-        print(f"HATA (kcf_tracker): update_tracker HATASI: {e}")
-        traceback.print_exc() # Detaylı hata çıktısı
-        return False, None
+        print(f"HATA (kcf_tracker): {e}")
+        traceback.print_exc()
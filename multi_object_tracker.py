@@ -0,0 +1,357 @@
+# multi_object_tracker.py
+# Çoklu hedef izleyici. Her tespit edilen nesne için sabit hızlı Kalman durumu (merkez, boyut, hız) tutan bir
+# iz tablosu. Tespit ile izler, vektörel IoU/merkez uzaklığı maliyet matrisi üzerinde Macar algoritmasıyla
+# (scipy.optimize.linear_sum_assignment) eşleştirilir; scipy yoksa açgözlü eşleştirme kullanılır.
+#
+#   - Doğum: eşleşmeyen tespit yeni (geçici) iz açar; min_hits ardışık eşleşmeden sonra iz onaylanır.
+#   - Ölüm: geçici iz ilk kaçırmada, onaylı iz max_age ardışık kaçırmadan sonra silinir.
+#   - Kimlikler artarak verilir ve iz yaşadığı sürece değişmez.
+#
+# Dedektörün çalışmadığı karelerde predict() ile izler ileri kestirilir; böylece dedektör daha düşük hızda
+# çalışırken kilitli hedefin konumu ve hızı her karede kullanılabilir.
+#
+# Tespitler detections.Detections kümesidir; update() eşleşen izin kimliğini kümenin track_id sütununa yazar.
+
+import numpy as np
+
+from detections import NO_TRACK
+
+try:
+    from scipy.optimize import linear_sum_assignment
+    SCIPY_AVAILABLE = True
+except ImportError:
+    linear_sum_assignment = None
+    SCIPY_AVAILABLE = False
+    print("UYARI (multi_object_tracker): scipy bulunamadı, açgözlü eşleştirme kullanılacak.")
+
+# Onay için gereken ardışık eşleşme sayısı
+MOT_MIN_HITS = 3
+# Onaylı izin silinmeden önce kaçırabileceği ardışık dedektör çalışması
+MOT_MAX_AGE = 15
+# IoU'su sıfır olan tespitlerde merkez uzaklığı kapısı (piksel)
+MOT_MAX_DISTANCE_PIXELS = 250.0
+# Eşleşme için en yüksek maliyet (IoU > 0 ise 1 - IoU, değilse 1 + uzaklık / kapı)
+MOT_MAX_COST = 1.9
+# Kalman süreç gürültüsü: merkez ivmesi (piksel/s^2) ve boyut değişimi (piksel/s) standart sapmaları
+MOT_ACCELERATION_STD = 400.0
+MOT_SIZE_RATE_STD = 40.0
+# Ölçüm gürültüsü: kutu boyutuyla orantılı standart sapma ve alt sınırı (piksel)
+MOT_MEASUREMENT_STD_RATIO = 0.05
+MOT_MEASUREMENT_STD_MIN = 2.0
+# İlk ölçümde hız belirsizliği (piksel/s)
+MOT_INITIAL_VELOCITY_STD = 300.0
+# Görsel izleyici kutusunun (correct) ölçüm gürültüsü, dedektör ölçüm gürültüsünün bu katıdır (güvenle bölünür)
+MOT_VISUAL_MEASUREMENT_STD_SCALE = 2.0
+
+# Durum vektörü: [cx, cy, w, h, vx, vy]; ölçüm: [cx, cy, w, h]
+_STATE_SIZE = 6
+_MEASUREMENT_MATRIX = np.hstack([np.eye(4), np.zeros((4, 2))])
+_INFEASIBLE_COST = 1e6
+
+
+class Track:
+    """Tek bir nesnenin izi. Konum/boyut/hız Kalman durumundan okunur."""
+
+    def __init__(self, track_id, bbox, class_id, score, timestamp):
+        self.track_id = track_id
+        self.class_id = class_id
+        self.score = score
+        self.last_bbox = bbox  # Son ölçülen (x, y, w, h) kutu (kaçırılan karelerde eskisi kalır)
+        self.hits = 1  # Ardışık eşleşme sayısı
+        self.misses = 0  # Ardışık kaçırma sayısı (dedektör çalışmalarında)
+        self.age = 1  # Toplam dedektör çalışması
+        self.confirmed = False
+        self.last_update_time = timestamp
+        self.predicted_time = timestamp
+
+        measurement = _bbox_to_measurement(bbox)
+        self.x = np.concatenate([measurement, np.zeros(2)])
+        std = _measurement_std(measurement)
+        self.P = np.diag(np.concatenate([std ** 2, np.full(2, MOT_INITIAL_VELOCITY_STD ** 2)]))
+
+    @property
+    def center(self):
+        return float(self.x[0]), float(self.x[1])
+
+    @property
+    def velocity(self):
+        """Merkez hızı (vx, vy), piksel/saniye."""
+        return float(self.x[4]), float(self.x[5])
+
+    @property
+    def bbox(self):
+        """Kalman durumundan (x, y, w, h) tamsayı kutu."""
+        cx, cy, w, h = self.x[:4]
+        w, h = max(w, 1.0), max(h, 1.0)
+        return int(round(cx - w / 2)), int(round(cy - h / 2)), int(round(w)), int(round(h))
+
+    @property
+    def updated(self):
+        """Son dedektör çalışmasında bir tespitle eşleşti mi?"""
+        return self.misses == 0
+
+    def box_at(self, timestamp):
+        """Durumun verilen ana doğrusal kestirimiyle (cx, cy, w, h); filtre değişmez (geç ölçüm eşleştirmesi)."""
+        box = self.x[:4].copy()
+        box[:2] += self.x[4:6] * (timestamp - self.predicted_time)
+        return box
+
+    def predict(self, timestamp):
+        dt = timestamp - self.predicted_time
+        if dt <= 0:
+            return
+        self._propagate(dt)
+        self.predicted_time = timestamp
+
+    def _propagate(self, dt):
+        """Durumu dt saniye ilerletir (dt < 0: geri kestirim; süreç gürültüsü |dt| ile eklenir)."""
+        F = np.eye(_STATE_SIZE)
+        F[0, 4] = F[1, 5] = dt
+        # Beyaz gürültü ivme modeli (merkez) ve rastgele yürüyüş (boyut)
+        q = MOT_ACCELERATION_STD ** 2
+        Q = np.zeros((_STATE_SIZE, _STATE_SIZE))
+        for position, velocity in ((0, 4), (1, 5)):
+            Q[position, position] = q * dt ** 4 / 4.0
+            Q[position, velocity] = Q[velocity, position] = q * dt ** 3 / 2.0
+            Q[velocity, velocity] = q * dt ** 2
+        Q[2, 2] = Q[3, 3] = (MOT_SIZE_RATE_STD * dt) ** 2
+        self.x = F @ self.x
+        self.P = F @ self.P @ F.T + Q
+
+    def update(self, bbox, score, timestamp):
+        """
+        Dedektör ölçümü: Kalman düzeltmesi ve eşleşme sayaçları (hits, misses, last_bbox).
+        Ölçüm izin kestirildiği andan eskiyse (asenkron dedektör sonucu, arada predict/correct yapılmış), durum ve
+        kovaryans ölçüm anına geri kestirilir, düzeltilir ve yeniden ileri kestirilir; eski ölçüm daha yeni bir
+        anın durumuna o anın ölçümüymüş gibi katılmaz.
+        """
+        lag = self.predicted_time - timestamp
+        if lag > 0:
+            self._propagate(-lag)
+        self._kalman_update(bbox)
+        if lag > 0:
+            self._propagate(lag)
+        self.last_bbox = bbox
+        self.score = score
+        self.hits += 1
+        self.misses = 0
+        self.last_update_time = timestamp
+
+    def correct_state(self, bbox, std_scale=1.0):
+        """
+        Dedektör dışı ölçüm (görsel izleyici kutusu): yalnızca Kalman durumu (x, P) düzeltilir. hits, misses,
+        confirmed ve last_bbox dedektöre aittir; izin onayı ve ölümü yalnızca dedektör çalışmalarına bağlı kalır.
+        """
+        self._kalman_update(bbox, std_scale)
+
+    def _kalman_update(self, bbox, std_scale=1.0):
+        z = _bbox_to_measurement(bbox)
+        R = np.diag((std_scale * _measurement_std(z)) ** 2)
+        H = _MEASUREMENT_MATRIX
+        S = H @ self.P @ H.T + R
+        K = self.P @ H.T @ np.linalg.inv(S)
+        self.x = self.x + K @ (z - H @ self.x)
+        self.P = (np.eye(_STATE_SIZE) - K @ H) @ self.P
+
+
+class MultiObjectTracker:
+    """
+    İz tablosu. Dedektör çalıştığında update(), çalışmadığı karelerde predict() çağrılır.
+    :param class_aware: True ise yalnızca aynı sınıftaki tespit ve izler eşleşebilir.
+    """
+
+    def __init__(self, min_hits=MOT_MIN_HITS, max_age=MOT_MAX_AGE, max_distance=MOT_MAX_DISTANCE_PIXELS,
+                 max_cost=MOT_MAX_COST, class_aware=True):
+        self.min_hits = min_hits
+        self.max_age = max_age
+        self.max_distance = max_distance
+        self.max_cost = max_cost
+        self.class_aware = class_aware
+        self.tracks = []
+        self._next_id = 1
+
+    def reset(self):
+        """Tüm izleri siler (görev değişimi, kamera durdurma). Kimlik sayacı sıfırlanmaz."""
+        self.tracks = []
+
+    def get(self, track_id):
+        """Kimliği verilen canlı izi döndürür; yoksa None."""
+        if track_id is None:
+            return None
+        for track in self.tracks:
+            if track.track_id == track_id:
+                return track
+        return None
+
+    def confirmed_tracks(self):
+        return [track for track in self.tracks if track.confirmed]
+
+    def predict(self, timestamp):
+        """Tüm izleri verilen zamana kestirir (dedektörün çalışmadığı kareler). Onaylı izleri döndürür."""
+        for track in self.tracks:
+            track.predict(timestamp)
+        return self.confirmed_tracks()
+
+    def apply_shift(self, dx, dy):
+        """
+        Tüm izleri görüntü kayması kadar öteler (taret hareketi, ego_motion). Eşleştirmeden önce çağrılır; hız
+        durumu değişmez, böylece izlerin hızı taretten bağımsız hedef hareketini gösterir.
+        """
+        if not dx and not dy:
+            return
+        for track in self.tracks:
+            track.x[0] += dx
+            track.x[1] += dy
+
+    def correct(self, track_id, bbox, timestamp, confidence=1.0):
+        """
+        Tek bir izi dedektör dışı bir ölçümle (örn. görsel izleyicinin kutusu) düzeltir; diğer izlere dokunulmaz.
+        Yalnızca Kalman durumu değişir: iz bu ölçümle onaylanmaz, kaçırma sayacı sıfırlanmaz (updated değişmez).
+        :param confidence: İzleyici güveni (0-1); düşük güvende ölçüm gürültüsü büyür.
+        :return: Düzeltilen iz; kimlik yoksa None.
+        """
+        track = self.get(track_id)
+        if track is None:
+            return None
+        track.predict(timestamp)
+        track.correct_state(tuple(bbox), MOT_VISUAL_MEASUREMENT_STD_SCALE / max(confidence, 0.1))
+        return track
+
+    def update(self, detections, timestamp, region=None):
+        """
+        Bir dedektör çalışmasının sonuçlarıyla izleri günceller.
+        :param detections: detections.Detections; eşleşen izin kimliği track_id sütununa yazılır.
+        :param region: Dedektör yalnızca bir kırpıntıda çalıştıysa (x0, y0, x1, y1); tahmini merkezi bu
+                       bölgenin dışında kalan izler kaçırılmış sayılmaz.
+        :return: Onaylı izler.
+        """
+        for track in self.tracks:
+            track.predict(timestamp)
+
+        track_ids = detections.track_ids
+        track_ids[:] = NO_TRACK
+        matches, unmatched_tracks, unmatched_detections = self._associate(detections, timestamp)
+
+        for track_index, detection_index in matches:
+            track = self.tracks[track_index]
+            track.update(detections.bbox(detection_index), detections.score(detection_index), timestamp)
+            track.age += 1
+            if not track.confirmed and track.hits >= self.min_hits:
+                track.confirmed = True
+            track_ids[detection_index] = track.track_id
+
+        for track_index in unmatched_tracks:
+            track = self.tracks[track_index]
+            if region is not None and not _center_in_region(track.box_at(timestamp), region):
+                continue  # Dedektör bu izi görmedi
+            track.age += 1
+            track.misses += 1
+            track.hits = 0
+
+        self.tracks = [track for track in self.tracks if self._alive(track)]
+
+        for detection_index in unmatched_detections:
+            track = Track(self._next_id, detections.bbox(detection_index), detections.class_id(detection_index),
+                          detections.score(detection_index), timestamp)
+            self._next_id += 1
+            track.confirmed = self.min_hits <= 1
+            self.tracks.append(track)
+            track_ids[detection_index] = track.track_id
+
+        return self.confirmed_tracks()
+
+    def _alive(self, track):
+        if track.misses == 0:
+            return True
+        if not track.confirmed:
+            return False
+        return track.misses <= self.max_age
+
+    def _associate(self, detections, timestamp):
+        """(eşleşmeler, eşleşmeyen iz dizinleri, eşleşmeyen tespit dizinleri)"""
+        if not self.tracks or not len(detections):
+            return [], list(range(len(self.tracks))), list(range(len(detections)))
+
+        cost = self._cost_matrix(detections, timestamp)
+        if SCIPY_AVAILABLE:
+            rows, cols = linear_sum_assignment(cost)
+            pairs = zip(rows.tolist(), cols.tolist())
+        else:
+            pairs = _greedy_assignment(cost)
+
+        matches = [(row, col) for row, col in pairs if cost[row, col] <= self.max_cost]
+        matched_tracks = {row for row, _ in matches}
+        matched_detections = {col for _, col in matches}
+        unmatched_tracks = [i for i in range(len(self.tracks)) if i not in matched_tracks]
+        unmatched_detections = [j for j in range(len(detections)) if j not in matched_detections]
+        return matches, unmatched_tracks, unmatched_detections
+
+    def _cost_matrix(self, detections, timestamp):
+        """
+        İz x tespit maliyeti: IoU > 0 ise 1 - IoU, değilse 1 + merkez uzaklığı / kapı; kapı dışı olanaksız.
+        İzler tespitlerin ait olduğu ana (timestamp) kestirilerek karşılaştırılır.
+        """
+        track_states = np.array([track.box_at(timestamp) for track in self.tracks], dtype=np.float64)
+        track_boxes = _cxcywh_to_xyxy(track_states)
+        detection_boxes = detections.xyxy.astype(np.float64)
+
+        iou = box_iou(track_boxes, detection_boxes)
+        track_centers = track_states[:, :2]
+        detection_centers = (detection_boxes[:, :2] + detection_boxes[:, 2:]) / 2.0
+        distance = np.linalg.norm(track_centers[:, None, :] - detection_centers[None, :, :], axis=2)
+
+        cost = np.where(iou > 0.0, 1.0 - iou, 1.0 + distance / self.max_distance)
+        cost[(iou <= 0.0) & (distance > self.max_distance)] = _INFEASIBLE_COST
+        if self.class_aware:
+            track_classes = np.array([track.class_id for track in self.tracks])
+            cost[track_classes[:, None] != detections.class_ids[None, :]] = _INFEASIBLE_COST
+        return cost
+
+
+def box_iou(boxes_a, boxes_b):
+    """(N, 4) ve (M, 4) x1y1x2y2 kutular arasında (N, M) IoU matrisi."""
+    top_left = np.maximum(boxes_a[:, None, :2], boxes_b[None, :, :2])
+    bottom_right = np.minimum(boxes_a[:, None, 2:], boxes_b[None, :, 2:])
+    intersection = np.prod(np.clip(bottom_right - top_left, 0.0, None), axis=2)
+    area_a = np.prod(boxes_a[:, 2:] - boxes_a[:, :2], axis=1)
+    area_b = np.prod(boxes_b[:, 2:] - boxes_b[:, :2], axis=1)
+    union = area_a[:, None] + area_b[None, :] - intersection
+    return np.where(union > 0.0, intersection / np.maximum(union, 1e-9), 0.0)
+
+
+def _greedy_assignment(cost):
+    """scipy yoksa: en düşük maliyetten başlayarak satır ve sütunu bir kez kullanan eşleştirme."""
+    pairs = []
+    used_rows, used_cols = set(), set()
+    for flat_index in np.argsort(cost, axis=None):
+        row, col = np.unravel_index(flat_index, cost.shape)
+        if row in used_rows or col in used_cols:
+            continue
+        if cost[row, col] >= _INFEASIBLE_COST:
+            break
+        pairs.append((int(row), int(col)))
+        used_rows.add(row)
+        used_cols.add(col)
+    return pairs
+
+
+def _cxcywh_to_xyxy(boxes):
+    boxes = boxes.reshape(-1, 4)
+    top_left = boxes[:, :2] - boxes[:, 2:] / 2.0
+    return np.hstack([top_left, top_left + boxes[:, 2:]])
+
+
+def _bbox_to_measurement(bbox):
+    x, y, w, h = bbox
+    return np.array([x + w / 2.0, y + h / 2.0, float(w), float(h)])
+
+
+def _measurement_std(measurement):
+    w, h = measurement[2], measurement[3]
+    return np.maximum(MOT_MEASUREMENT_STD_RATIO * np.array([w, h, w, h]), MOT_MEASUREMENT_STD_MIN)
+
+
+def _center_in_region(box, region):
+    x0, y0, x1, y1 = region
+    cx, cy = box[0], box[1]
+    return x0 <= cx < x1 and y0 <= cy < y1
@@ -0,0 +1,308 @@
+# ort_backend.py
+# TensorRT olmayan makineler için ONNX Runtime çıkarım arka ucu. Giriş ve çıkışlar önceden ayrılmış OrtValue'lara
+# IO binding ile bağlanır; kare başına ayırma ve fazladan kopya yapılmaz. CUDA sağlayıcısında sabit şekilli
+# modeller CUDA grafiği olarak yakalanır (çekirdek başlatma yükü tek bir grafik başlatmaya iner). Graf
+# optimizasyonu sonucu optimized_model_filepath ile önbelleğe yazılır ve sonraki açılışlarda yeniden yapılmaz.
+#
+# Kıyaslama: python ort_backend.py best.onnx
+
+import argparse
+import hashlib
+import os
+import time
+import traceback
+
+import numpy as np
+import onnxruntime as ort
+
+import engine_cache  # ONNX içerik özeti ve önbellek dizini
+
+# Optimize edilmiş ONNX modellerinin saklanacağı dizin (motor önbelleğinin altında)
+ORT_OPTIMIZED_MODEL_DIR = os.path.join(engine_cache.ENGINE_CACHE_DIR, "ort")
+
+# Oturum sağlayıcıları (bkz. create_session)
+PROVIDER_CPU = "cpu"
+PROVIDER_CUDA = "cuda"
+PROVIDER_TENSORRT = "tensorrt"  # ONNX Runtime TensorRT sağlayıcısı (yerel TensorRT motorundan ayrı)
+
+# ONNX Runtime TensorRT sağlayıcısının kendi motor önbelleği (model başına bir alt dizin, bkz. ort_trt_cache_dir)
+ORT_TRT_ENGINE_CACHE_DIR = os.path.join(engine_cache.ENGINE_CACHE_DIR, "ort_trt")
+
+# Sabit şekilli modelde CUDA grafiği yakalansın mı (tüm düğümler CUDA sağlayıcısında değilse kendiliğinden kapanır)
+ORT_ENABLE_CUDA_GRAPH = True
+
+# CPU sağlayıcısı iş parçacıkları. None: kullanılabilir çekirdek sayısının bir eksiği (bir çekirdek arayüz ve
+# kamera için kalır). Tek bir model sıralı çalıştığından operatörler arası paralellik kapalıdır.
+ORT_INTRA_OP_THREADS = None
+ORT_INTER_OP_THREADS = 1
+# Bekleyen iş parçacıkları döngüde beklesin mi (gecikme düşer, ancak boşta CPU tüketir)
+ORT_ALLOW_SPINNING = True
+
+
+def available_cpu_count():
+    """Bu işlemin kullanabileceği mantıksal çekirdek sayısı."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def cpu_thread_count():
+    """CPU sağlayıcısı için varsayılan operatör içi iş parçacığı sayısı."""
+    if ORT_INTRA_OP_THREADS is not None:
+        return ORT_INTRA_OP_THREADS
+    return max(1, available_cpu_count() - 1)
+
+
+def ort_trt_cache_dir(onnx_path):
+    """Modelin ONNX Runtime TensorRT motor önbelleği dizini (ONNX içerik özetine göre)."""
+    return os.path.join(ORT_TRT_ENGINE_CACHE_DIR, engine_cache.onnx_content_hash(onnx_path)[:16])
+
+
+def ort_trt_cache_warm(onnx_path):
+    """Model için ONNX Runtime TensorRT motoru daha önce derlenip önbelleğe yazılmış mı."""
+    try:
+        return any(name.endswith(".engine") for name in os.listdir(ort_trt_cache_dir(onnx_path)))
+    except OSError:
+        return False
+
+
+def get_optimized_model_path(onnx_path, providers):
+    """
+    Optimize edilmiş modelin önbellek yolunu döndürür. Anahtar; ONNX içerik özeti, ONNX Runtime sürümü ve
+    sağlayıcılardan oluşur (CPU'da optimize edilmiş graf donanıma özgü düğümler içerebilir).
+    """
+    provider_names = [provider[0] if isinstance(provider, tuple) else provider for provider in providers]
+    key = f"{engine_cache.onnx_content_hash(onnx_path)}|{ort.__version__}|{','.join(provider_names)}"
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+    base_name = os.path.splitext(os.path.basename(onnx_path))[0]
+    return os.path.join(ORT_OPTIMIZED_MODEL_DIR, f"{base_name}_{digest}.onnx")
+
+
+def create_session(onnx_path, provider=PROVIDER_CPU, threads=None, cuda_graph=False):
+    """
+    Ayarlanmış bir InferenceSession oluşturur. Optimize edilmiş model önbellekteyse doğrudan o yüklenir;
+    değilse optimizasyon yapılıp sonuç önbelleğe yazılır.
+    :param provider: PROVIDER_CPU, PROVIDER_CUDA veya PROVIDER_TENSORRT.
+    :param threads: CPU sağlayıcısı operatör içi iş parçacığı sayısı (None: cpu_thread_count()).
+    :return: (oturum, CUDA grafiği etkin mi)
+    """
+    providers = []
+    if provider == PROVIDER_TENSORRT:
+        trt_cache_dir = ort_trt_cache_dir(onnx_path)
+        os.makedirs(trt_cache_dir, exist_ok=True)
+        providers.append(("TensorrtExecutionProvider", {
+            "device_id": 0,
+            "trt_fp16_enable": True,
+            "trt_engine_cache_enable": True,
+            "trt_engine_cache_path": trt_cache_dir,
+        }))
+    if provider in (PROVIDER_CUDA, PROVIDER_TENSORRT):
+        providers.append(("CUDAExecutionProvider", {
+            "device_id": 0,  # Kullanılacak GPU kimliği (genellikle 0)
+            "arena_extend_strategy": "kNextPowerOfTwo",
+            "cudnn_conv_algo_search": "EXHAUSTIVE",
+            "do_copy_in_default_stream": True,
+            "enable_cuda_graph": cuda_graph,
+        }))
+    providers.append("CPUExecutionProvider")  # Her zaman CPU'yu yedek olarak ekle
+
+    sess_options = ort.SessionOptions()
+    sess_options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    sess_options.inter_op_num_threads = ORT_INTER_OP_THREADS
+    if provider == PROVIDER_CPU:
+        sess_options.intra_op_num_threads = threads if threads is not None else cpu_thread_count()
+    sess_options.add_session_config_entry("session.intra_op.allow_spinning", "1" if ORT_ALLOW_SPINNING else "0")
+
+    model_path = onnx_path
+    optimized_path = None
+    if provider != PROVIDER_TENSORRT:  # TensorRT'ye derlenmiş düğümler ONNX olarak kaydedilemez
+        try:
+            optimized_path = get_optimized_model_path(onnx_path, providers)
+        except OSError as e:
+            print(f"UYARI (ort_backend): Optimize model önbellek anahtarı hesaplanamadı: {e}")
+    if optimized_path is not None and os.path.exists(optimized_path):
+        model_path = optimized_path
+        sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+        print(f"HATA AYIKLAMA (ort_backend): Önbellekteki optimize model kullanılıyor: {optimized_path}")
+    else:
+        sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if optimized_path is not None:
+            os.makedirs(ORT_OPTIMIZED_MODEL_DIR, exist_ok=True)
+            sess_options.optimized_model_filepath = optimized_path
+
+    try:
+        session = ort.InferenceSession(model_path, sess_options=sess_options, providers=providers)
+    except Exception as e:
+        if cuda_graph:
+            # Genellikle bazı düğümler CPU sağlayıcısına düştüğünde olur; grafiksiz yeniden dene
+            print(f"UYARI (ort_backend): CUDA grafiği ile oturum oluşturulamadı, grafiksiz denenecek: {e}")
+            return create_session(onnx_path, provider, threads, cuda_graph=False)
+        if model_path != onnx_path:
+            # Önbellekteki dosya bozuk olabilir; silip özgün modelden yeniden oluştur
+            print(f"UYARI (ort_backend): Önbellekteki optimize model yüklenemedi, siliniyor: {e}")
+            os.remove(model_path)
+            return create_session(onnx_path, provider, threads, cuda_graph)
+        raise
+    return session, cuda_graph
+
+
+# ONNX Runtime tensör türü -> numpy türü (çıkışlar NMS'li modellerde tamsayı olabilir)
+_ORT_TYPE_TO_NUMPY = {
+    "tensor(float)": np.float32,
+    "tensor(float16)": np.float16,
+    "tensor(int32)": np.int32,
+    "tensor(int64)": np.int64,
+}
+
+
+def is_static_shape(shape):
+    return all(isinstance(dim, int) and dim > 0 for dim in shape)
+
+
+class _ShapeBinding:
+    """Belirli bir giriş şekli için önceden ayrılmış giriş/çıkış OrtValue'ları ve bunlara bağlı IO binding."""
+
+    def __init__(self, session, input_name, output_names, input_shape, device, output_shapes, output_dtypes,
+                 outputs_on_device):
+        self.io_binding = session.io_binding()
+        self.device = device
+        if device == "cpu":
+            # CPU'da OrtValue numpy dizisinin belleğini paylaşır: girişe np.copyto yeterlidir
+            self.input_array = np.zeros(input_shape, dtype=np.float32)
+            self.input_value = ort.OrtValue.ortvalue_from_numpy(self.input_array)
+        else:
+            self.input_array = None
+            self.input_value = ort.OrtValue.ortvalue_from_shape_and_type(input_shape, np.float32, device, 0)
+        self.io_binding.bind_ortvalue_input(input_name, self.input_value)
+
+        self.output_arrays = []
+        self.output_values = []
+        for name, shape, dtype in zip(output_names, output_shapes, output_dtypes):
+            if outputs_on_device:
+                # CUDA grafiği tüm giriş/çıkışların sabit cihaz adreslerinde olmasını ister
+                value = ort.OrtValue.ortvalue_from_shape_and_type(shape, dtype, device, 0)
+            else:
+                # Çıkış doğrudan bu numpy dizisine yazılır (CUDA'da cihazdan kopyalanarak)
+                array = np.zeros(shape, dtype=dtype)
+                self.output_arrays.append(array)
+                value = ort.OrtValue.ortvalue_from_numpy(array)
+            self.output_values.append(value)
+            self.io_binding.bind_ortvalue_output(name, value)
+
+    def set_input(self, input_image):
+        if self.input_array is not None:
+            np.copyto(self.input_array, input_image)
+        else:
+            self.input_value.update_inplace(np.ascontiguousarray(input_image, dtype=np.float32))
+
+    def read_outputs(self):
+        if self.output_arrays:
+            return self.output_arrays
+        return [value.numpy() for value in self.output_values]
+
+
+class OrtIoBindingRunner:
+    """
+    ONNX Runtime oturumunu IO binding ile çalıştırır. Her giriş şekli için bağlama bir kez oluşturulur
+    (dinamik modellerde boyut/toplu değişimi yeniden ayırma gerektirmez). Dönen çıkış dizileri bir sonraki
+    çağrıda üzerine yazılır.
+    """
+
+    def __init__(self, session, cuda_graph=False):
+        self.session = session
+        self.input_name = session.get_inputs()[0].name
+        self.output_names = [output.name for output in session.get_outputs()]
+        self.declared_output_shapes = [output.shape for output in session.get_outputs()]
+        self.output_dtypes = [_ORT_TYPE_TO_NUMPY.get(output.type, np.float32) for output in session.get_outputs()]
+        self.uses_cuda = any(name in session.get_providers()
+                             for name in ("CUDAExecutionProvider", "TensorrtExecutionProvider"))
+        self.device = "cuda" if self.uses_cuda else "cpu"
+        self.cuda_graph = cuda_graph
+        self._bindings = {}  # giriş şekli -> _ShapeBinding
+
+    def run(self, input_image):
+        """
+        :param input_image: (B, 3, H, W) float32 giriş.
+        :return: Çıkış numpy dizilerinin listesi.
+        """
+        binding = self._binding_for(tuple(input_image.shape))
+        binding.set_input(input_image)
+        self.session.run_with_iobinding(binding.io_binding)
+        return binding.read_outputs()
+
+    def _binding_for(self, input_shape):
+        binding = self._bindings.get(input_shape)
+        if binding is None:
+            binding = _ShapeBinding(self.session, self.input_name, self.output_names, input_shape, self.device,
+                                    self._output_shapes(input_shape), self.output_dtypes, self.cuda_graph)
+            self._bindings[input_shape] = binding
+        return binding
+
+    def _output_shapes(self, input_shape):
+        if all(is_static_shape(shape) for shape in self.declared_output_shapes):
+            return self.declared_output_shapes
+        # Dinamik çıkış şekilleri bu giriş şekliyle bir kez çalıştırılarak öğrenilir
+        outputs = self.session.run(self.output_names, {self.input_name: np.zeros(input_shape, dtype=np.float32)})
+        return [output.shape for output in outputs]
+
+
+def create_runner(onnx_path, provider=PROVIDER_CPU, threads=None):
+    """
+    Oturumu ve IO binding çalıştırıcısını oluşturur. CUDA grafiği yalnızca CUDA sağlayıcısında ve giriş şekli
+    tamamen sabit olan modellerde denenir (yakalanan graf tek bir şekle bağlıdır).
+    :return: (oturum, OrtIoBindingRunner)
+    """
+    cuda_graph = False
+    if provider == PROVIDER_CUDA and ORT_ENABLE_CUDA_GRAPH:
+        probe_options = ort.SessionOptions()
+        probe_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+        probe = ort.InferenceSession(onnx_path, sess_options=probe_options, providers=["CPUExecutionProvider"])
+        cuda_graph = is_static_shape(probe.get_inputs()[0].shape)
+        del probe
+    session, cuda_graph = create_session(onnx_path, provider, threads, cuda_graph)
+    runner = OrtIoBindingRunner(session, cuda_graph)
+    thread_note = f", {threads or cpu_thread_count()} iş parçacığı" if provider == PROVIDER_CPU else ""
+    print(f"HATA AYIKLAMA (ort_backend): IO binding etkin ({provider}"
+          f"{', CUDA grafiği' if cuda_graph else ''}{thread_note}).")
+    return session, runner
+
+
+def _benchmark():
+    parser = argparse.ArgumentParser(description="ONNX Runtime: session.run ve IO binding gecikme kıyaslaması")
+    parser.add_argument("model", help=".onnx model yolu")
+    parser.add_argument("--cpu", action="store_true", help="CUDA sağlayıcısı olsa bile CPU kullan")
+    parser.add_argument("--iterations", type=int, default=100)
+    args = parser.parse_args()
+
+    use_cuda = not args.cpu and "CUDAExecutionProvider" in ort.get_available_providers()
+    plain = ort.InferenceSession(args.model, providers=["CUDAExecutionProvider", "CPUExecutionProvider"]
+                                 if use_cuda else ["CPUExecutionProvider"])
+    _, runner = create_runner(args.model, PROVIDER_CUDA if use_cuda else PROVIDER_CPU)
+    shape = [dim if isinstance(dim, int) and dim > 0 else 1 for dim in plain.get_inputs()[0].shape]
+    if not is_static_shape(plain.get_inputs()[0].shape):
+        shape[2:] = [640, 640]
+    input_name = plain.get_inputs()[0].name
+
+    def run_plain():
+        plain.run(None, {input_name: np.random.rand(*shape).astype(np.float32)})
+
+    def run_bound():
+        runner.run(np.random.rand(*shape).astype(np.float32))
+
+    for name, fn in (("session.run", run_plain), ("IO binding", run_bound)):
+        for _ in range(5):
+            fn()  # ısıtma (CUDA grafiği yakalama dahil)
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            fn()
+        elapsed = (time.perf_counter() - start) / args.iterations
+        print(f"{name:<12} {elapsed * 1000.0:8.2f} ms/kare")
+
+
+if __name__ == "__main__":
+    try:
+        _benchmark()
+    except Exception as e:
+        print(f"HATA (ort_backend): {e}")
+        traceback.print_exc()
@@ -1,14 +1,21 @@
 # renk_kalibrasyon.py
+import argparse
+
 import cv2
 import numpy as np
 
+import frame_source  # Canlı kamera yerine video dosyası / görüntü klasörü / kayıt tekrarı
+
 # Trackbar'lar için boş bir fonksiyon
 def nothing(x):
     pass
 
 # --- Kamera Ayarları ---
-# Kamerayı başlat
-cap = cv2.VideoCapture(0)
+# Kamerayı başlat. --source verilirse kayıt üzerinde kalibrasyon yapılır (örn. --source kayit.mp4 --loop)
+parser = argparse.ArgumentParser(description="HSV renk kalibrasyon aracı")
+frame_source.add_source_arguments(parser)
+args = parser.parse_args()
+cap = cv2.VideoCapture(0) if args.source is None else frame_source.open_source_from_args(args)
 # Otomatik ayarları kapatmak, renklerin daha stabil kalmasını sağlar
 cap.set(cv2.CAP_PROP_AUTO_WB, 0) # Otomatik Beyaz Dengesini Kapat
 cap.set(cv2.CAP_PROP_AUTO_EXPOSURE, 0.25) # Otomatik Pozlamayı Manuel Moda Al
@@ -40,7 +47,10 @@ while True:
     # Kameradan bir kare oku
     ret, frame = cap.read()
     if not ret:
-        print("Kamera okunamadı, program sonlandırılıyor.")
+        if getattr(cap, "ended", False):
+            print("Kaynak sona erdi, program sonlandırılıyor. (Tekrar için --loop)")
+        else:
+            print("Kamera okunamadı, program sonlandırılıyor.")
         break
 
     # Görüntüyü BGR'dan HSV renk uzayına çevir
@@ -0,0 +1,71 @@
+# roi_detection.py
+# Kilitli hedef varken dedektörü tüm kare yerine, hedefin tahmini konumu etrafındaki doğal çözünürlüklü bir
+# kırpıntı (ROI) üzerinde çalıştırmaya karar verir. Kırpıntı kenarı modelin giriş boyutlarından biri seçildiği için
+# letterbox ölçeği 1 olur: uzaktaki küçük balonlar piksel kaybetmez ve boş gökyüzüne GPU zamanı harcanmaz.
+# Hedef kaybolmaya başladığında (missing_frames artınca) veya her N karede bir tam kare taranır.
+
+# Her bu kadar ROI karesinden sonra bir tam kare taraması yapılır (yeni hedefleri ve kaçan hedefi yakalamak için)
+FULL_FRAME_REFRESH_INTERVAL = 10
+# ROI, hedef kutusunun en uzun kenarının bu katı kadar bağlam içerir
+ROI_BBOX_MARGIN = 3.0
+# ROI'nin en az bu kadar piksel olması istenir (çok küçük hedeflerde yeterli bağlam için)
+ROI_MIN_SIDE = 160
+
+
+class RoiScheduler:
+    """Kare başına tam kare mi yoksa ROI mi çalıştırılacağına karar verir ve ROI'yi hesaplar."""
+
+    def __init__(self, refresh_interval=FULL_FRAME_REFRESH_INTERVAL, bbox_margin=ROI_BBOX_MARGIN,
+                 min_side=ROI_MIN_SIDE):
+        self.refresh_interval = refresh_interval
+        self.bbox_margin = bbox_margin
+        self.min_side = min_side
+        self.frames_since_full = 0
+        self.last_missing_frames = 0
+        self.last_roi = None
+
+    def reset(self):
+        """Kilit bırakıldığında çağrılır; bir sonraki kilitte ilk kare tam kare olur."""
+        self.frames_since_full = 0
+        self.last_missing_frames = 0
+        self.last_roi = None
+
+    def plan(self, frame_width, frame_height, bbox, velocity, lookahead, missing_frames, input_sizes):
+        """
+        Bu kare için dedektör bölgesini seçer.
+        :param bbox: Kilitli hedefin son kutusu (x, y, w, h); None ise tam kare.
+        :param velocity: Hedef hızı (vx, vy), piksel/saniye.
+        :param lookahead: Tahmin süresi (saniye), genellikle son kareden bu yana geçen süre.
+        :param missing_frames: Hedefin ardışık kaç karedir bulunamadığı.
+        :param input_sizes: Modelin desteklediği kare giriş boyutları.
+        :return: (roi, giriş_boyutu). roi (x0, y0, x1, y1) veya tam kare için None.
+        """
+        missing_rising = missing_frames > self.last_missing_frames
+        self.last_missing_frames = missing_frames
+        if bbox is None or missing_rising or self.frames_since_full >= self.refresh_interval:
+            return self._full_frame()
+
+        x, y, w, h = bbox
+        vx, vy = velocity
+        # Hedefin bu karedeki tahmini merkezi ve hareket payı dahil gerekli kenar uzunluğu
+        center_x = x + w / 2 + vx * lookahead
+        center_y = y + h / 2 + vy * lookahead
+        needed_side = max(max(w, h) * self.bbox_margin + 2 * max(abs(vx), abs(vy)) * lookahead, self.min_side)
+
+        # Doğal çözünürlük için kenar = modelin bir giriş boyutu (ölçek 1); kareye sığmalı
+        fitting_sizes = [size for size in sorted(input_sizes)
+                         if size >= needed_side and size <= min(frame_width, frame_height)]
+        if not fitting_sizes:
+            return self._full_frame()
+        side = fitting_sizes[0]
+
+        x0 = int(min(max(center_x - side / 2, 0), frame_width - side))
+        y0 = int(min(max(center_y - side / 2, 0), frame_height - side))
+        self.frames_since_full += 1
+        self.last_roi = (x0, y0, x0 + side, y0 + side)
+        return self.last_roi, side
+
+    def _full_frame(self):
+        self.frames_since_full = 0
+        self.last_roi = None
+        return None, None
@@ -0,0 +1,219 @@
+# scene_activity.py
+# Sahne etkinliği kapısı: hedef kilitli değilken dedektörün her karede çalışıp çalışmayacağına karar verir.
+# Kare, küçük gri bir küçük resme (varsayılan 96 piksel genişlik) indirilir ve yavaş güncellenen bir arka plan
+# ortalamasıyla karşılaştırılır. Değişen piksellerin oranı hareket skorudur:
+#   - Skor etkinleşme eşiğini aşarsa sahne "etkin" olur. Değişim küçük bir bölgedeyse yalnızca o bölgede (ROI),
+#     geniş bir alandaysa tam karede çıkarım yapılır.
+#   - Skor bırakma eşiğinin altında IDLE_HOLD_FRAMES kare kalınca sahne "durgun" olur (histerezis: eşik
+#     çevresindeki gürültü kararı her karede değiştirmez) ve çıkarım atlanır.
+#   - Durgun sahnede de en geç max_skip karede bir tam kare çıkarımı yapılır; duran veya küçük resimde
+#     görünmeyecek kadar uzak hedefler bu yenilemeyle bulunur.
+#   - Taret dönerken (ego-hareket kayması) tüm sahne değiştiğinden tam kare çalışılır ve arka plan yeniden kurulur.
+#
+# Ayar: python scene_activity.py klip1.mp4 [klip2/ ...] [--max-skip 10]
+#   Her klip için tam / ROI / atlanan kare oranlarını ve kapının kare başına süresini yazdırır.
+
+import argparse
+import time
+import traceback
+
+import cv2
+import numpy as np
+
+# Kapı kararları
+GATE_FULL = "full"
+GATE_ROI = "roi"
+GATE_SKIP = "skip"
+
+# Küçük resim genişliği (piksel); yükseklik en-boy oranından
+ACTIVITY_THUMBNAIL_WIDTH = 96
+# Arka plan ortalamasının öğrenme katsayısı (cv2.accumulateWeighted)
+ACTIVITY_BACKGROUND_ALPHA = 0.05
+# Bir küçük resim pikselinin "değişmiş" sayılması için arka plandan en az gri düzey farkı
+ACTIVITY_PIXEL_THRESHOLD = 15
+# Histerezis: değişen piksel oranı bunu aşınca sahne etkin olur, ikincisinin altında kalınca durgunluk sayacı
+# ilerler. 96x54 küçük resimde 0.0004 ~2 piksel: uzaktaki tek bir balon bile sahneyi etkinleştirebilir
+ACTIVITY_ON_THRESHOLD = 0.0004
+ACTIVITY_OFF_THRESHOLD = 0.0002
+IDLE_HOLD_FRAMES = 5
+# Durgun sahnede en fazla bu kadar kare art arda atlanır
+ACTIVITY_MAX_SKIP_FRAMES = 10
+# Değişim kutusu karenin bu oranından büyükse ROI yerine tam kare çalışılır
+ACTIVITY_ROI_MAX_AREA = 0.25
+# ROI, değişim kutusunun uzun kenarının bu katı kadar bağlam içerir
+ACTIVITY_ROI_MARGIN = 2.0
+# Bundan büyük ego-hareket kayması (tam kare pikseli) taret dönüşü sayılır
+ACTIVITY_EGO_SHIFT_PIXELS = 2.0
+
+
+class ActivityGate:
+    """
+    Kare başına çıkarım kararı (GATE_FULL, GATE_ROI, GATE_SKIP) verir.
+    :param on_threshold: Sahnenin etkinleşmesi için değişen piksel oranı.
+    :param off_threshold: Durgunluk sayacının ilerlemesi için bu oranın altında kalınmalı (on_threshold'dan küçük).
+    :param hold_frames: Durgun sayılmadan önce eşik altında geçmesi gereken kare sayısı.
+    :param max_skip: Durgun sahnede art arda atlanabilecek en fazla kare (0: hiç atlanmaz).
+    """
+
+    def __init__(self, on_threshold=ACTIVITY_ON_THRESHOLD, off_threshold=ACTIVITY_OFF_THRESHOLD,
+                 hold_frames=IDLE_HOLD_FRAMES, max_skip=ACTIVITY_MAX_SKIP_FRAMES,
+                 thumbnail_width=ACTIVITY_THUMBNAIL_WIDTH, pixel_threshold=ACTIVITY_PIXEL_THRESHOLD,
+                 background_alpha=ACTIVITY_BACKGROUND_ALPHA):
+        self.on_threshold = on_threshold
+        self.off_threshold = off_threshold
+        self.hold_frames = hold_frames
+        self.max_skip = max_skip
+        self.thumbnail_width = thumbnail_width
+        self.pixel_threshold = pixel_threshold
+        self.background_alpha = background_alpha
+        self.active = True  # Başlangıçta etkin: ilk karelerde tam tarama yapılır
+        self.score = 0.0
+        self.motion_box = None  # Son değişim kutusu (x0, y0, x1, y1), tam kare koordinatlarında
+        self.counts = {GATE_FULL: 0, GATE_ROI: 0, GATE_SKIP: 0}
+        self._quiet_frames = 0
+        self._skipped = 0
+        self._full_requested = False
+        self._background = None
+        self._diff = None
+        self._mask = None
+
+    def reset(self):
+        """Kaynak veya görev değiştiğinde: arka plan yeniden kurulur, sahne etkin başlar."""
+        self.active = True
+        self.score = 0.0
+        self.motion_box = None
+        self._quiet_frames = 0
+        self._skipped = 0
+        self._full_requested = False
+        self._background = None
+
+    def request_full(self):
+        """Bir sonraki karede kararı ne olursa olsun tam kare çıkarım yaptırır (örn. QR okunduğunda)."""
+        self._full_requested = True
+
+    def decide(self, frame, shift=None, input_sizes=None):
+        """
+        Bu kare için çıkarım kararı.
+        :param frame: BGR kare.
+        :param shift: Bu karedeki ego-hareket kayması (dx, dy); None ise taret hareketi bilinmiyor.
+        :param input_sizes: Modelin kare giriş boyutları; ROI kenarı bunlardan biri seçilir (ölçek 1). None ise
+            ROI kararı verilmez.
+        :return: (karar, roi, giriş_boyutu). roi (x0, y0, x1, y1) yalnızca GATE_ROI için, diğerlerinde None.
+        """
+        frame_height, frame_width = frame.shape[:2]
+        turret_moving = shift is not None and np.hypot(shift[0], shift[1]) > ACTIVITY_EGO_SHIFT_PIXELS
+        self.score = self._update_score(frame, turret_moving)
+
+        if self.score >= self.on_threshold or turret_moving:
+            self.active = True
+            self._quiet_frames = 0
+        elif self.score < self.off_threshold:
+            self._quiet_frames += 1
+            if self._quiet_frames >= self.hold_frames:
+                self.active = False
+        else:
+            self._quiet_frames = 0
+
+        if self._full_requested or turret_moving:
+            decision, roi, input_size = GATE_FULL, None, None
+        elif not self.active:
+            if self._skipped < self.max_skip:
+                self._skipped += 1
+                self.counts[GATE_SKIP] += 1
+                return GATE_SKIP, None, None
+            decision, roi, input_size = GATE_FULL, None, None
+        else:
+            roi, input_size = self._motion_roi(frame_width, frame_height, input_sizes)
+            decision = GATE_ROI if roi is not None else GATE_FULL
+        self._full_requested = False
+        self._skipped = 0
+        self.counts[decision] += 1
+        return decision, roi, input_size
+
+    def _update_score(self, frame, reset_background):
+        """Küçük resmi arka planla karşılaştırır, değişim kutusunu günceller; değişen piksel oranını döndürür."""
+        frame_height, frame_width = frame.shape[:2]
+        scale = min(1.0, self.thumbnail_width / float(frame_width))
+        size = (max(int(frame_width * scale), 1), max(int(frame_height * scale), 1))
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        thumbnail = cv2.resize(gray, size, interpolation=cv2.INTER_AREA).astype(np.float32)
+
+        if reset_background or self._background is None or self._background.shape != thumbnail.shape:
+            self._background = thumbnail
+            self._diff = np.empty_like(thumbnail)
+            self._mask = np.empty(thumbnail.shape, dtype=bool)
+            self.motion_box = None
+            return 0.0
+
+        cv2.absdiff(thumbnail, self._background, self._diff)
+        np.greater(self._diff, self.pixel_threshold, out=self._mask)
+        cv2.accumulateWeighted(thumbnail, self._background, self.background_alpha)
+
+        changed = np.count_nonzero(self._mask)
+        if not changed:
+            self.motion_box = None
+            return 0.0
+        rows = np.flatnonzero(self._mask.any(axis=1))
+        columns = np.flatnonzero(self._mask.any(axis=0))
+        inverse = 1.0 / scale
+        self.motion_box = (int(columns[0] * inverse), int(rows[0] * inverse),
+                           int((columns[-1] + 1) * inverse), int((rows[-1] + 1) * inverse))
+        return changed / float(self._mask.size)
+
+    def _motion_roi(self, frame_width, frame_height, input_sizes):
+        """Değişim kutusunu kapsayan, kenarı bir model giriş boyutu olan kare ROI; uygun değilse (None, None)."""
+        if self.motion_box is None or not input_sizes:
+            return None, None
+        x0, y0, x1, y1 = self.motion_box
+        if (x1 - x0) * (y1 - y0) > ACTIVITY_ROI_MAX_AREA * frame_width * frame_height:
+            return None, None
+        needed_side = max(x1 - x0, y1 - y0) * ACTIVITY_ROI_MARGIN
+        fitting_sizes = [size for size in sorted(input_sizes)
+                         if needed_side <= size <= min(frame_width, frame_height)]
+        if not fitting_sizes:
+            return None, None
+        side = fitting_sizes[0]
+        left = int(min(max((x0 + x1) / 2 - side / 2, 0), frame_width - side))
+        top = int(min(max((y0 + y1) / 2 - side / 2, 0), frame_height - side))
+        return (left, top, left + side, top + side), side
+
+
+def _run_report(args):
+    import frame_source
+
+    print(f"{'klip':<28} {'kare':>6} {'tam':>6} {'ROI':>6} {'atlanan':>8} {'ms/kare':>8}")
+    for clip in args.clips:
+        gate = ActivityGate(max_skip=args.max_skip, thumbnail_width=args.width)
+        source = frame_source.open_source(clip, replay=frame_source.REPLAY_FAST)
+        frames, elapsed = 0, 0.0
+        try:
+            while True:
+                ok, frame = source.read()
+                if not ok:
+                    break
+                start = time.perf_counter()
+                gate.decide(frame, input_sizes=args.input_sizes)
+                elapsed += time.perf_counter() - start
+                frames += 1
+        finally:
+            source.release()
+        if not frames:
+            print(f"{clip[-28:]:<28} kare okunamadı")
+            continue
+        print(f"{clip[-28:]:<28} {frames:>6} {gate.counts[GATE_FULL] / frames:>6.0%} "
+              f"{gate.counts[GATE_ROI] / frames:>6.0%} {gate.counts[GATE_SKIP] / frames:>8.0%} "
+              f"{1000.0 * elapsed / frames:>8.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sahne etkinliği kapısının kararlarını kayıtlarda özetler")
+    parser.add_argument("clips", nargs="+", help="Video dosyaları veya görüntü klasörleri")
+    parser.add_argument("--max-skip", type=int, default=ACTIVITY_MAX_SKIP_FRAMES)
+    parser.add_argument("--width", type=int, default=ACTIVITY_THUMBNAIL_WIDTH, help="Küçük resim genişliği")
+    parser.add_argument("--input-sizes", type=int, nargs="*", default=[320, 480, 640],
+                        help="ROI kenarı için model giriş boyutları")
+    try:
+        _run_report(parser.parse_args())
+    except Exception as e:
+        print(f"HATA (scene_activity): {e}")
+        traceback.print_exc()
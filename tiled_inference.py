@@ -0,0 +1,168 @@
+# tiled_inference.py
+# Yüksek çözünürlüklü karede küçük hedefler için döşemeli (tiled) tespit. Kare, birbiriyle örtüşen doğal
+# çözünürlüklü döşemelere (örn. 640x640) bölünür ve tüm döşemeler tek bir toplu TensorRT/ONNX Runtime çağrısıyla
+# çalıştırılır. Döşeme sonuçları kare koordinatlarına taşınıp döşemeler arası sınıf bazlı NMS ile birleştirilir.
+# Döşeme düzeni her kamera çözünürlüğü için bir kez hesaplanır. Model tüm döşemeleri tek çağrıda alamıyorsa
+# (statik, toplu boyutu 1 olan dışa aktarım) döşemeli yol kullanılmaz; döşeme başına sıralı çağrı tek görüntülü
+# yoldan kat kat yavaştır.
+#
+# Kıyaslama: python tiled_inference.py best.onnx --width 1280 --height 720
+
+import argparse
+import math
+import time
+
+import numpy as np
+
+from yolo_postprocess import DET_X1, DET_Y1, DET_X2, DET_Y2, nms_detections
+
+# Döşemeler arası en az örtüşme (piksel). Bu boyuttan küçük bir hedef en az bir döşemede bütün olarak görünür.
+TILE_MIN_OVERLAP = 64
+
+
+def compute_tile_layout(frame_width, frame_height, tile_size, min_overlap=TILE_MIN_OVERLAP):
+    """
+    Kareyi kaplayan, en az min_overlap örtüşmeli ve eşit aralıklı döşemelerin sol üst köşelerini döndürür.
+    Kare bir eksende döşemeden küçükse None döner (döşeme gereksiz).
+    """
+    if frame_width < tile_size or frame_height < tile_size:
+        return None
+
+    def axis_origins(length):
+        count = max(1, math.ceil((length - min_overlap) / (tile_size - min_overlap)))
+        if count == 1:
+            return [0]
+        stride = (length - tile_size) / (count - 1)
+        return [int(round(i * stride)) for i in range(count)]
+
+    return [(x0, y0) for y0 in axis_origins(frame_height) for x0 in axis_origins(frame_width)]
+
+
+class TiledDetector:
+    """Döşemeli çıkarımı yürütür; döşeme düzenlerini çözünürlük başına önbelleğe alır."""
+
+    def __init__(self, postprocessor, tile_size=640, min_overlap=TILE_MIN_OVERLAP):
+        self.postprocessor = postprocessor
+        self.tile_size = tile_size
+        self.min_overlap = min_overlap
+        self._layouts = {}  # (genişlik, yükseklik, döşeme boyutu) -> döşeme köşeleri
+        self._batch_warnings = set()  # Toplu boyut yetersizliği uyarısı yazılmış (döşeme sayısı, en büyük toplu)
+
+    def get_layout(self, frame_width, frame_height, tile_size):
+        key = (frame_width, frame_height, tile_size)
+        if key not in self._layouts:
+            self._layouts[key] = compute_tile_layout(frame_width, frame_height, tile_size, self.min_overlap)
+        return self._layouts[key]
+
+    def tile_size_for(self, model):
+        """Model için döşeme boyutu: dinamik modelde tile_size'a en yakın giriş, statik modelde giriş boyutu."""
+        if model.dynamic_input:
+            return model.nearest_input_size(self.tile_size)
+        return model.input_height
+
+    def detect(self, model, frame, allow_sequential=False):
+        """
+        Kareyi döşemelerle tespit eder.
+        :param allow_sequential: True ise döşemeler modelin toplu boyutuna sığmadığında sıralı çağrılarla çalıştırılır
+            (yalnızca kıyaslama için); False ise bu durumda None döner.
+        :return: (K, 6) tespit dizisi (kare koordinatlarında) veya kare döşemeye uygun değilse None.
+        """
+        if not model.dynamic_input and model.input_width != model.input_height:
+            return None  # Kare olmayan statik giriş döşemeye uygun değil
+        frame_height, frame_width = frame.shape[:2]
+        tile_size = self.tile_size_for(model)
+        layout = self.get_layout(frame_width, frame_height, tile_size)
+        if layout is None:
+            return None
+        if model.max_batch < len(layout) and not allow_sequential:
+            warning_key = (len(layout), model.max_batch)
+            if warning_key not in self._batch_warnings:
+                self._batch_warnings.add(warning_key)
+                print(f"UYARI (tiled_inference): Model en fazla {model.max_batch} görüntülük toplu çağrı alıyor, "
+                      f"kare {len(layout)} döşeme gerektiriyor; döşemeli tarama kapalı (tek görüntülü yol). "
+                      f"Dinamik dışa aktarılmış model gerekir.")
+            return None
+
+        tile_results = []
+        for start in range(0, len(layout), max(1, model.max_batch)):
+            origins = layout[start:start + max(1, model.max_batch)]
+            outputs, infos = model.infer_tiles(frame, origins, tile_size)
+            for i, info in enumerate(infos):
+                tile_outputs = [output[i:i + 1] for output in outputs]
+                dets = self.postprocessor.process(tile_outputs, model.output_layout, info)
+                tile_results.append(self._drop_cut_boxes(dets, info, frame_width, frame_height, tile_size))
+        if not tile_results:
+            return None
+        merged = np.concatenate(tile_results)
+        return nms_detections(merged, self.postprocessor.nms_threshold, self.postprocessor.max_det)
+
+    def _drop_cut_boxes(self, dets, info, frame_width, frame_height, tile_size):
+        """
+        Komşu döşemeye bakan (iç) kenara değen küçük kutuları atar: örtüşmeden küçük bir hedef komşu döşemede
+        bütün olarak bulunduğundan, kesik kopyası birleştirmede ayrı bir tespit olarak kalmamalıdır.
+        """
+        margin = 2
+        x0, y0 = info.offset_x, info.offset_y
+        widths = dets[:, DET_X2] - dets[:, DET_X1]
+        heights = dets[:, DET_Y2] - dets[:, DET_Y1]
+        cut = np.zeros(len(dets), dtype=bool)
+        if x0 > 0:
+            cut |= (dets[:, DET_X1] <= x0 + margin) & (widths < self.min_overlap)
+        if x0 + tile_size < frame_width:
+            cut |= (dets[:, DET_X2] >= x0 + tile_size - margin) & (widths < self.min_overlap)
+        if y0 > 0:
+            cut |= (dets[:, DET_Y1] <= y0 + margin) & (heights < self.min_overlap)
+        if y0 + tile_size < frame_height:
+            cut |= (dets[:, DET_Y2] >= y0 + tile_size - margin) & (heights < self.min_overlap)
+        return dets[~cut]
+
+
+def _benchmark():
+    from yolo_models import load_yolo_model
+    from yolo_postprocess import YoloPostprocessor
+
+    parser = argparse.ArgumentParser(description="Döşemeli ve tek görüntülü çıkarım verimi kıyaslaması")
+    parser.add_argument("model", help=".onnx veya .engine (toplu çıkarım için dinamik dışa aktarılmış olmalı)")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--tile-size", type=int, default=640)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    model = load_yolo_model(args.model, use_engine_cache=False)
+    if model is None:
+        return
+    frame = np.random.default_rng(0).integers(0, 255, (args.height, args.width, 3), dtype=np.uint8)
+    postprocessor = YoloPostprocessor(0.4, 0.4)
+    batched = TiledDetector(postprocessor, args.tile_size)
+    tile_size = batched.tile_size_for(model)
+    layout = batched.get_layout(args.width, args.height, tile_size)
+    if layout is None:
+        print("Kare döşeme boyutundan küçük.")
+        return
+    print(f"Kare {args.width}x{args.height}, {len(layout)} döşeme ({tile_size}px), en büyük toplu: {model.max_batch}")
+
+    def single():
+        outputs, letterbox = model.infer_frame(frame, tile_size)
+        postprocessor.process(outputs, model.output_layout, letterbox)
+
+    def tiled_sequential():
+        max_batch, model.max_batch = model.max_batch, 1
+        try:
+            batched.detect(model, frame, allow_sequential=True)
+        finally:
+            model.max_batch = max_batch
+
+    for name, fn in (("tek görüntü (küçültülmüş)", single), ("döşemeli, sıralı", tiled_sequential),
+                     ("döşemeli, toplu", lambda: batched.detect(model, frame, allow_sequential=True))):
+        for _ in range(3):
+            fn()  # ısıtma
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            fn()
+        elapsed = (time.perf_counter() - start) / args.iterations
+        print(f"{name:<26} {elapsed * 1000.0:8.2f} ms/kare  {1.0 / elapsed:7.1f} kare/s")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,72 @@
+# ui_state.py
+# Arayüz durum modeli ve toplu görünüm yenileyici. Denetim döngüsü ve yuvalar (slot) widget'lara doğrudan
+# yazmaz; gösterilecek düz değerleri (durum mesajı, hedef bilgisi, açılar, piksel hatası...) UiState'e yazar.
+# UiRefresher sabit bir hızda (varsayılan 10 Hz) her bağlama için ekrandaki metni modelden üretir ve yalnızca
+# değişenleri widget'a aktarır. Böylece bir kare içinde aynı etikete yapılan çok sayıda setText tek bir
+# güncellemeye iner, değişmeyen zengin metin (HTML) etiketleri her karede yeniden ayrıştırılmaz.
+
+from PyQt5.QtCore import QTimer
+
+# Görünümün en fazla yenilenme hızı (Hz)
+UI_REFRESH_HZ = 10.0
+
+
+class UiState:
+    """Arayüzde gösterilen değerlerin düz modeli. Yazmak ucuzdur; widget'lara dokunulmaz."""
+
+    def __init__(self, **initial):
+        self._values = dict(initial)
+
+    def set(self, **fields):
+        self._values.update(fields)
+
+    def get(self, name, default=None):
+        return self._values.get(name, default)
+
+    def snapshot(self):
+        return dict(self._values)
+
+
+class _Binding:
+    __slots__ = ("fields", "render", "apply", "shown")
+
+    def __init__(self, fields, render, apply):
+        self.fields = fields
+        self.render = render
+        self.apply = apply
+        self.shown = None  # Ekrana en son aktarılan değer
+
+
+class UiRefresher:
+    """
+    UiState'i bağlı widget'lara sınırlı hızda aktarır. Her bağlama: model alanları -> render(*değerler) ->
+    gösterilecek değer; değer ekrandakinden farklıysa apply(değer) çağrılır.
+    """
+
+    def __init__(self, state, rate_hz=UI_REFRESH_HZ, parent=None):
+        self.state = state
+        self._bindings = []
+        self.pushes = 0  # Widget'a aktarılan değişiklik sayısı
+        self._timer = QTimer(parent)
+        self._timer.timeout.connect(self.refresh)
+        self.rate_hz = rate_hz
+
+    def bind(self, fields, render, apply):
+        self._bindings.append(_Binding(tuple(fields), render, apply))
+
+    def start(self):
+        self.refresh()
+        self._timer.start(max(1, int(round(1000.0 / self.rate_hz))))
+
+    def stop(self):
+        self._timer.stop()
+
+    def refresh(self):
+        """Değişen bağlamaları ekrana aktarır (GUI iş parçacığında çağrılmalı)."""
+        values = self.state.snapshot()
+        for binding in self._bindings:
+            shown = binding.render(*(values.get(field) for field in binding.fields))
+            if shown != binding.shown:
+                binding.apply(shown)
+                binding.shown = shown
+                self.pushes += 1
@@ -0,0 +1,201 @@
+# video_view.py
+# Kamera görüntüsünü dönüştürmeden gösteren widget. BGR kare doğrudan QImage.Format_BGR888 olarak sarılır
+# (kopya ve BGR->RGB dönüşümü yok); ölçekleme boyama sırasında QPainter tarafından yapılır. Artı işareti,
+# kutular ve yazılar kareye OpenCV ile çizilmez; kare koordinatlarında vektör kaplama (Overlays) olarak
+# verilir ve görüntünün üzerine QPainter ile çizilir, böylece denetim döngüsü kareyi kopyalamaz.
+#
+# Yeni kare set_frame ile yalnızca saklanır; ekran en fazla max_fps hızında (varsayılan: monitör yenileme
+# hızı) güncellenir, aradaki kareler boyanmadan atlanır.
+
+from collections import namedtuple
+
+import cv2
+from PyQt5.QtCore import Qt, QTimer, QRectF, QPointF
+from PyQt5.QtGui import QImage, QPainter, QPen, QColor, QFont, QGuiApplication
+from PyQt5.QtWidgets import QWidget
+
+# Monitör yenileme hızı okunamazsa kullanılan görüntüleme hızı
+DEFAULT_DISPLAY_FPS = 60.0
+# Qt 5.14 öncesinde Format_BGR888 yoktur; o durumda RGB'ye dönüştürülür
+HAS_BGR888 = hasattr(QImage, "Format_BGR888")
+
+# Kaplama öğeleri (kare piksel koordinatları, renkler OpenCV gibi BGR)
+OverlayLine = namedtuple('OverlayLine', ['x1', 'y1', 'x2', 'y2', 'color', 'width'])
+OverlayRect = namedtuple('OverlayRect', ['x0', 'y0', 'x1', 'y1', 'color', 'width'])
+OverlayText = namedtuple('OverlayText', ['x', 'y', 'text', 'color', 'point_size'])
+
+
+class Overlays:
+    """Bir kare için vektör çizim listesi. Koordinatlar kare pikselleri, renkler (B, G, R)."""
+
+    def __init__(self):
+        self.items = []
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def line(self, x1, y1, x2, y2, color, width=1):
+        self.items.append(OverlayLine(x1, y1, x2, y2, color, width))
+
+    def rect(self, x0, y0, x1, y1, color, width=1):
+        self.items.append(OverlayRect(x0, y0, x1, y1, color, width))
+
+    def text(self, x, y, text, color, point_size=8):
+        """(x, y) yazının sol alt köşesidir (cv2.putText gibi)."""
+        self.items.append(OverlayText(x, y, text, color, point_size))
+
+    def crosshair(self, cx, cy, size, color, width=2):
+        self.line(cx - size, cy, cx + size, cy, color, width)
+        self.line(cx, cy - size, cx, cy + size, color, width)
+
+
+def frame_to_qimage(frame):
+    """
+    BGR (H, W, 3) veya gri (H, W) uint8 kareyi kopyalamadan QImage ile sarar.
+    :return: (QImage, arabellek) - QImage veriyi kopyalamadığından arabellek görüntü kullanıldığı sürece tutulmalıdır.
+    """
+    if not frame.flags['C_CONTIGUOUS']:
+        frame = frame.copy()
+    h, w = frame.shape[:2]
+    if frame.ndim == 2:
+        return QImage(frame.data, w, h, frame.strides[0], QImage.Format_Grayscale8), frame
+    if HAS_BGR888:
+        return QImage(frame.data, w, h, frame.strides[0], QImage.Format_BGR888), frame
+    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    return QImage(rgb.data, w, h, rgb.strides[0], QImage.Format_RGB888), rgb
+
+
+def _qcolor(bgr):
+    return QColor(int(bgr[2]), int(bgr[1]), int(bgr[0]))
+
+
+class ThrottledViewMixin:
+    """
+    VideoView ve GLVideoView için ortak kısım: kare/kaplama saklama, max_fps zamanlayıcısı, sayaçlar ve
+    widget <-> kare koordinat dönüşümü. Alt sınıf _frame_size() ve boyamayı sağlar.
+    """
+
+    def _init_view(self, max_fps):
+        self._overlays = ()
+        self._dirty = False
+        self.frames_shown = 0
+        self.frames_skipped = 0  # Boyanmadan üzerine yazılan kareler
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self._on_tick)
+        self.max_fps = None
+        self.set_max_fps(max_fps)
+
+    def set_max_fps(self, max_fps=None):
+        if max_fps is None:
+            screen = QGuiApplication.primaryScreen()
+            refresh_rate = screen.refreshRate() if screen is not None else 0.0
+            max_fps = refresh_rate if refresh_rate and refresh_rate > 1.0 else DEFAULT_DISPLAY_FPS
+        self.max_fps = float(max_fps)
+        self._timer.start(max(1, int(round(1000.0 / self.max_fps))))
+
+    def _mark_dirty(self, overlays):
+        if self._dirty:
+            self.frames_skipped += 1
+        self._overlays = overlays
+        self._dirty = True
+
+    def image_rect(self):
+        """Görüntünün en-boy oranı korunarak widget içinde çizildiği dikdörtgen."""
+        size = self._frame_size()
+        if size is None:
+            return QRectF(self.rect())
+        image_w, image_h = size
+        scale = min(self.width() / image_w, self.height() / image_h)
+        w, h = image_w * scale, image_h * scale
+        return QRectF((self.width() - w) / 2.0, (self.height() - h) / 2.0, w, h)
+
+    def image_size(self):
+        """Gösterilen karenin (genişlik, yükseklik) boyutu; kare yoksa None."""
+        return self._frame_size()
+
+    def widget_to_frame(self, x, y):
+        """Widget koordinatını (örn. fare olayı) kare pikseline çevirir; kare yoksa None."""
+        size = self._frame_size()
+        if size is None:
+            return None
+        target = self.image_rect()
+        scale = target.width() / size[0]
+        return (x - target.x()) / scale, (y - target.y()) / scale
+
+    def _on_tick(self):
+        if self._dirty:
+            self._dirty = False
+            self.update()
+
+
+class VideoView(ThrottledViewMixin, QWidget):
+    """
+    QLabel yerine kullanılan video görüntüleme widget'ı. set_frame(kare, kaplamalar) ile beslenir.
+    :param max_fps: Azami boyama hızı; None ise monitör yenileme hızı.
+    """
+
+    def __init__(self, parent=None, max_fps=None):
+        super().__init__(parent)
+        # Tüm alan her boyamada doldurulur; Qt arka planı ayrıca silmez
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self.smooth_scaling = False  # Ölçeklemede yumuşatma (yavaş); kare ve widget aynı boyuttaysa etkisiz
+        self._image = None
+        self._buffer = None
+        self._init_view(max_fps)
+
+    def _frame_size(self):
+        return None if self._image is None else (self._image.width(), self._image.height())
+
+    def set_frame(self, frame, overlays=()):
+        """Gösterilecek kareyi saklar; ekran bir sonraki zamanlayıcı adımında güncellenir. Kare değiştirilmemelidir."""
+        self._image, self._buffer = frame_to_qimage(frame)
+        self._mark_dirty(overlays)
+
+    def clear(self):
+        self._image, self._buffer, self._overlays = None, None, ()
+        self._dirty = False
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        try:
+            painter.fillRect(self.rect(), Qt.black)
+            if self._image is None:
+                return
+            target = self.image_rect()
+            painter.setRenderHint(QPainter.SmoothPixmapTransform, self.smooth_scaling)
+            painter.drawImage(target, self._image)
+            if self._overlays:
+                draw_overlays(painter, target, target.width() / self._image.width(), self._overlays)
+        finally:
+            painter.end()
+        self.frames_shown += 1
+
+
+def draw_overlays(painter, target, scale, overlays, text_only=False):
+    """Kaplamaları QPainter ile çizer. target: görüntünün widget içindeki dikdörtgeni, scale: widget/kare oranı."""
+    painter.setRenderHint(QPainter.Antialiasing, False)
+    font = QFont(painter.font())
+    for item in overlays:
+        pen = QPen(_qcolor(item.color))
+        if isinstance(item, OverlayText):
+            font.setPointSizeF(item.point_size)
+            painter.setFont(font)
+            painter.setPen(pen)
+            painter.drawText(QPointF(target.x() + item.x * scale, target.y() + item.y * scale), item.text)
+            continue
+        if text_only:
+            continue
+        pen.setWidthF(item.width)  # Kalınlık ölçeklenmez (ekran pikseli)
+        painter.setPen(pen)
+        if isinstance(item, OverlayRect):
+            painter.setBrush(Qt.NoBrush)
+            painter.drawRect(QRectF(target.x() + item.x0 * scale, target.y() + item.y0 * scale,
+                                    (item.x1 - item.x0) * scale, (item.y1 - item.y0) * scale))
+        else:
+            painter.drawLine(QPointF(target.x() + item.x1 * scale, target.y() + item.y1 * scale),
+                             QPointF(target.x() + item.x2 * scale, target.y() + item.y2 * scale))
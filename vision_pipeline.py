@@ -0,0 +1,415 @@
+# vision_pipeline.py
+# Aşamalı görüntü işleme hattı. Her aşama kendi iş parçacığında çalışır, isteğe bağlı olarak hız sınırlıdır
+# (rate_hz) ve aşamalar sınırlı kuyruklarla bağlanır. Kuyruk dolduğunda ne olacağı bağlantı başına seçilir:
+#
+#   DROP_OLDEST : en eski öğe atılır, yeni öğe eklenir (varsayılan; en taze veri kazanır, gecikme birikmez)
+#   DROP_NEWEST : yeni öğe reddedilir (sıradakiler korunur)
+#   BLOCK       : üretici yer açılana kadar bekler (geri basınç; yavaş aşama üst aşamaları yavaşlatır)
+#
+# Böylece en yavaş aşama herkesin hızını belirlemez: örn. denetim kamera hızında çalışırken çizim 30 Hz'te
+# kalabilir. Aşama başına işlenen/düşürülen öğe, anlık hız (fps), ortalama işleme süresi ve kuyruk derinliği
+# sayaçları tutulur (Pipeline.stats / format_stats).
+#
+# Uçtan uca ölçüm (kaynak -> ön işleme -> çıkarım -> son işleme -> izleme -> denetim -> çizim):
+#   python vision_pipeline.py best.onnx --source kayit.mp4 --replay fast [--render-fps 30] [--show]
+
+import argparse
+from collections import deque, namedtuple
+import threading
+import time
+import traceback
+
+# Kuyruk dolu olduğunda uygulanacak politikalar
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+BLOCK = "block"
+
+# Aşama girişini beklerken kullanılan zaman aşımı (durdurma bayrağının kontrol aralığı)
+STAGE_POLL_INTERVAL = 0.05
+# Kaynak aşaması öğe üretmediğinde yeniden denemeden önce beklenen süre
+SOURCE_IDLE_SLEEP = 0.001
+# Anlık hızın hesaplandığı pencere (saniye)
+STAGE_RATE_WINDOW = 1.0
+# Aynı aşamanın hata mesajları en fazla bu aralıkla yazdırılır
+STAGE_ERROR_LOG_INTERVAL = 2.0
+
+# format_stats satırları için aşama özeti
+StageStats = namedtuple('StageStats', ['name', 'processed', 'fps', 'busy_ms', 'errors', 'queue_depth',
+                                       'queue_max_depth', 'queue_dropped'])
+
+
+class StageQueue:
+    """Politikası seçilebilen sınırlı kuyruk. get/put iş parçacığı güvenlidir."""
+
+    def __init__(self, maxsize=1, policy=DROP_OLDEST):
+        if policy not in (DROP_OLDEST, DROP_NEWEST, BLOCK):
+            raise ValueError(f"Geçersiz kuyruk politikası: {policy}")
+        self.maxsize = max(1, maxsize)
+        self.policy = policy
+        self._items = deque()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._closed = False
+        self.put_count = 0
+        self.dropped = 0
+        self.max_depth = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
+
+    def put(self, item, timeout=None):
+        """
+        Öğeyi ekler. DROP_OLDEST her zaman ekler; DROP_NEWEST kuyruk doluysa False döner;
+        BLOCK yer açılana kadar bekler, timeout dolarsa veya kuyruk kapanırsa False döner (öğe düşürülmüş sayılmaz,
+        üretici yeniden dener).
+        """
+        with self._lock:
+            if self._closed:
+                return False
+            if len(self._items) >= self.maxsize:
+                if self.policy == DROP_OLDEST:
+                    self._items.popleft()
+                    self.dropped += 1
+                elif self.policy == DROP_NEWEST:
+                    self.dropped += 1
+                    return False
+                elif not self._not_full.wait_for(lambda: self._closed or len(self._items) < self.maxsize,
+                                                 timeout):
+                    return False
+                if self._closed:
+                    return False
+            self._items.append(item)
+            self.put_count += 1
+            self.max_depth = max(self.max_depth, len(self._items))
+            self._not_empty.notify()
+            return True
+
+    def get(self, timeout=None):
+        """Sıradaki öğeyi döndürür; timeout içinde öğe gelmezse veya kuyruk kapandıysa None."""
+        with self._lock:
+            if not self._items and not self._not_empty.wait_for(lambda: self._closed or self._items, timeout):
+                return None
+            if not self._items:
+                return None
+            item = self._items.popleft()
+            self._not_full.notify()
+            return item
+
+    def close(self):
+        """Bekleyen üretici ve tüketicileri uyandırır; sonraki put çağrıları reddedilir."""
+        with self._lock:
+            self._closed = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+
+    @property
+    def closed(self):
+        return self._closed
+
+
+class Stage:
+    """
+    Hattın bir aşaması. func, kaynak aşamalarda argümansız, diğerlerinde giriş öğesiyle çağrılır; None dışındaki
+    dönüş değeri tüm çıkış kuyruklarına eklenir. rate_hz verilirse aşama saniyede en fazla bu kadar çalışır;
+    bekleme girişi almadan önce yapıldığından DROP_OLDEST girişte her zaman en taze öğe işlenir.
+    """
+
+    def __init__(self, name, func, rate_hz=None, source=False):
+        self.name = name
+        self.func = func
+        self.rate_hz = rate_hz
+        self.source = source
+        self.input = None
+        self.outputs = []
+        self.processed = 0
+        self.errors = 0
+        self.fps = 0.0
+        self.busy_ms = 0.0  # İşleme süresinin üstel ortalaması
+        self._running = False
+        self._thread = None
+        self._window_start = 0.0
+        self._window_count = 0
+        self._last_error_log = 0.0
+
+    def start(self):
+        if self.input is None and not self.source:
+            raise ValueError(f"'{self.name}' aşamasının girişi bağlanmamış.")
+        self._window_start = time.monotonic()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=f"stage-{self.name}", daemon=True)
+        self._thread.start()
+
+    def request_stop(self):
+        self._running = False
+
+    def join(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                print(f"UYARI (vision_pipeline): '{self.name}' aşaması zamanında durmadı.")
+            self._thread = None
+
+    def emit(self, item):
+        """Öğeyi bu aşamanın çıkışlarına ekler. BLOCK kuyruklarda yer açılana kadar (aşama durmadıkça) bekler."""
+        for queue in self.outputs:
+            if queue.policy != BLOCK:
+                queue.put(item)
+                continue
+            while not queue.put(item, STAGE_POLL_INTERVAL):
+                if not self._running or queue.closed:
+                    break
+
+    def _run(self):
+        period = 1.0 / self.rate_hz if self.rate_hz else 0.0
+        next_due = time.monotonic()
+        while self._running:
+            if period:
+                now = time.monotonic()
+                if next_due > now:
+                    time.sleep(min(next_due - now, STAGE_POLL_INTERVAL))
+                    continue
+            if self.source:
+                item = None
+            else:
+                item = self.input.get(STAGE_POLL_INTERVAL)
+                if item is None:
+                    continue
+            start = time.monotonic()
+            try:
+                result = self.func() if self.source else self.func(item)
+            except Exception as e:
+                self.errors += 1
+                if start - self._last_error_log >= STAGE_ERROR_LOG_INTERVAL:
+                    self._last_error_log = start
+                    print(f"HATA (vision_pipeline): '{self.name}' aşamasında hata: {e}")
+                    traceback.print_exc()
+                continue
+            end = time.monotonic()
+            if self.source and result is None:
+                time.sleep(SOURCE_IDLE_SLEEP)  # Kaynakta henüz öğe yok
+                continue
+            if period:
+                # Geride kalındıysa birikmiş periyotlar atlanır (patlama yapılmaz)
+                next_due = max(next_due + period, end - period)
+            self.record(start, end)
+            if result is not None:  # None: aşama öğeyi tüketti (denetim, çizim) veya eledi
+                self.emit(result)
+
+    def record(self, start, end):
+        """Bir öğenin [start, end] (time.monotonic) aralığında işlendiğini sayaçlara işler."""
+        self.busy_ms = (end - start) * 1000.0 if self.processed == 0 else \
+            0.9 * self.busy_ms + 0.1 * (end - start) * 1000.0
+        self.processed += 1
+        self._window_count += 1
+        if end - self._window_start >= STAGE_RATE_WINDOW:
+            self.fps = self._window_count / (end - self._window_start)
+            self._window_start, self._window_count = end, 0
+
+    def stats(self):
+        queue = self.input
+        return StageStats(self.name, self.processed, self.fps, self.busy_ms, self.errors,
+                          len(queue) if queue is not None else 0,
+                          queue.max_depth if queue is not None else 0,
+                          queue.dropped if queue is not None else 0)
+
+
+class Pipeline:
+    """Aşamaları ve aralarındaki kuyrukları yönetir."""
+
+    def __init__(self, name="vision"):
+        self.name = name
+        self.stages = []
+
+    def add_stage(self, name, func, rate_hz=None, source=False):
+        stage = Stage(name, func, rate_hz, source)
+        self.stages.append(stage)
+        return stage
+
+    def connect(self, upstream, downstream, maxsize=1, policy=DROP_OLDEST):
+        """upstream'in çıktısını downstream'in girişine bağlar. Her aşamanın tek girişi olur."""
+        if downstream.input is not None:
+            raise ValueError(f"'{downstream.name}' aşamasının girişi zaten bağlı.")
+        queue = StageQueue(maxsize, policy)
+        downstream.input = queue
+        upstream.outputs.append(queue)
+        return queue
+
+    def add_input(self, downstream, maxsize=1, policy=DROP_OLDEST):
+        """Hattın dışından (örn. GUI iş parçacığı) beslenen bir giriş kuyruğu oluşturur."""
+        if downstream.input is not None:
+            raise ValueError(f"'{downstream.name}' aşamasının girişi zaten bağlı.")
+        downstream.input = StageQueue(maxsize, policy)
+        return downstream.input
+
+    def start(self):
+        for stage in self.stages:
+            stage.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        for stage in self.stages:
+            stage.request_stop()
+        for stage in self.stages:
+            if stage.input is not None:
+                stage.input.close()
+            for queue in stage.outputs:
+                queue.close()
+        for stage in self.stages:
+            stage.join(timeout)
+
+    def stats(self):
+        return [stage.stats() for stage in self.stages]
+
+    def format_stats(self):
+        lines = [f"{'aşama':<12} {'işlenen':>8} {'fps':>7} {'ms':>7} {'kuyruk':>7} {'en çok':>7} "
+                 f"{'düşen':>7} {'hata':>5}"]
+        for s in self.stats():
+            lines.append(f"{s.name:<12} {s.processed:>8} {s.fps:>7.1f} {s.busy_ms:>7.2f} {s.queue_depth:>7} "
+                         f"{s.queue_max_depth:>7} {s.queue_dropped:>7} {s.errors:>5}")
+        return "\n".join(lines)
+
+
+def _run_headless(args):
+    """Kayıt üzerinde tam hattı çalıştırır ve aşama sayaçlarını yazdırır (kamera ve GUI gerekmez)."""
+    import cv2
+    import numpy as np
+
+    import frame_source
+    from gpu_preprocess import letterbox_cpu
+    from detections import Detections
+    from multi_object_tracker import MultiObjectTracker
+    from yolo_models import load_yolo_model
+    from yolo_postprocess import YoloPostprocessor, DET_X1, DET_Y1, DET_X2, DET_Y2
+
+    model = load_yolo_model(args.model)
+    if model is None:
+        print("HATA (vision_pipeline): Model yüklenemedi.")
+        return
+    postprocessor = YoloPostprocessor(args.conf, args.nms)
+    tracker = MultiObjectTracker()
+    track_detections = Detections()  # İzleme aşamasının yeniden kullanılan tespit tamponu
+    source = frame_source.open_source_from_args(args)
+    if not source.isOpened():
+        print(f"HATA (vision_pipeline): Kaynak açılamadı: {args.source}")
+        return
+    print(source.describe())
+
+    state = {"seq": 0, "target": None, "target_id": None}
+    display_queue = StageQueue(1, DROP_OLDEST)
+
+    def read_frame():
+        ok, image = source.read()
+        if not ok:
+            return None
+        state["seq"] += 1
+        return {"seq": state["seq"], "timestamp": time.monotonic(), "image": image}
+
+    def preprocess(packet):
+        packet["input"], packet["letterbox"] = letterbox_cpu(packet["image"], model.input_width,
+                                                             model.input_height)
+        return packet
+
+    def infer(packet):
+        # ORT IO binding / TensorRT çıkış tamponları bir sonraki çıkarımda yeniden yazılır; kopyalanır
+        packet["outputs"] = [np.array(output, copy=True) for output in model.infer(packet["input"])]
+        return packet
+
+    def postprocess(packet):
+        packet["detections"] = postprocessor.process(packet["outputs"], model.output_layout, packet["letterbox"])
+        return packet
+
+    def track(packet):
+        # Tespitler iz tablosuna işlenir; kilitli iz yaşadığı sürece hedef odur, yoksa en yüksek skorlu onaylı iz
+        tracks = tracker.update(track_detections.fill(packet["detections"]), packet["timestamp"])
+        locked = tracker.get(state["target_id"])
+        if locked is None and tracks:
+            locked = max(tracks, key=lambda track: track.score)
+        state["target_id"] = locked.track_id if locked is not None else None
+        packet["target"] = locked.center if locked is not None else None
+        return packet
+
+    def control(packet):
+        # Hedefin kare merkezine göre piksel hatası (denetleyici girdisi); komut gönderilmez
+        h, w = packet["image"].shape[:2]
+        target = packet["target"]
+        state["target"] = None if target is None else (target[0] - w / 2.0, target[1] - h / 2.0)
+        return None
+
+    def render(packet):
+        image = packet["image"].copy()
+        h, w = image.shape[:2]
+        cv2.drawMarker(image, (w // 2, h // 2), (0, 255, 0), cv2.MARKER_CROSS, 20, 2)
+        for det in packet["detections"]:
+            cv2.rectangle(image, (int(det[DET_X1]), int(det[DET_Y1])), (int(det[DET_X2]), int(det[DET_Y2])),
+                          (0, 0, 255), 2)
+        if args.show:
+            display_queue.put(image)
+        return None
+
+    pipeline = Pipeline("headless")
+    stage_source = pipeline.add_stage("source", read_frame, source=True)
+    stage_pre = pipeline.add_stage("preprocess", preprocess)
+    stage_infer = pipeline.add_stage("infer", infer)
+    stage_post = pipeline.add_stage("postprocess", postprocess)
+    stage_track = pipeline.add_stage("track", track)
+    stage_control = pipeline.add_stage("control", control)
+    stage_render = pipeline.add_stage("render", render, rate_hz=args.render_fps)
+    # Olabildiğince hızlı tekrarda aşamalar geri basınçla birbirini bekler (her kare işlenir, uçtan uca azami hız
+    # ölçülür); gerçek zamanlı tekrarda canlı kamera gibi en eski öğe atılır. Çizim her iki durumda da yalnızca
+    # en taze kareyi alır.
+    policy = BLOCK if args.replay == frame_source.REPLAY_FAST else DROP_OLDEST
+    pipeline.connect(stage_source, stage_pre, 2, policy)
+    pipeline.connect(stage_pre, stage_infer, 1, policy)
+    pipeline.connect(stage_infer, stage_post, 2, policy)
+    pipeline.connect(stage_post, stage_track, 2, policy)
+    pipeline.connect(stage_track, stage_control, 2, policy)
+    pipeline.connect(stage_track, stage_render, 1, DROP_OLDEST)
+
+    start = time.monotonic()
+    pipeline.start()
+    try:
+        last_report = start
+        while not getattr(source, "ended", False) or any(len(stage.input) for stage in pipeline.stages[1:]):
+            if args.show:
+                image = display_queue.get(0.05)
+                if image is not None:
+                    cv2.imshow("vision_pipeline", image)
+                if cv2.waitKey(1) & 0xFF == ord('q'):
+                    break
+            else:
+                time.sleep(0.05)
+            if time.monotonic() - last_report >= args.report_interval:
+                last_report = time.monotonic()
+                print(pipeline.format_stats())
+        time.sleep(STAGE_POLL_INTERVAL * 2)  # Son öğelerin alt aşamalara geçmesi için
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pipeline.stop()
+        source.release()
+        if args.show:
+            cv2.destroyAllWindows()
+    elapsed = time.monotonic() - start
+    print(pipeline.format_stats())
+    print(f"Uçtan uca: {stage_control.processed} kare, {stage_control.processed / elapsed:.1f} fps "
+          f"({elapsed:.1f} s), kaynaktan okunan: {stage_source.processed}")
+
+
+if __name__ == "__main__":
+    import frame_source
+
+    parser = argparse.ArgumentParser(description="Aşamalı görüntü işleme hattını kayıt üzerinde ölçer")
+    parser.add_argument("model", help=".onnx veya .engine model yolu")
+    frame_source.add_source_arguments(parser)
+    parser.add_argument("--conf", type=float, default=0.4)
+    parser.add_argument("--nms", type=float, default=0.4)
+    parser.add_argument("--render-fps", type=float, default=30.0, help="Çizim aşamasının hız sınırı")
+    parser.add_argument("--show", action="store_true", help="Çizilen kareleri pencerede göster")
+    parser.add_argument("--report-interval", type=float, default=2.0, help="Sayaç raporu aralığı (saniye)")
+    try:
+        _run_headless(parser.parse_args())
+    except Exception as e:
+        print(f"HATA (vision_pipeline): {e}")
+        traceback.print_exc()
@@ -0,0 +1,746 @@
+# yolo_models.py
+# YOLO modellerini (TensorRT veya ONNX Runtime) yükler. Her model kendi motorunu, bağlamını, CUDA akışını,
+# sabitlenmiş (pinned) tamponlarını ve giriş boyutunu tutar; böylece Aşama 1/2 ve Aşama 3 modelleri
+# aynı anda bellekte kalabilir ve görev değişimi yeniden yükleme gerektirmez.
+
+import threading
+import traceback
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+import backend_selector  # Ölçümle arka uç seçimi (kayıtlı karar)
+import engine_cache  # ONNX -> TensorRT motor önbelleği
+import ort_backend  # IO binding + CUDA grafiği + optimize model önbelleği ile ONNX Runtime
+from gpu_preprocess import FrameStaging, LetterboxInfo, create_gpu_letterbox, letterbox_cpu
+
+# TensorRT içe aktarmaları
+try:
+    import tensorrt as trt
+    import pycuda.driver as cuda
+    import pycuda.autoinit  # CUDA bağlamını otomatik olarak başlatır
+
+    TRT_AVAILABLE = True
+    print("HATA AYIKLAMA: TensorRT ve PyCUDA başarıyla içe aktarıldı.")
+except ImportError:
+    TRT_AVAILABLE = False
+    print("UYARI: TensorRT veya PyCUDA bulunamadı. Yalnızca ONNX Runtime (CPU/GPU) kullanılabilir olacak.")
+    print(
+        "TensorRT kullanmak için 'pip install tensorrt pycuda' komutunu çalıştırdığınızdan ve CUDA/cuDNN kurduğunuzdan emin olun.")
+except Exception as e:
+    TRT_AVAILABLE = False
+    print(f"UYARI: TensorRT/PyCUDA içe aktarma sırasında hata: {e}")
+    print("TensorRT veya PyCUDA yanlış kurulmuş olabilir. Yalnızca ONNX Runtime (CPU/GPU) kullanılabilir olacak.")
+    traceback.print_exc()
+
+# .onnx modeller için TensorRT motor önbelleğini kullan (motor hazır olana kadar ONNX Runtime kullanılır)
+USE_ENGINE_CACHE = True
+
+# Model giriş boyutu algılanamazsa kullanılacak varsayılan (YOLOv11 için)
+DEFAULT_IMG_HEIGHT, DEFAULT_IMG_WIDTH = 640, 640
+
+# YENİ: TensorRT modelleri için asenkron çalıştırmada kullanılacak tampon seti (slot) sayısı.
+# 3 slot ile N+1 karesinin yüklenmesi, N karesinin çıkarımı ve N-1 karesinin geri okunması örtüşür.
+# 0 yapılırsa senkron (execute_v2) yol kullanılır.
+ASYNC_EXECUTION_SLOTS = 3
+
+# Asenkron çalıştırmanın bir sonucu: çıkışlar, gönderimdeki meta (LetterboxInfo) ve sonucun ait olduğu karenin
+# yakalama zamanı ile kırpıntısı (poll() genellikle daha önceki bir gönderimin sonucunu döndürür)
+AsyncResult = namedtuple('AsyncResult', ['outputs', 'meta', 'timestamp', 'roi'])
+
+# Model çıkış düzenleri
+OUTPUT_LAYOUT_RAW = "raw"  # (1, 4+C, N) ham başlık: çözme + NMS ana bilgisayarda yapılır
+OUTPUT_LAYOUT_TOPK = "topk"  # (1, K, 6) x1, y1, x2, y2, skor, sınıf (Ultralytics nms=True ONNX dışa aktarımı)
+OUTPUT_LAYOUT_EFFICIENT_NMS = "efficient_nms"  # num_dets, det_boxes, det_scores, det_classes (EfficientNMS_TRT)
+
+
+def detect_output_layout(output_shapes):
+    """Çıkış şekillerine bakarak modelin çıkış düzenini belirler (NMS'in grafta olup olmadığı)."""
+    if len(output_shapes) == 4:
+        return OUTPUT_LAYOUT_EFFICIENT_NMS
+    shape = tuple(output_shapes[0])
+    # Ham başlıkta son boyut çapa sayısıdır (binlerce); top-K düzeninde son boyut 6'dır
+    if len(shape) == 3 and shape[2] == 6 and shape[1] != 6:
+        return OUTPUT_LAYOUT_TOPK
+    return OUTPUT_LAYOUT_RAW
+
+
+# Dinamik girişli ONNX modellerinde (ONNX Runtime) kullanılabilecek kare giriş boyutları.
+# TensorRT motorlarında kullanılabilir boyutlar motorun optimizasyon profillerinden okunur.
+DYNAMIC_INPUT_SIZES = (320, 480, 640, 960)
+ONNX_DYNAMIC_MAX_BATCH = 8
+
+
+def get_engine_profile_layout(engine):
+    """
+    Motorun optimizasyon profili düzenini döndürür (bkz. convert_to_engine.build_engine profile_sets).
+    :return: (bir profil grubundaki kare giriş boyutları, profil grubu sayısı). Statik motorlarda grup sayısı 0'dır.
+    """
+    input_name = next(engine.get_tensor_name(i) for i in range(engine.num_io_tensors)
+                      if engine.get_tensor_mode(engine.get_tensor_name(i)) == trt.TensorIOMode.INPUT)
+    shape = engine.get_tensor_shape(input_name)
+    if all(dim > 0 for dim in shape):
+        return [int(shape[2])], 0
+    sizes = []
+    for profile in range(engine.num_optimization_profiles):
+        size = int(engine.get_tensor_profile_shape(input_name, profile)[1][2])
+        if size in sizes:
+            break
+        sizes.append(size)
+    return sizes, engine.num_optimization_profiles // len(sizes)
+
+
+def allocate_io_buffers(engine, context, stream, profile_set=None, profile_sizes=()):
+    """
+    Bir yürütme bağlamı için giriş/çıkış tamponlarını ayırır ve adreslerini bağlama bağlar.
+    Dinamik motorlarda tamponlar bağlamın profil grubundaki en büyük şekillere (en kötü duruma) göre bir kez
+    ayrılır; giriş boyutu değiştiğinde yeniden ayırma gerekmez, yalnızca tamponun başı kullanılır.
+    :return: (girişler, çıkışlar) tampon sözlüğü listeleri.
+    """
+    names = [engine.get_tensor_name(i) for i in range(engine.num_io_tensors)]
+    input_names = [name for name in names if engine.get_tensor_mode(name) == trt.TensorIOMode.INPUT]
+    if profile_set is None:
+        volumes = {name: trt.volume(engine.get_tensor_shape(name)) for name in names}
+    else:
+        volumes = {}
+        for size_index in range(len(profile_sizes)):
+            profile = profile_set * len(profile_sizes) + size_index
+            context.set_optimization_profile_async(profile, stream.handle)
+            for name in input_names:
+                context.set_input_shape(name, engine.get_tensor_profile_shape(name, profile)[2])
+            for name in names:
+                volumes[name] = max(volumes.get(name, 0), trt.volume(context.get_tensor_shape(name)))
+
+    inputs, outputs = [], []
+    for name in names:
+        dtype = engine.get_tensor_dtype(name)
+        # Düzeltme: pagelocked_empty eleman sayısını bekler, byte sayısını değil
+        host_mem = cuda.pagelocked_empty(volumes[name], dtype=trt.nptype(dtype))
+        device_mem = cuda.mem_alloc(volumes[name] * dtype.itemsize)
+        context.set_tensor_address(name, int(device_mem))
+        buffer = {'name': name, 'host': host_mem, 'device': device_mem,
+                  'shape': tuple(context.get_tensor_shape(name))}
+        if name in input_names:
+            inputs.append(buffer)
+        else:
+            outputs.append(buffer)
+    return inputs, outputs
+
+
+def set_context_input_size(context, stream, inputs, outputs, profile, size, batch=1):
+    """Bağlamı verilen profile geçirir, giriş şeklini (batch, 3, size, size) yapar ve tampon şekillerini günceller."""
+    context.set_optimization_profile_async(profile, stream.handle)
+    context.set_input_shape(inputs[0]['name'], (batch, 3, size, size))
+    for buffer in inputs + outputs:
+        buffer['shape'] = tuple(context.get_tensor_shape(buffer['name']))
+
+
+def _host_view(buffer):
+    """Tamponun geçerli şekle karşılık gelen kısmını döndürür (en kötü duruma göre ayrılmış tamponun başı)."""
+    return buffer['host'][:int(np.prod(buffer['shape']))].reshape(buffer['shape'])
+
+
+def _crop_roi(frame, roi):
+    """Kareden ROI kırpıntısını (kopyasız görünüm) ve ofsetini döndürür; roi None ise kareyi olduğu gibi."""
+    if roi is None:
+        return frame, (0, 0)
+    x0, y0, x1, y1 = roi
+    return frame[y0:y1, x0:x1], (x0, y0)
+
+
+def _enqueue_readback(outputs, stream):
+    for output in outputs:
+        cuda.memcpy_dtoh_async(_host_view(output), output['device'], stream)
+
+
+class AsyncTrtExecutor:
+    """
+    TensorRT motorunu execute_async_v3 ile, her biri kendi bağlamına, CUDA akışına, sabitlenmiş
+    ana bilgisayar tamponlarına, cihaz tamponlarına ve CUDA olayına sahip birden fazla slot üzerinden çalıştırır.
+    submit() engellemez; poll() tamamlanan en yeni sonucu engellemeden döndürür.
+    Dinamik motorlarda her slot kendi profil grubunu kullanır (first_profile_set + slot indeksi).
+    """
+
+    def __init__(self, engine, num_slots=ASYNC_EXECUTION_SLOTS, gpu_letterbox=None, profile_sizes=(),
+                 first_profile_set=None):
+        self.gpu_letterbox = gpu_letterbox
+        self.profile_sizes = list(profile_sizes)
+        self.slots = []
+        self.submit_seq = 0
+        self.last_polled_seq = -1
+        self.next_slot_idx = 0
+        self.dropped_submissions = 0
+
+        for slot_idx in range(num_slots):
+            profile_set = None if first_profile_set is None else first_profile_set + slot_idx
+            context = engine.create_execution_context()
+            stream = cuda.Stream()
+            inputs, outputs = allocate_io_buffers(engine, context, stream, profile_set, self.profile_sizes)
+            slot = {
+                'context': context,
+                'stream': stream,
+                'done_event': cuda.Event(),
+                'inputs': inputs,
+                'outputs': outputs,
+                'profile_set': profile_set,
+                'input_size': None,
+                'frame_staging': FrameStaging() if gpu_letterbox is not None else None,
+                'in_flight': False,
+                'seq': -1,
+                'meta': None,
+                'timestamp': None,
+                'roi': None,
+            }
+            self.slots.append(slot)
+
+    def _acquire_slot(self):
+        """Sıradaki slot boşsa döndürür; hâlâ GPU'da çalışıyorsa None (kare atlanır)."""
+        slot = self.slots[self.next_slot_idx]
+        if slot['in_flight'] and not slot['done_event'].query():
+            self.dropped_submissions += 1
+            return None
+        return slot
+
+    def _prepare_input_size(self, slot, size):
+        # Dinamik motorda slotun bağlamını istenen boyutun profiline geçir (boyut değişmediyse işlem yok)
+        if slot['profile_set'] is None or slot['input_size'] == size:
+            return
+        profile = slot['profile_set'] * len(self.profile_sizes) + self.profile_sizes.index(size)
+        set_context_input_size(slot['context'], slot['stream'], slot['inputs'], slot['outputs'], profile, size)
+        slot['input_size'] = size
+
+    def submit(self, input_image, meta=None):
+        """
+        Ön işlenmiş bir girişi sıradaki boş slota kuyruğa alır: yükleme, çıkarım ve geri okuma slotun akışında
+        sırayla çalışır. Tüm slotlar meşgulse kare atlanır ve False döner (çağıran hiçbir zaman GPU'yu beklemez).
+        :param meta: Sonuçla birlikte geri verilecek bilgi.
+        """
+        slot = self._acquire_slot()
+        if slot is None:
+            return False
+        self._prepare_input_size(slot, input_image.shape[2])
+        host_input = _host_view(slot['inputs'][0])
+        np.copyto(host_input, input_image.reshape(host_input.shape))
+        cuda.memcpy_htod_async(slot['inputs'][0]['device'], host_input, slot['stream'])
+        self._enqueue_execution(slot, meta)
+        return True
+
+    def submit_frame(self, frame, dst_width, dst_height, roi=None, timestamp=None):
+        """
+        Ham BGR kareyi kuyruğa alır. GPU ön işleme varsa letterbox/renk/CHW dönüşümü slotun akışında GPU'da yapılır.
+        Sonuçla birlikte meta olarak LetterboxInfo döner (roi verilmişse kırpıntı ofsetiyle birlikte).
+        :param timestamp: Karenin yakalama zamanı; sonuçla birlikte (roi ile) geri verilir.
+        """
+        slot = self._acquire_slot()
+        if slot is None:
+            return False
+        self._prepare_input_size(slot, dst_height)
+        frame, offset = _crop_roi(frame, roi)
+        if self.gpu_letterbox is not None:
+            letterbox = self.gpu_letterbox.enqueue(frame, slot['frame_staging'], slot['inputs'][0]['device'],
+                                                   dst_width, dst_height, slot['stream'])
+        else:
+            input_image, letterbox = letterbox_cpu(frame, dst_width, dst_height)
+            host_input = _host_view(slot['inputs'][0])
+            np.copyto(host_input, input_image.reshape(host_input.shape))
+            cuda.memcpy_htod_async(slot['inputs'][0]['device'], host_input, slot['stream'])
+        self._enqueue_execution(slot, letterbox._replace(offset_x=offset[0], offset_y=offset[1]), timestamp, roi)
+        return True
+
+    def _enqueue_execution(self, slot, meta, timestamp=None, roi=None):
+        stream = slot['stream']
+        slot['context'].execute_async_v3(stream.handle)
+        _enqueue_readback(slot['outputs'], stream)
+        slot['done_event'].record(stream)
+
+        slot['in_flight'] = True
+        slot['seq'] = self.submit_seq
+        slot['meta'] = meta
+        slot['timestamp'] = timestamp
+        slot['roi'] = roi
+        self.submit_seq += 1
+        self.next_slot_idx = (self.next_slot_idx + 1) % len(self.slots)
+        return True
+
+    def poll(self):
+        """
+        Tamamlanmış slotlar arasından en yeni (ve daha önce döndürülmemiş) sonucu döndürür.
+        :return: AsyncResult (çıkışlar, meta, gönderimdeki yakalama zamanı ve roi) veya hazır sonuç yoksa None.
+            Daha eski tamamlanmış sonuçlar atlanır.
+        """
+        newest_slot = None
+        for slot in self.slots:
+            if slot['in_flight'] and slot['done_event'].query():
+                slot['in_flight'] = False
+                if slot['seq'] > self.last_polled_seq and (newest_slot is None or slot['seq'] > newest_slot['seq']):
+                    newest_slot = slot
+        if newest_slot is None:
+            return None
+        self.last_polled_seq = newest_slot['seq']
+        # Slot bir sonraki submit'te yeniden kullanılacağı için çıkışları kopyala
+        outputs = [_host_view(output).copy() for output in newest_slot['outputs']]
+        return AsyncResult(outputs, newest_slot['meta'], newest_slot['timestamp'], newest_slot['roi'])
+
+    def synchronize(self):
+        """Kuyruktaki tüm işlerin bitmesini bekler (ısıtma ve kapatma için)."""
+        for slot in self.slots:
+            slot['stream'].synchronize()
+
+
+class YoloModel:
+    """
+    Tek bir YOLO modelinin tüm çalışma durumunu tutar.
+    backend "tensorrt" ise motor/bağlam/akış/tamponlar, "onnx" ise ONNX Runtime oturumu kullanılır.
+    """
+
+    def __init__(self, model_path, classes=None):
+        self.model_path = model_path
+        self.classes = classes if classes is not None else []
+        self.backend = None
+        self.backend_choice = None  # backend_selector aday adı (örn. "tensorrt", "ort-cpu:4")
+        self.input_height = DEFAULT_IMG_HEIGHT
+        self.input_width = DEFAULT_IMG_WIDTH
+        # Dinamik girişli modellerde çalışma zamanında seçilebilen kare giriş boyutları
+        self.dynamic_input = False
+        self.input_sizes = [DEFAULT_IMG_WIDTH]
+        # Tek çağrıda işlenebilecek en büyük toplu boyutu (döşemeli çıkarım için)
+        self.max_batch = 1
+
+        # TensorRT durumu
+        self.trt_runtime = None
+        self.trt_engine = None
+        self.trt_context = None
+        self.trt_stream = None
+        self.trt_inputs = []
+        self.trt_outputs = []
+        self.trt_profile_sizes = []
+        self.trt_profile_sets = 0  # 0: statik motor (profil geçişi yok)
+
+        # ONNX Runtime durumu
+        self.session = None
+        self.ort_runner = None  # Önceden ayrılmış OrtValue'larla IO binding çalıştırıcısı
+        self.input_name = None
+        self.output_names = []
+
+        # Çıkış düzeni (bkz. detect_output_layout)
+        self.output_layout = OUTPUT_LAYOUT_RAW
+
+        # Asenkron TensorRT çalıştırıcısı (yalnızca TensorRT modelleri için, etkinleştirilirse)
+        self.async_executor = None
+
+        # GPU ön işleme çekirdeği ve ham kare tamponu (yalnızca TensorRT modelleri için)
+        self.gpu_letterbox = None
+        self.frame_staging = None
+
+    @property
+    def is_tensorrt(self):
+        return self.backend == "tensorrt"
+
+    def nearest_input_size(self, size):
+        """Modelin desteklediği giriş boyutlarından istenene en yakın olanı döndürür."""
+        return min(self.input_sizes, key=lambda available: abs(available - size))
+
+    def set_input_size(self, size, batch=1):
+        """
+        Dinamik girişli modelde giriş çözünürlüğünü (ve toplu boyutunu) değiştirir. TensorRT'de bağlam ilgili
+        optimizasyon profiline geçirilir; tamponlar en kötü duruma göre ayrıldığından yeniden ayırma yapılmaz.
+        Statik modellerde etkisizdir.
+        :return: Kullanılan giriş boyutu.
+        """
+        if not self.dynamic_input:
+            return self.input_height
+        size = self.nearest_input_size(size)
+        if self.backend == "tensorrt" and self.trt_inputs[0]['shape'] != (batch, 3, size, size):
+            set_context_input_size(self.trt_context, self.trt_stream, self.trt_inputs, self.trt_outputs,
+                                   self.trt_profile_sizes.index(size), size, batch)
+        self.input_width = self.input_height = size
+        return size
+
+    def infer(self, input_image):
+        """
+        Ön işlenmiş (B, 3, H, W) float32 girişle çıkarım yapar.
+        :return: Çıkış numpy dizilerinin listesi.
+        """
+        if self.backend == "tensorrt":
+            if self.dynamic_input and tuple(input_image.shape) != self.trt_inputs[0]['shape']:
+                self.set_input_size(input_image.shape[2], input_image.shape[0])
+            # Giriş verilerini ana bilgisayardan cihaza kopyala
+            host_input = _host_view(self.trt_inputs[0])
+            np.copyto(host_input, input_image.reshape(host_input.shape))
+            cuda.memcpy_htod_async(self.trt_inputs[0]['device'], host_input, self.trt_stream)
+            return self._execute_trt_and_read()
+
+        if self.ort_runner is not None:
+            return self.ort_runner.run(input_image)
+        return self.session.run(self.output_names, {self.input_name: input_image})
+
+    def _execute_trt_and_read(self):
+        # Çıkarım ve geri okuma, yükleme ile aynı akışta sıralanır
+        self.trt_context.execute_async_v3(self.trt_stream.handle)
+        _enqueue_readback(self.trt_outputs, self.trt_stream)
+        self.trt_stream.synchronize()
+        return [_host_view(output) for output in self.trt_outputs]
+
+    def infer_frame(self, frame, input_size=None, roi=None):
+        """
+        Ham BGR kare ile çıkarım yapar. Ön işleme mümkünse GPU'da, değilse CPU'da yapılır.
+        :param input_size: Dinamik girişli modellerde bu kare için kullanılacak giriş boyutu (None: geçerli boyut).
+        :param roi: (x0, y0, x1, y1) verilirse yalnızca bu kırpıntı işlenir; LetterboxInfo ofseti kutuları
+                    tam kare koordinatlarına geri taşır.
+        :return: (çıkışlar, LetterboxInfo)
+        """
+        if input_size is not None:
+            self.set_input_size(input_size)
+        frame, offset = _crop_roi(frame, roi)
+        if self.gpu_letterbox is not None:
+            letterbox = self.gpu_letterbox.enqueue(frame, self.frame_staging, self.trt_inputs[0]['device'],
+                                                   self.input_width, self.input_height, self.trt_stream)
+            return self._execute_trt_and_read(), letterbox._replace(offset_x=offset[0], offset_y=offset[1])
+        input_image, letterbox = letterbox_cpu(frame, self.input_width, self.input_height)
+        return self.infer(input_image), letterbox._replace(offset_x=offset[0], offset_y=offset[1])
+
+    def infer_tiles(self, frame, tile_origins, tile_size):
+        """
+        Karenin doğal çözünürlüklü tile_size x tile_size döşemeleriyle tek bir toplu çıkarım yapar.
+        len(tile_origins) en fazla max_batch olmalı; döşemeler karenin içinde olmalı.
+        :return: (çıkışlar (toplu boyutu = döşeme sayısı), döşeme başına LetterboxInfo listesi)
+        """
+        batch = len(tile_origins)
+        if self.gpu_letterbox is not None:
+            self.set_input_size(tile_size, batch)
+            infos = self.gpu_letterbox.enqueue_tiles(frame, self.frame_staging, self.trt_inputs[0]['device'],
+                                                     tile_origins, tile_size, self.trt_stream)
+            return self._execute_trt_and_read(), infos
+        tiles = [frame[y0:y0 + tile_size, x0:x0 + tile_size] for x0, y0 in tile_origins]
+        # blobFromImages; BGR->RGB, HWC->CHW ve 1/255 ölçeklemeyi tüm döşemeler için tek çağrıda yapar
+        input_batch = cv2.dnn.blobFromImages(tiles, scalefactor=1.0 / 255.0, swapRB=True)
+        infos = [LetterboxInfo(1.0, 0, 0, tile_size, tile_size, x0, y0) for x0, y0 in tile_origins]
+        return self.infer(input_batch), infos
+
+    def warmup(self, iterations=2):
+        """
+        İlk gerçek karede gecikme olmaması için modeli boş bir girişle ısıtır.
+        Dinamik girişli modellerde her giriş boyutu ısıtılır, böylece çözünürlük değişimi de takılmaz.
+        """
+        default_size = self.input_height
+        sizes = self.input_sizes if self.dynamic_input else [default_size]
+        for size in sizes:
+            self.set_input_size(size)
+            dummy_input = np.zeros((1, 3, self.input_height, self.input_width), dtype=np.float32)
+            for _ in range(iterations):
+                self.infer(dummy_input)
+            if self.async_executor is not None:
+                # Her slotun kendi bağlamı olduğundan hepsini bir kez çalıştır
+                for _ in range(len(self.async_executor.slots)):
+                    self.async_executor.submit(dummy_input)
+                self.async_executor.synchronize()
+                while self.async_executor.poll() is not None:
+                    pass
+        self.set_input_size(default_size)
+
+    def enable_gpu_preprocessing(self):
+        """TensorRT modeli için GPU ön işleme çekirdeğini hazırlar (derlenemezse CPU yolu kalır)."""
+        if self.backend != "tensorrt":
+            return
+        self.gpu_letterbox = create_gpu_letterbox()
+        if self.gpu_letterbox is not None:
+            self.frame_staging = FrameStaging()
+            print("HATA AYIKLAMA: GPU ön işleme (letterbox + renk + CHW) etkin.")
+
+    def enable_async_execution(self, num_slots=ASYNC_EXECUTION_SLOTS):
+        """TensorRT modeli için çok slotlu asenkron çalıştırıcıyı oluşturur."""
+        if self.backend != "tensorrt":
+            return
+        if self.trt_profile_sets:
+            # Senkron bağlam 0. profil grubunu kullanır; her slota kalan gruplardan biri verilir
+            num_slots = min(num_slots, self.trt_profile_sets - 1)
+        if num_slots < 2:
+            print("HATA AYIKLAMA: Asenkron çalıştırma için yeterli slot/profil grubu yok, senkron yol kullanılacak.")
+            return
+        self.async_executor = AsyncTrtExecutor(self.trt_engine, num_slots, self.gpu_letterbox,
+                                               self.trt_profile_sizes, 1 if self.trt_profile_sets else None)
+        print(f"HATA AYIKLAMA: Asenkron TensorRT çalıştırma etkin ({num_slots} slot).")
+
+
+def _load_tensorrt_engine(model, engine_path):
+    """Bir .engine dosyasını deserialize eder ve modelin kendi tamponlarını ayırır."""
+    TRT_LOGGER = trt.Logger(trt.Logger.WARNING)
+    model.trt_runtime = trt.Runtime(TRT_LOGGER)
+    with open(engine_path, "rb") as f:
+        model.trt_engine = model.trt_runtime.deserialize_cuda_engine(f.read())
+    if not model.trt_engine:
+        raise RuntimeError("TensorRT motoru yüklenemedi.")
+
+    print("TensorRT motoru başarıyla yüklendi.")
+    engine = model.trt_engine
+    model.trt_context = engine.create_execution_context()
+
+    input_shape = None
+    for i in range(engine.num_io_tensors):
+        binding_name = engine.get_tensor_name(i)
+        if engine.get_tensor_mode(binding_name) == trt.TensorIOMode.INPUT:
+            input_shape = engine.get_tensor_shape(binding_name)
+            break
+    if input_shape is None:
+        raise RuntimeError("TensorRT motorundan giriş bağlama adı belirlenemedi.")
+
+    # Giriş/çıkış belleği ayır (her model kendi tamponlarına ve akışına sahiptir)
+    model.trt_stream = cuda.Stream()
+    if len(input_shape) == 4 and any(dim < 0 for dim in input_shape):
+        # Dinamik motor: senkron bağlam 0. profil grubunu kullanır, tamponlar en kötü duruma göre ayrılır
+        model.trt_profile_sizes, model.trt_profile_sets = get_engine_profile_layout(engine)
+        model.trt_inputs, model.trt_outputs = allocate_io_buffers(engine, model.trt_context, model.trt_stream,
+                                                                  0, model.trt_profile_sizes)
+        model.dynamic_input = True
+        model.input_sizes = list(model.trt_profile_sizes)
+        model.max_batch = int(engine.get_tensor_profile_shape(model.trt_inputs[0]['name'], 0)[2][0])
+        model.set_input_size(DEFAULT_IMG_HEIGHT)
+        print(f"TensorRT motoru dinamik giriş boyutları: {model.input_sizes} "
+              f"({model.trt_profile_sets} profil grubu), başlangıç: {model.input_width}x{model.input_height}")
+    else:
+        model.trt_inputs, model.trt_outputs = allocate_io_buffers(engine, model.trt_context, model.trt_stream)
+        if len(input_shape) == 4:
+            model.input_height = input_shape[2]
+            model.input_width = input_shape[3]
+            model.input_sizes = [model.input_height]
+            print(f"TensorRT motoru giriş boyutu algılandı: {model.input_width}x{model.input_height}")
+        else:
+            print(f"TensorRT motoru giriş boyutu beklenmedik formatta ({input_shape}). "
+                  f"Varsayılan {model.input_width}x{model.input_height} kullanılacak.")
+
+    if not model.trt_outputs:
+        raise RuntimeError("TensorRT motorundan çıkış bağlama adı belirlenemedi.")
+    model.output_layout = detect_output_layout([output['shape'] for output in model.trt_outputs])
+    print(f"TensorRT motoru çıkış düzeni: {model.output_layout}")
+    model.backend = "tensorrt"
+
+
+def _load_onnx_session(model, onnx_path, provider=ort_backend.PROVIDER_CPU, threads=None):
+    """
+    ONNX Runtime oturumunu ve IO binding çalıştırıcısını oluşturur (bkz. ort_backend).
+    :param provider: ort_backend.PROVIDER_* (sağlayıcı backend_selector tarafından seçilir).
+    :param threads: CPU sağlayıcısı iş parçacığı sayısı.
+    """
+    model.session, model.ort_runner = ort_backend.create_runner(onnx_path, provider, threads)
+    print("ONNX modeli başarıyla yüklendi.")
+
+    model.input_name = model.session.get_inputs()[0].name
+    model.output_names = [output.name for output in model.session.get_outputs()]
+    input_shape = model.session.get_inputs()[0].shape
+
+    # ONNX model giriş şekli (toplu, kanallar, yükseklik, genişlik) formatında olmalı
+    if len(input_shape) == 4 and isinstance(input_shape[2], int) and isinstance(input_shape[3], int):
+        model.input_height = input_shape[2]
+        model.input_width = input_shape[3]
+        model.input_sizes = [model.input_height]
+        model.max_batch = ONNX_DYNAMIC_MAX_BATCH if not isinstance(input_shape[0], int) else input_shape[0]
+        print(f"ONNX model giriş boyutu algılandı: {model.input_width}x{model.input_height}")
+    elif len(input_shape) == 4:
+        # Dinamik dışa aktarılmış model: giriş boyutu kare başına seçilebilir
+        model.dynamic_input = True
+        model.input_sizes = list(DYNAMIC_INPUT_SIZES)
+        model.max_batch = ONNX_DYNAMIC_MAX_BATCH if not isinstance(input_shape[0], int) else input_shape[0]
+        model.set_input_size(DEFAULT_IMG_HEIGHT)
+        print(f"ONNX model dinamik giriş boyutları: {model.input_sizes}, "
+              f"başlangıç: {model.input_width}x{model.input_height}")
+    else:
+        print(f"ONNX model giriş boyutu beklenmedik formatta ({input_shape}). "
+              f"Varsayılan {model.input_width}x{model.input_height} kullanılacak.")
+    model.output_layout = detect_output_layout([output.shape for output in model.session.get_outputs()])
+    print(f"ONNX model çıkış düzeni: {model.output_layout}")
+    model.backend = "onnx"
+
+
+# backend_selector aday adı -> ort_backend sağlayıcısı
+_CANDIDATE_PROVIDERS = {
+    backend_selector.CANDIDATE_ORT_TENSORRT: ort_backend.PROVIDER_TENSORRT,
+    backend_selector.CANDIDATE_ORT_CUDA: ort_backend.PROVIDER_CUDA,
+    backend_selector.CANDIDATE_ORT_CPU: ort_backend.PROVIDER_CPU,
+}
+
+
+def _load_candidate(onnx_path, classes, candidate, engine_path):
+    """Modeli verilen backend_selector adayıyla yükler (ölçüm ve kayıtlı karar için)."""
+    name, threads = backend_selector.parse_candidate(candidate)
+    if name == backend_selector.CANDIDATE_TENSORRT:
+        if engine_path is None or not TRT_AVAILABLE:
+            raise RuntimeError("Yerel TensorRT motoru kullanılamıyor.")
+        model = YoloModel(engine_path, classes)
+        try:
+            _load_tensorrt_engine(model, engine_path)
+        except Exception:
+            # Önbellekteki motor bu sürücü/TensorRT ile uyumsuz; sil ki yeniden derlensin
+            engine_cache.invalidate(engine_path)
+            raise
+        return model
+    if name not in _CANDIDATE_PROVIDERS:
+        raise ValueError(f"Bilinmeyen arka uç: {candidate}")
+    model = YoloModel(onnx_path, classes)
+    _load_onnx_session(model, onnx_path, _CANDIDATE_PROVIDERS[name], threads)
+    return model
+
+
+# YOLO modelini yükleme fonksiyonu
+def load_yolo_model(model_path, classes=None, fallback_onnx_path=None, use_engine_cache=None):
+    """
+    Bir YOLO modelini yükler ve yeni bir YoloModel döndürür. Başarısız olursa None döner.
+    :param model_path: .engine veya .onnx dosya yolu.
+    :param classes: Modelin sınıf adları listesi.
+    :param fallback_onnx_path: .engine yüklenemezse kullanılacak ONNX yolu (motor önbelleğinden gelen motorlar için).
+    :param use_engine_cache: .onnx için motor önbelleği kullanılsın mı. None ise USE_ENGINE_CACHE.
+    """
+    if use_engine_cache is None:
+        use_engine_cache = USE_ENGINE_CACHE
+    print(f"YOLO modeli yükleniyor: {model_path}")
+
+    # .onnx için önce motor önbelleğine bak; yoksa arka planda derle. Arka uç (yerel TensorRT motoru veya
+    # ONNX Runtime sağlayıcıları) ölçümle seçilir; motor hazır olunca seçim yeniden yapılır.
+    if model_path.endswith(".onnx"):
+        cached_engine_path = None
+        if TRT_AVAILABLE and use_engine_cache:
+            try:
+                cached_engine_path = engine_cache.lookup_engine(model_path)
+                if cached_engine_path is None:
+                    engine_cache.start_background_build(model_path)
+                    print("Motor hazır olana kadar ONNX Runtime kullanılacak.")
+            except Exception as e:
+                print(f"UYARI: Motor önbelleği kullanılamadı: {e}")
+                traceback.print_exc()
+        choice, model = backend_selector.select_backend(
+            model_path, backend_selector.list_candidates(cached_engine_path, onnx_path=model_path),
+            lambda candidate: _load_candidate(model_path, classes, candidate, cached_engine_path))
+        if model is None:
+            print(f"YOLO modeli hiçbir arka uçla yüklenemedi: {model_path}")
+            print(
+                "Lütfen YOLO_MODEL_PATH'in doğru olduğundan, gerekli kütüphanelerin (onnxruntime-gpu) kurulu olduğundan ve GPU sürücülerinizin güncel olduğundan emin olun.")
+            return None
+        model.backend_choice = choice
+        return model
+
+    model = YoloModel(model_path, classes)
+    if model_path.endswith(".engine") and TRT_AVAILABLE:
+        try:
+            _load_tensorrt_engine(model, model_path)
+            return model
+        except Exception as e:
+            print(f"HATA: TensorRT motoru yüklenirken veya yapılandırılırken hata: {e}")
+            traceback.print_exc()
+            print("TensorRT yüklenemedi, ONNX Runtime'a geri dönülüyor.")
+            # TensorRT başarısız olursa, ONNX Runtime'a geri dön
+            if fallback_onnx_path is not None:
+                # Önbellekteki motor bu sürücü/TensorRT ile uyumsuz; sil ki yeniden derlensin
+                engine_cache.invalidate(model_path)
+                return load_yolo_model(fallback_onnx_path, classes)
+            return load_yolo_model(model_path.replace(".engine", ".onnx"), classes)  # ONNX versiyonunu dene
+    else:
+        print("Desteklenmeyen model formatı. Yalnızca .onnx veya .engine desteklenir.")
+        return None
+
+
+class ModelRegistry:
+    """
+    Kayıtlı YOLO modellerini bellekte tutar. Modeller arka planda yüklenip ısıtılır;
+    activate() yalnızca etkin model işaretçisini değiştirir (yeniden yükleme yapmaz).
+    :param async_slots: TensorRT modellerinde asenkron çalıştırma slot sayısı (0: yalnızca senkron yol).
+    """
+
+    def __init__(self, async_slots=ASYNC_EXECUTION_SLOTS):
+        self.async_slots = async_slots
+        self._lock = threading.Lock()
+        self._specs = {}  # ad -> (model_yolu, sınıflar)
+        self._models = {}  # ad -> YoloModel
+        self._loading = set()
+        self._pending_promotions = []  # Model yüklenirken tamamlanan motor derlemeleri
+        self.active_name = None
+        self.active_model = None
+
+    def register(self, name, model_path, classes):
+        """Bir modeli adıyla kaydeder (yüklemez)."""
+        with self._lock:
+            self._specs[name] = (model_path, classes)
+
+    def get(self, name):
+        return self._models.get(name)
+
+    def is_loading(self, name):
+        with self._lock:
+            return name in self._loading
+
+    def activate(self, name):
+        """Etkin modeli değiştirir. Model henüz yüklenmediyse arka planda yüklenmeye başlar ve None döner."""
+        self.active_name = name
+        self.active_model = self._models.get(name)
+        if self.active_model is None and name in self._specs:
+            self.load_in_background([name])
+        return self.active_model
+
+    def deactivate(self):
+        self.active_name = None
+        self.active_model = None
+
+    def _install(self, name, model):
+        """Yüklenen modeli kayda ekler; etkin model buysa işaretçiyi de günceller."""
+        with self._lock:
+            self._models[name] = model
+            if self.active_name == name:
+                self.active_model = model
+
+    def _load_worker(self, name, model_path, classes):
+        # pycuda.autoinit bağlamı ana iş parçacığına aittir; tamponların aynı bağlamda oluşması için bu iş parçacığında etkinleştir
+        if TRT_AVAILABLE:
+            pycuda.autoinit.context.push()
+        try:
+            model = load_yolo_model(model_path, classes)
+            if model is None:
+                print(f"HATA (ModelRegistry): '{name}' modeli yüklenemedi.")
+                return
+            model.enable_gpu_preprocessing()
+            if self.async_slots:
+                model.enable_async_execution(self.async_slots)
+            model.warmup()
+            self._install(name, model)
+            print(f"HATA AYIKLAMA (ModelRegistry): '{name}' modeli hazır ({model.backend_choice or model.backend}, "
+                  f"{model.input_width}x{model.input_height}).")
+        except Exception as e:
+            print(f"HATA (ModelRegistry): '{name}' modeli yüklenirken hata: {e}")
+            traceback.print_exc()
+        finally:
+            if TRT_AVAILABLE:
+                cuda.Context.pop()
+            with self._lock:
+                self._loading.discard(name)
+
+    def load_in_background(self, names=None):
+        """Verilen (veya tüm) kayıtlı modelleri yüklenmemişse arka planda yükler ve ısıtır."""
+        with self._lock:
+            names = list(self._specs) if names is None else names
+            to_load = [n for n in names if n not in self._models and n not in self._loading]
+            self._loading.update(to_load)
+            specs = {n: self._specs[n] for n in to_load}
+        for name, (model_path, classes) in specs.items():
+            threading.Thread(target=self._load_worker, args=(name, model_path, classes),
+                             name=f"model-load-{name}", daemon=True).start()
+
+    def promote_built_engines(self):
+        """
+        Arka planda derlenen TensorRT motorları hazır olduğunda ilgili modeli yeniden yükler; aday kümesine motor
+        eklendiği için arka uç yeniden ölçülür. Yeni model hazır olana kadar mevcut model kullanılmaya devam eder.
+        """
+        self._pending_promotions.extend(engine_cache.pop_finished_builds())
+        still_pending = []
+        for onnx_path, engine_path in self._pending_promotions:
+            with self._lock:
+                names = [n for n, (path, _) in self._specs.items() if path == onnx_path]
+                if any(n in self._loading for n in names):
+                    # İlk yükleme sürüyor; bittikten sonra geçiş yap
+                    still_pending.append((onnx_path, engine_path))
+                    continue
+                self._loading.update(names)
+            for name in names:
+                classes = self._specs[name][1]
+                print(f"HATA AYIKLAMA (ModelRegistry): '{name}' için TensorRT motoru hazır ({engine_path}), "
+                      f"arka uç yeniden seçiliyor.")
+                threading.Thread(target=self._load_worker, args=(name, onnx_path, classes),
+                                 name=f"model-promote-{name}", daemon=True).start()
+        self._pending_promotions = still_pending
@@ -0,0 +1,243 @@
+# yolo_postprocess.py
+# YOLO çıktısının vektörleştirilmiş son işlemesi. Sınıf seçimi (argmax), güven eşiği, xywh -> xyxy dönüşümü ve
+# letterbox geri eşlemesi önceden ayrılmış bir çalışma alanında dizi işlemleriyle yapılır; Python döngüsü yoktur.
+# NMS sınıf bazlıdır (üst üste binen kırmızı ve mavi balon birbirini bastırmaz): OpenCV'de NMSBoxesBatched varsa
+# o, yoksa NumPy IoU ile açgözlü NMS kullanılır.
+# Sonuç, satır başına bir tespit içeren kompakt bir (K, 6) float32 dizidir: x1, y1, x2, y2, skor, sınıf.
+#
+# Mikro kıyaslama: python yolo_postprocess.py --classes 2 --anchors 8400
+
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from yolo_models import OUTPUT_LAYOUT_EFFICIENT_NMS, OUTPUT_LAYOUT_RAW
+
+# Sonuç dizisinin sütunları
+DET_X1, DET_Y1, DET_X2, DET_Y2, DET_SCORE, DET_CLASS = range(6)
+
+# NMS'e girecek en fazla aday (düşük eşiklerde en yüksek skorlu adaylar tutulur)
+MAX_NMS_CANDIDATES = 3000
+
+_HAS_NMS_BOXES_BATCHED = hasattr(cv2.dnn, "NMSBoxesBatched")
+
+
+def nms_class_aware_numpy(xyxy, scores, class_ids, iou_threshold, max_det):
+    """
+    NumPy ile sınıf bazlı açgözlü NMS. Kutular sınıf kimliğiyle orantılı bir ofsetle kaydırılır,
+    böylece farklı sınıfların kutuları hiçbir zaman çakışmaz ve tek geçişte tüm sınıflar işlenir.
+    :return: Tutulan adayların indeksleri (skora göre azalan).
+    """
+    if len(scores) == 0:
+        return np.empty(0, dtype=np.intp)
+    offset = class_ids.astype(np.float32)[:, None] * (float(xyxy.max() - xyxy.min()) + 1.0)
+    boxes = xyxy + offset
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    order = np.argsort(-scores, kind="stable")
+
+    keep = []
+    while order.size > 0 and len(keep) < max_det:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        inter_w = np.clip(np.minimum(boxes[i, 2], boxes[rest, 2]) - np.maximum(boxes[i, 0], boxes[rest, 0]), 0, None)
+        inter_h = np.clip(np.minimum(boxes[i, 3], boxes[rest, 3]) - np.maximum(boxes[i, 1], boxes[rest, 1]), 0, None)
+        inter = inter_w * inter_h
+        iou = inter / (areas[i] + areas[rest] - inter + 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.asarray(keep, dtype=np.intp)
+
+
+def nms_detections(detections, iou_threshold, max_det=300):
+    """
+    Kompakt (K, 6) tespit dizisine sınıf bazlı NMS uygular (örn. döşemeler arası birleştirme).
+    :return: Tutulan satırlar, skora göre azalan (yeni dizi).
+    """
+    if len(detections) == 0:
+        return detections
+    if _HAS_NMS_BOXES_BATCHED:
+        xywh = detections[:, :4].copy()
+        xywh[:, 2:] -= xywh[:, :2]
+        keep = cv2.dnn.NMSBoxesBatched(xywh, detections[:, DET_SCORE], detections[:, DET_CLASS].astype(np.int32),
+                                       0.0, iou_threshold)
+        keep = np.asarray(keep, dtype=np.intp).reshape(-1)[:max_det]
+    else:
+        keep = nms_class_aware_numpy(detections[:, :4], detections[:, DET_SCORE],
+                                     detections[:, DET_CLASS].astype(np.intp), iou_threshold, max_det)
+    return detections[keep]
+
+
+class YoloPostprocessor:
+    """
+    Önceden ayrılmış çalışma alanıyla YOLO son işlemesi. Çalışma alanı, daha büyük bir model çıktısı geldiğinde
+    bir kez büyür; kararlı durumda kare başına yalnızca hayatta kalan adaylar kadar küçük diziler oluşur.
+    """
+
+    def __init__(self, conf_threshold, nms_threshold, max_det=300, use_opencv_nms=True):
+        self.conf_threshold = conf_threshold
+        self.nms_threshold = nms_threshold
+        self.max_det = max_det
+        self.use_opencv_nms = use_opencv_nms and _HAS_NMS_BOXES_BATCHED
+
+        self._capacity = 0
+        self._scores = None
+        self._class_ids = None
+        self._mask = None
+        self._boxes = None  # xywh (orijinal kare koordinatları), NMSBoxesBatched girişi
+        self._result = np.zeros((max_det, 6), dtype=np.float32)
+
+    def _ensure_workspace(self, num_anchors):
+        if num_anchors > self._capacity:
+            self._scores = np.empty(num_anchors, dtype=np.float32)
+            self._class_ids = np.empty(num_anchors, dtype=np.intp)
+            self._mask = np.empty(num_anchors, dtype=bool)
+            self._boxes = np.empty((num_anchors, 4), dtype=np.float32)
+            self._capacity = num_anchors
+
+    def process(self, outputs, output_layout, letterbox):
+        """
+        Model çıkışlarını (herhangi bir düzende) kompakt tespit dizisine dönüştürür.
+        :return: (K, 6) float32 dizi: x1, y1, x2, y2, skor, sınıf (orijinal kare koordinatlarında).
+                 Dönen dizi çalışma alanının bir görünümüdür; bir sonraki çağrıda üzerine yazılır.
+        """
+        if output_layout == OUTPUT_LAYOUT_RAW:
+            return self.process_raw(outputs[0], letterbox)
+        return self.process_fused(outputs, output_layout, letterbox)
+
+    def process_raw(self, output, letterbox):
+        """Ham (1, 4+C, N) başlığını çözer, eşikler ve sınıf bazlı NMS uygular."""
+        predictions = output[0]  # (4+C, N); transpoz yok, sütunlar doğrudan okunur
+        num_anchors = predictions.shape[1]
+        self._ensure_workspace(num_anchors)
+        scores = self._scores[:num_anchors]
+        class_ids = self._class_ids[:num_anchors]
+        mask = self._mask[:num_anchors]
+
+        class_scores = predictions[4:]
+        np.max(class_scores, axis=0, out=scores)
+        np.argmax(class_scores, axis=0, out=class_ids)
+        np.greater(scores, self.conf_threshold, out=mask)
+        candidates = np.flatnonzero(mask)
+        if candidates.size == 0:
+            return self._result[:0]
+        if candidates.size > MAX_NMS_CANDIDATES:
+            top = np.argpartition(-scores[candidates], MAX_NMS_CANDIDATES)[:MAX_NMS_CANDIDATES]
+            candidates = candidates[top]
+
+        count = candidates.size
+        boxes = self._boxes[:count]
+        cand_scores = scores[candidates]
+        cand_classes = class_ids[candidates]
+        # xywh (merkez) -> sol üst + boyut, letterbox dolgusu çıkarılıp ölçek geri alınarak
+        inv_scale = 1.0 / letterbox.scale
+        half_w = predictions[2, candidates] * 0.5
+        half_h = predictions[3, candidates] * 0.5
+        np.multiply(predictions[0, candidates] - half_w - letterbox.pad_x, inv_scale, out=boxes[:, 0])
+        np.multiply(predictions[1, candidates] - half_h - letterbox.pad_y, inv_scale, out=boxes[:, 1])
+        np.multiply(predictions[2, candidates], inv_scale, out=boxes[:, 2])
+        np.multiply(predictions[3, candidates], inv_scale, out=boxes[:, 3])
+        if letterbox.offset_x or letterbox.offset_y:
+            # Giriş bir ROI kırpıntısıysa kutuları tam kare koordinatlarına taşı
+            boxes[:, 0] += letterbox.offset_x
+            boxes[:, 1] += letterbox.offset_y
+
+        if self.use_opencv_nms:
+            keep = cv2.dnn.NMSBoxesBatched(boxes, cand_scores, cand_classes.astype(np.int32),
+                                           self.conf_threshold, self.nms_threshold)
+            keep = np.asarray(keep, dtype=np.intp).reshape(-1)
+        else:
+            xyxy = boxes.copy()
+            xyxy[:, 2:] += xyxy[:, :2]
+            keep = nms_class_aware_numpy(xyxy, cand_scores, cand_classes, self.nms_threshold, self.max_det)
+
+        n = min(len(keep), self.max_det)
+        keep = keep[:n]
+        result = self._result[:n]
+        result[:, DET_X1] = boxes[keep, 0]
+        result[:, DET_Y1] = boxes[keep, 1]
+        result[:, DET_X2] = boxes[keep, 0] + boxes[keep, 2]
+        result[:, DET_Y2] = boxes[keep, 1] + boxes[keep, 3]
+        result[:, DET_SCORE] = cand_scores[keep]
+        result[:, DET_CLASS] = cand_classes[keep]
+        return result
+
+    def process_fused(self, outputs, output_layout, letterbox):
+        """NMS'i modelin içinde yapılmış top-K çıktısından yalnızca eşik ve letterbox geri eşlemesi uygular."""
+        if output_layout == OUTPUT_LAYOUT_EFFICIENT_NMS:
+            num_dets = int(outputs[0].ravel()[0])
+            xyxy = outputs[1].reshape(-1, 4)[:num_dets]
+            scores = outputs[2].ravel()[:num_dets]
+            class_ids = outputs[3].ravel()[:num_dets]
+        else:
+            rows = outputs[0].reshape(-1, 6)
+            xyxy, scores, class_ids = rows[:, :4], rows[:, 4], rows[:, 5]
+
+        keep = np.flatnonzero(scores > self.conf_threshold)[:self.max_det]
+        n = keep.size
+        result = self._result[:n]
+        inv_scale = 1.0 / letterbox.scale
+        result[:, DET_X1] = (xyxy[keep, 0] - letterbox.pad_x) * inv_scale + letterbox.offset_x
+        result[:, DET_Y1] = (xyxy[keep, 1] - letterbox.pad_y) * inv_scale + letterbox.offset_y
+        result[:, DET_X2] = (xyxy[keep, 2] - letterbox.pad_x) * inv_scale + letterbox.offset_x
+        result[:, DET_Y2] = (xyxy[keep, 3] - letterbox.pad_y) * inv_scale + letterbox.offset_y
+        result[:, DET_SCORE] = scores[keep]
+        result[:, DET_CLASS] = class_ids[keep]
+        return result
+
+
+def _process_reference(output, letterbox, conf_threshold, nms_threshold):
+    """Kıyaslama için eski satır satır Python döngüsü + sınıf bağımsız NMSBoxes uygulaması."""
+    predictions = np.squeeze(output).T
+    scores = np.max(predictions[:, 4:], axis=1)
+    valid_predictions = predictions[scores > conf_threshold]
+    valid_scores = scores[scores > conf_threshold]
+    boxes, confidences, class_ids = [], [], []
+    for row, score in zip(valid_predictions, valid_scores):
+        center_x, center_y, w, h = row[:4]
+        boxes.append([int((center_x - w / 2 - letterbox.pad_x) / letterbox.scale),
+                      int((center_y - h / 2 - letterbox.pad_y) / letterbox.scale),
+                      int(w / letterbox.scale), int(h / letterbox.scale)])
+        confidences.append(float(score))
+        class_ids.append(np.argmax(row[4:]))
+    return cv2.dnn.NMSBoxes(boxes, confidences, conf_threshold, nms_threshold)
+
+
+def _benchmark():
+    from gpu_preprocess import compute_letterbox
+
+    parser = argparse.ArgumentParser(description="YOLO son işleme mikro kıyaslaması")
+    parser.add_argument("--classes", type=int, default=2)
+    parser.add_argument("--anchors", type=int, default=8400)
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.4, 0.1, 0.01])
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    output = np.empty((1, 4 + args.classes, args.anchors), dtype=np.float32)
+    output[0, 0:2] = rng.uniform(0, 640, (2, args.anchors))
+    output[0, 2:4] = rng.uniform(8, 120, (2, args.anchors))
+    output[0, 4:] = rng.random((args.classes, args.anchors)) ** 3  # çoğu aday düşük skorlu
+    letterbox, _, _ = compute_letterbox(1280, 720, 640, 640)
+
+    print(f"Çıkış: {output.shape}, NMSBoxesBatched: {_HAS_NMS_BOXES_BATCHED}")
+    for conf in args.thresholds:
+        survivors = int((output[0, 4:].max(axis=0) > conf).sum())
+        timings = {}
+        for name, fn in (
+                ("eski (döngü)", lambda: _process_reference(output, letterbox, conf, 0.4)),
+                ("vektör + OpenCV NMS", YoloPostprocessor(conf, 0.4, use_opencv_nms=True).process_raw),
+                ("vektör + NumPy NMS", YoloPostprocessor(conf, 0.4, use_opencv_nms=False).process_raw)):
+            call = fn if name.startswith("eski") else (lambda f=fn: f(output, letterbox))
+            call()  # ısıtma
+            start = time.perf_counter()
+            for _ in range(args.iterations):
+                call()
+            timings[name] = (time.perf_counter() - start) / args.iterations * 1000.0
+        summary = ", ".join(f"{name}: {ms:.2f} ms" for name, ms in timings.items())
+        print(f"eşik={conf:<5} aday={survivors:<6} {summary}")
+
+
+if __name__ == "__main__":
+    _benchmark()